@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+"""
+Client-side idempotency keys for the create operations of the adapters.
+
+``create_qod_session``, ``create_traffic_influence_resource``, ``onboard_app``
+and ``deploy_app`` create a new resource on every call, so retrying one after a
+timeout may leave a duplicate NEF subscription or app instance behind. They
+accept an ``idempotency_key``: the first successful call with a key stores its
+result, and later calls with the same key return that result without calling
+the backend again::
+
+    network_client.attach_idempotency_store(SqliteIdempotencyStore("/var/lib/sdk/keys.db"))
+    session = network_client.create_qod_session(session_info, idempotency_key=request_id)
+
+Concurrent calls with the same key in one process share a single backend call.
+Failed calls (exceptions, HTTP error statuses) are not stored, so they can be
+retried with the same key. Reusing a key with different arguments raises
+IdempotencyKeyConflict instead of returning the result of another request.
+Once the resource created under a key is removed (e.g. a workflow compensating
+its steps), ``forget`` the key so that reusing it creates the resource again.
+
+MemoryIdempotencyStore is a bounded LRU for a single process.
+SqliteIdempotencyStore keeps the keys in a SQLite file that several processes
+can share: a call reserves its key with an INSERT before calling the backend,
+and the other processes wait for its result. A reservation older than ``lease``
+seconds is considered abandoned by a crashed process and taken over. Results
+are pickled, so the file must only be writable by trusted processes. Entries of
+both stores expire after ``ttl`` seconds.
+"""
+import copy
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from requests import Response
+
+from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.common.single_flight import SingleFlight, freeze
+
+log = logger.get_logger(__name__)
+
+_default_store_lock = threading.Lock()
+
+
+class IdempotencyKeyConflict(ValueError):
+    """An idempotency key was reused with different arguments."""
+
+
+def fingerprint(*args: Any) -> str:
+    """Digest of the arguments of a call, to tell requests sharing a key apart."""
+    return hashlib.sha256(repr(freeze(args)).encode()).hexdigest()
+
+
+def without(request: dict, *fields: str) -> dict:
+    """
+    Copy of a request without the fields an adapter adds to it in place (e.g.
+    the created resource ID), so retrying with the same dictionary still
+    matches the fingerprint of the first call.
+    """
+    return {name: value for name, value in request.items() if name not in fields}
+
+
+def succeeded(result: Any) -> bool:
+    """Whether an adapter result is a success worth replaying."""
+    if isinstance(result, Response):
+        return result.status_code < 400
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], int):
+        return result[1] < 400
+    return True
+
+
+class IdempotencyStore:
+    """
+    Base of the stores of call results by idempotency key.
+
+    Subclasses implement _load and _save of (fingerprint, result) entries,
+    and forget.
+    """
+
+    def __init__(self):
+        self._flights = SingleFlight()
+
+    def _load(self, key: str) -> tuple[str, Any] | None:
+        raise NotImplementedError
+
+    def _save(self, key: str, call_fingerprint: str, result: Any) -> None:
+        raise NotImplementedError
+
+    def forget(self, key: str) -> None:
+        """Removes the result stored for key, so the next call with it runs again."""
+        raise NotImplementedError
+
+    def call(self, key: str, fn: Callable, *args: Any, call_fingerprint: str | None = None) -> Any:
+        """
+        Result stored for key, or else the result of fn(*args), stored if the
+        call succeeded.
+
+        args:
+            key: idempotency key, namespaced by the caller.
+            fn: call creating the resource.
+            call_fingerprint: identifies the request; by default a digest of args.
+
+        raises:
+            IdempotencyKeyConflict: if key was used by a call with other arguments.
+        """
+        call_fingerprint = call_fingerprint or fingerprint(*args)
+        return self._flights.do(key, self._call, key, call_fingerprint, fn, args)
+
+    def _call(self, key: str, call_fingerprint: str, fn: Callable, args: tuple) -> Any:
+        stored = self._load(key)
+        if stored is not None:
+            if stored[0] != call_fingerprint:
+                raise IdempotencyKeyConflict(
+                    f"Idempotency key {key!r} was already used for a different request"
+                )
+            log.debug(f"Replaying the result of idempotency key {key!r}")
+            return stored[1]
+        result = fn(*args)
+        if succeeded(result):
+            self._save(key, call_fingerprint, result)
+        return result
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """
+    In-process LRU of call results.
+
+    args:
+        max_entries: keys kept; the least recently used ones are evicted.
+        ttl: seconds a key is kept.
+        clock: time source, in seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: float = 24 * 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self, key: str) -> tuple[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self.clock() - entry[0] >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Callers may modify what they get, e.g. the dictionaries of the network adapters
+        return entry[1], copy.deepcopy(entry[2])
+
+    def _save(self, key: str, call_fingerprint: str, result: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock(), call_fingerprint, copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SqliteIdempotencyStore(IdempotencyStore):
+    """
+    Call results kept in a SQLite database shared by several processes.
+
+    A key is reserved by a row without result while its call runs, so a call
+    with the same key in another process waits for that result instead of
+    calling the backend too.
+
+    args:
+        path: database file, created if missing.
+        max_entries: keys kept; the oldest ones are removed beyond it.
+        ttl: seconds a key is kept.
+        lease: seconds after which the reservation of a call that never
+               finished (e.g. its process crashed) can be taken over.
+        poll_interval: seconds between checks while waiting for the call of
+                       another process.
+        clock: wall clock time source, in seconds (shared between processes).
+        sleep: waits between checks.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 100_000,
+        ttl: float = 24 * 3600.0,
+        lease: float = 300.0,
+        poll_interval: float = 0.1,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.sleep = sleep
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, "
+                "result BLOB, created_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idempotency_keys_created_at "
+                "ON idempotency_keys (created_at)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM idempotency_keys").fetchone()[0]
+
+    def _load(self, key: str) -> tuple[str, Any] | None:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT fingerprint, result FROM idempotency_keys "
+                "WHERE key = ? AND created_at > ? AND result IS NOT NULL",
+                (key, self.clock() - self.ttl),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        return row[0], pickle.loads(row[1])
+
+    def _save(self, key: str, call_fingerprint: str, result: Any) -> None:
+        now = self.clock()
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO idempotency_keys VALUES (?, ?, ?, ?)",
+                (key, call_fingerprint, pickle.dumps(result), now),
+            )
+            connection.execute(
+                "DELETE FROM idempotency_keys WHERE created_at <= ? OR key IN ("
+                "SELECT key FROM idempotency_keys ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (now - self.ttl, self.max_entries),
+            )
+
+    def forget(self, key: str) -> None:
+        with self._connection() as connection:
+            connection.execute("DELETE FROM idempotency_keys WHERE key = ?", (key,))
+
+    def _reserve(self, key: str, call_fingerprint: str) -> tuple[str, Any, float] | None:
+        """
+        Reserves key for a call.
+
+        returns:
+            None when reserved, else the (fingerprint, pickled result or None
+            while running, created_at) of the entry holding the key.
+        """
+        now = self.clock()
+        with self._connection() as connection:
+            connection.execute(
+                "DELETE FROM idempotency_keys WHERE key = ? AND created_at <= ? "
+                "AND result IS NOT NULL",
+                (key, now - self.ttl),
+            )
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO idempotency_keys VALUES (?, ?, NULL, ?)",
+                (key, call_fingerprint, now),
+            )
+            if cursor.rowcount == 1:
+                return None
+            return connection.execute(
+                "SELECT fingerprint, result, created_at FROM idempotency_keys WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+    def _take_over(self, key: str, reserved_at: float) -> bool:
+        """Takes over an abandoned reservation, unless another process did first."""
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "UPDATE idempotency_keys SET created_at = ? "
+                "WHERE key = ? AND result IS NULL AND created_at = ?",
+                (self.clock(), key, reserved_at),
+            )
+        return cursor.rowcount == 1
+
+    def _release(self, key: str) -> None:
+        with self._connection() as connection:
+            connection.execute(
+                "DELETE FROM idempotency_keys WHERE key = ? AND result IS NULL", (key,)
+            )
+
+    def _call(self, key: str, call_fingerprint: str, fn: Callable, args: tuple) -> Any:
+        while True:
+            entry = self._reserve(key, call_fingerprint)
+            if entry is None:
+                break
+            stored_fingerprint, result, reserved_at = entry
+            if stored_fingerprint != call_fingerprint:
+                raise IdempotencyKeyConflict(
+                    f"Idempotency key {key!r} was already used for a different request"
+                )
+            if result is not None:
+                log.debug(f"Replaying the result of idempotency key {key!r}")
+                return pickle.loads(result)
+            if self.clock() - reserved_at >= self.lease:
+                if self._take_over(key, reserved_at):
+                    log.warning(f"Taking over the abandoned call of idempotency key {key!r}")
+                    break
+                continue
+            # Running in another process
+            self.sleep(self.poll_interval)
+        try:
+            result = fn(*args)
+        except BaseException:
+            self._release(key)
+            raise
+        if succeeded(result):
+            self._save(key, call_fingerprint, result)
+        else:
+            self._release(key)
+        return result
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def call(owner, operation: str, key: str, fn: Callable, *args: Any) -> Any:
+    """
+    Runs an adapter operation under an idempotency key.
+
+    The key is namespaced by the operation and the adapter base URL. Adapters
+    without an attached store get an in-memory one on first use.
+
+    args:
+        owner: adapter exposing an idempotency_store attribute.
+        operation: name of the operation, e.g. "deploy_app".
+        key: idempotency key given by the caller.
+        fn: operation to run, called with args.
+    """
+    if owner.idempotency_store is None:
+        with _default_store_lock:
+            if owner.idempotency_store is None:
+                owner.idempotency_store = MemoryIdempotencyStore()
+    return owner.idempotency_store.call(_namespaced(owner, operation, key), fn, *args)
+
+
+def forget(owner, operation: str, key: str) -> None:
+    """
+    Forgets the result of an adapter operation run under an idempotency key,
+    e.g. after removing the resource it created.
+    """
+    if owner.idempotency_store is not None:
+        owner.idempotency_store.forget(_namespaced(owner, operation, key))
+
+
+def _namespaced(owner, operation: str, key: str) -> str:
+    return f"{operation}:{getattr(owner, 'base_url', '')}:{key}"
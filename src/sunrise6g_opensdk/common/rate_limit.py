@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""
+Token-bucket rate limiting with priority admission queues.
+
+Limits are configured per backend ``base_url``, optionally narrowed to one
+``scs_as_id`` (AF) of that backend. Every HTTP call issued through
+``common.resilience`` is admitted by the default limiter first::
+
+    limiter = rate_limit.get_default_limiter()
+    limiter.configure("http://nef:8080", rate=20, burst=40)
+    limiter.configure("http://nef:8080", rate=5, scs_as_id="myNetApp")
+
+    with rate_limit.priority(rate_limit.Priority.bulk):
+        client.create_qod_session(...)    # queued behind interactive calls
+
+A limit applies to the URLs with the same scheme, host and port as its
+``base_url`` whose path is the base path or lies under it, segment-wise:
+``http://nef:8080/api`` does not limit ``http://nef:8080/api2``.
+
+Calls waiting for a token are served by priority, then in arrival order, so
+interactive calls overtake queued bulk jobs. Threads block in ``acquire``;
+coroutines await ``acquire_async`` without blocking their event loop.
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import heapq
+import itertools
+import threading
+import time
+from enum import IntEnum
+from typing import Callable, Iterator, NamedTuple
+from urllib.parse import urlsplit
+
+import requests
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class Priority(IntEnum):
+    interactive = 0
+    bulk = 10
+
+
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "rate_limit_priority", default=Priority.interactive
+)
+
+
+@contextlib.contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """Admission priority of the calls made inside the block."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def call_with_priority(level: Priority, fn: Callable, *args, **kwargs):
+    """Runs fn with the given admission priority, e.g. in an executor thread."""
+    with priority(level):
+        return fn(*args, **kwargs)
+
+
+class AdmissionTimeout(requests.exceptions.Timeout):
+    """Raised when a call waited longer than allowed for a rate limit token."""
+
+
+class LimiterMetrics(NamedTuple):
+    queue_depth: int
+    admitted: int
+    timed_out: int
+    total_wait: float
+    max_wait: float
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.admitted if self.admitted else 0.0
+
+
+class _Lane:
+    """Token bucket and waiting queue of one configured limit."""
+
+    __slots__ = (
+        "rate",
+        "burst",
+        "max_wait",
+        "tokens",
+        "updated",
+        "waiters",
+        "admitted",
+        "timed_out",
+        "total_wait",
+        "max_observed_wait",
+    )
+
+    def __init__(self, rate: float, burst: float, max_wait: float | None, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.tokens = burst
+        self.updated = now
+        self.waiters: list[tuple[int, int]] = []
+        self.admitted = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_observed_wait = 0.0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available."""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+@functools.lru_cache(maxsize=1024)
+def _origin_and_path(url: str) -> tuple[tuple[str, str, int | None], str]:
+    """((scheme, host, port), path without trailing slash) of a URL."""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    origin = (scheme, (parts.hostname or "").lower(), port or _DEFAULT_PORTS.get(scheme))
+    return origin, parts.path.rstrip("/")
+
+
+class RateLimiter:
+    """
+    Set of token buckets keyed by (base_url, scs_as_id).
+
+    args:
+        clock: monotonic time source, in seconds.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._lanes: dict[tuple[str, str | None], _Lane] = {}
+        self._cond = threading.Condition()
+        self._sequence = itertools.count()
+
+    def configure(
+        self,
+        base_url: str,
+        rate: float,
+        burst: float | None = None,
+        scs_as_id: str | None = None,
+        max_wait: float | None = None,
+    ) -> None:
+        """
+        Sets (or replaces) the limit of a backend.
+
+        args:
+            base_url: URL prefix of the backend.
+            rate: sustained requests per second.
+            burst: requests allowed at once; defaults to max(1, rate).
+            scs_as_id: restricts the limit to the URLs of this AF.
+            max_wait: seconds a call may wait before AdmissionTimeout.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        burst = max(1.0, rate) if burst is None else burst
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        with self._cond:
+            key = (base_url.rstrip("/"), scs_as_id)
+            self._lanes[key] = _Lane(rate, burst, max_wait, self.clock())
+            self._cond.notify_all()
+
+    def remove(self, base_url: str, scs_as_id: str | None = None) -> None:
+        with self._cond:
+            self._lanes.pop((base_url.rstrip("/"), scs_as_id), None)
+            self._cond.notify_all()
+
+    def metrics(self) -> dict[tuple[str, str | None], LimiterMetrics]:
+        with self._cond:
+            return {
+                key: LimiterMetrics(
+                    len(lane.waiters),
+                    lane.admitted,
+                    lane.timed_out,
+                    lane.total_wait,
+                    lane.max_observed_wait,
+                )
+                for key, lane in self._lanes.items()
+            }
+
+    def acquire(
+        self, url: str, level: Priority | None = None, timeout: float | None = None
+    ) -> float:
+        """
+        Blocks until every limit applying to url admits the call.
+
+        args:
+            url: URL of the call.
+            level: admission priority; defaults to the one set with priority().
+            timeout: overrides the max_wait of the limits.
+
+        returns:
+            seconds spent waiting.
+
+        raises:
+            AdmissionTimeout: if the call could not be admitted in time; the
+                              tokens already taken from broader limits are
+                              given back.
+        """
+        lanes = self._lanes_for(url)
+        if not lanes:
+            return 0.0
+        level = _priority.get() if level is None else level
+        start = self.clock()
+        admitted = []
+        try:
+            for lane in lanes:
+                deadline = self._deadline(lane, start, timeout)
+                with self._cond:
+                    entry = self._enqueue(lane, level)
+                    try:
+                        while not self._try_admit(lane, entry, start):
+                            wait = lane.delay() if lane.waiters[0] == entry else None
+                            if deadline is not None:
+                                remaining = deadline - self.clock()
+                                if remaining <= 0:
+                                    raise self._timed_out(lane, url)
+                                wait = remaining if wait is None else min(wait, remaining)
+                            self._cond.wait(wait)
+                    finally:
+                        self._dequeue(lane, entry)
+                admitted.append(lane)
+        except BaseException:
+            self._refund(admitted)
+            raise
+        return self.clock() - start
+
+    async def acquire_async(
+        self, url: str, level: Priority | None = None, timeout: float | None = None
+    ) -> float:
+        """Coroutine counterpart of acquire()."""
+        lanes = self._lanes_for(url)
+        if not lanes:
+            return 0.0
+        level = _priority.get() if level is None else level
+        start = self.clock()
+        admitted = []
+        try:
+            for lane in lanes:
+                deadline = self._deadline(lane, start, timeout)
+                with self._cond:
+                    entry = self._enqueue(lane, level)
+                try:
+                    while True:
+                        with self._cond:
+                            if self._try_admit(lane, entry, start):
+                                break
+                            head = lane.waiters[0] == entry
+                            wait = lane.delay() if head else min(1 / lane.rate, 0.05)
+                            if deadline is not None:
+                                remaining = deadline - self.clock()
+                                if remaining <= 0:
+                                    raise self._timed_out(lane, url)
+                                wait = min(wait, remaining)
+                        await asyncio.sleep(max(wait, 0.001))
+                finally:
+                    with self._cond:
+                        self._dequeue(lane, entry)
+                admitted.append(lane)
+        except BaseException:
+            # Also on cancellation
+            self._refund(admitted)
+            raise
+        return self.clock() - start
+
+    def _lanes_for(self, url: str) -> list[_Lane]:
+        """Limits applying to url, broadest first."""
+        origin, path = _origin_and_path(url)
+        lanes = []
+        with self._cond:
+            for (base_url, scs_as_id), lane in sorted(
+                self._lanes.items(), key=lambda item: (len(item[0][0]), item[0][1] is not None)
+            ):
+                base_origin, base_path = _origin_and_path(base_url)
+                if base_origin != origin:
+                    continue
+                if path != base_path and not path.startswith(base_path + "/"):
+                    continue
+                if scs_as_id is None or scs_as_id in path[len(base_path) :].split("/"):
+                    lanes.append(lane)
+        return lanes
+
+    def _refund(self, lanes: list[_Lane]) -> None:
+        # Gives back the tokens of a call that was not admitted by all its limits
+        if not lanes:
+            return
+        with self._cond:
+            for lane in lanes:
+                lane.tokens = min(lane.burst, lane.tokens + 1)
+                lane.admitted -= 1
+            self._cond.notify_all()
+
+    def _deadline(self, lane: _Lane, start: float, timeout: float | None) -> float | None:
+        limit = lane.max_wait if timeout is None else timeout
+        return None if limit is None else start + limit
+
+    def _enqueue(self, lane: _Lane, level: Priority) -> tuple[int, int]:
+        entry = (int(level), next(self._sequence))
+        heapq.heappush(lane.waiters, entry)
+        return entry
+
+    def _dequeue(self, lane: _Lane, entry: tuple[int, int]) -> None:
+        if entry in lane.waiters:
+            lane.waiters.remove(entry)
+            heapq.heapify(lane.waiters)
+        self._cond.notify_all()
+
+    def _try_admit(self, lane: _Lane, entry: tuple[int, int], start: float) -> bool:
+        now = self.clock()
+        lane.refill(now)
+        if lane.waiters[0] != entry or lane.tokens < 1:
+            return False
+        heapq.heappop(lane.waiters)
+        lane.tokens -= 1
+        waited = now - start
+        lane.admitted += 1
+        lane.total_wait += waited
+        lane.max_observed_wait = max(lane.max_observed_wait, waited)
+        self._cond.notify_all()
+        return True
+
+    def _timed_out(self, lane: _Lane, url: str) -> AdmissionTimeout:
+        lane.timed_out += 1
+        return AdmissionTimeout(f"Rate limit admission timed out for {url}")
+
+
+_default_limiter = RateLimiter()
+
+
+def get_default_limiter() -> RateLimiter:
+    return _default_limiter
+
+
+def set_default_limiter(limiter: RateLimiter) -> None:
+    """Replaces the limiter applied to all adapters."""
+    global _default_limiter
+    _default_limiter = limiter
@@ -0,0 +1,687 @@
+# -*- coding: utf-8 -*-
+"""
+Mobility-driven relocation of edge application instances.
+
+RelocationOrchestrator follows the locations of groups of devices (NEF
+monitoring event reports, or the output of ``retrieve_locations``), maps every
+device to its nearest edge-cloud zone through a ZoneGeoIndex, and keeps the
+application instance serving each group in the zone most of its devices are
+closest to::
+
+    zones = ZoneGeoIndex.for_adapter(edgecloud, positions={"zone-a": (41.39, 2.11)})
+    orchestrator = RelocationOrchestrator(edgecloud, network, zones, debounce=30)
+    orchestrator.add_group("fleet", app_id, app_instance_id, "zone-a", devices, {ti_id: ti})
+    receiver.subscribe(subscription_id, orchestrator.handle_notification)
+    orchestrator.start()
+
+A group is only relocated once its new zone has been the same for ``debounce``
+seconds, so devices moving along a zone border do not make it bounce. The move
+is make-before-break: the application is deployed in the new zone (ahead of
+the decision with ``predeploy``), and once the new instance is ready the
+traffic influence resources of the group are updated with the DNAI of the new
+zone in their ``trafficRoutes``, and only then is the old instance undeployed.
+
+Location updates only do bookkeeping under the orchestrator lock: the adapter
+calls (deployments ahead, relocations and the undeployment of unused instances)
+run on a bounded pool of worker threads, and the debounce timers only hand the
+relocations over to it. A relocation that fails puts its target zone on an
+exponential backoff, so the group is not redeployed at once to a zone that
+just failed.
+
+Each relocation is reported as a RelocationDecision with its latencies: from the
+first location report pointing to the new zone to the decision, and from the
+decision to the traffic being steered to the new instance.
+"""
+import math
+import re
+import statistics
+import threading
+import time
+from collections import Counter, deque
+from concurrent import futures
+from typing import Callable, Dict, Iterable, NamedTuple
+
+from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.common.timer_wheel import TimerHandle, TimerWheel
+from sunrise6g_opensdk.edgecloud.core import migration
+from sunrise6g_opensdk.edgecloud.core.utils import response_payload, zone_id_of
+from sunrise6g_opensdk.network.core import schemas
+from sunrise6g_opensdk.network.core.geofencing import report_device_key
+from sunrise6g_opensdk.network.core.geometry import centroid_of, haversine_distance
+from sunrise6g_opensdk.network.core.location_cache import device_keys
+from sunrise6g_opensdk.network.core.notification_receiver import Notification
+
+log = logger.get_logger(__name__)
+
+LatLon = tuple[float, float]
+
+# GSMA zone geolocation, "latitude,longitude"
+_GEOLOCATION = re.compile(r"^\s*([-+]?\d+(?:\.\d+)?)\s*[,;\s]\s*([-+]?\d+(?:\.\d+)?)\s*$")
+
+
+def parse_geolocation(value: str | None) -> LatLon | None:
+    """(latitude, longitude) of a "latitude,longitude" string, or None."""
+    match = _GEOLOCATION.match(value or "")
+    if match is None:
+        return None
+    lat, lon = float(match.group(1)), float(match.group(2))
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+class ZoneGeoIndex:
+    """
+    Position of every edge-cloud zone, answering nearest-zone queries.
+
+    The zone list is cached for ttl seconds. Zones are placed with the static
+    positions given, or else with the GSMA ``geolocation`` of their listing;
+    zones without a position are ignored.
+
+    args:
+        list_zones: returns the zones (CAMARA or GSMA dictionaries).
+        positions: zone ID -> (latitude, longitude), overriding the listing.
+        ttl: seconds the zone list is reused before being listed again.
+        clock: time source, in seconds.
+    """
+
+    def __init__(
+        self,
+        list_zones: Callable[[], list[Dict]] | None = None,
+        positions: Dict[str, LatLon] | None = None,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.list_zones = list_zones
+        self.positions = dict(positions or {})
+        self.ttl = ttl
+        self.clock = clock
+        self._zone_ids: list[str] = []
+        self._points: list[LatLon] = []
+        self._refreshed_at: float | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_adapter(cls, adapter, **kwargs) -> "ZoneGeoIndex":
+        """Index of the zones of an edge-cloud adapter."""
+        return cls(lambda: response_payload(adapter.get_edge_cloud_zones()) or [], **kwargs)
+
+    def __len__(self) -> int:
+        self._fresh()
+        return len(self._zone_ids)
+
+    def refresh(self) -> None:
+        """Lists the zones again and rebuilds the index."""
+        located = {}
+        for zone in self.list_zones() if self.list_zones is not None else []:
+            zone_id = zone_id_of(zone)
+            position = parse_geolocation(zone.get("geolocation"))
+            if zone_id and position is not None:
+                located[zone_id] = position
+        located.update(self.positions)
+        with self._lock:
+            self._zone_ids = list(located)
+            self._points = list(located.values())
+            self._refreshed_at = self.clock()
+
+    def position(self, zone_id: str) -> LatLon | None:
+        self._fresh()
+        with self._lock:
+            if zone_id in self._zone_ids:
+                return self._points[self._zone_ids.index(zone_id)]
+        return None
+
+    def nearest(self, lat: float, lon: float) -> tuple[str, float] | None:
+        """
+        Nearest zone to a point.
+
+        returns:
+            (zone ID, distance in meters), or None if no zone has a position.
+        """
+        self._fresh()
+        with self._lock:
+            best = None
+            for zone_id, (zone_lat, zone_lon) in zip(self._zone_ids, self._points):
+                distance = haversine_distance(lat, lon, zone_lat, zone_lon)
+                if best is None or distance < best[1]:
+                    best = (zone_id, distance)
+            return best
+
+    def _fresh(self) -> None:
+        if self._refreshed_at is None or self.clock() - self._refreshed_at >= self.ttl:
+            self.refresh()
+
+
+class RelocationDecision(NamedTuple):
+    group_id: str
+    source_zone: str
+    target_zone: str
+    source_instance_id: str
+    target_instance_id: str | None
+    # First location report pointing to target_zone, decision, end of the move
+    detected_at: float
+    decided_at: float
+    completed_at: float
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def decision_latency(self) -> float:
+        """Seconds from the first report pointing to the new zone to the decision."""
+        return self.decided_at - self.detected_at
+
+    @property
+    def relocation_latency(self) -> float:
+        """Seconds from the decision to the traffic reaching the new instance."""
+        return self.completed_at - self.decided_at
+
+    @property
+    def latency(self) -> float:
+        return self.completed_at - self.detected_at
+
+
+class DeviceGroup:
+    """Devices served by one application instance, and where they are."""
+
+    __slots__ = (
+        "group_id",
+        "app_id",
+        "app_instance_id",
+        "zone_id",
+        "traffic_influences",
+        "device_zones",
+        "candidate",
+        "detected_at",
+        "standby",
+        "relocating",
+        "failures",
+        "backoff",
+        "_timer",
+    )
+
+    def __init__(
+        self,
+        group_id: str,
+        app_id: str,
+        app_instance_id: str,
+        zone_id: str,
+        devices: Iterable[str],
+        traffic_influences: Dict[str, Dict] | None,
+    ):
+        self.group_id = group_id
+        self.app_id = app_id
+        self.app_instance_id = app_instance_id
+        self.zone_id = zone_id
+        # Traffic influence resource ID -> CAMARA traffic influence info
+        self.traffic_influences = dict(traffic_influences or {})
+        # Device key -> nearest zone, None until its first location
+        self.device_zones: Dict[str, str | None] = {device: None for device in devices}
+        self.candidate: str | None = None
+        self.detected_at: float | None = None
+        # (zone, instance ID) deployed ahead of a relocation
+        self.standby: tuple[str, str] | None = None
+        self.relocating = False
+        # Consecutive failed relocations, and (zone, until) not to retry before
+        self.failures = 0
+        self.backoff: tuple[str, float] | None = None
+        self._timer: TimerHandle | None = None
+
+    def target_zone(self) -> str:
+        """
+        Zone most devices are nearest to; the current one on ties. Devices not
+        located yet count for the current zone.
+        """
+        counts = Counter(zone or self.zone_id for zone in self.device_zones.values())
+        if not counts:
+            return self.zone_id
+        top = max(counts.values())
+        if counts.get(self.zone_id) == top:
+            return self.zone_id
+        return min(zone for zone, count in counts.items() if count == top)
+
+    def __repr__(self) -> str:
+        return (
+            f"DeviceGroup({self.group_id!r}, zone={self.zone_id!r}, "
+            f"devices={len(self.device_zones)})"
+        )
+
+
+class RelocationOrchestrator:
+    """
+    Keeps the application instance of each device group in the zone nearest to
+    its devices.
+
+    args:
+        edgecloud: edge-cloud adapter deploying the application instances.
+        network: network adapter owning the traffic influence resources; its
+                 location parsing is used for NEF reports.
+        zones: ZoneGeoIndex of the edge-cloud zones.
+        debounce: seconds a new zone must stay the group target before the
+                  group is relocated.
+        predeploy: deploy the application in a new target zone as soon as it is
+                   detected, so the relocation only waits for the debounce.
+        dnai_of: DNAI routing to a zone (the zone ID by default, as in
+                 ``create_traffic_influence_resource``).
+        ready_timeout: seconds a new instance has to become ready.
+        retry_backoff: seconds a zone is not retried after a failed relocation
+                       to it, doubled after every consecutive failure.
+        max_backoff: upper bound of that delay, in seconds.
+        max_workers: threads running the deployments and relocations.
+        on_decision: called with every RelocationDecision.
+        max_decisions: number of decisions kept for latency reporting.
+        tick: resolution of the debounce timers, in seconds.
+        clock: time source, in seconds.
+    """
+
+    def __init__(
+        self,
+        edgecloud,
+        network,
+        zones: ZoneGeoIndex,
+        debounce: float = 30.0,
+        predeploy: bool = False,
+        dnai_of: Callable[[str], str] | None = None,
+        ready_timeout: float = 300.0,
+        retry_backoff: float = 60.0,
+        max_backoff: float = 3600.0,
+        max_workers: int = 4,
+        on_decision: Callable[[RelocationDecision], None] | None = None,
+        max_decisions: int = 1000,
+        tick: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if debounce < 0:
+            raise ValueError("debounce must be a non-negative number of seconds")
+        self.edgecloud = edgecloud
+        self.network = network
+        self.zones = zones
+        self.debounce = debounce
+        self.predeploy = predeploy
+        self.dnai_of = dnai_of or (lambda zone_id: zone_id)
+        self.ready_timeout = ready_timeout
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.on_decision = on_decision
+        self.clock = clock
+        self.decisions: deque[RelocationDecision] = deque(maxlen=max_decisions)
+        self._groups: Dict[str, DeviceGroup] = {}
+        # Device key -> group ID
+        self._device_groups: Dict[str, str] = {}
+        self._wheel = TimerWheel(tick=tick, clock=clock)
+        self._lock = threading.RLock()
+        self._max_workers = max_workers
+        self._executor = self._new_executor()
+        self._pending: set[futures.Future] = set()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def group(self, group_id: str) -> DeviceGroup | None:
+        return self._groups.get(group_id)
+
+    def add_group(
+        self,
+        group_id: str,
+        app_id: str,
+        app_instance_id: str,
+        zone_id: str,
+        devices: Iterable[str | schemas.Device],
+        traffic_influences: Dict[str, Dict] | None = None,
+    ) -> DeviceGroup:
+        """
+        Starts following a group of devices.
+
+        args:
+            group_id: name of the group.
+            app_id: application served to the group.
+            app_instance_id: instance currently serving it.
+            zone_id: zone of that instance.
+            devices: device keys (as in location_cache.device_keys) or CAMARA
+                     Devices, keyed by their first identifier.
+            traffic_influences: traffic influence resource ID -> the CAMARA
+                                traffic influence info it was created with.
+        """
+        keys = []
+        for device in devices:
+            if isinstance(device, str):
+                keys.append(device)
+            elif device_keys(device):
+                keys.append(device_keys(device)[0])
+            else:
+                raise ValueError("Device has no identifier")
+        group = DeviceGroup(group_id, app_id, app_instance_id, zone_id, keys, traffic_influences)
+        with self._lock:
+            self.remove_group(group_id)
+            self._groups[group_id] = group
+            for key in keys:
+                self._device_groups[key] = group_id
+        return group
+
+    def remove_group(self, group_id: str) -> DeviceGroup | None:
+        """Stops following a group; an instance deployed ahead is undeployed."""
+        with self._lock:
+            group = self._groups.pop(group_id, None)
+            if group is None:
+                return None
+            for key in group.device_zones:
+                if self._device_groups.get(key) == group_id:
+                    del self._device_groups[key]
+            actions = self._clear_candidate(group)
+        self._submit(actions)
+        return group
+
+    def update(self, device: str, location: schemas.Location) -> str | None:
+        """
+        Processes a new location of a device.
+
+        returns:
+            the zone nearest to the device, or None if the device is not
+            followed or no zone has a position.
+        """
+        with self._lock:
+            group = self._groups.get(self._device_groups.get(device))
+        if group is None:
+            return None
+        nearest = self.zones.nearest(*centroid_of(location.area))
+        if nearest is None:
+            return None
+        with self._lock:
+            group.device_zones[device] = nearest[0]
+            actions = self._evaluate(group)
+        self._submit(actions)
+        return nearest[0]
+
+    def consume_locations(
+        self, results: Iterable[tuple[schemas.Device | None, schemas.Location | Exception]]
+    ) -> None:
+        """Processes the output of BaseNetworkClient.retrieve_locations."""
+        for device, location in results:
+            keys = device_keys(device)
+            if keys and isinstance(location, schemas.Location):
+                self.update(keys[0], location)
+
+    def consume_reports(self, reports: Iterable[schemas.MonitoringEventReport]) -> None:
+        """Processes NEF monitoring event reports identifying the device by MSISDN or NAI."""
+        reports = [report for report in reports if report_device_key(report) is not None]
+        for report, location in zip(reports, self.network.build_camara_locations(reports)):
+            if isinstance(location, Exception):
+                log.warning(f"Skipped location report without usable location: {location}")
+                continue
+            self.update(report_device_key(report), location)
+
+    def handle_notification(self, notification: Notification) -> None:
+        """Callback for NotificationReceiver.subscribe."""
+        if isinstance(notification.payload, schemas.MonitoringNotification):
+            self.consume_reports(notification.payload.monitoringEventReports or [])
+
+    def poll(self, now: float | None = None) -> int:
+        """
+        Starts relocating the groups whose debounce has elapsed, and retries
+        the zones whose backoff is over. The relocations run in the background;
+        see join.
+
+        returns:
+            number of timers fired.
+        """
+        return self._wheel.advance(now)
+
+    def join(self, timeout: float | None = None) -> bool:
+        """
+        Waits for the deployments and relocations in progress, including the
+        ones they start.
+
+        returns:
+            False if some were still running after timeout seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = set(self._pending)
+            if not pending:
+                return True
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            _, not_done = futures.wait(pending, remaining)
+            if not_done:
+                return False
+
+    def start(self) -> None:
+        """Polls the debounce timers from a background daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="edge-relocation", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stops the polling thread and lets the worker threads exit once the
+        relocations in progress are done (see join).
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        # The new pool only starts threads when used, e.g. by a later update()
+        executor, self._executor = self._executor, self._new_executor()
+        executor.shutdown(wait=False)
+
+    def _new_executor(self) -> futures.ThreadPoolExecutor:
+        return futures.ThreadPoolExecutor(
+            max_workers=self._max_workers, thread_name_prefix="edge-relocation-worker"
+        )
+
+    def latency_summary(self) -> Dict[str, float | int]:
+        """
+        Count, mean, median, 95th percentile and max end-to-end latency of the
+        successful relocations.
+        """
+        latencies = sorted(decision.latency for decision in self.decisions if decision.ok)
+        if not latencies:
+            return {"count": 0}
+        return {
+            "count": len(latencies),
+            "mean": statistics.fmean(latencies),
+            "p50": statistics.median(latencies),
+            "p95": latencies[max(0, math.ceil(0.95 * len(latencies)) - 1)],
+            "max": latencies[-1],
+        }
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._wheel.tick):
+            self.poll()
+
+    def _submit(self, actions: list[tuple]) -> None:
+        # Runs (function, *args) actions on the workers; never with the lock held
+        for function, *args in actions:
+            future = self._executor.submit(self._run_action, function, args)
+            with self._lock:
+                self._pending.add(future)
+            future.add_done_callback(self._action_done)
+
+    def _action_done(self, future: futures.Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    @staticmethod
+    def _run_action(function: Callable, args: tuple) -> None:
+        try:
+            function(*args)
+        except Exception as e:
+            log.error(f"Relocation task {function.__name__} failed: {e}")
+
+    def _evaluate(self, group: DeviceGroup) -> list[tuple]:
+        # Called with the lock held; returns the actions to submit once released
+        if group.relocating:
+            return []
+        target = group.target_zone()
+        if target == group.zone_id:
+            return self._clear_candidate(group)
+        if target == group.candidate:
+            return []
+        now = self.clock()
+        backoff = group.backoff is not None and group.backoff[0] == target
+        backoff = backoff and now < group.backoff[1]
+        if backoff and group.candidate is None and group._timer is not None:
+            # Already waiting for the end of the backoff
+            return []
+        actions = self._clear_candidate(group)
+        if backoff:
+            log.debug(f"Group {group.group_id} not relocated to zone {target} before backoff")
+            group._timer = self._wheel.schedule(group.backoff[1], self._reevaluate, group)
+            return actions
+        group.candidate = target
+        group.detected_at = now
+        log.debug(f"Group {group.group_id} heading to zone {target}")
+        if self.debounce == 0:
+            actions.append((self._relocate, group, *self._begin_relocation(group)))
+            return actions
+        if self.predeploy:
+            actions.append((self._predeploy, group, target))
+        group._timer = self._wheel.schedule(now + self.debounce, self._debounced, group)
+        return actions
+
+    def _clear_candidate(self, group: DeviceGroup) -> list[tuple]:
+        # Called with the lock held
+        if group._timer is not None:
+            self._wheel.cancel(group._timer)
+            group._timer = None
+        group.candidate = group.detected_at = None
+        if group.standby is None:
+            return []
+        zone, instance_id = group.standby
+        group.standby = None
+        return [(self._undeploy, instance_id, f"unused instance ahead of zone {zone}")]
+
+    def _reevaluate(self, group: DeviceGroup) -> None:
+        # Timer thread: end of a backoff
+        with self._lock:
+            group._timer = None
+            if self._groups.get(group.group_id) is not group:
+                return
+            actions = self._evaluate(group)
+        self._submit(actions)
+
+    def _debounced(self, group: DeviceGroup) -> None:
+        # Timer thread: hands the relocation over to the workers
+        with self._lock:
+            if self._groups.get(group.group_id) is not group or group.candidate is None:
+                return
+            group._timer = None
+            relocation = self._begin_relocation(group)
+        self._submit([(self._relocate, group, *relocation)])
+
+    def _begin_relocation(self, group: DeviceGroup) -> tuple:
+        # Called with the lock held
+        group.relocating = True
+        standby, group.standby = group.standby, None
+        return group.candidate, group.detected_at, standby
+
+    def _predeploy(self, group: DeviceGroup, zone: str) -> None:
+        try:
+            instance_id = self._deploy(group.app_id, zone)
+        except Exception as e:
+            log.warning(f"Deployment ahead of group {group.group_id} in zone {zone} failed: {e}")
+            return
+        with self._lock:
+            wanted = self._groups.get(group.group_id) is group and group.candidate == zone
+            if wanted and not group.relocating and group.standby is None:
+                group.standby = (zone, instance_id)
+                return
+        # The group moved on, or its relocation started, while deploying
+        self._undeploy(instance_id, f"unused instance ahead of zone {zone}")
+
+    def _deploy(self, app_id: str, zone: str) -> str:
+        zones = [{"EdgeCloudZone": {"edgeCloudZoneId": zone}}]
+        return response_payload(self.edgecloud.deploy_app(app_id, zones))["appInstanceId"]
+
+    def _undeploy(self, app_instance_id: str, what: str) -> None:
+        try:
+            self.edgecloud.undeploy_app(app_instance_id)
+        except Exception as e:
+            log.warning(f"Failed to undeploy {what} {app_instance_id}: {e}")
+
+    def _relocate(
+        self,
+        group: DeviceGroup,
+        target: str,
+        detected_at: float,
+        standby: tuple[str, str] | None,
+    ) -> None:
+        decided_at = self.clock()
+        source_zone, source_instance_id = group.zone_id, group.app_instance_id
+        target_instance_id = None
+        error = None
+        switched: Dict[str, Dict] = {}
+        try:
+            if standby is not None and standby[0] == target:
+                target_instance_id = standby[1]
+            else:
+                if standby is not None:
+                    self._undeploy(standby[1], f"unused instance ahead of zone {standby[0]}")
+                target_instance_id = self._deploy(group.app_id, target)
+            migration.wait_until_ready(
+                self.edgecloud, group.app_id, target_instance_id, self.ready_timeout
+            )
+            for resource_id, info in group.traffic_influences.items():
+                switched[resource_id] = self.network.put_traffic_influence_resource(
+                    resource_id, dict(info, edgeCloudZoneId=self.dnai_of(target))
+                )
+        except Exception as e:
+            error = str(e)
+            log.error(f"Relocation of group {group.group_id} to zone {target} failed: {e}")
+            for resource_id in switched:
+                try:
+                    self.network.put_traffic_influence_resource(
+                        resource_id, group.traffic_influences[resource_id]
+                    )
+                except Exception as restore_error:
+                    log.error(f"Traffic influence {resource_id} not restored: {restore_error}")
+            if target_instance_id is not None:
+                self._undeploy(target_instance_id, "failed instance")
+        completed_at = self.clock()
+        if error is None:
+            self._undeploy(source_instance_id, "previous instance")
+        decision = RelocationDecision(
+            group.group_id,
+            source_zone,
+            target,
+            source_instance_id,
+            target_instance_id,
+            detected_at,
+            decided_at,
+            completed_at,
+            error,
+        )
+        actions = []
+        with self._lock:
+            if error is None:
+                group.zone_id, group.app_instance_id = target, target_instance_id
+                group.traffic_influences.update(switched)
+                group.failures, group.backoff = 0, None
+            else:
+                group.failures += 1
+                delay = min(self.retry_backoff * 2 ** (group.failures - 1), self.max_backoff)
+                group.backoff = (target, completed_at + delay)
+            group.relocating = False
+            group.candidate = group.detected_at = None
+            self.decisions.append(decision)
+            # Devices may have moved on while the group was relocated
+            if self._groups.get(group.group_id) is group:
+                actions = self._evaluate(group)
+        self._submit(actions)
+        if error is None:
+            log.info(
+                f"Relocated group {group.group_id} from zone {source_zone} to {target} "
+                f"(decision {decision.decision_latency:.3f}s, "
+                f"relocation {decision.relocation_latency:.3f}s)"
+            )
+        if self.on_decision is not None:
+            try:
+                self.on_decision(decision)
+            except Exception as e:
+                log.error(f"Relocation decision callback failed for {decision}: {e}")
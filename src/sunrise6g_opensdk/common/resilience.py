@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+Shared resilience policy for the HTTP calls made by the adapters.
+
+ResiliencePolicy.request wraps ``requests`` with:
+
+- retries with jittered exponential backoff. Idempotent verbs are retried on
+  connection errors, timeouts and 502/503/504. Any verb is retried on 429 and
+  when the connection could not be established (refused, unresolvable host,
+  connect timeout), since in both cases the backend has not processed the
+  request.
+- ``Retry-After`` support on 429 and 503 responses.
+- one circuit breaker per endpoint (scheme://host:port). After
+  ``failure_threshold`` consecutive failures, calls fail immediately with
+  CircuitOpenError for ``reset_timeout`` seconds. A single probe is then let
+  through to decide whether to close the circuit again.
+
+Each attempt is first admitted by the rate limiter (common.rate_limit).
+
+CircuitOpenError is a ``requests.exceptions.ConnectionError`` and
+AdmissionTimeout a ``requests.exceptions.Timeout``, so the existing error
+handling of each adapter maps them to its own error type.
+"""
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable
+from urllib.parse import urlsplit
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError
+
+from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.common import rate_limit
+
+log = logger.get_logger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def request_not_sent(error: requests.exceptions.RequestException) -> bool:
+    """
+    Whether a request failed before reaching the server: the connection was
+    refused, the host could not be resolved or the connection timed out.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError):
+        return False
+    # requests wraps the urllib3 MaxRetryError, whose reason is the socket error
+    reason = error.args[0] if error.args else None
+    reason = getattr(reason, "reason", reason)
+    # NewConnectionError (refused, name resolution) is a ConnectTimeoutError
+    return isinstance(reason, ConnectTimeoutError)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without contacting the backend while its circuit is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Circuit open for {endpoint}, retry in {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for a single endpoint.
+
+    args:
+        endpoint: name used in errors and logs.
+        failure_threshold: consecutive failures that open the circuit.
+        reset_timeout: seconds the circuit stays open before a probe is allowed.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        endpoint: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raises CircuitOpenError if the call must not reach the backend."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            retry_in = self._opened_at + self.reset_timeout - self.clock()
+            if self.state == self.OPEN and retry_in <= 0:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(self.endpoint, max(0.0, retry_in))
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                log.info(f"Circuit closed for {self.endpoint}")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    log.warning(
+                        f"Circuit opened for {self.endpoint} after {self.failures} failures"
+                    )
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+
+
+class ResiliencePolicy:
+    """
+    Retry, backoff and circuit breaker settings shared by the adapters.
+
+    args:
+        max_attempts: total attempts per call, including the first one.
+        backoff_base: base delay in seconds; attempt n waits a random time up
+                      to backoff_base * 2 ** n (full jitter), capped at backoff_max.
+        backoff_max: upper bound for a single backoff delay.
+        max_retry_after: longest Retry-After honoured; longer ones are not retried.
+        timeout: default request timeout in seconds.
+        failure_threshold: consecutive failures that open an endpoint circuit.
+        reset_timeout: seconds an open circuit waits before probing again.
+        limiter: rate limiter admitting each attempt; defaults to the shared one.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.2,
+        backoff_max: float = 10.0,
+        max_retry_after: float = 60.0,
+        timeout: float | None = 30.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+        limiter: rate_limit.RateLimiter | None = None,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.sleep = sleep
+        self.clock = clock
+        self.limiter = limiter
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """Circuit breaker of the endpoint serving url."""
+        parts = urlsplit(url)
+        endpoint = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(
+                    endpoint, self.failure_threshold, self.reset_timeout, self.clock
+                )
+            return breaker
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def request(
+        self, method: str, url: str, session: requests.Session | None = None, **kwargs
+    ) -> requests.Response:
+        """
+        Sends an HTTP request applying the policy.
+
+        args:
+            method: HTTP verb.
+            url: target URL.
+            session: optional requests.Session (connection pooling).
+            kwargs: passed to requests (headers, data, params, timeout...).
+
+        returns:
+            the last requests.Response received, whatever its status.
+
+        raises:
+            CircuitOpenError: if the endpoint circuit is open.
+            AdmissionTimeout: if the rate limiter did not admit the call in time.
+            requests.exceptions.RequestException: if the last attempt failed
+                                                  without response.
+        """
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        kwargs.setdefault("timeout", self.timeout)
+        breaker = self.breaker(url)
+        sender = session or requests
+
+        for attempt in range(self.max_attempts):
+            last_attempt = attempt == self.max_attempts - 1
+            (self.limiter or rate_limit.get_default_limiter()).acquire(url)
+            breaker.before_call()
+            try:
+                response = sender.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                breaker.record_failure()
+                not_sent = request_not_sent(e)
+                transient = isinstance(
+                    e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+                )
+                if last_attempt or not transient or not (idempotent or not_sent):
+                    raise
+                delay = self.backoff(attempt)
+                log.warning(f"{method} {url} failed ({e}), retrying in {delay:.2f}s")
+                self.sleep(delay)
+                continue
+
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            status = response.status_code
+            if last_attempt or status not in RETRY_STATUSES:
+                return response
+            if status != 429 and not idempotent:
+                return response
+            delay = self.backoff(attempt)
+            if status in (429, 503):
+                retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    if retry_after > self.max_retry_after:
+                        return response
+                    delay = retry_after
+            log.warning(f"{method} {url} returned {status}, retrying in {delay:.2f}s")
+            self.sleep(delay)
+        return response
+
+
+def _retry_after_seconds(value: str | None) -> float | None:
+    """Parses a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+_default_policy = ResiliencePolicy()
+
+
+def get_default_policy() -> ResiliencePolicy:
+    return _default_policy
+
+
+def set_default_policy(policy: ResiliencePolicy) -> None:
+    """Replaces the policy used by all adapters."""
+    global _default_policy
+    _default_policy = policy
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """Sends an HTTP request with the default policy."""
+    return _default_policy.request(method, url, **kwargs)
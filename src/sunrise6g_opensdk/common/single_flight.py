@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Single-flight request coalescing.
+
+When several callers ask for the same resource at the same time (same zone
+list, same QoD session...), only the first one performs the backend call; the
+others wait for it and receive the same result, or the same exception. Nothing
+is cached: once the call completes, the next request goes to the backend again.
+
+Both threaded and asyncio callers are supported::
+
+    @single_flight()
+    def get_zones(url: str, params: dict | None) -> requests.Response:
+        ...
+
+    get_zones(url, None)                 # from threads
+    await get_zones.aio(url, None)       # from coroutines, run in an executor
+
+Results are shared between callers and must be treated as read-only. Calls
+made with different credentials must not share a flight: include auth_key() of
+the credential in the key.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import threading
+from typing import Any, Callable, Hashable
+
+
+def freeze(value: Any) -> Hashable:
+    """Hashable representation of (nested) call arguments."""
+    if isinstance(value, dict):
+        return tuple(sorted((freeze(k), freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def auth_key(credential: str | None) -> str | None:
+    """
+    Digest of a credential (token, Authorization header...) for coalescing
+    keys, so that the key tells callers apart without holding the secret.
+    """
+    if credential is None:
+        return None
+    return hashlib.sha256(str(credential).encode()).hexdigest()
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Group of in-flight calls, deduplicated by key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._async_calls: dict[tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) unless a call with the same key is already in
+        flight in another thread, in which case its outcome is returned. The
+        result object is not copied: every caller gets the same one, and must
+        not modify it.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            owner = call is None
+            if owner:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+
+        if not owner:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.event.set()
+
+    async def do_async(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """
+        Asyncio counterpart of do(): coroutines of the same event loop share the
+        awaited outcome of fn(*args, **kwargs), which may return an awaitable.
+
+        The call runs in a task of its own, so cancelling any of the callers,
+        including the first one, leaves the others waiting for it.
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        task = self._async_calls.get(flight_key)
+        if task is None:
+            task = self._async_calls[flight_key] = loop.create_task(_awaited(fn, args, kwargs))
+            self.calls += 1
+
+            def done(task):
+                if self._async_calls.get(flight_key) is task:
+                    del self._async_calls[flight_key]
+                # Mark the exception as retrieved when every caller was cancelled
+                if not task.cancelled():
+                    task.exception()
+
+            task.add_done_callback(done)
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+
+async def _awaited(fn: Callable, args: tuple, kwargs: dict):
+    result = fn(*args, **kwargs)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def single_flight(key: Callable[..., Hashable] | None = None, group: SingleFlight | None = None):
+    """
+    Decorator coalescing concurrent calls with identical arguments.
+
+    args:
+        key: builds the coalescing key from the call arguments. Defaults to
+             the frozen positional and keyword arguments.
+        group: SingleFlight to use; each decorated function gets its own by default.
+
+    Decorated coroutine functions are coalesced per event loop. Decorated
+    regular functions also expose an ``aio`` coroutine running them in the
+    default executor, coalesced with both async and threaded callers.
+    """
+
+    def decorator(fn):
+        flights = group or SingleFlight()
+
+        def make_key(args, kwargs):
+            if key is not None:
+                return key(*args, **kwargs)
+            return (freeze(args), freeze(kwargs))
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await flights.do_async(make_key(args, kwargs), fn, *args, **kwargs)
+
+            async_wrapper.flights = flights
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return flights.do(make_key(args, kwargs), fn, *args, **kwargs)
+
+        async def aio(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            call = functools.partial(wrapper, *args, **kwargs)
+            return await flights.do_async(make_key(args, kwargs), loop.run_in_executor, None, call)
+
+        wrapper.aio = aio
+        wrapper.flights = flights
+        return wrapper
+
+    return decorator
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Hierarchical timer wheel.
+
+Timers are hashed into one of several levels of fixed-size slot rings according
+to how far in the future they expire; each level covers a range 64 times wider
+than the previous one. Scheduling and cancelling are O(1) regardless of how many
+timers are pending, and advancing the clock only touches the slots whose tick
+has elapsed, which makes it suitable for tracking hundreds of thousands of
+deadlines (e.g. QoD session expiries).
+"""
+import math
+import threading
+import time
+from typing import Any, Callable
+
+from sunrise6g_opensdk import logger
+
+log = logger.get_logger(__name__)
+
+_SLOT_BITS = 6
+_SLOTS = 1 << _SLOT_BITS
+_SLOT_MASK = _SLOTS - 1
+# Marks timers collected by advance() whose callback has not run yet, so that an
+# earlier callback of the same batch can still cancel them.
+_FIRING = object()
+
+
+class TimerHandle:
+    """Handle returned by TimerWheel.schedule, used to cancel the timer."""
+
+    __slots__ = ("deadline", "expiry_tick", "callback", "args", "_slot")
+
+    def __init__(self, deadline: float, expiry_tick: int, callback: Callable, args: tuple):
+        self.deadline = deadline
+        self.expiry_tick = expiry_tick
+        self.callback = callback
+        self.args = args
+        self._slot: set | object | None = None
+
+    @property
+    def active(self) -> bool:
+        return self._slot is not None
+
+
+class TimerWheel:
+    """
+    Hierarchical timer wheel with O(1) schedule and cancel.
+
+    args:
+        tick: resolution of the wheel in seconds. Timers fire on the first
+              advance() at or after the tick that contains their deadline.
+        levels: number of wheel levels. With 64 slots per level, the wheel
+                spans tick * 64 ** levels seconds; later deadlines are parked in
+                the last level and re-hashed as the wheel turns.
+        clock: time source, in seconds (defaults to time.time).
+    """
+
+    def __init__(self, tick: float = 1.0, levels: int = 4, clock: Callable[[], float] = time.time):
+        if tick <= 0:
+            raise ValueError("tick must be a positive number of seconds")
+        if levels < 1:
+            raise ValueError("levels must be at least 1")
+        self.tick = tick
+        self.levels = levels
+        self.clock = clock
+        self._wheels = [[set() for _ in range(_SLOTS)] for _ in range(levels)]
+        self._current_tick = math.floor(clock() / tick)
+        self._count = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def schedule(self, deadline: float, callback: Callable, *args: Any) -> TimerHandle:
+        """
+        Schedules callback(*args) to run once the clock reaches deadline.
+
+        args:
+            deadline: absolute time, in the same unit and origin as the clock.
+            callback: callable invoked by advance() when the timer expires.
+
+        returns:
+            TimerHandle that can be passed to cancel().
+        """
+        handle = TimerHandle(deadline, math.ceil(deadline / self.tick), callback, args)
+        with self._lock:
+            self._place(handle)
+            self._count += 1
+        return handle
+
+    def schedule_in(self, delay: float, callback: Callable, *args: Any) -> TimerHandle:
+        return self.schedule(self.clock() + delay, callback, *args)
+
+    def cancel(self, handle: TimerHandle) -> bool:
+        """
+        Cancels a pending timer.
+
+        returns:
+            True if the timer was pending, False if it already fired or was cancelled.
+        """
+        with self._lock:
+            if handle._slot is None:
+                return False
+            if handle._slot is _FIRING:
+                handle._slot = None
+                return True
+            handle._slot.discard(handle)
+            handle._slot = None
+            self._count -= 1
+            return True
+
+    def advance(self, now: float | None = None) -> int:
+        """
+        Moves the wheel up to now and runs the callbacks of the expired timers.
+
+        Callbacks run in the calling thread, outside the wheel lock, so they may
+        schedule or cancel timers, including timers expiring in the same call.
+        Exceptions raised by callbacks are logged and do not prevent the
+        remaining timers from firing.
+
+        returns:
+            number of timers fired.
+        """
+        now = self.clock() if now is None else now
+        target_tick = math.floor(now / self.tick)
+        expired = []
+        with self._lock:
+            while self._current_tick < target_tick:
+                if self._count == len(expired):
+                    # Nothing else pending: jump straight to the target tick
+                    self._current_tick = target_tick
+                    break
+                self._current_tick += 1
+                self._cascade()
+                slot = self._wheels[0][self._current_tick & _SLOT_MASK]
+                if slot:
+                    for handle in list(slot):
+                        slot.discard(handle)
+                        if handle.expiry_tick <= self._current_tick:
+                            handle._slot = _FIRING
+                            expired.append(handle)
+                        else:
+                            self._place(handle)
+            self._count -= len(expired)
+
+        fired = 0
+        for handle in expired:
+            with self._lock:
+                if handle._slot is not _FIRING:
+                    continue
+                handle._slot = None
+            fired += 1
+            try:
+                handle.callback(*handle.args)
+            except Exception as e:
+                log.error(f"Timer callback {handle.callback!r} failed: {e}")
+        return fired
+
+    def next_deadline(self) -> float | None:
+        """Earliest pending deadline, or None. Scans the wheel, so meant for diagnostics."""
+        with self._lock:
+            deadlines = [h.deadline for level in self._wheels for slot in level for h in slot]
+        return min(deadlines) if deadlines else None
+
+    def _cascade(self) -> None:
+        tick = self._current_tick
+        for level in range(1, self.levels):
+            if (tick >> (_SLOT_BITS * (level - 1))) & _SLOT_MASK:
+                break
+            index = (tick >> (_SLOT_BITS * level)) & _SLOT_MASK
+            slot = self._wheels[level][index]
+            if slot:
+                handles = list(slot)
+                slot.clear()
+                for handle in handles:
+                    self._place(handle)
+
+    def _place(self, handle: TimerHandle) -> None:
+        expiry = max(handle.expiry_tick, self._current_tick + 1)
+        delta = expiry - self._current_tick
+        for level in range(self.levels):
+            if delta < 1 << (_SLOT_BITS * (level + 1)):
+                break
+        else:
+            level = self.levels - 1
+            expiry = self._current_tick + (1 << (_SLOT_BITS * self.levels)) - 1
+        slot = self._wheels[level][(expiry >> (_SLOT_BITS * level)) & _SLOT_MASK]
+        slot.add(handle)
+        handle._slot = slot
@@ -0,0 +1,527 @@
+# -*- coding: utf-8 -*-
+"""
+Workflows of adapter calls declared as a DAG of steps.
+
+Onboarding an application usually spans several adapters: onboard the app,
+deploy it to zones, then create traffic influence resources and QoD sessions
+for the devices. Declared as a Workflow, the independent steps (e.g. the QoD
+sessions, which do not need the deployment) run concurrently::
+
+    adapters = Sdk.create_adapters_from(specs)
+    workflow = onboarding_workflow(
+        adapters["edgecloud"], adapters["network"], app_manifest, app_zones,
+        traffic_influences=[ti_info], qod_sessions=[session_info],
+    )
+    run = WorkflowExecutor(store=FileWorkflowStore("/var/lib/sdk/runs")).run(workflow, "run-1")
+
+Every step is retried with exponential backoff. If a step still fails, no new
+step is started and the steps that succeeded are compensated (undeploy, delete
+sessions...) in the reverse order they finished in, so dependants are undone
+before what they depend on.
+
+With a store, the state of the run is saved after every step; running it again
+with the same run ID skips the steps that already succeeded, reusing their
+results. Step results are therefore kept JSON-serialisable. Each step record
+also reports when the step started and finished, and how many attempts it took.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List
+
+from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.common import idempotency
+from sunrise6g_opensdk.edgecloud.core.utils import response_payload
+from sunrise6g_opensdk.network.core.base_network_client import resource_id_from_link
+
+log = logger.get_logger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+COMPENSATED = "compensated"
+COMPENSATION_FAILED = "compensation_failed"
+
+
+class WorkflowError(Exception):
+    """Invalid workflow definition."""
+
+
+class Step:
+    """
+    Node of a workflow.
+
+    args:
+        name: unique name of the step in its workflow.
+        action: called with the results of the steps finished so far (step name
+                -> result); its return value is the result of the step.
+        depends_on: names of the steps that must succeed before this one.
+        compensate: called with the result of the step to undo it when the
+                    workflow fails.
+        retries: attempts made after the first one fails.
+        retry_delay: seconds before the first retry, doubled on each retry.
+    """
+
+    __slots__ = ("name", "action", "depends_on", "compensate", "retries", "retry_delay")
+
+    def __init__(
+        self,
+        name: str,
+        action: Callable[[Dict[str, Any]], Any],
+        depends_on: Iterable[str] = (),
+        compensate: Callable[[Any], None] | None = None,
+        retries: int = 0,
+        retry_delay: float = 1.0,
+    ):
+        if retries < 0:
+            raise ValueError("retries must not be negative")
+        self.name = name
+        self.action = action
+        self.depends_on = tuple(depends_on)
+        self.compensate = compensate
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+    def __repr__(self) -> str:
+        return f"Step({self.name!r}, depends_on={list(self.depends_on)})"
+
+
+class Workflow:
+    """
+    Set of steps forming a directed acyclic graph.
+
+    raises:
+        WorkflowError: on duplicated names, unknown dependencies or cycles.
+    """
+
+    def __init__(self, steps: Iterable[Step]):
+        self.steps: Dict[str, Step] = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise WorkflowError(f"Duplicated step '{step.name}'")
+            self.steps[step.name] = step
+        for step in self.steps.values():
+            unknown = [name for name in step.depends_on if name not in self.steps]
+            if unknown:
+                raise WorkflowError(f"Step '{step.name}' depends on unknown steps {unknown}")
+        self.order = self._topological_order()
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def _topological_order(self) -> List[str]:
+        remaining = {name: set(step.depends_on) for name, step in self.steps.items()}
+        order = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise WorkflowError(f"Dependency cycle between steps {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+                order.append(name)
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+
+class StepRecord:
+    """State and timing of a step in a workflow run."""
+
+    __slots__ = ("name", "state", "attempts", "result", "error", "started_at", "finished_at")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = PENDING
+        self.attempts = 0
+        self.result: Any = None
+        self.error: str | None = None
+        # Wall clock times, so they stay meaningful in a resumed run
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    @property
+    def duration(self) -> float | None:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "StepRecord":
+        record = cls(data["name"])
+        for name in cls.__slots__[1:]:
+            setattr(record, name, data.get(name))
+        record.attempts = record.attempts or 0
+        return record
+
+    def __repr__(self) -> str:
+        return f"StepRecord({self.name!r}, {self.state}, attempts={self.attempts})"
+
+
+class WorkflowRun:
+    """Outcome of running a workflow, one StepRecord per step."""
+
+    __slots__ = ("run_id", "state", "error", "records")
+
+    def __init__(self, run_id: str, records: Dict[str, StepRecord]):
+        self.run_id = run_id
+        self.state = RUNNING
+        self.error: str | None = None
+        self.records = records
+
+    @property
+    def ok(self) -> bool:
+        return self.state == SUCCEEDED
+
+    @property
+    def results(self) -> Dict[str, Any]:
+        return {
+            name: record.result
+            for name, record in self.records.items()
+            if record.state == SUCCEEDED
+        }
+
+    def timings(self) -> Dict[str, float | None]:
+        """Duration of every step that ran, in seconds."""
+        return {name: record.duration for name, record in self.records.items()}
+
+    def to_dict(self) -> Dict:
+        return {
+            "runId": self.run_id,
+            "state": self.state,
+            "error": self.error,
+            "steps": [record.to_dict() for record in self.records.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "WorkflowRun":
+        records = [StepRecord.from_dict(step) for step in data.get("steps", [])]
+        run = cls(data["runId"], {record.name: record for record in records})
+        run.state = data.get("state", RUNNING)
+        run.error = data.get("error")
+        return run
+
+    def __repr__(self) -> str:
+        return f"WorkflowRun({self.run_id!r}, {self.state})"
+
+
+class FileWorkflowStore:
+    """
+    Saves workflow runs as JSON files, one per run ID, in a directory.
+
+    Files are replaced atomically, so a crash never leaves a partial state.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, run_id: str) -> str:
+        return os.path.join(self.directory, f"{run_id}.json")
+
+    def save(self, run: WorkflowRun) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(run.to_dict(), f, default=str)
+            os.replace(tmp_path, self._path(run.run_id))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self, run_id: str) -> WorkflowRun | None:
+        try:
+            with open(self._path(run_id)) as f:
+                return WorkflowRun.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def delete(self, run_id: str) -> None:
+        try:
+            os.unlink(self._path(run_id))
+        except FileNotFoundError:
+            pass
+
+
+class WorkflowExecutor:
+    """
+    Runs workflows, concurrently where their DAG allows.
+
+    args:
+        max_workers: steps running at the same time.
+        store: saves the runs for resumption (e.g. FileWorkflowStore); None
+               keeps them in memory only.
+        sleep: waits between retries.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        store: FileWorkflowStore | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.store = store
+        self.sleep = sleep
+        self._lock = threading.Lock()
+
+    def run(self, workflow: Workflow, run_id: str | None = None) -> WorkflowRun:
+        """
+        Runs a workflow, resuming the stored run with the same ID if any.
+
+        returns:
+            the WorkflowRun, in state succeeded, or failed or compensated when a
+            step failed (see the step records for the details).
+        """
+        run = self._start(workflow, run_id or str(uuid.uuid4()))
+        failed = None
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while True:
+                if failed is None:
+                    for name in workflow.order:
+                        record = run.records[name]
+                        if record.state == PENDING and all(
+                            run.records[dep].state == SUCCEEDED
+                            for dep in workflow.steps[name].depends_on
+                        ):
+                            record.state = RUNNING
+                            results = run.results
+                            running[
+                                pool.submit(self._execute, run, workflow.steps[name], results)
+                            ] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record = run.records[running.pop(future)]
+                    if record.state == FAILED and failed is None:
+                        failed = record
+        if failed is None:
+            run.state = SUCCEEDED
+            self._save(run)
+            log.info(f"Workflow {run.run_id} succeeded: {self._timing_summary(run)}")
+            return run
+        for record in run.records.values():
+            if record.state == PENDING:
+                record.state = SKIPPED
+        run.error = f"step '{failed.name}' failed: {failed.error}"
+        run.state = FAILED
+        self._save(run)
+        self._compensate(workflow, run)
+        return run
+
+    def _start(self, workflow: Workflow, run_id: str) -> WorkflowRun:
+        stored = self.store.load(run_id) if self.store is not None else None
+        records = {}
+        for name in workflow.order:
+            record = stored.records.get(name) if stored is not None else None
+            if record is None or record.state != SUCCEEDED:
+                # Interrupted, failed or undone steps run again
+                record = StepRecord(name)
+            records[name] = record
+        if stored is not None:
+            done = [name for name, record in records.items() if record.state == SUCCEEDED]
+            log.info(f"Resuming workflow {run_id}, skipping steps {done}")
+        return WorkflowRun(run_id, records)
+
+    def _execute(self, run: WorkflowRun, step: Step, results: Dict[str, Any]) -> None:
+        record = run.records[step.name]
+        record.started_at = time.time()
+        while True:
+            record.attempts += 1
+            try:
+                record.result = step.action(results)
+                record.state = SUCCEEDED
+                break
+            except Exception as e:
+                if record.attempts > step.retries:
+                    record.error = str(e)
+                    record.state = FAILED
+                    log.error(f"Step {step.name} failed after {record.attempts} attempts: {e}")
+                    break
+                delay = step.retry_delay * 2 ** (record.attempts - 1)
+                log.warning(f"Step {step.name} failed ({e}), retrying in {delay}s")
+                self.sleep(delay)
+        record.finished_at = time.time()
+        self._save(run)
+
+    def _compensate(self, workflow: Workflow, run: WorkflowRun) -> None:
+        done = sorted(
+            (record for record in run.records.values() if record.state == SUCCEEDED),
+            key=lambda record: record.finished_at or 0,
+            reverse=True,
+        )
+        undone = True
+        for record in done:
+            compensate = workflow.steps[record.name].compensate
+            if compensate is None:
+                continue
+            try:
+                compensate(record.result)
+                record.state = COMPENSATED
+            except Exception as e:
+                undone = False
+                record.state = COMPENSATION_FAILED
+                record.error = str(e)
+                log.error(f"Compensation of step {record.name} failed: {e}")
+            self._save(run)
+        if undone:
+            run.state = COMPENSATED
+            self._save(run)
+
+    def _save(self, run: WorkflowRun) -> None:
+        if self.store is not None:
+            with self._lock:
+                self.store.save(run)
+
+    @staticmethod
+    def _timing_summary(run: WorkflowRun) -> str:
+        return ", ".join(
+            f"{name} {duration:.3f}s" for name, duration in run.timings().items() if duration
+        )
+
+
+def onboarding_workflow(
+    edgecloud,
+    network,
+    app_manifest: Dict,
+    app_zones: List[Dict],
+    traffic_influences: Iterable[Dict] = (),
+    qod_sessions: Iterable[Dict] = (),
+    retries: int = 2,
+    retry_delay: float = 1.0,
+    idempotency_prefix: str | None = None,
+) -> Workflow:
+    """
+    Onboards and deploys an app, then steers and prioritises device traffic.
+
+    The QoD sessions depend on no other step, so they are created while the
+    app is onboarded and deployed. The traffic influence resources wait for
+    the deployment; they are given its appId, and its appInstanceId when they
+    have none.
+
+    args:
+        edgecloud: edge-cloud adapter.
+        network: network adapter.
+        app_manifest: CAMARA application manifest.
+        app_zones: zones to deploy to, as taken by deploy_app.
+        traffic_influences: CAMARA traffic influence infos to create.
+        qod_sessions: CAMARA QoD session infos to create.
+        retries: retries of every step.
+        retry_delay: seconds before the first retry of a step.
+        idempotency_prefix: if given (e.g. the run ID), every create call is
+                            made with the idempotency key "<prefix>:<step>", so
+                            a retried or resumed step never creates a resource
+                            twice. Compensating a step forgets its key, so a
+                            compensated run resumed with the same ID creates
+                            the resources again instead of replaying results
+                            of resources that no longer exist.
+    """
+
+    def keyed(step: str) -> Dict:
+        if idempotency_prefix is None:
+            return {}
+        return {"idempotency_key": f"{idempotency_prefix}:{step}"}
+
+    def undo(adapter, operation: str, step: str, remove: Callable[[Any], None]):
+        def compensate(result):
+            remove(result)
+            if idempotency_prefix is not None:
+                idempotency.forget(adapter, operation, keyed(step)["idempotency_key"])
+
+        return compensate
+
+    def onboard(results):
+        payload = response_payload(edgecloud.onboard_app(app_manifest, **keyed("onboard")))
+        app_id = payload.get("appId") if isinstance(payload, dict) else None
+        return app_id or app_manifest["appId"]
+
+    def deploy(results):
+        payload = response_payload(
+            edgecloud.deploy_app(results["onboard"], app_zones, **keyed("deploy"))
+        )
+        if isinstance(payload, list):
+            payload = payload[0]
+        return {"appInstanceId": payload["appInstanceId"]}
+
+    def create_traffic_influence(step, info):
+        def action(results):
+            info_for_instance = {
+                "appInstanceId": results["deploy"]["appInstanceId"],
+                **info,
+                "appId": results["onboard"],
+            }
+            return network.create_traffic_influence_resource(info_for_instance, **keyed(step))
+
+        return action
+
+    def create_qod_session(step, info):
+        return lambda results: network.create_qod_session(dict(info), **keyed(step))
+
+    options = {"retries": retries, "retry_delay": retry_delay}
+    steps = [
+        Step(
+            "onboard",
+            onboard,
+            compensate=undo(edgecloud, "onboard_app", "onboard", edgecloud.delete_onboarded_app),
+            **options,
+        ),
+        Step(
+            "deploy",
+            deploy,
+            depends_on=["onboard"],
+            compensate=undo(
+                edgecloud,
+                "deploy_app",
+                "deploy",
+                lambda result: edgecloud.undeploy_app(result["appInstanceId"]),
+            ),
+            **options,
+        ),
+    ]
+    for index, info in enumerate(traffic_influences):
+        name = f"traffic-influence-{index}"
+        steps.append(
+            Step(
+                name,
+                create_traffic_influence(name, info),
+                depends_on=["deploy"],
+                compensate=undo(
+                    network,
+                    "create_traffic_influence_resource",
+                    name,
+                    # trafficInfluenceID is the NEF self link of the resource
+                    lambda result: network.delete_traffic_influence_resource(
+                        resource_id_from_link(result["trafficInfluenceID"])
+                    ),
+                ),
+                **options,
+            )
+        )
+    for index, info in enumerate(qod_sessions):
+        name = f"qod-session-{index}"
+        steps.append(
+            Step(
+                name,
+                create_qod_session(name, info),
+                compensate=undo(
+                    network,
+                    "create_qod_session",
+                    name,
+                    lambda result: network.delete_qod_session(str(result["sessionId"])),
+                ),
+                **options,
+            )
+        )
+    return Workflow(steps)
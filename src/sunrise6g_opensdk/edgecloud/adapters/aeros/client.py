@@ -5,25 +5,79 @@
 #   - Vasilis Pitsilis (vpitsilis@dat.demokritos.gr, vpitsilis@iit.demokritos.gr)
 #   - Andreas Sakellaropoulos (asakellaropoulos@iit.demokritos.gr)
 ##
+import queue
+import time
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import yaml
 from requests import Response
 
 from sunrise6g_opensdk.edgecloud.adapters.aeros import config
+from sunrise6g_opensdk.edgecloud.adapters.aeros.continuum_cache import ContinuumCache
 from sunrise6g_opensdk.edgecloud.adapters.aeros.continuum_client import ContinuumClient
+from sunrise6g_opensdk.edgecloud.adapters.aeros.ie_table import (
+    COLUMNS,
+    InfrastructureTable,
+    ie_flavour,
+    zone_details,
+)
+from sunrise6g_opensdk.edgecloud.adapters.aeros.notifications import (
+    NotificationReceiver,
+)
 from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
+from sunrise6g_opensdk.edgecloud.core import migration
 from sunrise6g_opensdk.edgecloud.core.edgecloud_interface import (
     EdgeCloudManagementInterface,
 )
+from sunrise6g_opensdk.edgecloud.core.instance_events import (
+    AppInstanceEvent,
+    InstanceTracker,
+)
 from sunrise6g_opensdk.logger import setup_logger
 
+SERVICE_COMPONENT_STATUS = "serviceComponentStatus"
+
+# CAMARA status of the aerOS service component statuses
+_COMPONENT_STATUSES = {
+    "running": "ready",
+    "deploying": "instantiating",
+    "pending": "instantiating",
+    "starting": "instantiating",
+    "failed": "failed",
+    "error": "failed",
+    "removing": "terminating",
+    "stopping": "terminating",
+    "finished": "terminating",
+    "removed": "terminating",
+}
+
+
+def component_status(component: Dict) -> str:
+    """CAMARA status of a ServiceComponent entity."""
+    status = str(component.get(SERVICE_COMPONENT_STATUS, "")).split(":")[-1].lower()
+    return _COMPONENT_STATUSES.get(status, "unknown")
+
+
+def service_status(statuses: List[str]) -> str:
+    """
+    CAMARA status of a service from those of its components: ready when all of
+    them are, otherwise the most severe one. A service without components yet
+    is instantiating.
+    """
+    if not statuses:
+        return "instantiating"
+    if all(status == "ready" for status in statuses):
+        return "ready"
+    for status in ("failed", "terminating", "instantiating"):
+        if status in statuses:
+            return status
+    return "unknown"
+
 
 class EdgeApplicationManager(EdgeCloudManagementInterface):
     """
     aerOS Continuum Client
-    FIXME: Handle None responses from continuum client
     """
 
     def __init__(self, base_url: str, **kwargs):
@@ -32,6 +86,9 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
         self._app_store: Dict[str, Dict] = {}
         self._deployed_services: Dict[str, List[str]] = {}
         self._stopped_services: Dict[str, List[str]] = {}
+        self._notification_receiver: Optional[NotificationReceiver] = None
+        self._continuum_cache: Optional[ContinuumCache] = None
+        self.infrastructure_table: Optional[InfrastructureTable] = None
 
         # Overwrite config values if provided via kwargs
         if "aerOS_API_URL" in kwargs:
@@ -40,6 +97,12 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
             config.aerOS_ACCESS_TOKEN = kwargs["aerOS_ACCESS_TOKEN"]
         if "aerOS_HLO_TOKEN" in kwargs:
             config.aerOS_HLO_TOKEN = kwargs["aerOS_HLO_TOKEN"]
+        if "aerOS_NOTIFICATION_HOST" in kwargs:
+            config.NOTIFICATION_HOST = kwargs["aerOS_NOTIFICATION_HOST"]
+        if "aerOS_NOTIFICATION_URL" in kwargs:
+            config.NOTIFICATION_URL = kwargs["aerOS_NOTIFICATION_URL"]
+        if "aerOS_NOTIFICATION_PORT" in kwargs:
+            config.NOTIFICATION_PORT = int(kwargs["aerOS_NOTIFICATION_PORT"])
 
         if not config.aerOS_API_URL:
             raise ValueError("Missing 'aerOS_API_URL'")
@@ -48,7 +111,9 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
         if not config.aerOS_HLO_TOKEN:
             raise ValueError("Missing 'aerOS_HLO_TOKEN'")
 
-    def onboard_app(self, app_manifest: Dict) -> Dict:
+    def onboard_app(self, app_manifest: Dict, idempotency_key: Optional[str] = None) -> Dict:
+        if idempotency_key is not None:
+            return self._idempotent("onboard_app", idempotency_key, self.onboard_app, app_manifest)
         app_id = app_manifest.get("appId")
         if not app_id:
             raise EdgeCloudPlatformError("Missing 'appId' in app manifest")
@@ -180,7 +245,16 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
 
         return yaml_dict
 
-    def deploy_app(self, app_id: str, app_zones: List[Dict]) -> Dict:
+    def deploy_app(
+        self, app_id: str, app_zones: List[Dict], idempotency_key: Optional[str] = None
+    ) -> Dict:
+        if idempotency_key is not None:
+            return self._idempotent(
+                "deploy_app", idempotency_key, self.deploy_app, app_id, app_zones
+            )
+        return self._deploy_placed(app_id, app_zones, self._deploy_app)
+
+    def _deploy_app(self, app_id: str, app_zones: List[Dict]) -> Dict:
         # 1. Get app CAMARA manifest
         app_manifest = self._app_store.get(app_id)
         if not app_manifest:
@@ -239,6 +313,154 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
         # TODO: Implement actual aeros-specific logic for retrieving a specific deployed app
         raise NotImplementedError("get_deployed_app is not yet implemented for aeros adapter")
 
+    def watch_app_instances(
+        self, app_id: Optional[str] = None, timeout: Optional[float] = None
+    ) -> Iterator[AppInstanceEvent]:
+        """
+        Change events of the application instances deployed through this
+        adapter, pushed by the aerOS broker through an NGSI-LD subscription on
+        the status of the ServiceComponent entities.
+        :param app_id: Only report the instances of this application
+        :param timeout: Seconds to watch for, None for no limit
+        :return: Iterator of AppInstanceEvent
+        """
+        aeros_client = ContinuumClient(self.base_url)
+        receiver = self._get_notification_receiver()
+        notifications: queue.Queue = queue.Queue()
+        key = uuid.uuid4().hex
+        receiver.register(key, notifications.put)
+        subscription_id = None
+        try:
+            subscription_id = aeros_client.create_subscription(
+                "ServiceComponent",
+                receiver.url_for(key),
+                watched_attributes=[SERVICE_COMPONENT_STATUS],
+            )
+            # Listed after subscribing, so no change falls in between. The
+            # listing may be shared with other callers: copied before updates
+            components = {
+                component["id"]: dict(component)
+                for component in aeros_client.query_entities(
+                    "type=ServiceComponent&format=simplified"
+                )
+            }
+            tracker = InstanceTracker(app_id)
+            yield from tracker.replace(self._service_instances(components))
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return
+                try:
+                    entities = notifications.get(timeout=remaining)
+                except queue.Empty:
+                    return
+                for entity in entities:
+                    components.setdefault(entity["id"], {}).update(entity)
+                yield from tracker.replace(self._service_instances(components))
+        finally:
+            receiver.unregister(key)
+            if subscription_id is not None:
+                try:
+                    aeros_client.delete_subscription(subscription_id)
+                except EdgeCloudPlatformError as e:
+                    self.logger.warning("Subscription %s not deleted: %s", subscription_id, e)
+
+    def start_continuum_cache(self, resync_interval: Optional[float] = 300.0) -> ContinuumCache:
+        """
+        Keeps a local copy of the continuum domains and infrastructure elements,
+        updated through NGSI-LD subscriptions, and serves get_edge_cloud_zones
+        and get_edge_cloud_zones_details from it. The capacity of every zone is
+        aggregated incrementally in infrastructure_table.
+        :param resync_interval: Seconds between full reloads, None to never reload
+        :return: The started ContinuumCache
+        """
+        if self._continuum_cache is None:
+            self.infrastructure_table = InfrastructureTable()
+            cache = ContinuumCache(
+                ContinuumClient(self.base_url),
+                self._get_notification_receiver(),
+                resync_interval=resync_interval,
+                on_change=self.infrastructure_table.apply_change,
+            )
+            try:
+                self._continuum_cache = cache.start()
+            except Exception:
+                cache.stop()
+                raise
+        return self._continuum_cache
+
+    def stop_continuum_cache(self) -> None:
+        """Removes the continuum subscriptions and goes back to querying the broker."""
+        if self._continuum_cache is not None:
+            self._continuum_cache.stop()
+            self._continuum_cache = None
+
+    def _get_notification_receiver(self) -> NotificationReceiver:
+        if self._notification_receiver is None:
+            self._notification_receiver = NotificationReceiver(
+                config.NOTIFICATION_HOST, config.NOTIFICATION_PORT, config.NOTIFICATION_URL
+            ).start()
+        return self._notification_receiver
+
+    def _service_instances(self, components: Dict[str, Dict]) -> List[Dict]:
+        """
+        AppInstanceInfo of the instances deployed through this adapter, with a
+        status aggregated from their service components.
+        """
+        statuses: Dict[str, List[str]] = {}
+        for component in components.values():
+            service_id = component.get("service") or component["id"].rsplit(":", 2)[0]
+            statuses.setdefault(service_id, []).append(component_status(component))
+        instances = []
+        for app_id, instance_ids in self._deployed_services.items():
+            app_manifest = self._app_store.get(app_id, {})
+            for instance_id in instance_ids:
+                instances.append(
+                    {
+                        "name": app_manifest.get("name"),
+                        "appId": app_id,
+                        "appProvider": app_manifest.get("appProvider"),
+                        "appInstanceId": instance_id,
+                        "status": service_status(statuses.get(instance_id, [])),
+                    }
+                )
+        return instances
+
+    def migrate_app_instance(
+        self,
+        app_instance_id: str,
+        target_zone: str,
+        timeout: float = 300.0,
+        wait: bool = True,
+    ) -> migration.Migration:
+        """
+        Moves an application instance to another domain make-before-break: a
+        new service is deployed in the target domain and the source service is
+        only undeployed once the broker reports all its components running.
+        The HLO re-allocation (ContinuumClient.deploy_service) is not used: it
+        takes no target domain and replaces the service in place.
+        :param app_instance_id: Unique identifier of the application instance
+        :param target_zone: Domain to move the instance to
+        :param timeout: Seconds the new service has to become ready
+        :param wait: Block until the migration ends
+        :return: Migration record
+        """
+        return migration.migrate(
+            self,
+            app_instance_id,
+            target_zone,
+            timeout=timeout,
+            wait=wait,
+            app_id_of=self._instance_app_id,
+        )
+
+    def _instance_app_id(self, app_instance_id: str) -> str:
+        for app_id, instances in self._deployed_services.items():
+            if app_instance_id in instances:
+                return app_id
+        raise EdgeCloudPlatformError(f"No deployed app instance with ID '{app_instance_id}' found")
+
     def _purge_deployed_app_from_continuum(self, app_id: str) -> None:
         aeros_client = ContinuumClient(self.base_url)
         response = aeros_client.purge_service(app_id)
@@ -288,9 +510,12 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
     def get_edge_cloud_zones(
         self, region: Optional[str] = None, status: Optional[str] = None
     ) -> List[Dict]:
-        aeros_client = ContinuumClient(self.base_url)
-        ngsild_params = "type=Domain&format=simplified"
-        aeros_domains = aeros_client.query_entities(ngsild_params)
+        if self._continuum_cache is not None:
+            aeros_domains = self._continuum_cache.domains()
+        else:
+            aeros_client = ContinuumClient(self.base_url)
+            ngsild_params = "type=Domain&format=simplified"
+            aeros_domains = aeros_client.query_entities(ngsild_params)
         return [
             {
                 "zoneId": domain["id"],
@@ -341,6 +566,10 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
         #     }],
         #     #
         # }
+        if self._continuum_cache is not None:
+            # Kept up to date by the continuum cache notifications and resyncs
+            self._continuum_cache.ensure_fresh()
+            return self.infrastructure_table.zone_details(zone_id)
         aeros_client = ContinuumClient(self.base_url)
         ngsild_params = f'format=simplified&type=InfrastructureElement&q=domain=="{zone_id}"'
         self.logger.debug(
@@ -369,58 +598,12 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
         :param domain: The ID of the edge cloud zone
         :return: Transformed details of the edge cloud zone
         """
-        total_cpu = 0
-        total_ram = 0
-        total_disk = 0
-        total_available_ram = 0
-        total_available_disk = 0
-
-        flavours_supported = []
-
+        totals = [0.0] * len(COLUMNS)
         for element in domain_ies:
-            total_cpu += element.get("cpuCores", 0)
-            total_ram += element.get("ramCapacity", 0)
-            total_available_ram += element.get("availableRam", 0)
-            total_disk += element.get("diskCapacity", 0)
-            total_available_disk += element.get("availableDisk", 0)
-
-            # Create a flavour per machine
-            flavour = {
-                "flavourId": f"{element.get('hostname')}-{element.get('containerTechnology')}",
-                "cpuArchType": f"{element.get('cpuArchitecture')}",
-                "supportedOSTypes": [
-                    {
-                        "architecture": f"{element.get('cpuArchitecture')}",
-                        "distribution": f"{element.get('operatingSystem')}",  # assume
-                        "version": "OS_VERSION_UBUNTU_2204_LTS",
-                        "license": "OS_LICENSE_TYPE_FREE",
-                    }
-                ],
-                "numCPU": element.get("cpuCores", 0),
-                "memorySize": element.get("ramCapacity", 0),
-                "storageSize": element.get("diskCapacity", 0),
-            }
-            flavours_supported.append(flavour)
-
-        result = {
-            "zoneId": domain,
-            "reservedComputeResources": [
-                {
-                    "cpuArchType": "ISA_X86_64",
-                    "numCPU": str(total_cpu),
-                    "memory": total_ram,
-                }
-            ],
-            "computeResourceQuotaLimits": [
-                {
-                    "cpuArchType": "ISA_X86_64",
-                    "numCPU": str(total_cpu * 2),  # Assume quota is 2x total?
-                    "memory": total_ram * 2,
-                }
-            ],
-            "flavoursSupported": flavours_supported,
-        }
-        return result
+            for index, name in enumerate(COLUMNS):
+                totals[index] += element.get(name, 0)
+        # A flavour per machine
+        return zone_details(domain, totals, [ie_flavour(element) for element in domain_ies])
 
     # --- GSMA-specific methods ---
 
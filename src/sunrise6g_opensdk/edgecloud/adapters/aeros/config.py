@@ -23,5 +23,11 @@ if not aerOS_ACCESS_TOKEN:
 aerOS_HLO_TOKEN = "harcoded_hlo_token"
 if not aerOS_HLO_TOKEN:
     raise ValueError("Environment variable 'aerOS_HLO_TOKEN' is not set.")
+# Local endpoint of the NGSI-LD notification receiver; NOTIFICATION_URL is the
+# base URL the broker reaches it at, when it is not the listening address. It is
+# required when listening on all interfaces, together with a fixed port.
+NOTIFICATION_HOST = "0.0.0.0"
+NOTIFICATION_PORT = 0
+NOTIFICATION_URL = None
 DEBUG = False
 LOG_FILE = ".log/aeros_client.log"
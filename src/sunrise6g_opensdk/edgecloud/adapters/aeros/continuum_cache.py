@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Local copy of the aerOS Domain and InfrastructureElement entities.
+
+The cache subscribes to both entity types, then loads them once; from there on
+every NGSI-LD notification is merged into the copy, so reading the zones no
+longer downloads the whole continuum. Notifications carry only the changed
+attributes, which are merged into the stored entity. Deleted entities are not
+notified by every broker, so the cache is also reloaded every resync_interval
+seconds, which repairs anything missed while the receiver was unreachable.
+"""
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from sunrise6g_opensdk.edgecloud.adapters.aeros import config
+from sunrise6g_opensdk.edgecloud.adapters.aeros.continuum_client import ContinuumClient
+from sunrise6g_opensdk.edgecloud.adapters.aeros.notifications import (
+    NotificationReceiver,
+)
+from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
+from sunrise6g_opensdk.logger import setup_logger
+
+DOMAIN = "Domain"
+INFRASTRUCTURE_ELEMENT = "InfrastructureElement"
+
+
+class ContinuumCache:
+    """
+    Domains and infrastructure elements of the continuum, kept up to date by
+    NGSI-LD notifications.
+
+    :param continuum_client: ContinuumClient of the broker
+    :param receiver: started NotificationReceiver reachable by the broker
+    :param resync_interval: seconds between full reloads, None to never reload
+    :param on_change: called with (entity type, previous entity or None, new
+    entity or None) for every change, e.g. to maintain aggregates
+    """
+
+    def __init__(
+        self,
+        continuum_client: ContinuumClient,
+        receiver: NotificationReceiver,
+        resync_interval: Optional[float] = 300.0,
+        on_change: Optional[Callable[[str, Optional[Dict], Optional[Dict]], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.logger = setup_logger(__name__, is_debug=True, file_name=config.LOG_FILE)
+        self.continuum_client = continuum_client
+        self.receiver = receiver
+        self.resync_interval = resync_interval
+        self.on_change = on_change
+        self.clock = clock
+        self._entities: Dict[str, Dict[str, Dict]] = {DOMAIN: {}, INFRASTRUCTURE_ELEMENT: {}}
+        # domain id -> ids of its infrastructure elements
+        self._domain_ies: Dict[str, set] = {}
+        self._subscriptions: Dict[str, str] = {}
+        self._keys: Dict[str, str] = {}
+        self._synced_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    @property
+    def started(self) -> bool:
+        return bool(self._subscriptions)
+
+    def start(self) -> "ContinuumCache":
+        """Subscribes to domain and IE changes and loads both entity types."""
+        for entity_type in (DOMAIN, INFRASTRUCTURE_ELEMENT):
+            key = uuid.uuid4().hex
+            self.receiver.register(key, self._handler(entity_type))
+            self._keys[entity_type] = key
+            self._subscriptions[entity_type] = self.continuum_client.create_subscription(
+                entity_type, self.receiver.url_for(key)
+            )
+        # Loaded after subscribing, so no change falls in between
+        self.resync()
+        return self
+
+    def stop(self) -> None:
+        for entity_type, subscription_id in list(self._subscriptions.items()):
+            self.receiver.unregister(self._keys.pop(entity_type))
+            try:
+                self.continuum_client.delete_subscription(subscription_id)
+            except EdgeCloudPlatformError as e:
+                self.logger.warning("Subscription %s not deleted: %s", subscription_id, e)
+            del self._subscriptions[entity_type]
+
+    def resync(self) -> None:
+        """Replaces the cached entities with a full listing of the broker."""
+        listings = {
+            entity_type: self.continuum_client.query_entities(
+                f"type={entity_type}&format=simplified"
+            )
+            for entity_type in (DOMAIN, INFRASTRUCTURE_ELEMENT)
+        }
+        with self._lock:
+            for entity_type, entities in listings.items():
+                current = {entity["id"]: entity for entity in entities}
+                for entity_id in [e for e in self._entities[entity_type] if e not in current]:
+                    self._remove(entity_type, entity_id)
+                for entity in entities:
+                    self._put(entity_type, entity, replace=True)
+            self._synced_at = self.clock()
+
+    def _handler(self, entity_type: str):
+        def handle(entities: List[Dict]) -> None:
+            with self._lock:
+                for entity in entities:
+                    if "deletedAt" in entity:
+                        self._remove(entity_type, entity["id"])
+                    else:
+                        self._put(entity_type, entity)
+
+        return handle
+
+    def _put(self, entity_type: str, entity: Dict, replace: bool = False) -> None:
+        entities = self._entities[entity_type]
+        previous = entities.get(entity["id"])
+        if replace or previous is None:
+            current = dict(entity)
+        else:
+            current = {**previous, **entity}
+        if current == previous:
+            return
+        entities[entity["id"]] = current
+        if entity_type == INFRASTRUCTURE_ELEMENT:
+            self._index_ie(previous, current)
+        if self.on_change is not None:
+            self.on_change(entity_type, previous, current)
+
+    def _remove(self, entity_type: str, entity_id: str) -> None:
+        previous = self._entities[entity_type].pop(entity_id, None)
+        if previous is None:
+            return
+        if entity_type == INFRASTRUCTURE_ELEMENT:
+            self._index_ie(previous, None)
+        if self.on_change is not None:
+            self.on_change(entity_type, previous, None)
+
+    def _index_ie(self, previous: Optional[Dict], current: Optional[Dict]) -> None:
+        if previous is not None:
+            self._domain_ies.get(previous.get("domain"), set()).discard(previous["id"])
+        if current is not None:
+            self._domain_ies.setdefault(current.get("domain"), set()).add(current["id"])
+
+    def ensure_fresh(self) -> None:
+        """Reloads the copy if it is older than resync_interval."""
+        if self.resync_interval is None or self._synced_at is None:
+            return
+        if self.clock() - self._synced_at >= self.resync_interval:
+            self.resync()
+
+    def domains(self) -> List[Dict]:
+        """Cached Domain entities."""
+        self.ensure_fresh()
+        with self._lock:
+            return list(self._entities[DOMAIN].values())
+
+    def infrastructure_elements(self, domain: Optional[str] = None) -> List[Dict]:
+        """Cached InfrastructureElement entities, of one domain if given."""
+        self.ensure_fresh()
+        with self._lock:
+            entities = self._entities[INFRASTRUCTURE_ELEMENT]
+            if domain is None:
+                return list(entities.values())
+            return [entities[ie_id] for ie_id in sorted(self._domain_ies.get(domain, ()))]
@@ -9,9 +9,11 @@
 aerOS REST API Client
    This client is used to interact with the aerOS REST API.
 """
+import uuid
+from typing import List, Optional
 
-import requests
-
+from sunrise6g_opensdk.common import resilience
+from sunrise6g_opensdk.common.single_flight import auth_key, single_flight
 from sunrise6g_opensdk.edgecloud.adapters.aeros import config
 from sunrise6g_opensdk.edgecloud.adapters.aeros.utils import catch_requests_exceptions
 from sunrise6g_opensdk.logger import setup_logger
@@ -50,6 +52,14 @@ class ContinuumClient:
             "Authorization": f"Bearer {self.hlo_token}",
         }
 
+    @single_flight(
+        key=lambda self, entity_id, ngsild_params: (
+            self.api_url,
+            auth_key(self.headers["Authorization"]),
+            entity_id,
+            ngsild_params,
+        )
+    )
     @catch_requests_exceptions
     def query_entity(self, entity_id, ngsild_params) -> dict:
         """
@@ -61,17 +71,20 @@ class ContinuumClient:
         ngsi-ld object
         """
         entity_url = f"{self.api_url}/entities/{entity_id}?{ngsild_params}"
-        response = requests.get(entity_url, headers=self.headers, timeout=15)
-        if response is None:
-            return None
-        else:
-            if config.DEBUG:
-                self.logger.debug("Query entity URL: %s", entity_url)
-                self.logger.debug(
-                    "Query entity response: %s %s", response.status_code, response.text
-                )
-            return response.json()
+        response = resilience.request("GET", entity_url, headers=self.headers, timeout=15)
+        response.raise_for_status()
+        if config.DEBUG:
+            self.logger.debug("Query entity URL: %s", entity_url)
+            self.logger.debug("Query entity response: %s %s", response.status_code, response.text)
+        return response.json()
 
+    @single_flight(
+        key=lambda self, ngsild_params: (
+            self.api_url,
+            auth_key(self.headers["Authorization"]),
+            ngsild_params,
+        )
+    )
     @catch_requests_exceptions
     def query_entities(self, ngsild_params):
         """
@@ -82,9 +95,8 @@ class ContinuumClient:
         ngsi-ld object
         """
         entities_url = f"{self.api_url}/entities?{ngsild_params}"
-        response = requests.get(entities_url, headers=self.headers, timeout=15)
-        if response is None:
-            return None
+        response = resilience.request("GET", entities_url, headers=self.headers, timeout=15)
+        response.raise_for_status()
         # else:
         #     if config.DEBUG:
         #         self.logger.debug("Query entities URL: %s", entities_url)
@@ -92,6 +104,61 @@ class ContinuumClient:
         #                           response.status_code, response.text)
         return response.json()
 
+    @catch_requests_exceptions
+    def create_subscription(
+        self,
+        entity_type: str,
+        notification_uri: str,
+        watched_attributes: Optional[List[str]] = None,
+        q: Optional[str] = None,
+    ) -> str:
+        """
+        Subscribe to changes of entities of a type
+        :input
+        @param entity_type: the type of the entities to watch
+        @param notification_uri: the endpoint notifications are sent to
+        @param watched_attributes: only notify changes of these attributes
+        @param q: ngsi-ld query the notified entities must match
+        :output
+        the id of the created subscription
+        """
+        subscription_id = f"urn:ngsi-ld:Subscription:{uuid.uuid4()}"
+        body = {
+            "id": subscription_id,
+            "type": "Subscription",
+            "entities": [{"type": entity_type}],
+            "notification": {
+                "format": "keyValues",
+                "endpoint": {"uri": notification_uri, "accept": "application/json"},
+            },
+        }
+        if watched_attributes:
+            body["watchedAttributes"] = watched_attributes
+        if q:
+            body["q"] = q
+        subscriptions_url = f"{self.api_url}/subscriptions"
+        response = resilience.request(
+            "POST", subscriptions_url, json=body, headers=self.headers, timeout=15
+        )
+        response.raise_for_status()
+        if config.DEBUG:
+            self.logger.debug("Create subscription URL: %s", subscriptions_url)
+            self.logger.debug("Create subscription request body: %s", body)
+        return subscription_id
+
+    @catch_requests_exceptions
+    def delete_subscription(self, subscription_id: str) -> None:
+        """
+        Delete a subscription
+        :input
+        @param subscription_id: the id of the subscription to delete
+        """
+        subscription_url = f"{self.api_url}/subscriptions/{subscription_id}"
+        response = resilience.request("DELETE", subscription_url, headers=self.headers, timeout=15)
+        response.raise_for_status()
+        if config.DEBUG:
+            self.logger.debug("Delete subscription URL: %s", subscription_url)
+
     @catch_requests_exceptions
     def deploy_service(self, service_id: str) -> dict:
         """
@@ -102,18 +169,16 @@ class ContinuumClient:
         the re-allocated service json object
         """
         re_allocate_url = f"{self.api_url}/hlo_fe/services/{service_id}"
-        response = requests.put(re_allocate_url, headers=self.hlo_headers, timeout=15)
-        if response is None:
-            return None
-        else:
-            if config.DEBUG:
-                self.logger.debug("Re-allocate service URL: %s", re_allocate_url)
-                self.logger.debug(
-                    "Re-allocate service response: %s %s",
-                    response.status_code,
-                    response.text,
-                )
-            return response.json()
+        response = resilience.request("PUT", re_allocate_url, headers=self.hlo_headers, timeout=15)
+        response.raise_for_status()
+        if config.DEBUG:
+            self.logger.debug("Re-allocate service URL: %s", re_allocate_url)
+            self.logger.debug(
+                "Re-allocate service response: %s %s",
+                response.status_code,
+                response.text,
+            )
+        return response.json()
 
     @catch_requests_exceptions
     def undeploy_service(self, service_id: str) -> dict:
@@ -125,18 +190,16 @@ class ContinuumClient:
         the undeployed service json object
         """
         undeploy_url = f"{self.api_url}/hlo_fe/services/{service_id}"
-        response = requests.delete(undeploy_url, headers=self.hlo_headers, timeout=15)
-        if response is None:
-            return None
-        else:
-            if config.DEBUG:
-                self.logger.debug("Re-allocate service URL: %s", undeploy_url)
-                self.logger.debug(
-                    "Undeploy service response: %s %s",
-                    response.status_code,
-                    response.text,
-                )
-            return response.json()
+        response = resilience.request("DELETE", undeploy_url, headers=self.hlo_headers, timeout=15)
+        response.raise_for_status()
+        if config.DEBUG:
+            self.logger.debug("Re-allocate service URL: %s", undeploy_url)
+            self.logger.debug(
+                "Undeploy service response: %s %s",
+                response.status_code,
+                response.text,
+            )
+        return response.json()
 
     @catch_requests_exceptions
     def onboard_and_deploy_service(self, service_id: str, tosca_str: str) -> dict:
@@ -152,20 +215,18 @@ class ContinuumClient:
         if config.DEBUG:
             self.logger.debug("Onboard service URL: %s", onboard_url)
             self.logger.debug("Onboard service request body (TOSCA-YAML): %s", tosca_str)
-        response = requests.post(
-            onboard_url, data=tosca_str, headers=self.hlo_onboard_headers, timeout=15
+        response = resilience.request(
+            "POST", onboard_url, data=tosca_str, headers=self.hlo_onboard_headers, timeout=15
         )
-        if response is None:
-            return None
-        else:
-            if config.DEBUG:
-                self.logger.debug("Onboard service URL: %s", onboard_url)
-                self.logger.debug(
-                    "Onboard service response: %s %s",
-                    response.status_code,
-                    response.text,
-                )
-            return response.json()
+        response.raise_for_status()
+        if config.DEBUG:
+            self.logger.debug("Onboard service URL: %s", onboard_url)
+            self.logger.debug(
+                "Onboard service response: %s %s",
+                response.status_code,
+                response.text,
+            )
+        return response.json()
 
     @catch_requests_exceptions
     def purge_service(self, service_id: str) -> bool:
@@ -177,18 +238,15 @@ class ContinuumClient:
         the purge result message from aerOS continuum
         """
         purge_url = f"{self.api_url}/hlo_fe/services/{service_id}/purge"
-        response = requests.delete(purge_url, headers=self.hlo_headers, timeout=15)
-        if response is None:
+        response = resilience.request("DELETE", purge_url, headers=self.hlo_headers, timeout=15)
+        if config.DEBUG:
+            self.logger.debug("Purge service URL: %s", purge_url)
+            self.logger.debug(
+                "Purge service response: %s %s",
+                response.status_code,
+                response.text,
+            )
+        if response.status_code != 200:
+            self.logger.error("Failed to purge service: %s", response.text)
             return False
-        else:
-            if config.DEBUG:
-                self.logger.debug("Purge service URL: %s", purge_url)
-                self.logger.debug(
-                    "Purge service response: %s %s",
-                    response.status_code,
-                    response.text,
-                )
-            if response.status_code != 200:
-                self.logger.error("Failed to purge service: %s", response.text)
-                return False
-            return True
+        return True
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Column-oriented table of aerOS infrastructure elements with running per-domain
+aggregates.
+
+Every numeric capacity attribute is a column (a typed array), and each IE is a
+row; rows of removed IEs are reused. Adding, removing or updating an IE applies
+the difference to the totals of its domain, and the zone details built from
+them are cached until the domain changes, so reading the details of a zone
+does not walk its IEs. Capacity queries such as "hosts with at least N MB of
+free RAM" scan only the columns they filter on.
+"""
+import copy
+import threading
+from array import array
+from typing import Any, Dict, List, Optional
+
+# Numeric IE attributes kept as columns, in the order of the domain totals
+COLUMNS = ("cpuCores", "ramCapacity", "availableRam", "diskCapacity", "availableDisk")
+_CPU, _RAM, _AVAILABLE_RAM, _DISK, _AVAILABLE_DISK = range(len(COLUMNS))
+
+
+def _number(value: float) -> float | int:
+    return int(value) if float(value).is_integer() else value
+
+
+def ie_flavour(element: Dict[str, Any]) -> Dict[str, Any]:
+    """GSMA flavour of the machine behind an infrastructure element."""
+    return {
+        "flavourId": f"{element.get('hostname')}-{element.get('containerTechnology')}",
+        "cpuArchType": f"{element.get('cpuArchitecture')}",
+        "supportedOSTypes": [
+            {
+                "architecture": f"{element.get('cpuArchitecture')}",
+                "distribution": f"{element.get('operatingSystem')}",  # assume
+                "version": "OS_VERSION_UBUNTU_2204_LTS",
+                "license": "OS_LICENSE_TYPE_FREE",
+            }
+        ],
+        "numCPU": element.get("cpuCores", 0),
+        "memorySize": element.get("ramCapacity", 0),
+        "storageSize": element.get("diskCapacity", 0),
+    }
+
+
+def zone_details(domain: str, totals, flavours: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """GSMA-style zone details of a domain from its totals (ordered as COLUMNS)."""
+    total_cpu = _number(totals[_CPU])
+    total_ram = _number(totals[_RAM])
+    return {
+        "zoneId": domain,
+        "reservedComputeResources": [
+            {
+                "cpuArchType": "ISA_X86_64",
+                "numCPU": str(total_cpu),
+                "memory": total_ram,
+            }
+        ],
+        "computeResourceQuotaLimits": [
+            {
+                "cpuArchType": "ISA_X86_64",
+                "numCPU": str(total_cpu * 2),  # Assume quota is 2x total?
+                "memory": total_ram * 2,
+            }
+        ],
+        "flavoursSupported": flavours,
+    }
+
+
+class _Domain:
+    __slots__ = ("totals", "flavours", "details")
+
+    def __init__(self):
+        self.totals = [0.0] * len(COLUMNS)
+        # IE id -> flavour, in insertion order
+        self.flavours: Dict[str, Dict[str, Any]] = {}
+        self.details: Optional[Dict[str, Any]] = None
+
+
+class InfrastructureTable:
+    """
+    Infrastructure elements by row, with running totals per domain.
+
+    Feed it IE entities with upsert/remove, or pass apply_change as the
+    on_change hook of a ContinuumCache.
+    """
+
+    def __init__(self):
+        self._columns = {name: array("d") for name in COLUMNS}
+        self._ids: List[Optional[str]] = []
+        self._domains: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._by_domain: Dict[str, _Domain] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def upsert(self, element: Dict[str, Any]) -> None:
+        """Adds an infrastructure element, or replaces it if known."""
+        with self._lock:
+            ie_id = element["id"]
+            if ie_id in self._rows:
+                self.remove(ie_id)
+            if self._free:
+                row = self._free.pop()
+                for name in COLUMNS:
+                    self._columns[name][row] = float(element.get(name) or 0)
+                self._ids[row] = ie_id
+                self._domains[row] = element.get("domain")
+            else:
+                row = len(self._ids)
+                for name in COLUMNS:
+                    self._columns[name].append(float(element.get(name) or 0))
+                self._ids.append(ie_id)
+                self._domains.append(element.get("domain"))
+            self._rows[ie_id] = row
+            domain = self._by_domain.setdefault(element.get("domain"), _Domain())
+            self._apply(domain, row, 1)
+            domain.flavours[ie_id] = ie_flavour(element)
+
+    def remove(self, ie_id: str) -> None:
+        """Removes an infrastructure element, if known."""
+        with self._lock:
+            row = self._rows.pop(ie_id, None)
+            if row is None:
+                return
+            domain = self._by_domain[self._domains[row]]
+            self._apply(domain, row, -1)
+            del domain.flavours[ie_id]
+            if not domain.flavours:
+                del self._by_domain[self._domains[row]]
+            self._ids[row] = None
+            self._domains[row] = None
+            self._free.append(row)
+
+    def _apply(self, domain: _Domain, row: int, sign: int) -> None:
+        for index, name in enumerate(COLUMNS):
+            domain.totals[index] += sign * self._columns[name][row]
+        domain.details = None
+
+    def apply_change(
+        self, entity_type: str, previous: Optional[Dict], current: Optional[Dict]
+    ) -> None:
+        """ContinuumCache on_change hook."""
+        if entity_type != "InfrastructureElement":
+            return
+        if current is None:
+            self.remove(previous["id"])
+        else:
+            self.upsert(current)
+
+    def totals(self, domain: str) -> Dict[str, float | int]:
+        """Running totals of the numeric IE attributes of a domain."""
+        with self._lock:
+            found = self._by_domain.get(domain)
+            values = found.totals if found else [0.0] * len(COLUMNS)
+            return {name: _number(value) for name, value in zip(COLUMNS, values)}
+
+    def zone_details(self, domain: str) -> Dict[str, Any]:
+        """
+        Zone details of a domain, built once per change of the domain. The
+        caller gets its own copy and may modify it.
+        """
+        with self._lock:
+            found = self._by_domain.get(domain)
+            if found is None:
+                return zone_details(domain, [0.0] * len(COLUMNS), [])
+            if found.details is None:
+                found.details = zone_details(domain, found.totals, list(found.flavours.values()))
+            return copy.deepcopy(found.details)
+
+    def hosts_with(
+        self,
+        domain: Optional[str] = None,
+        min_cpu: float = 0,
+        min_available_ram: float = 0,
+        min_available_disk: float = 0,
+    ) -> List[str]:
+        """IDs of the infrastructure elements with at least the given capacity."""
+        with self._lock:
+            conditions = [
+                (self._columns[name], minimum)
+                for name, minimum in (
+                    ("cpuCores", min_cpu),
+                    ("availableRam", min_available_ram),
+                    ("availableDisk", min_available_disk),
+                )
+                if minimum
+            ]
+            # Narrow the candidate rows one column at a time
+            rows = [row for row, ie_id in enumerate(self._ids) if ie_id is not None]
+            if domain is not None:
+                rows = [row for row in rows if self._domains[row] == domain]
+            for column, minimum in conditions:
+                rows = [row for row in rows if column[row] >= minimum]
+            return [self._ids[row] for row in rows]
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Local receiver of NGSI-LD notifications sent by the aerOS context broker.
+
+Each subscription is given its own endpoint path (see url_for), registered
+before the subscription is created, so notifications sent right after the
+broker accepts it are never lost. The entities of every notification are
+passed to the handler registered for its path, on the receiver thread.
+
+This is deliberately not the asyncio NotificationReceiver of the network
+package: that one validates NEF callbacks into the 3GPP models of its fixed
+notification kinds and runs on an event loop, while NGSI-LD notifications are
+plain entity lists, consumed by blocking iterators (watch_app_instances) and
+the continuum cache, and the edge-cloud adapters do not depend on the network
+layer.
+
+The broker must be able to reach the URLs handed out: when listening on a
+wildcard address, public_url is required, with a fixed port.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+from sunrise6g_opensdk.edgecloud.adapters.aeros import config
+from sunrise6g_opensdk.logger import setup_logger
+
+NOTIFY_PATH = "/ngsi-ld/notify/"
+_WILDCARD_HOSTS = ("", "0.0.0.0", "::")
+
+
+class NotificationReceiver:
+    """
+    HTTP endpoint receiving NGSI-LD notifications.
+
+    :param host: interface to listen on
+    :param port: port to listen on, 0 for any free port
+    :param public_url: base URL the broker reaches the receiver at, when it is
+    not the listening address (NAT, proxies); required on a wildcard host
+    :raises ValueError: if the broker could not be given a reachable URL
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 0, public_url: Optional[str] = None):
+        if public_url is None and host in _WILDCARD_HOSTS:
+            raise ValueError(
+                f"Listening on {host or 'all interfaces'} needs the public URL of the receiver"
+            )
+        if public_url is not None and port == 0:
+            raise ValueError("A public URL needs a fixed port to forward to")
+        self.logger = setup_logger(__name__, is_debug=True, file_name=config.LOG_FILE)
+        self.public_url = public_url
+        self._handlers: Dict[str, Callable[[List[Dict]], None]] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        if self.public_url:
+            return self.public_url.rstrip("/")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, key: str) -> str:
+        """Notification endpoint of the handler registered under key."""
+        return f"{self.url}{NOTIFY_PATH}{key}"
+
+    def register(self, key: str, handler: Callable[[List[Dict]], None]) -> None:
+        with self._lock:
+            self._handlers[key] = handler
+
+    def unregister(self, key: str) -> None:
+        with self._lock:
+            self._handlers.pop(key, None)
+
+    def start(self) -> "NotificationReceiver":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, name="ngsi-ld-notifications", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def dispatch(self, key: str, notification: Dict) -> bool:
+        """Hands the entities of a notification to its handler; False if none."""
+        with self._lock:
+            handler = self._handlers.get(key)
+        if handler is None:
+            return False
+        try:
+            handler(notification.get("data", []))
+        except Exception as e:
+            self.logger.error("Notification handler %s failed: %s", key, e)
+        return True
+
+    def _handler_class(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                key = self.path[len(NOTIFY_PATH) :] if self.path.startswith(NOTIFY_PATH) else None
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    notification = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+                found = key is not None and receiver.dispatch(key, notification)
+                # The broker only needs to know the notification was taken
+                self.send_response(204 if found else 404)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                receiver.logger.debug("Notification endpoint: " + format, *args)
+
+        return Handler
@@ -8,36 +8,43 @@
 """
 Docstring
 """
-from requests.exceptions import HTTPError, RequestException, Timeout
+import functools
+
+from requests.exceptions import ConnectionError, HTTPError, RequestException, Timeout
 
 import sunrise6g_opensdk.edgecloud.adapters.aeros.config as config
+from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
 from sunrise6g_opensdk.logger import setup_logger
 
 
 def catch_requests_exceptions(func):
     """
-    Docstring
+    Turns requests failures of a continuum call into EdgeCloudPlatformError,
+    so that callers get a meaningful error instead of a None response.
+    Retries and the circuit breaker are applied by common.resilience before
+    the error reaches this decorator.
     """
     logger = setup_logger(__name__, is_debug=True, file_name=config.LOG_FILE)
 
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
         try:
             result = func(*args, **kwargs)
             return result
         except HTTPError as e:
             logger.info("4xx or 5xx: %s \n", {e})
-            return None  # raise our custom exception or log, etc.
+            raise EdgeCloudPlatformError(f"aerOS continuum returned an error: {e}") from e
         except ConnectionError as e:
             logger.info(
                 "Raised for connection-related issues (e.g., DNS resolution failure, network issues): %s \n",
                 {e},
             )
-            return None  # raise our custom exception or log, etc.
+            raise EdgeCloudPlatformError(f"aerOS continuum unreachable: {e}") from e
         except Timeout as e:
             logger.info("Timeout occured: %s \n", {e})
-            return None  # raise our custom exception or log, etc.
+            raise EdgeCloudPlatformError(f"aerOS continuum timed out: {e}") from e
         except RequestException as e:
             logger.info("Request failed: %s \n", {e})
-            return None  # raise our custom exception or log, etc.
+            raise EdgeCloudPlatformError(f"aerOS continuum request failed: {e}") from e
 
     return wrapper
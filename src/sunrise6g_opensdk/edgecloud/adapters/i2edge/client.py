@@ -15,7 +15,7 @@ from pydantic import ValidationError
 from requests import Response
 
 from sunrise6g_opensdk import logger
-from sunrise6g_opensdk.edgecloud.core import gsma_schemas
+from sunrise6g_opensdk.edgecloud.core import gsma_schemas, migration
 from sunrise6g_opensdk.edgecloud.core import schemas as camara_schemas
 from sunrise6g_opensdk.edgecloud.core.edgecloud_interface import (
     EdgeCloudManagementInterface,
@@ -216,14 +216,17 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
     # Application Management (CAMARA-Compliant)
     # ------------------------------------------------------------------------
 
-    def onboard_app(self, app_manifest: Dict) -> Response:
+    def onboard_app(self, app_manifest: Dict, idempotency_key: Optional[str] = None) -> Response:
         """
         Onboards an application using a CAMARA-compliant manifest.
         Translates the manifest to the i2Edge format and returns a CAMARA-compliant response.
 
         :param app_manifest: CAMARA-compliant application manifest
+        :param idempotency_key: Optional key making retries return the first result
         :return: Response with status code, headers, and CAMARA-normalised payload
         """
+        if idempotency_key is not None:
+            return self._idempotent("onboard_app", idempotency_key, self.onboard_app, app_manifest)
         try:
             # Validate CAMARA input
             camara_schemas.AppManifest(**app_manifest)
@@ -412,15 +415,25 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
     #     # <logic that select the best flavour>
     #     return flavourId
 
-    def deploy_app(self, app_id: str, app_zones: List[Dict]) -> Response:
+    def deploy_app(
+        self, app_id: str, app_zones: List[Dict], idempotency_key: Optional[str] = None
+    ) -> Response:
         """
         Deploys an application using CAMARA-compliant interface.
         Returns a CAMARA-compliant response with deployment details.
 
         :param app_id: Unique identifier of the application
         :param app_zones: List of Edge Cloud Zones where the app should be deployed
+        :param idempotency_key: Optional key making retries return the first result
         :return: Response with deployment details in CAMARA format
         """
+        if idempotency_key is not None:
+            return self._idempotent(
+                "deploy_app", idempotency_key, self.deploy_app, app_id, app_zones
+            )
+        return self._deploy_placed(app_id, app_zones, self._deploy_app)
+
+    def _deploy_app(self, app_id: str, app_zones: List[Dict]) -> Response:
         appId = app_id
 
         # Get onboarded app metadata for deployment
@@ -722,6 +735,28 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
             log.error(f"Failed to undeploy app from i2Edge: {e}")
             raise
 
+    def migrate_app_instance(
+        self,
+        app_instance_id: str,
+        target_zone: str,
+        timeout: float = 300.0,
+        wait: bool = True,
+    ) -> migration.Migration:
+        """
+        Moves an application instance to another zone make-before-break: a new
+        instance is deployed in the target zone and the source instance is only
+        undeployed once i2Edge reports the new one as DEPLOYED. No i2Edge
+        migration operation is wired for the AppMigration schema, so the move
+        is composed from deploy, watch and undeploy.
+
+        :param app_instance_id: Unique identifier of the application instance
+        :param target_zone: Edge Cloud Zone to move the instance to
+        :param timeout: Seconds the new instance has to become ready
+        :param wait: Block until the migration ends
+        :return: Migration record
+        """
+        return migration.migrate(self, app_instance_id, target_zone, timeout=timeout, wait=wait)
+
     # ########################################################################
     # GSMA EDGE COMPUTING API (EWBI OPG) - FEDERATION
     # ########################################################################
@@ -14,6 +14,8 @@ import requests
 from pydantic import BaseModel
 
 from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.common import resilience
+from sunrise6g_opensdk.common.single_flight import single_flight
 from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
 
 log = logger.get_logger(__name__)
@@ -48,7 +50,7 @@ def i2edge_post(url: str, model_payload: BaseModel, expected_status: int = 201)
     log.debug(f"Sending payload to i2Edge: {json_payload}")
 
     try:
-        response = requests.post(url, data=json_payload, headers=headers)
+        response = resilience.request("POST", url, data=json_payload, headers=headers)
         if response.status_code == expected_status:
             return response
         else:
@@ -64,6 +66,10 @@ def i2edge_post(url: str, model_payload: BaseModel, expected_status: int = 201)
         err_msg = "Failed to deploy app: {}. Detail: {}".format(i2edge_err_msg, e)
         log.error(err_msg)
         raise I2EdgeError(err_msg)
+    except requests.exceptions.RequestException as e:
+        err_msg = "i2Edge request to {} failed: {}".format(url, e)
+        log.error(err_msg)
+        raise I2EdgeError(err_msg) from e
 
 
 def i2edge_patch(url: str, model_payload: BaseModel, expected_status: int = 200) -> dict:
@@ -73,7 +79,7 @@ def i2edge_patch(url: str, model_payload: BaseModel, expected_status: int = 200)
     }
     json_payload = json.dumps(model_payload.model_dump(exclude_unset=True, mode="json"))
     try:
-        response = requests.patch(url, data=json_payload, headers=headers)
+        response = resilience.request("PATCH", url, data=json_payload, headers=headers)
         if response.status_code == expected_status:
             return response
         else:
@@ -88,6 +94,10 @@ def i2edge_patch(url: str, model_payload: BaseModel, expected_status: int = 200)
         err_msg = "Failed to patch: {}. Detail: {}".format(i2edge_err_msg, e)
         log.error(err_msg)
         raise I2EdgeError(err_msg)
+    except requests.exceptions.RequestException as e:
+        err_msg = "i2Edge request to {} failed: {}".format(url, e)
+        log.error(err_msg)
+        raise I2EdgeError(err_msg) from e
 
 
 def i2edge_post_multiform_data(url: str, model_payload: BaseModel) -> dict:
@@ -97,7 +107,7 @@ def i2edge_post_multiform_data(url: str, model_payload: BaseModel) -> dict:
     payload_dict = model_payload.model_dump(mode="json")
     payload_in_str = {k: str(v) for k, v in payload_dict.items()}
     try:
-        response = requests.post(url, data=payload_in_str, headers=headers)
+        response = resilience.request("POST", url, data=payload_in_str, headers=headers)
         response.raise_for_status()
         return response
     except requests.exceptions.HTTPError as e:
@@ -105,13 +115,17 @@ def i2edge_post_multiform_data(url: str, model_payload: BaseModel) -> dict:
         err_msg = "Failed to deploy app: {}. Detail: {}".format(i2edge_err_msg, e)
         log.error(err_msg)
         raise I2EdgeError(err_msg)
+    except requests.exceptions.RequestException as e:
+        err_msg = "i2Edge request to {} failed: {}".format(url, e)
+        log.error(err_msg)
+        raise I2EdgeError(err_msg) from e
 
 
 def i2edge_delete(url: str, id: str, expected_status: int = 200) -> dict:
     headers = {"accept": "application/json"}
     try:
         query = "{}/{}".format(url, id)
-        response = requests.delete(query, headers=headers)
+        response = resilience.request("DELETE", query, headers=headers)
         if response.status_code == expected_status:
             return response
         else:
@@ -127,12 +141,17 @@ def i2edge_delete(url: str, id: str, expected_status: int = 200) -> dict:
         err_msg = "Failed to undeploy app: {}. Detail: {}".format(i2edge_err_msg, e)
         log.error(err_msg)
         raise I2EdgeError(err_msg)
+    except requests.exceptions.RequestException as e:
+        err_msg = "i2Edge request to {} failed: {}".format(query, e)
+        log.error(err_msg)
+        raise I2EdgeError(err_msg) from e
 
 
+@single_flight()
 def i2edge_get(url: str, params: Optional[dict], expected_status: int = 200):
     headers = {"accept": "application/json"}
     try:
-        response = requests.get(url, params=params, headers=headers)
+        response = resilience.request("GET", url, params=params, headers=headers)
         if response.status_code == expected_status:
             return response
         else:
@@ -148,3 +167,7 @@ def i2edge_get(url: str, params: Optional[dict], expected_status: int = 200):
         err_msg = "Failed to get apps: {}. Detail: {}".format(i2edge_err_msg, e)
         log.error(err_msg)
         raise I2EdgeError(err_msg)
+    except requests.exceptions.RequestException as e:
+        err_msg = "i2Edge request to {} failed: {}".format(url, e)
+        log.error(err_msg)
+        raise I2EdgeError(err_msg) from e
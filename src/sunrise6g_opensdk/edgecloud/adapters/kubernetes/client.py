@@ -1,10 +1,10 @@
 # Mocked API for testing purposes
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
-from kubernetes.client import V1Deployment
 from requests import Response
 
+from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
 from sunrise6g_opensdk.edgecloud.adapters.kubernetes.lib.core.piedge_encoder import (
     deploy_service_function,
 )
@@ -21,12 +21,20 @@ from sunrise6g_opensdk.edgecloud.adapters.kubernetes.lib.utils.connector_db impo
     ConnectorDB,
 )
 from sunrise6g_opensdk.edgecloud.adapters.kubernetes.lib.utils.kubernetes_connector import (
+    DeploymentResult,
     KubernetesConnector,
 )
+from sunrise6g_opensdk.edgecloud.adapters.kubernetes.lib.utils.readiness import (
+    InstanceStatus,
+)
 from sunrise6g_opensdk.edgecloud.core import schemas as camara_schemas
 from sunrise6g_opensdk.edgecloud.core.edgecloud_interface import (
     EdgeCloudManagementInterface,
 )
+from sunrise6g_opensdk.edgecloud.core.instance_events import (
+    AppInstanceEvent,
+    InstanceTracker,
+)
 from sunrise6g_opensdk.edgecloud.core.utils import build_custom_http_response
 
 
@@ -51,7 +59,11 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
         if storage_uri is not None:
             self.connector_db = ConnectorDB(storage_uri)
 
-    def onboard_app(self, app_manifest: AppManifest) -> Response:
+    def onboard_app(
+        self, app_manifest: AppManifest, idempotency_key: Optional[str] = None
+    ) -> Response:
+        if idempotency_key is not None:
+            return self._idempotent("onboard_app", idempotency_key, self.onboard_app, app_manifest)
         print(f"Submitting application: {app_manifest}")
         logging.info("Extracting variables from payload...")
 
@@ -164,7 +176,16 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
             request=None,
         )
 
-    def deploy_app(self, app_id: str, app_zones: List[Dict]) -> Response:
+    def deploy_app(
+        self, app_id: str, app_zones: List[Dict], idempotency_key: Optional[str] = None
+    ) -> Response:
+        if idempotency_key is not None:
+            return self._idempotent(
+                "deploy_app", idempotency_key, self.deploy_app, app_id, app_zones
+            )
+        return self._deploy_placed(app_id, app_zones, self._deploy_app)
+
+    def _deploy_app(self, app_id: str, app_zones: List[Dict]) -> Response:
         logging.info("Searching for registered app with ID: " + app_id + " in database...")
         status_code = None
         app = self.connector_db.get_documents_from_collection(
@@ -188,12 +209,12 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
                 kubernetes_connector=self.k8s_connector,
             )
 
-        if type(result) is V1Deployment:
+        if isinstance(result, DeploymentResult) and result.ok:
             status_code = 202
             response = {}
-            response["name"] = result.metadata.name
+            response["name"] = result.deployment.metadata.name
             response["appId"] = app[0].get("_id")
-            response["appInstanceId"] = result.metadata.uid
+            response["appInstanceId"] = result.deployment.metadata.uid
             response["appProvider"] = app[0].get("app_provider")
             response["status"] = "unknown"
             # interfaces = []
@@ -204,13 +225,20 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
             response["kubernetesClusterRef"] = ""
             response["edgeCloudZoneId"] = app_zones[0].get("EdgeCloudZone").get("edgeCloudZoneId")
 
-        elif "Conflict" in result:
+        elif isinstance(result, DeploymentResult) and result.status == 409:
             status_code = 409
             response = {
                 "status": 409,
                 "code": "CONFLICT",
                 "message": "Application already instantiated in the given Edge Cloud Zone",
             }
+        elif isinstance(result, DeploymentResult):
+            status_code = result.status
+            response = {
+                "status": status_code,
+                "code": "DEPLOYMENT_FAILED",
+                "message": result.message,
+            }
         return build_custom_http_response(
             status_code=status_code,
             content=response,
@@ -316,6 +344,108 @@ class EdgeApplicationManager(EdgeCloudManagementInterface):
             request=None,
         )
 
+    def watch_app_instances(
+        self, app_id: Optional[str] = None, timeout: Optional[float] = None
+    ) -> Iterator[AppInstanceEvent]:
+        """
+        Change events of the application instances, from one watch on the
+        Deployments of the namespace instead of repeated listings.
+
+        :param app_id: Only report the instances of this application
+        :param timeout: Seconds to watch for, None for no limit
+        :return: Iterator of AppInstanceEvent
+        """
+        tracker = InstanceTracker(app_id)
+        records = {}
+        for event_type, deployment in self.k8s_connector.watch_deployments(timeout):
+            instance = self._deployment_instance_info(deployment, records)
+            if instance is None:
+                continue
+            if event_type == "DELETED":
+                event = tracker.remove(instance["appInstanceId"])
+            else:
+                event = tracker.update(instance)
+            if event is not None:
+                yield event
+
+    def _deployment_instance_info(self, deployment, records: Dict) -> Optional[Dict]:
+        # AppInstanceInfo of a Deployment; records caches the database documents
+        # of every instance by Deployment name and is reloaded on a miss
+        name = deployment.metadata.name
+        if name not in records:
+            apps = {
+                app["name"]: app
+                for app in self.connector_db.get_documents_from_collection("service_functions")
+            }
+            for deployed in self.connector_db.get_documents_from_collection(
+                "deployed_service_functions"
+            ):
+                app = apps.get(deployed.get("service_function_name"), {})
+                records[deployed["instance_name"]] = (deployed, app)
+        if name not in records:
+            # Not deployed through this adapter, or not recorded yet
+            return None
+        deployed, app = records[name]
+        ready_replicas = deployment.status.ready_replicas if deployment.status else None
+        if deployment.metadata.deletion_timestamp is not None:
+            status = "terminating"
+        elif ready_replicas:
+            status = "ready"
+        else:
+            status = "instantiating"
+        node_selector = deployment.spec.template.spec.node_selector or {}
+        return {
+            "name": app.get("name"),
+            "appId": app.get("_id"),
+            "appProvider": app.get("app_provider"),
+            "appInstanceId": deployed["_id"],
+            "status": status,
+            "kubernetesClusterRef": "",
+            "edgeCloudZoneId": node_selector.get("location"),
+        }
+
+    def watch_app_instance_status(
+        self, app_instance_id: str, timeout: Optional[float] = None
+    ) -> Iterator[InstanceStatus]:
+        """
+        Yields the status of an application instance every time it changes,
+        starting with the current one, until it is ready or failed. Image pull
+        and crash loop back-offs and unschedulable pods are reported as failed
+        as soon as Kubernetes reports them.
+
+        :param app_instance_id: Unique identifier of the application instance
+        :param timeout: Seconds to follow the instance for, None for no limit
+        :return: Iterator of InstanceStatus (status, reason, message, pod)
+        """
+        documents = self.connector_db.get_documents_from_collection(
+            "deployed_service_functions", input_type="_id", input_value=app_instance_id
+        )
+        if not documents:
+            raise EdgeCloudPlatformError(f"App instance {app_instance_id} does not exist")
+        return self.k8s_connector.watch_service_function(documents[0]["instance_name"], timeout)
+
+    def wait_until_ready(self, app_instance_id: str, timeout: float = 300) -> InstanceStatus:
+        """
+        Blocks until an application instance is ready.
+
+        :param app_instance_id: Unique identifier of the application instance
+        :param timeout: Maximum seconds to wait
+        :return: The ready InstanceStatus
+        :raises EdgeCloudPlatformError: If the instance failed or timed out
+        """
+        last = None
+        for last in self.watch_app_instance_status(app_instance_id, timeout):
+            if last.status == "ready":
+                return last
+            if last.status == "failed":
+                raise EdgeCloudPlatformError(
+                    f"App instance {app_instance_id} failed: {last.reason} {last.message or ''}"
+                )
+        raise EdgeCloudPlatformError(
+            f"App instance {app_instance_id} not ready after {timeout}s"
+            f" (last status: {last.status if last else 'unknown'})"
+        )
+
     def undeploy_app(self, app_instance_id: str) -> None:
         logging.info("Searching for deployed app with ID: " + app_instance_id + " in database...")
         print(f"Deleting app instance: {app_instance_id}")
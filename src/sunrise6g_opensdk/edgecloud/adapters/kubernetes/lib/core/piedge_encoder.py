@@ -1,5 +1,3 @@
-from kubernetes.client import V1Deployment
-
 from sunrise6g_opensdk.edgecloud.adapters.kubernetes.lib.models.deploy_service_function import (  # noqa: E501
     DeployServiceFunction,
 )
@@ -204,8 +202,8 @@ def deploy_service_function(
 
     if "location" not in deployed_service_function_db:
         deployed_service_function_db["location"] = "Node is selected by the K8s scheduler"
-    if type(response) is V1Deployment:
-        deployed_service_function_db["_id"] = response.metadata.uid
+    if response.ok:
+        deployed_service_function_db["_id"] = response.deployment.metadata.uid
         connector_db.insert_document_deployed_service_function(
             document=deployed_service_function_db
         )
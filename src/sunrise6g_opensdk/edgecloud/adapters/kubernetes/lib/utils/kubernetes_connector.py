@@ -1,14 +1,19 @@
 from __future__ import print_function
 
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
 from urllib.parse import urlparse
 
 import requests
 import urllib3
-from kubernetes import client
+from kubernetes import client, watch
 from kubernetes.client.rest import ApiException
 
+from sunrise6g_opensdk.common.single_flight import SingleFlight, auth_key
 from sunrise6g_opensdk.edgecloud.adapters.kubernetes.lib.utils import (
     auxiliary_functions,
+    readiness,
 )
 from sunrise6g_opensdk.edgecloud.adapters.kubernetes.lib.utils.connector_db import (
     ConnectorDB,
@@ -18,6 +23,78 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 configuration = client.Configuration()
 
+# Identical list calls issued concurrently against the same cluster share one request
+_list_flights = SingleFlight()
+
+# Field manager of the server-side applies of deploy_service_function
+FIELD_MANAGER = "sunrise6g-opensdk"
+
+# apiVersion and client model of the kinds deploy_service_function manages
+_KINDS = {
+    "PersistentVolumeClaim": ("v1", "V1PersistentVolumeClaim"),
+    "Deployment": ("apps/v1", "V1Deployment"),
+    "Service": ("v1", "V1Service"),
+    "HorizontalPodAutoscaler": ("autoscaling/v1", "V1HorizontalPodAutoscaler"),
+}
+
+
+class ResourceFailure(NamedTuple):
+    kind: str
+    name: str
+    status: int | None
+    reason: str
+
+
+class DeploymentResult:
+    """
+    Outcome of deploy_service_function.
+
+    deployment: the created V1Deployment, None on failure
+    created: (kind, name) of the objects deployed
+    failures: ResourceFailure of every object that could not be deployed
+    rolled_back: (kind, name) of the objects deleted again after a failure
+    left_behind: (kind, name) of the objects the rollback could not delete,
+                 which have to be removed by hand
+    """
+
+    __slots__ = ("deployment", "created", "failures", "rolled_back", "left_behind")
+
+    def __init__(self, deployment, created, failures=None, rolled_back=None, left_behind=None):
+        self.deployment = deployment
+        self.created = created
+        self.failures = failures or []
+        self.rolled_back = rolled_back or []
+        self.left_behind = left_behind or []
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    @property
+    def status(self) -> int:
+        """201 on success, else 409 if an object already existed, else the first error status."""
+        if self.ok:
+            return 201
+        statuses = [failure.status for failure in self.failures]
+        if 409 in statuses:
+            return 409
+        return next((status for status in statuses if status), 500)
+
+    @property
+    def message(self) -> str:
+        parts = [f"{f.kind} '{f.name}': {f.reason}" for f in self.failures]
+        if self.left_behind:
+            objects = ", ".join(f"{kind} '{name}'" for kind, name in self.left_behind)
+            parts.append(f"not rolled back, remove by hand: {objects}")
+        return "; ".join(parts)
+
+    def __repr__(self):
+        return (
+            f"DeploymentResult(status={self.status}, created={self.created}, "
+            f"failures={self.failures}, rolled_back={self.rolled_back}, "
+            f"left_behind={self.left_behind})"
+        )
+
 
 class KubernetesConnector:
     def __init__(self, ip, port, token, username, namespace):
@@ -182,11 +259,20 @@ class KubernetesConnector:
 
         return pop_output
 
+    def _list(self, list_function, *args):
+        key = (
+            self.host,
+            auth_key(self.token_k8s),
+            getattr(list_function, "__qualname__", repr(list_function)),
+            args,
+        )
+        return _list_flights.do(key, list_function, *args)
+
     def get_PoPs(self):
 
         try:
             pops_ = []
-            x1 = self.v1.list_node()
+            x1 = self._list(self.v1.list_node)
             for node in x1.items:
                 pop_ = {}
                 pop_["name"] = node.metadata.name
@@ -247,80 +333,187 @@ class KubernetesConnector:
         doc["instance_name"] = service_function_name
         connector_db.delete_document_deployed_service_functions(document=doc)
 
-    def deploy_service_function(self, descriptor_service_function):
-        # deploys a Deployment yaml file, a service, a pvc and a hpa
-
-        if "volumes" in descriptor_service_function:
-            for volume in descriptor_service_function["volumes"]:
-                # first solution (python k8s client arises error without reason!)
-                # body_volume = create_pvc(descriptor_service_function["name"], volume)
-                # api_response_pvc = v1.create_namespaced_persistent_volume_claim("sunrise6g", body_volume)
-
-                # #deploy pv
-                # print("deploy pv")
-                # try:
-                #     url = host + "/api/v1/persistentvolumes"
-                #     body_volume = create_pv_dict(descriptor_service_function["name"], volume)
-                #
-                #
-                #     headers = {"Authorization": "Bearer " + token_k8s}
-                #     x = requests.post(url, headers=headers, json=body_volume, verify=False)
-                #     print (x.status_code)
-                # except requests.exceptions.HTTPError as e:
-                #     # logging.error(traceback.format_exc())
-                #     return ("Exception when calling CoreV1Api->/api/v1/persistentvolumes: %s\n" % e)
-
-                # deploy pvc
-
-                if volume.get("hostpath") is None:
-                    try:
-                        url = (
-                            self.host
-                            + "/api/v1/namespaces/"
-                            + self.namespace
-                            + "/persistentvolumeclaims"
-                        )
-                        body_volume = self.create_pvc_dict(
-                            descriptor_service_function["name"], volume
-                        )
-                        headers = {"Authorization": "Bearer " + self.token_k8s}
-                        requests.post(url, headers=headers, json=body_volume, verify=False)
-                    except requests.exceptions.HTTPError as e:
-                        # logging.error(traceback.format_exc())
-                        return (
-                            "Exception when calling CoreV1Api->/api/v1/namespaces/"
-                            + self.namespace
-                            + "/persistentvolumeclaims: %s\n" % e
-                        )
-
-                # api_response_pvc = api_instance_corev1api.create_namespaced_persistent_volume_claim
-        body_deployment = self.create_deployment(descriptor_service_function)
-        body_service = self.create_service(descriptor_service_function)
-
-        try:
-            api_response_deployment = self.api_instance_appsv1.create_namespaced_deployment(
-                self.namespace, body_deployment
+    def deploy_service_function(self, descriptor_service_function, server_side_apply=False):
+        """
+        Deploys the PVCs, Deployment, Service and (optional) HPA of a service
+        function. The objects do not depend on each other at creation time, so
+        they are submitted concurrently; if any of them fails, the ones created
+        by this call are deleted again.
+
+        With server_side_apply, the manifests are applied as one batch: all of
+        them are first applied with dryRun=All and only persisted if every one
+        is accepted.
+
+        returns:
+            DeploymentResult
+        """
+        manifests = self._service_function_manifests(descriptor_service_function)
+        if server_side_apply:
+            return self._apply_manifests(manifests)
+        return self._create_manifests(manifests)
+
+    def _service_function_manifests(self, descriptor_service_function):
+        # (kind, name, body) of every object of a service function, PVCs first
+        name = descriptor_service_function["name"]
+        manifests = []
+        for volume in descriptor_service_function.get("volumes", []):
+            # Volumes with a hostpath are mounted directly and need no claim
+            if volume.get("hostpath") is None:
+                body = self.create_pvc_dict(name, volume)
+                manifests.append(("PersistentVolumeClaim", body["metadata"]["name"], body))
+        manifests.append(("Deployment", name, self.create_deployment(descriptor_service_function)))
+        manifests.append(("Service", name, self.create_service(descriptor_service_function)))
+        if "autoscaling_policies" in descriptor_service_function:
+            manifests.append(
+                ("HorizontalPodAutoscaler", name, self.create_hpa(descriptor_service_function))
             )
-            # api_response_service = api_instance_apiregv1.create_api_service(body_service)
-            self.v1.create_namespaced_service(self.namespace, body_service)
-            if "autoscaling_policies" in descriptor_service_function:
-                # V1 AUTOSCALER
-                body_hpa = self.create_hpa(descriptor_service_function)
-                self.api_instance_v1autoscale.create_namespaced_horizontal_pod_autoscaler(
-                    self.namespace, body_hpa
-                )
-                # V2beta1 AUTOSCALER
-                # body_hpa = create_hpa(descriptor_paas)
-                # api_instance_v2beta1autoscale.create_namespaced_horizontal_pod_autoscaler("sunrise6g",body_hpa)
+        return manifests
 
-            return api_response_deployment
-        except ApiException as e:
-            # logging.error(traceback.format_exc())
+    def _resource_api(self, kind):
+        # (create, delete, API path) of the kinds deploy_service_function manages
+        if kind == "PersistentVolumeClaim":
             return (
-                "Exception when calling AppsV1Api->create_namespaced_deployment or ApiregistrationV1Api->create_api_service: %s\n"
-                % e
+                self.v1.create_namespaced_persistent_volume_claim,
+                self.v1.delete_namespaced_persistent_volume_claim,
+                "/api/v1/namespaces/{namespace}/persistentvolumeclaims/{name}",
             )
-        # Exception("An exception occurred : ", e)
+        if kind == "Deployment":
+            return (
+                self.api_instance_appsv1.create_namespaced_deployment,
+                self.api_instance_appsv1.delete_namespaced_deployment,
+                "/apis/apps/v1/namespaces/{namespace}/deployments/{name}",
+            )
+        if kind == "Service":
+            return (
+                self.v1.create_namespaced_service,
+                self.v1.delete_namespaced_service,
+                "/api/v1/namespaces/{namespace}/services/{name}",
+            )
+        if kind == "HorizontalPodAutoscaler":
+            return (
+                self.api_instance_v1autoscale.create_namespaced_horizontal_pod_autoscaler,
+                self.api_instance_v1autoscale.delete_namespaced_horizontal_pod_autoscaler,
+                "/apis/autoscaling/v1/namespaces/{namespace}/horizontalpodautoscalers/{name}",
+            )
+        raise ValueError(f"Unsupported kind: {kind}")
+
+    def _submit(self, manifests, call):
+        # Runs call(kind, name, body) for every manifest concurrently and returns
+        # ([(kind, name, response)], [ResourceFailure]) in manifest order
+        with ThreadPoolExecutor(max_workers=len(manifests)) as pool:
+            futures = [
+                (kind, name, pool.submit(call, kind, name, body)) for kind, name, body in manifests
+            ]
+        done, failures = [], []
+        for kind, name, future in futures:
+            try:
+                done.append((kind, name, future.result()))
+            except ApiException as e:
+                failures.append(ResourceFailure(kind, name, e.status, e.reason or str(e)))
+            except Exception as e:
+                # Whatever the error, the objects created so far are rolled back
+                failures.append(ResourceFailure(kind, name, None, str(e) or type(e).__name__))
+        return done, failures
+
+    def _create_manifests(self, manifests):
+        def create(kind, name, body):
+            return self._resource_api(kind)[0](self.namespace, body)
+
+        done, failures = self._submit(manifests, create)
+        created = [(kind, name) for kind, name, _ in done]
+        deployment = next((resp for kind, _, resp in done if kind == "Deployment"), None)
+        if not failures:
+            return DeploymentResult(deployment, created)
+        return DeploymentResult(None, [], failures, *self._rollback(created))
+
+    def _apply_manifests(self, manifests):
+        api_client = self.api_instance_appsv1.api_client
+
+        def apply(dry_run):
+            def call(kind, name, body):
+                path = self._resource_api(kind)[2].format(namespace=self.namespace, name=name)
+                query = [("fieldManager", FIELD_MANAGER), ("force", "true")]
+                if dry_run:
+                    query.append(("dryRun", "All"))
+                manifest = api_client.sanitize_for_serialization(body)
+                manifest.setdefault("apiVersion", _KINDS[kind][0])
+                manifest.setdefault("kind", kind)
+                # PATCH answers 201 when the object was created and 200 when updated
+                data, status, _ = api_client.call_api(
+                    path,
+                    "PATCH",
+                    query_params=query,
+                    header_params={
+                        "Accept": "application/json",
+                        "Content-Type": "application/apply-patch+yaml",
+                    },
+                    body=manifest,
+                    response_type=_KINDS[kind][1],
+                    auth_settings=["BearerToken"],
+                    _return_http_data_only=False,
+                )
+                return data, status
+
+            return call
+
+        _, failures = self._submit(manifests, apply(dry_run=True))
+        if failures:
+            return DeploymentResult(None, [], failures)
+        done, failures = self._submit(manifests, apply(dry_run=False))
+        created = [(kind, name) for kind, name, (_, status) in done if status == 201]
+        if failures:
+            # Objects that existed before the batch are left as they are
+            return DeploymentResult(None, [], failures, *self._rollback(created))
+        deployment = next((data for kind, _, (data, _) in done if kind == "Deployment"), None)
+        return DeploymentResult(deployment, [(kind, name) for kind, name, _ in done])
+
+    def _rollback(self, created):
+        # Deletes the given objects, dependants first; returns (deleted, not deleted)
+        rolled_back, left_behind = [], []
+        for kind, name in reversed(created):
+            try:
+                self._resource_api(kind)[1](name=name, namespace=self.namespace)
+                rolled_back.append((kind, name))
+            except Exception as e:
+                logging.error(
+                    f"Rollback of {kind} '{name}' failed, it has to be removed by hand: {e}"
+                )
+                left_behind.append((kind, name))
+        return rolled_back, left_behind
+
+    def watch_service_function(self, name, timeout=None):
+        """
+        Status transitions of a deployed service function, from one watch on
+        its pods; see readiness.watch_status.
+
+        returns:
+            iterator of readiness.InstanceStatus
+        """
+        return readiness.watch_status(self.v1, self.namespace, name, timeout)
+
+    def watch_deployments(self, timeout=None):
+        """
+        (event type, V1Deployment) for every change to the Deployments of the
+        namespace, starting with ADDED for the existing ones, over one watch.
+        The watch is restarted from a fresh listing if its version expires.
+
+        args:
+            timeout: seconds to watch for, None for no limit
+        """
+        while True:
+            stream = watch.Watch()
+            kwargs = {} if timeout is None else {"timeout_seconds": max(1, int(timeout))}
+            try:
+                for event in stream.stream(
+                    self.api_instance_appsv1.list_namespaced_deployment, self.namespace, **kwargs
+                ):
+                    yield event["type"], event["object"]
+                return
+            except ApiException as e:
+                if e.status != 410 or timeout is not None:
+                    raise
+            finally:
+                stream.stop()
 
     def create_deployment(self, descriptor_service_function):
         metadata = client.V1ObjectMeta(name=descriptor_service_function["name"])
@@ -537,7 +730,7 @@ class KubernetesConnector:
         # metadata={}
         # labels={}
         body = {
-            "api_version": "v1",
+            "apiVersion": "v1",
             "kind": "PersistentVolumeClaim",
             "metadata": {"labels": {self.namespace: name_vol}, "name": name_vol},
             "spec": {
@@ -548,7 +741,7 @@ class KubernetesConnector:
         }
 
         if volume_name is not None:
-            body["spec"]["volume_name"] = volume_name
+            body["spec"]["volumeName"] = volume_name
 
         return body
 
@@ -626,6 +819,7 @@ class KubernetesConnector:
                             break
                     break
 
+    @staticmethod
     def create_hpa(descriptor_service_function):
 
         # V1!!!!!!!
@@ -661,9 +855,11 @@ class KubernetesConnector:
         return body
 
     def get_deployed_dataspace_connector(self, instance_name):
-        api_response = self.api_instance_appsv1.list_namespaced_deployment(self.namespace)
+        api_response = self._list(
+            self.api_instance_appsv1.list_namespaced_deployment, self.namespace
+        )
 
-        api_response_service = self.v1.list_namespaced_service(self.namespace)
+        api_response_service = self._list(self.v1.list_namespaced_service, self.namespace)
         app_ = {}
         for app in api_response.items:
             metadata = app.metadata
@@ -716,9 +912,13 @@ class KubernetesConnector:
 
     def get_deployed_service_functions(self, connector_db: ConnectorDB):
         self.get_deployed_hpas(connector_db)
-        api_response = self.api_instance_appsv1.list_namespaced_deployment(self.namespace)
-        api_response_service = self.v1.list_namespaced_service(self.namespace)
-        api_response_pvc = self.v1.list_namespaced_persistent_volume_claim(self.namespace)
+        api_response = self._list(
+            self.api_instance_appsv1.list_namespaced_deployment, self.namespace
+        )
+        api_response_service = self._list(self.v1.list_namespaced_service, self.namespace)
+        api_response_pvc = self._list(
+            self.v1.list_namespaced_persistent_volume_claim, self.namespace
+        )
 
         apps_col = connector_db.get_documents_from_collection(collection_input="service_functions")
         deployed_apps_col = connector_db.get_documents_from_collection(
@@ -822,8 +1022,9 @@ class KubernetesConnector:
 
     def get_deployed_hpas(self, connector_db: ConnectorDB):
         # APPV1 Implementation!
-        api_response = self.api_instance_v1autoscale.list_namespaced_horizontal_pod_autoscaler(
-            self.namespace
+        api_response = self._list(
+            self.api_instance_v1autoscale.list_namespaced_horizontal_pod_autoscaler,
+            self.namespace,
         )
 
         hpas = []
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Status of a deployed service function, followed through a watch on its pods.
+
+The pods of a service function carry the label ``{namespace: name}`` set by
+KubernetesConnector.create_deployment, so a single label-selected pod watch
+sees every replica. The instance is ``ready`` as soon as one pod is Ready, the
+same rule get_deployed_service_functions applies to the Deployment, and
+``failed`` as soon as a pod cannot make progress without intervention (image
+pull or crash loop back-off, unschedulable), instead of when a caller next
+polls.
+"""
+import time
+from typing import Callable, Dict, Iterator, NamedTuple, Optional
+
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+# Container waiting reasons that do not resolve on their own
+FAILURE_REASONS = frozenset(
+    {
+        "ImagePullBackOff",
+        "CrashLoopBackOff",
+        "InvalidImageName",
+        "CreateContainerConfigError",
+    }
+)
+
+
+class InstanceStatus(NamedTuple):
+    """CAMARA status of an instance, with the pod and reason that explain it."""
+
+    status: str
+    reason: Optional[str] = None
+    message: Optional[str] = None
+    pod: Optional[str] = None
+
+    @property
+    def final(self) -> bool:
+        return self.status in ("ready", "failed")
+
+
+def _condition(pod, condition_type):
+    for condition in (pod.status and pod.status.conditions) or []:
+        if condition.type == condition_type:
+            return condition
+    return None
+
+
+def pod_status(pod) -> InstanceStatus:
+    """Status of a single pod."""
+    name = pod.metadata.name
+    if pod.metadata.deletion_timestamp is not None:
+        return InstanceStatus("terminating", pod=name)
+    status = pod.status
+    for container in (status and status.container_statuses) or []:
+        waiting = container.state and container.state.waiting
+        if waiting is not None and waiting.reason in FAILURE_REASONS:
+            return InstanceStatus("failed", waiting.reason, waiting.message, name)
+    scheduled = _condition(pod, "PodScheduled")
+    if (
+        scheduled is not None
+        and scheduled.status == "False"
+        and scheduled.reason == "Unschedulable"
+    ):
+        return InstanceStatus("failed", "Unschedulable", scheduled.message, name)
+    if status is not None and status.phase == "Failed":
+        return InstanceStatus("failed", status.reason, status.message, name)
+    ready = _condition(pod, "Ready")
+    if ready is not None and ready.status == "True":
+        return InstanceStatus("ready", pod=name)
+    return InstanceStatus("instantiating", pod=name)
+
+
+def instance_status(pods: Dict[str, object]) -> InstanceStatus:
+    """
+    Status of an instance from its pods: ready if any pod is ready, else failed
+    if any pod failed, else instantiating (terminating once every pod is).
+    """
+    statuses = [pod_status(pod) for _, pod in sorted(pods.items())]
+    for wanted in ("ready", "failed", "instantiating"):
+        match = next((s for s in statuses if s.status == wanted), None)
+        if match is not None:
+            return match
+    if statuses:
+        return statuses[0]
+    return InstanceStatus("instantiating")
+
+
+def _changed(last: Optional[InstanceStatus], current: InstanceStatus) -> bool:
+    # A transition is a new status or reason, not another pod reporting the same
+    return last is None or (last.status, last.reason) != (current.status, current.reason)
+
+
+def watch_status(
+    core_v1,
+    namespace: str,
+    name: str,
+    timeout: Optional[float] = None,
+    watch_factory: Callable = watch.Watch,
+    clock: Callable[[], float] = time.monotonic,
+) -> Iterator[InstanceStatus]:
+    """
+    Yields the status of a service function every time it changes, starting
+    with the current one, until it is final or timeout seconds have passed.
+
+    args:
+        core_v1: CoreV1Api of the cluster
+        namespace: namespace of the service function
+        name: name of the service function Deployment
+        timeout: seconds to follow the instance for, None for no limit
+    """
+    deadline = None if timeout is None else clock() + timeout
+    selector = f"{namespace}={name}"
+    pods, resource_version, last = {}, None, None
+    while True:
+        if resource_version is None:
+            # (Re)list once, then follow the changes from that version
+            listing = core_v1.list_namespaced_pod(namespace, label_selector=selector)
+            pods = {pod.metadata.name: pod for pod in listing.items}
+            resource_version = listing.metadata.resource_version
+            current = instance_status(pods)
+            if _changed(last, current):
+                last = current
+                yield current
+                if current.final:
+                    return
+        remaining = None if deadline is None else deadline - clock()
+        if remaining is not None and remaining <= 0:
+            return
+        kwargs = {"label_selector": selector, "resource_version": resource_version}
+        if remaining is not None:
+            kwargs["timeout_seconds"] = max(1, int(remaining))
+        stream = watch_factory()
+        try:
+            for event in stream.stream(core_v1.list_namespaced_pod, namespace, **kwargs):
+                pod = event["object"]
+                resource_version = pod.metadata.resource_version
+                if event["type"] == "DELETED":
+                    pods.pop(pod.metadata.name, None)
+                else:
+                    pods[pod.metadata.name] = pod
+                current = instance_status(pods)
+                if _changed(last, current):
+                    last = current
+                    yield current
+                    if current.final:
+                        return
+                if deadline is not None and clock() >= deadline:
+                    return
+        except ApiException as e:
+            if e.status != 410:
+                raise
+            # The version we watch from was compacted away
+            resource_version = None
+        finally:
+            stream.stop()
@@ -8,16 +8,177 @@
 #   - César Cajas (cesar.cajas@i2cat.net)
 ##
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional
 
 from requests import Response
 
+from sunrise6g_opensdk.common import idempotency
+from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
+from sunrise6g_opensdk.edgecloud.core.instance_events import (
+    AppInstanceEvent,
+    instance_list,
+    iterate_async,
+    poll_app_instances,
+)
+from sunrise6g_opensdk.edgecloud.core.utils import response_payload, zone_id_of
+
+
+def _rejected(result) -> bool:
+    # Adapters report some failures as an error response instead of raising
+    if isinstance(result, Response):
+        return result.status_code >= 400
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], int):
+        return result[1] >= 400
+    return False
+
 
 class EdgeCloudManagementInterface(ABC):
     """
     Abstract Base Class for Edge Application Management.
     """
 
+    placement_engine = None
+    idempotency_store = None
+    # migration_id -> migration.Migration of the migrations started on the adapter
+    _migrations = None
+
+    def attach_placement_engine(self, engine) -> None:
+        """
+        Lets deploy_app accept "auto" zones, chosen by a
+        placement.PlacementEngine from the zone capacity.
+
+        :param engine: PlacementEngine, or None to detach it.
+        """
+        self.placement_engine = engine
+
+    def attach_idempotency_store(self, store) -> None:
+        """
+        Keeps the results of onboard_app and deploy_app calls made with an
+        idempotency_key in store, instead of the in-memory store used by default.
+
+        :param store: idempotency.IdempotencyStore (e.g. a SqliteIdempotencyStore
+        shared by several processes), or None for the default one.
+        """
+        self.idempotency_store = store
+
+    def _idempotent(self, operation: str, idempotency_key: str, fn, *args):
+        """
+        Result of a previous successful call with idempotency_key, or of fn(*args).
+        """
+        return idempotency.call(self, operation, idempotency_key, fn, *args)
+
+    def _resolve_auto_zones(self, app_id: str, app_zones) -> tuple[List[Dict], list]:
+        """
+        Replaces the "auto" zones of a deploy_app request with the zones picked
+        by the attached placement engine, which reserves their capacity.
+
+        :param app_id: Unique identifier of the application.
+        :param app_zones: deploy_app zones, or "auto" for a single instance.
+        :return: (deploy_app zones with explicit zone identifiers, reservations
+                 to release if the deployment fails).
+        """
+        if app_zones == "auto":
+            app_zones = [{"EdgeCloudZone": {"edgeCloudZoneId": "auto"}}]
+        if not any(zone_id_of(zone) == "auto" for zone in app_zones):
+            return app_zones, []
+        if self.placement_engine is None:
+            raise ValueError("'auto' zones require attach_placement_engine()")
+        app = response_payload(self.get_onboarded_app(app_id)) or {}
+        return self.placement_engine.resolve_zones(app, app_zones)
+
+    def _release_reservations(self, reservations: list) -> None:
+        for reservation in reservations:
+            self.placement_engine.release(reservation)
+
+    def _deploy_placed(self, app_id: str, app_zones, deploy):
+        """
+        Runs deploy(app_id, zones) with the "auto" zones resolved, giving back
+        the capacity they reserved if the deployment raises or is rejected.
+
+        :param app_id: Unique identifier of the application.
+        :param app_zones: deploy_app zones, possibly "auto".
+        :param deploy: the adapter deployment, taking explicit zones.
+        :return: the result of deploy.
+        """
+        app_zones, reservations = self._resolve_auto_zones(app_id, app_zones)
+        try:
+            result = deploy(app_id, app_zones)
+        except Exception:
+            self._release_reservations(reservations)
+            raise
+        if _rejected(result):
+            self._release_reservations(reservations)
+        return result
+
+    def migrate_app_instance(
+        self,
+        app_instance_id: str,
+        target_zone: str,
+        timeout: float = 300.0,
+        wait: bool = True,
+    ):
+        """
+        Moves an application instance to another zone make-before-break: a new
+        instance is deployed in the target zone and the source instance is only
+        undeployed once the new one is ready. If it is not, the new instance is
+        removed and the source instance keeps serving.
+
+        :param app_instance_id: Unique identifier of the application instance.
+        :param target_zone: Edge Cloud Zone to move the instance to ("auto"
+        lets the attached placement engine choose).
+        :param timeout: Seconds the new instance has to become ready.
+        :param wait: Block until the migration ends, otherwise follow it with
+        get_migration.
+        :return: migration.Migration record.
+        :raises EdgeCloudPlatformError: If waiting and the migration was rolled back.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support instance migration")
+
+    def get_migration(self, migration_id: str):
+        """
+        Retrieves the state of a migration started with migrate_app_instance.
+
+        :param migration_id: Identifier of the migration.
+        :return: migration.Migration record.
+        """
+        migration = (self._migrations or {}).get(migration_id)
+        if migration is None:
+            raise EdgeCloudPlatformError(f"Migration '{migration_id}' does not exist")
+        return migration
+
+    def watch_app_instances(
+        self, app_id: Optional[str] = None, timeout: Optional[float] = None
+    ) -> Iterator[AppInstanceEvent]:
+        """
+        Yields an AppInstanceEvent (ADDED, MODIFIED or DELETED, with the CAMARA
+        AppInstanceInfo) whenever an application instance appears, changes or
+        disappears, starting with an ADDED event per existing instance.
+
+        Adapters override it with the change feed of their platform; by default
+        get_all_deployed_apps is polled at an adaptive interval and diffed.
+
+        :param app_id: Only report the instances of this application.
+        :param timeout: Seconds to watch for, None for no limit.
+        :return: Iterator of AppInstanceEvent.
+        """
+        return poll_app_instances(
+            lambda: instance_list(self.get_all_deployed_apps(app_id=app_id)),
+            app_id=app_id,
+            timeout=timeout,
+        )
+
+    def watch_app_instances_async(
+        self, app_id: Optional[str] = None, timeout: Optional[float] = None
+    ) -> AsyncIterator[AppInstanceEvent]:
+        """
+        Async iterator counterpart of watch_app_instances.
+
+        :param app_id: Only report the instances of this application.
+        :param timeout: Seconds to watch for, None for no limit.
+        :return: Async iterator of AppInstanceEvent.
+        """
+        return iterate_async(self.watch_app_instances(app_id=app_id, timeout=timeout))
+
     # ====================================================================
     # CAMARA EDGE CLOUD MANAGEMENT API
     # ====================================================================
@@ -46,12 +207,14 @@ class EdgeCloudManagementInterface(ABC):
     # --------------------------------------------------------------------
 
     @abstractmethod
-    def onboard_app(self, app_manifest: Dict) -> Response:
+    def onboard_app(self, app_manifest: Dict, idempotency_key: Optional[str] = None) -> Response:
         """
         Onboards an app, submitting application metadata
         to the Edge Cloud Provider.
 
         :param app_manifest: Application metadata in dictionary format.
+        :param idempotency_key: Calls repeating a successful call with the same
+        key return its result instead of onboarding the app again.
         :return: Dictionary containing created application details.
         """
         pass
@@ -86,13 +249,18 @@ class EdgeCloudManagementInterface(ABC):
         pass
 
     @abstractmethod
-    def deploy_app(self, app_id: str, app_zones: List[Dict]) -> Response:
+    def deploy_app(
+        self, app_id: str, app_zones: List[Dict], idempotency_key: Optional[str] = None
+    ) -> Response:
         """
         Requests the instantiation of an application instance
 
         :param app_id: Unique identifier of the application
         :param app_zones: List of Edge Cloud Zones where the app should be
-        instantiated.
+        instantiated. Zones with edgeCloudZoneId "auto" are chosen by the
+        attached placement engine.
+        :param idempotency_key: Calls repeating a successful call with the same
+        key return its instance instead of deploying another one.
         :return: Response with instance details
         """
         pass
@@ -0,0 +1,503 @@
+# -*- coding: utf-8 -*-
+"""
+Federation of several edge-cloud platforms behind one CAMARA interface.
+
+FederatedEdgeCloudClient holds one EdgeCloudManagementInterface per provider
+(i2Edge, aerOS, Kubernetes...). Read operations are sent to every provider
+concurrently and their results merged into a single CAMARA list, where every
+item carries the name of the provider it comes from in ``edgeCloudProvider``::
+
+    federation = FederatedEdgeCloudClient({"i2edge": i2edge, "aeros": aeros, "k8s": k8s})
+    zones = federation.get_edge_cloud_zones().json()
+    federation.deploy_app(app_id, [{"EdgeCloudZone": zones[0]}])
+
+The zone, application and instance IDs seen in the results are indexed, so
+that writes (deploy, undeploy, delete...) are routed to the owning provider.
+A zone ID listed by several providers is ambiguous: deploy_app then requires
+the ``edgeCloudProvider`` of the zone, as found in the merged zone list.
+Providers failing during a read are listed in the ``X-Unavailable-Providers``
+response header instead of failing the whole call.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Mapping, Optional
+
+from requests import Response
+
+from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
+from sunrise6g_opensdk.edgecloud.core import migration
+from sunrise6g_opensdk.edgecloud.core.edgecloud_interface import (
+    EdgeCloudManagementInterface,
+)
+from sunrise6g_opensdk.edgecloud.core.utils import (
+    build_custom_http_response,
+    response_payload,
+    zone_id_of,
+)
+
+log = logger.get_logger(__name__)
+
+UNAVAILABLE_HEADER = "X-Unavailable-Providers"
+
+
+def _items(payload) -> list:
+    if payload is None:
+        return []
+    if isinstance(payload, dict):
+        # i2Edge and CAMARA wrap some lists, e.g. {"appInstances": [...]}
+        for key in ("appInstances", "appManifests", "zones"):
+            if isinstance(payload.get(key), list):
+                return payload[key]
+        return [payload]
+    return list(payload)
+
+
+def _app_id(app: dict) -> str | None:
+    if "appManifest" in app:
+        app = app["appManifest"]
+    return app.get("appId")
+
+
+def _zone_provider(zone: dict) -> str | None:
+    # deploy_app zones are either {"EdgeCloudZone": {...}} or the zone itself
+    return zone.get("EdgeCloudZone", zone).get("edgeCloudProvider")
+
+
+def _respond(status_code: int, content, unavailable: list[str] | None = None) -> Response:
+    headers = {"Content-Type": "application/json"}
+    if unavailable:
+        headers[UNAVAILABLE_HEADER] = ",".join(unavailable)
+    return build_custom_http_response(
+        status_code=status_code,
+        content=content,
+        headers=headers,
+        encoding="utf-8",
+    )
+
+
+class FederatedEdgeCloudClient(EdgeCloudManagementInterface):
+    """
+    Edge-cloud client fanning out to several providers.
+
+    :param providers: provider name -> edge-cloud adapter.
+    :param default_provider: provider receiving the GSMA writes that carry no
+                             routable identifier; the first provider by default.
+    :param max_workers: threads used for the fan-out.
+    """
+
+    def __init__(
+        self,
+        providers: Mapping[str, EdgeCloudManagementInterface],
+        default_provider: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ):
+        if not providers:
+            raise EdgeCloudPlatformError("At least one edge-cloud provider is required")
+        self.providers = dict(providers)
+        self.default_provider = default_provider or next(iter(self.providers))
+        if self.default_provider not in self.providers:
+            raise EdgeCloudPlatformError(f"Unknown provider '{self.default_provider}'")
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(4, len(self.providers)),
+            thread_name_prefix="edgecloud-federation",
+        )
+        self._zones: dict[str, set[str]] = {}
+        self._apps: dict[str, set[str]] = {}
+        self._instances: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    # ------------------------------------------------------------------------
+    # Fan-out and routing
+    # ------------------------------------------------------------------------
+
+    def fan_out(
+        self,
+        call: Callable[[EdgeCloudManagementInterface], object],
+        providers: Optional[List[str]] = None,
+    ) -> tuple[dict[str, object], dict[str, Exception]]:
+        """
+        Runs call on every provider concurrently.
+
+        :param call: receives a provider adapter and returns its result.
+        :param providers: restricts the call to these providers.
+        :return: (provider -> payload, provider -> exception) of the providers
+                 that succeeded and of those that failed.
+        """
+        return self._fan_out_named(lambda name, adapter: call(adapter), providers)
+
+    def _fan_out_named(
+        self,
+        call: Callable[[str, EdgeCloudManagementInterface], object],
+        providers: Optional[List[str]] = None,
+    ) -> tuple[dict[str, object], dict[str, Exception]]:
+        # As fan_out, with call also receiving the provider name
+        names = providers if providers is not None else list(self.providers)
+        futures = {
+            name: self._executor.submit(
+                lambda name=name: response_payload(call(name, self.providers[name]))
+            )
+            for name in names
+        }
+        results, errors = {}, {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                log.warning(f"Edge-cloud provider '{name}' failed: {e}")
+                errors[name] = e
+        return results, errors
+
+    def _merged(self, call, index: Callable[[str, dict], None]) -> Response:
+        results, errors = self.fan_out(call)
+        if errors and not results:
+            raise EdgeCloudPlatformError(
+                "All edge-cloud providers failed: "
+                + "; ".join(f"{name}: {e}" for name, e in errors.items())
+            )
+        merged = []
+        for name, payload in results.items():
+            for item in _items(payload):
+                if isinstance(item, dict):
+                    item = dict(item, edgeCloudProvider=name)
+                    index(name, item)
+                merged.append(item)
+        return _respond(200, merged, sorted(errors))
+
+    def _index_zone(self, provider: str, zone: dict) -> None:
+        zone_id = zone_id_of(zone)
+        if not zone_id:
+            return
+        with self._lock:
+            owners = self._zones.setdefault(zone_id, set())
+            duplicate = bool(owners) and provider not in owners
+            owners.add(provider)
+        if duplicate:
+            log.warning(
+                f"Zone '{zone_id}' is listed by several providers ({', '.join(sorted(owners))}); "
+                "deployments to it must give its edgeCloudProvider"
+            )
+
+    def _index_app(self, provider: str, app: dict) -> None:
+        app_id = _app_id(app)
+        if app_id:
+            with self._lock:
+                self._apps.setdefault(app_id, set()).add(provider)
+
+    def _index_instance(self, provider: str, instance: dict) -> None:
+        instance_id = instance.get("appInstanceId")
+        if instance_id:
+            with self._lock:
+                self._instances[instance_id] = provider
+        self._index_app(provider, instance)
+
+    def provider_of_zone(self, zone_id: str, provider: Optional[str] = None) -> str:
+        """
+        Returns the provider owning a zone.
+
+        :param zone_id: Edge Cloud Zone identifier.
+        :param provider: provider expected to own the zone; required when
+                         several providers list the same zone ID.
+        :return: name of the owning provider.
+        """
+        if provider is not None and provider not in self.providers:
+            raise EdgeCloudPlatformError(f"Unknown provider '{provider}'")
+        owners = self._zone_owners(zone_id)
+        if not owners or (provider is not None and provider not in owners):
+            # Unknown zone: refresh the index once
+            self.get_edge_cloud_zones()
+            owners = self._zone_owners(zone_id)
+        if provider is not None:
+            if provider not in owners:
+                raise EdgeCloudPlatformError(f"Zone '{zone_id}' not found in provider '{provider}'")
+            return provider
+        if not owners:
+            raise EdgeCloudPlatformError(f"Zone '{zone_id}' not found in any provider")
+        if len(owners) > 1:
+            raise EdgeCloudPlatformError(
+                f"Zone '{zone_id}' is listed by several providers ({', '.join(sorted(owners))}): "
+                "give its edgeCloudProvider"
+            )
+        return next(iter(owners))
+
+    def _zone_owners(self, zone_id: str) -> set[str]:
+        with self._lock:
+            return set(self._zones.get(zone_id, ()))
+
+    def providers_of_app(self, app_id: str) -> list[str]:
+        with self._lock:
+            providers = self._apps.get(app_id)
+        if not providers:
+            self.get_all_onboarded_apps()
+            with self._lock:
+                providers = self._apps.get(app_id)
+        if not providers:
+            raise EdgeCloudPlatformError(f"Application '{app_id}' not found in any provider")
+        return sorted(providers)
+
+    def provider_of_instance(self, app_instance_id: str) -> str:
+        with self._lock:
+            provider = self._instances.get(app_instance_id)
+        if provider is None:
+            self.get_all_deployed_apps()
+            with self._lock:
+                provider = self._instances.get(app_instance_id)
+        if provider is None:
+            raise EdgeCloudPlatformError(
+                f"Application instance '{app_instance_id}' not found in any provider"
+            )
+        return provider
+
+    # ------------------------------------------------------------------------
+    # Edge Cloud Zone Management (CAMARA)
+    # ------------------------------------------------------------------------
+
+    def get_edge_cloud_zones(
+        self, region: Optional[str] = None, status: Optional[str] = None
+    ) -> Response:
+        """
+        Retrieves the Edge Cloud Zones of all providers.
+
+        :param region: Filter by geographical region.
+        :param status: Filter by status (active, inactive, unknown).
+        :return: Response with the merged list of Edge Cloud Zones.
+        """
+        return self._merged(
+            lambda p: p.get_edge_cloud_zones(region=region, status=status), self._index_zone
+        )
+
+    # ------------------------------------------------------------------------
+    # Application Management (CAMARA)
+    # ------------------------------------------------------------------------
+
+    def onboard_app(
+        self,
+        app_manifest: Dict,
+        providers: Optional[List[str]] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Response:
+        """
+        Onboards an application on several providers.
+
+        :param app_manifest: Application metadata in dictionary format.
+        :param providers: providers to onboard on; all of them by default.
+        :param idempotency_key: Calls repeating a successful call with the same
+        key return its result instead of onboarding the app again.
+        :return: Response with the result of each provider.
+        """
+        if idempotency_key is not None:
+            return self._idempotent(
+                "onboard_app", idempotency_key, self.onboard_app, app_manifest, providers
+            )
+        results, errors = self.fan_out(lambda p: p.onboard_app(app_manifest), providers)
+        if errors and not results:
+            raise EdgeCloudPlatformError(f"Onboarding failed on every provider: {errors}")
+        content = []
+        for name, payload in results.items():
+            self._index_app(name, {"appId": app_manifest.get("appId")})
+            if isinstance(payload, dict):
+                self._index_app(name, payload)
+            content.append({"edgeCloudProvider": name, "result": payload})
+        return _respond(201, content, sorted(errors))
+
+    def get_all_onboarded_apps(self) -> Response:
+        return self._merged(lambda p: p.get_all_onboarded_apps(), self._index_app)
+
+    def get_onboarded_app(self, app_id: str) -> Response:
+        provider = self.providers_of_app(app_id)[0]
+        payload = response_payload(self.providers[provider].get_onboarded_app(app_id))
+        if isinstance(payload, dict):
+            payload = dict(payload, edgeCloudProvider=provider)
+        return _respond(200, payload)
+
+    def delete_onboarded_app(self, app_id: str) -> Response:
+        providers = self.providers_of_app(app_id)
+        results, errors = self.fan_out(lambda p: p.delete_onboarded_app(app_id), providers)
+        with self._lock:
+            owners = self._apps.get(app_id, set())
+            owners.difference_update(results)
+            if not owners:
+                self._apps.pop(app_id, None)
+        if errors:
+            raise EdgeCloudPlatformError(
+                f"Failed to delete application '{app_id}' from {sorted(errors)}: "
+                + "; ".join(str(e) for e in errors.values())
+            )
+        return _respond(204, b"")
+
+    def deploy_app(
+        self, app_id: str, app_zones: List[Dict], idempotency_key: Optional[str] = None
+    ) -> Response:
+        """
+        Deploys an application on the providers owning the requested zones.
+
+        :param app_id: Unique identifier of the application.
+        :param app_zones: Edge Cloud Zones where the app should be instantiated,
+                          possibly of different providers. A zone whose ID is
+                          listed by several providers must carry its
+                          ``edgeCloudProvider``.
+        :param idempotency_key: Calls repeating a successful call with the same
+        key return its instances instead of deploying again.
+        :return: Response with the instance details (a list when the zones
+                 belong to several providers).
+        """
+        if idempotency_key is not None:
+            return self._idempotent(
+                "deploy_app", idempotency_key, self.deploy_app, app_id, app_zones
+            )
+        app_zones, reservations = self._resolve_auto_zones(app_id, app_zones)
+        by_provider: dict[str, list[Dict]] = {}
+        try:
+            for zone in app_zones:
+                zone_id = zone_id_of(zone)
+                if not zone_id:
+                    raise EdgeCloudPlatformError(f"Zone without identifier: {zone}")
+                provider = self.provider_of_zone(zone_id, _zone_provider(zone))
+                by_provider.setdefault(provider, []).append(zone)
+        except Exception:
+            self._release_reservations(reservations)
+            raise
+        results, errors = self._fan_out_named(
+            lambda name, p: p.deploy_app(app_id, by_provider[name]), list(by_provider)
+        )
+        if errors:
+            failed = {zone_id_of(zone) for name in errors for zone in by_provider[name]}
+            self._release_reservations([r for r in reservations if r.zone_id in failed])
+            # Instances already created are reported and kept: the caller decides
+            log.error(f"Deployment of '{app_id}' failed on {sorted(errors)}")
+            if not results:
+                raise EdgeCloudPlatformError(
+                    f"Failed to deploy '{app_id}': "
+                    + "; ".join(f"{name}: {e}" for name, e in errors.items())
+                )
+        instances = []
+        for name, payload in results.items():
+            for instance in _items(payload):
+                if isinstance(instance, dict):
+                    instance = dict(instance, edgeCloudProvider=name)
+                    self._index_instance(name, instance)
+                instances.append(instance)
+        content = instances[0] if len(instances) == 1 and not errors else instances
+        return _respond(202, content, sorted(errors))
+
+    def get_deployed_app(self, app_instance_id: str, *args, **kwargs) -> Response:
+        provider = self.provider_of_instance(app_instance_id)
+        payload = response_payload(
+            self.providers[provider].get_deployed_app(app_instance_id, *args, **kwargs)
+        )
+        if isinstance(payload, dict):
+            payload = dict(payload, edgeCloudProvider=provider)
+        return _respond(200, payload)
+
+    def get_all_deployed_apps(
+        self,
+        app_id: Optional[str] = None,
+        app_instance_id: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> Response:
+        return self._merged(
+            lambda p: p.get_all_deployed_apps(
+                app_id=app_id, app_instance_id=app_instance_id, region=region
+            ),
+            self._index_instance,
+        )
+
+    def undeploy_app(self, app_instance_id: str) -> Response:
+        provider = self.provider_of_instance(app_instance_id)
+        response_payload(self.providers[provider].undeploy_app(app_instance_id))
+        with self._lock:
+            self._instances.pop(app_instance_id, None)
+        return _respond(204, b"")
+
+    def migrate_app_instance(
+        self,
+        app_instance_id: str,
+        target_zone: str,
+        timeout: float = 300.0,
+        wait: bool = True,
+    ) -> migration.Migration:
+        """
+        Moves an instance make-before-break to a zone of any provider; the new
+        instance is deployed through the provider owning the target zone.
+        """
+        return migration.migrate(self, app_instance_id, target_zone, timeout=timeout, wait=wait)
+
+    # ------------------------------------------------------------------------
+    # GSMA EDGE COMPUTING API (EWBI OPG) - FEDERATION
+    # ------------------------------------------------------------------------
+
+    def _gsma_list(self, call) -> Response:
+        results, errors = self.fan_out(call)
+        if errors and not results:
+            raise EdgeCloudPlatformError(f"All edge-cloud providers failed: {errors}")
+        merged = [item for payload in results.values() for item in _items(payload)]
+        return _respond(200, merged, sorted(errors))
+
+    def _on(self, provider: str, call) -> Response:
+        result = call(self.providers[provider])
+        return result if isinstance(result, Response) else _respond(200, result)
+
+    def get_edge_cloud_zones_list_gsma(self) -> Response:
+        return self._gsma_list(lambda p: p.get_edge_cloud_zones_list_gsma())
+
+    def get_edge_cloud_zones_gsma(self) -> Response:
+        return self._gsma_list(lambda p: p.get_edge_cloud_zones_gsma())
+
+    def get_edge_cloud_zone_details_gsma(self, zone_id: str) -> Response:
+        return self._on(
+            self.provider_of_zone(zone_id), lambda p: p.get_edge_cloud_zone_details_gsma(zone_id)
+        )
+
+    def create_artefact_gsma(self, request_body: dict) -> Response:
+        return self._on(self.default_provider, lambda p: p.create_artefact_gsma(request_body))
+
+    def get_artefact_gsma(self, artefact_id: str) -> Response:
+        return self._on(self.default_provider, lambda p: p.get_artefact_gsma(artefact_id))
+
+    def delete_artefact_gsma(self, artefact_id: str) -> Response:
+        return self._on(self.default_provider, lambda p: p.delete_artefact_gsma(artefact_id))
+
+    def onboard_app_gsma(self, request_body: dict) -> Response:
+        response = self._on(self.default_provider, lambda p: p.onboard_app_gsma(request_body))
+        self._index_app(self.default_provider, request_body)
+        return response
+
+    def get_onboarded_app_gsma(self, app_id: str) -> Response:
+        provider = self._gsma_app_provider(app_id)
+        return self._on(provider, lambda p: p.get_onboarded_app_gsma(app_id))
+
+    def patch_onboarded_app_gsma(self, app_id: str, request_body: dict) -> Response:
+        provider = self._gsma_app_provider(app_id)
+        return self._on(provider, lambda p: p.patch_onboarded_app_gsma(app_id, request_body))
+
+    def delete_onboarded_app_gsma(self, app_id: str) -> Response:
+        provider = self._gsma_app_provider(app_id)
+        return self._on(provider, lambda p: p.delete_onboarded_app_gsma(app_id))
+
+    def deploy_app_gsma(self, request_body: dict) -> Response:
+        zone_id = (request_body.get("zoneInfo") or {}).get("zoneId")
+        provider = self.provider_of_zone(zone_id) if zone_id else self.default_provider
+        return self._on(provider, lambda p: p.deploy_app_gsma(request_body))
+
+    def get_deployed_app_gsma(self, app_id: str, app_instance_id: str, zone_id: str) -> Response:
+        return self._on(
+            self.provider_of_zone(zone_id),
+            lambda p: p.get_deployed_app_gsma(app_id, app_instance_id, zone_id),
+        )
+
+    def get_all_deployed_apps_gsma(self) -> Response:
+        return self._gsma_list(lambda p: p.get_all_deployed_apps_gsma())
+
+    def undeploy_app_gsma(self, app_id: str, app_instance_id: str, zone_id: str) -> Response:
+        return self._on(
+            self.provider_of_zone(zone_id),
+            lambda p: p.undeploy_app_gsma(app_id, app_instance_id, zone_id),
+        )
+
+    def _gsma_app_provider(self, app_id: str) -> str:
+        with self._lock:
+            providers = self._apps.get(app_id)
+        return sorted(providers)[0] if providers else self.default_provider
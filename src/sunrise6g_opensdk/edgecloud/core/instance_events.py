@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Change events of application instances, common to every edge-cloud adapter.
+
+EdgeCloudManagementInterface.watch_app_instances yields an AppInstanceEvent
+(ADDED, MODIFIED or DELETED, with the CAMARA AppInstanceInfo) whenever an
+instance appears, changes or disappears. Adapters feed an InstanceTracker with
+whatever their backend offers (a Kubernetes watch, NGSI-LD notifications) and
+the tracker turns it into events, so only real changes reach the caller. Where
+nothing better exists, poll_app_instances diffs successive listings, polling
+fast while instances are changing and backing off while they are stable.
+"""
+import asyncio
+import time
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
+from sunrise6g_opensdk.edgecloud.core.utils import response_payload
+
+log = logger.get_logger(__name__)
+
+ADDED = "ADDED"
+MODIFIED = "MODIFIED"
+DELETED = "DELETED"
+
+# Statuses an instance is expected to leave soon
+TRANSITIONAL_STATUSES = frozenset({"instantiating", "terminating"})
+
+
+class AppInstanceEvent(NamedTuple):
+    type: str
+    instance: Dict
+
+
+def instance_list(result) -> List[Dict]:
+    """AppInstanceInfo items of a get_all_deployed_apps result, whatever its shape."""
+    payload = response_payload(result) or []
+    if isinstance(payload, dict):
+        payload = payload.get("appInstances", [])
+    return [item.get("appInstance", item) for item in payload]
+
+
+class InstanceTracker:
+    """
+    Last known AppInstanceInfo of every instance, turning new states into
+    change events.
+
+    :param app_id: only track the instances of this application.
+    """
+
+    __slots__ = ("app_id", "instances")
+
+    def __init__(self, app_id: Optional[str] = None):
+        self.app_id = app_id
+        self.instances: Dict[str, Dict] = {}
+
+    def update(self, instance: Dict) -> Optional[AppInstanceEvent]:
+        """Event for a new or changed instance, None if nothing changed."""
+        if self.app_id is not None and instance.get("appId") != self.app_id:
+            return None
+        instance_id = instance["appInstanceId"]
+        previous = self.instances.get(instance_id)
+        if previous == instance:
+            return None
+        self.instances[instance_id] = instance
+        return AppInstanceEvent(ADDED if previous is None else MODIFIED, instance)
+
+    def remove(self, instance_id: str) -> Optional[AppInstanceEvent]:
+        """Event for an instance that no longer exists, None if it was unknown."""
+        previous = self.instances.pop(instance_id, None)
+        if previous is None:
+            return None
+        return AppInstanceEvent(DELETED, previous)
+
+    def replace(self, instances: Iterable[Dict]) -> List[AppInstanceEvent]:
+        """Events turning the tracked instances into a complete new listing."""
+        events, seen = [], set()
+        for instance in instances:
+            seen.add(instance["appInstanceId"])
+            event = self.update(instance)
+            if event is not None:
+                events.append(event)
+        for instance_id in [i for i in self.instances if i not in seen]:
+            events.append(self.remove(instance_id))
+        return events
+
+    @property
+    def settling(self) -> bool:
+        """Whether any instance is in a transitional status."""
+        return any(i.get("status") in TRANSITIONAL_STATUSES for i in self.instances.values())
+
+
+def poll_app_instances(
+    list_instances: Callable[[], List[Dict]],
+    app_id: Optional[str] = None,
+    timeout: Optional[float] = None,
+    min_interval: float = 1.0,
+    max_interval: float = 30.0,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> Iterator[AppInstanceEvent]:
+    """
+    Change events from successive listings of the instances. The first listing
+    yields an ADDED event per instance. The polling interval drops to
+    min_interval after a change and while an instance is instantiating or
+    terminating, and doubles up to max_interval otherwise. Failed listings are
+    logged and retried at the next interval.
+
+    :param list_instances: returns the current AppInstanceInfo items.
+    :param app_id: only report the instances of this application.
+    :param timeout: seconds to watch for, None for no limit.
+    """
+    deadline = None if timeout is None else clock() + timeout
+    tracker = InstanceTracker(app_id)
+    interval = min_interval
+    while True:
+        try:
+            events = tracker.replace(list_instances())
+        except EdgeCloudPlatformError as e:
+            log.warning(f"Listing app instances failed, retrying in {interval:g}s: {e}")
+            events = []
+        yield from events
+        if events or tracker.settling:
+            interval = min_interval
+        else:
+            interval = min(max_interval, interval * 2)
+        if deadline is not None:
+            remaining = deadline - clock()
+            if remaining <= 0:
+                return
+            interval = min(interval, remaining)
+        sleep(interval)
+
+
+async def iterate_async(iterator: Iterator) -> AsyncIterator:
+    """
+    Async iterator over a blocking one, advanced in a worker thread so the
+    event loop keeps running while it waits for the next event.
+    """
+    done = object()
+    while True:
+        item = await asyncio.to_thread(next, iterator, done)
+        if item is done:
+            return
+        yield item
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Make-before-break migration of application instances between zones.
+
+A migration deploys a new instance of the same application in the target zone,
+waits (through the adapter's watch_app_instances) until it is ready, and only
+then undeploys the source instance, so the application is served throughout.
+If the new instance fails or is not ready in time, it is undeployed again and
+the source instance is left untouched.
+
+Every migration is tracked by a Migration record (state, instances involved,
+when each state was entered), which the adapter keeps for get_migration. Only
+the last FINISHED_RETAINED finished migrations of an adapter are kept.
+
+This generic path is also used by the adapters whose platform has a native
+way of moving a service, because none of them can honour both the target zone
+and make-before-break: the aerOS HLO re-allocation (PUT on the service) takes
+no target domain and replaces the service in place, and the i2Edge client has
+no migration operation wired for its AppMigration schema.
+"""
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
+from sunrise6g_opensdk.edgecloud.core.instance_events import instance_list
+from sunrise6g_opensdk.edgecloud.core.utils import response_payload
+
+log = logger.get_logger(__name__)
+
+PENDING = "pending"
+DEPLOYING = "deploying"
+SWITCHING = "switching"
+COMPLETED = "completed"
+ROLLED_BACK = "rolled_back"
+
+# Finished migrations kept per adapter for get_migration
+FINISHED_RETAINED = 100
+
+_registry_lock = threading.Lock()
+
+
+class Migration:
+    """State of the migration of an application instance to another zone."""
+
+    __slots__ = (
+        "migration_id",
+        "app_id",
+        "source_instance_id",
+        "target_zone",
+        "target_instance_id",
+        "state",
+        "error",
+        "history",
+        "done",
+    )
+
+    def __init__(self, source_instance_id: str, target_zone: str):
+        self.migration_id = str(uuid.uuid4())
+        self.app_id: Optional[str] = None
+        self.source_instance_id = source_instance_id
+        self.target_zone = target_zone
+        self.target_instance_id: Optional[str] = None
+        self.state = PENDING
+        self.error: Optional[str] = None
+        # (state, wall clock time it was entered)
+        self.history: List[tuple] = [(PENDING, time.time())]
+        self.done = threading.Event()
+
+    def _enter(self, state: str) -> None:
+        self.state = state
+        self.history.append((state, time.time()))
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (COMPLETED, ROLLED_BACK)
+
+    def to_dict(self) -> Dict:
+        return {
+            "migrationId": self.migration_id,
+            "appId": self.app_id,
+            "sourceAppInstanceId": self.source_instance_id,
+            "targetEdgeCloudZoneId": self.target_zone,
+            "targetAppInstanceId": self.target_instance_id,
+            "state": self.state,
+            "error": self.error,
+            "history": [{"state": state, "at": at} for state, at in self.history],
+        }
+
+    def __repr__(self):
+        return (
+            f"Migration({self.migration_id}, {self.source_instance_id} -> "
+            f"{self.target_zone}, {self.state})"
+        )
+
+
+def instance_app_id(adapter, app_instance_id: str) -> str:
+    """Application of an instance, from the adapter's instance listing."""
+    for instance in instance_list(adapter.get_all_deployed_apps()):
+        if instance.get("appInstanceId") == app_instance_id:
+            return instance["appId"]
+    raise EdgeCloudPlatformError(f"No deployed app instance with ID '{app_instance_id}' found")
+
+
+def wait_until_ready(adapter, app_id: str, app_instance_id: str, timeout: float) -> None:
+    """
+    Blocks until an instance is reported ready by the adapter's
+    watch_app_instances.
+
+    :raises EdgeCloudPlatformError: if it failed, disappeared or timed out.
+    """
+    for event in adapter.watch_app_instances(app_id=app_id, timeout=timeout):
+        if event.instance.get("appInstanceId") != app_instance_id:
+            continue
+        if event.type == "DELETED":
+            raise EdgeCloudPlatformError(f"App instance {app_instance_id} was removed")
+        status = event.instance.get("status")
+        if status == "ready":
+            return
+        if status == "failed":
+            raise EdgeCloudPlatformError(f"App instance {app_instance_id} failed")
+    raise EdgeCloudPlatformError(f"App instance {app_instance_id} not ready after {timeout}s")
+
+
+def migrate(
+    adapter,
+    app_instance_id: str,
+    target_zone: str,
+    timeout: float = 300.0,
+    wait: bool = True,
+    app_id_of: Optional[Callable[[str], str]] = None,
+) -> Migration:
+    """
+    Migrates an instance of an adapter make-before-break; see the module doc.
+
+    :param adapter: EdgeCloudManagementInterface owning the instance.
+    :param app_instance_id: Instance to migrate.
+    :param target_zone: Zone to move it to.
+    :param timeout: Seconds the new instance has to become ready.
+    :param wait: Block until the migration ends; otherwise it runs in the
+    background and is followed with get_migration.
+    :param app_id_of: Resolves the application of an instance, by default from
+    the adapter's instance listing.
+    :return: The Migration record.
+    :raises EdgeCloudPlatformError: If waiting and the migration was rolled back.
+    """
+    migration = Migration(app_instance_id, target_zone)
+    _track(adapter, migration)
+
+    def run():
+        try:
+            _run(adapter, migration, timeout, app_id_of or (lambda i: instance_app_id(adapter, i)))
+        finally:
+            migration.done.set()
+
+    if not wait:
+        threading.Thread(
+            target=run, name=f"migration-{migration.migration_id}", daemon=True
+        ).start()
+        return migration
+    run()
+    if migration.state == ROLLED_BACK:
+        raise EdgeCloudPlatformError(
+            f"Migration of {app_instance_id} to {target_zone} rolled back: {migration.error}"
+        )
+    return migration
+
+
+def _track(adapter, migration: Migration) -> None:
+    # Registers a migration, dropping the oldest finished ones beyond FINISHED_RETAINED
+    with _registry_lock:
+        if adapter._migrations is None:
+            adapter._migrations = {}
+        finished = [key for key, value in adapter._migrations.items() if value.finished]
+        for key in finished[: max(0, len(finished) - FINISHED_RETAINED + 1)]:
+            del adapter._migrations[key]
+        adapter._migrations[migration.migration_id] = migration
+
+
+def _run(adapter, migration: Migration, timeout: float, app_id_of) -> None:
+    try:
+        migration.app_id = app_id_of(migration.source_instance_id)
+        migration._enter(DEPLOYING)
+        zones = [{"EdgeCloudZone": {"edgeCloudZoneId": migration.target_zone}}]
+        deployed = response_payload(adapter.deploy_app(migration.app_id, zones))
+        migration.target_instance_id = deployed["appInstanceId"]
+        wait_until_ready(adapter, migration.app_id, migration.target_instance_id, timeout)
+    except Exception as e:
+        migration.error = str(e)
+        log.error(f"Migration {migration.migration_id} failed, rolling back: {e}")
+        if migration.target_instance_id is not None:
+            try:
+                adapter.undeploy_app(migration.target_instance_id)
+            except Exception as undeploy_error:
+                migration.error += f"; new instance not removed: {undeploy_error}"
+        migration._enter(ROLLED_BACK)
+        return
+    migration._enter(SWITCHING)
+    try:
+        adapter.undeploy_app(migration.source_instance_id)
+    except Exception as e:
+        # The application already runs in the target zone
+        migration.error = f"source instance not removed: {e}"
+        log.warning(f"Migration {migration.migration_id}: {migration.error}")
+    migration._enter(COMPLETED)
+    log.info(
+        f"Migrated {migration.source_instance_id} to {migration.target_instance_id} "
+        f"in zone {migration.target_zone}"
+    )
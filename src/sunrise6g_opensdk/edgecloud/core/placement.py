@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+Capacity-aware placement of application instances across edge-cloud zones.
+
+PlacementEngine keeps a snapshot of the free CPU and memory of every zone of an
+adapter, built from the GSMA-style zone details the adapters already expose
+(``computeResourceQuotaLimits`` and ``reservedComputeResources``). The snapshot
+is refreshed once it is older than ``ttl`` seconds, so consecutive placement
+decisions do not query the platform again.
+
+Zones are scored with bin-packing heuristics against the application
+``requiredResources``: ``best_fit`` fills the zones that will be left with the
+least free capacity (consolidation), ``worst_fit`` the ones left with the most
+(spreading). Every placement reserves the requested capacity in the snapshot
+straight away, so a burst of deployments does not overcommit a zone. A
+reservation is dropped when released, or ``ttl`` seconds after it was made,
+when the platform capacity is expected to account for the instance itself.
+
+Once attached to an adapter, ``deploy_app`` accepts "auto" zones::
+
+    adapter.attach_placement_engine(PlacementEngine.for_adapter(adapter))
+    adapter.deploy_app(app_id, [{"EdgeCloudZone": {"edgeCloudZoneId": "auto"}}])
+"""
+import math
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
+from sunrise6g_opensdk.edgecloud.core.utils import response_payload, zone_id_of
+
+log = logger.get_logger(__name__)
+
+AUTO_ZONE = "auto"
+
+_QUANTITY = re.compile(r"^\s*([0-9.]+)\s*([A-Za-z]*)\s*$")
+# Multipliers to mega bytes of the Kubernetes quantity suffixes
+_MEMORY_UNITS = {
+    "": 1.0,
+    "Ki": 1 / 1024,
+    "Mi": 1.0,
+    "Gi": 1024.0,
+    "Ti": 1024.0**2,
+    "K": 1e3 / 2**20,
+    "k": 1e3 / 2**20,
+    "M": 1e6 / 2**20,
+    "G": 1e9 / 2**20,
+    "T": 1e12 / 2**20,
+    "MB": 1.0,
+    "GB": 1024.0,
+}
+
+
+class Resources(NamedTuple):
+    """CPU (vCPUs) and memory (mega bytes)."""
+
+    cpu: float = 0.0
+    memory: float = 0.0
+
+    def __add__(self, other: "Resources") -> "Resources":
+        return Resources(self.cpu + other.cpu, self.memory + other.memory)
+
+    def __sub__(self, other: "Resources") -> "Resources":
+        return Resources(self.cpu - other.cpu, self.memory - other.memory)
+
+    def fits(self, other: "Resources") -> bool:
+        """Whether other fits in these resources."""
+        return other.cpu <= self.cpu + 1e-9 and other.memory <= self.memory + 1e-9
+
+
+def parse_cpu(value) -> float:
+    """vCPUs of 2, "2", "0.5" or "500m"."""
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    if text.endswith("m"):
+        return float(text[:-1]) / 1000
+    return float(text)
+
+
+def parse_memory(value) -> float:
+    """
+    Mega bytes of a memory amount. Numbers are taken as mega bytes (CAMARA and
+    GSMA) and Kubernetes quantities ("16Gi", "16333892Ki") are converted.
+    """
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _QUANTITY.match(str(value))
+    if not match or match.group(2) not in _MEMORY_UNITS:
+        raise ValueError(f"Invalid memory quantity: {value}")
+    return float(match.group(1)) * _MEMORY_UNITS[match.group(2)]
+
+
+def _sum_resources(entries: Iterable[Dict] | None) -> Resources:
+    total = Resources()
+    for entry in entries or []:
+        total += Resources(parse_cpu(entry.get("numCPU")), parse_memory(entry.get("memory")))
+    return total
+
+
+def zone_capacity(details: Dict) -> tuple[Resources, Resources]:
+    """
+    (total, free) resources of GSMA-style zone details: the quota limits are
+    the total and the reserved compute resources are in use.
+    """
+    total = _sum_resources(details.get("computeResourceQuotaLimits"))
+    used = _sum_resources(details.get("reservedComputeResources"))
+    return total, Resources(max(0.0, total.cpu - used.cpu), max(0.0, total.memory - used.memory))
+
+
+def required_resources(app: Dict) -> Resources:
+    """Resources requested by a CAMARA application manifest (or its requiredResources)."""
+    if "appManifest" in app:
+        app = app["appManifest"]
+    required = app.get("requiredResources", app) or {}
+    if required.get("infraKind") == "kubernetes":
+        pools = (required.get("applicationResources") or {}).values()
+        return sum(
+            (
+                Resources(parse_cpu(pool.get("numCPU")), parse_memory(pool.get("memory")))
+                for pool in pools
+                if pool
+            ),
+            Resources(),
+        )
+    return Resources(parse_cpu(required.get("numCPU")), parse_memory(required.get("memory")))
+
+
+class Reservation(NamedTuple):
+    reservation_id: str
+    zone_id: str
+    resources: Resources
+
+
+class _Zone:
+    __slots__ = ("total", "free")
+
+    def __init__(self, total: Resources, free: Resources):
+        self.total = total
+        self.free = free
+
+
+class PlacementEngine:
+    """
+    Chooses zones for new application instances from a cached capacity snapshot.
+
+    :param list_zones: returns the zone IDs to consider.
+    :param zone_details: returns the GSMA-style details of a zone.
+    :param ttl: seconds a snapshot (and an unreleased reservation) stays valid.
+    :param strategy: "best_fit" (consolidate) or "worst_fit" (spread).
+    :param max_workers: concurrent zone detail requests when refreshing.
+    """
+
+    STRATEGIES = ("best_fit", "worst_fit")
+
+    def __init__(
+        self,
+        list_zones: Callable[[], List[str]],
+        zone_details: Callable[[str], Dict],
+        ttl: float = 30.0,
+        strategy: str = "best_fit",
+        max_workers: int = 8,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"strategy must be one of {self.STRATEGIES}")
+        self.list_zones = list_zones
+        self.zone_details = zone_details
+        self.ttl = ttl
+        self.strategy = strategy
+        self.max_workers = max_workers
+        self.clock = clock
+        self._zones: dict[str, _Zone] = {}
+        self._taken_at: float | None = None
+        # reservation_id -> (reservation, time it was made)
+        self._reservations: dict[str, tuple[Reservation, float]] = {}
+        self._lock = threading.RLock()
+        # Serialises refreshes; the zone details are fetched without _lock held
+        self._refreshing = threading.Lock()
+
+    @classmethod
+    def for_adapter(cls, adapter, **kwargs) -> "PlacementEngine":
+        """Engine reading zones and their details from an edge-cloud adapter."""
+
+        def list_zones():
+            zones = response_payload(adapter.get_edge_cloud_zones()) or []
+            return [zone_id_of(zone) for zone in zones if zone_id_of(zone)]
+
+        def zone_details(zone_id):
+            if hasattr(adapter, "get_edge_cloud_zones_details"):
+                return response_payload(adapter.get_edge_cloud_zones_details(zone_id))
+            return response_payload(adapter.get_edge_cloud_zone_details_gsma(zone_id))
+
+        return cls(list_zones, zone_details, **kwargs)
+
+    def refresh(self) -> None:
+        """Takes a new capacity snapshot of every zone."""
+        zone_ids = self.list_zones()
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(zone_ids)))) as pool:
+            details = list(pool.map(self._safe_details, zone_ids))
+        zones = {}
+        for zone_id, detail in zip(zone_ids, details):
+            if detail is not None:
+                zones[zone_id] = _Zone(*zone_capacity(detail))
+        now = self.clock()
+        with self._lock:
+            # Instances reserved more than ttl ago are expected in the new snapshot
+            self._reservations = {
+                key: (reservation, made_at)
+                for key, (reservation, made_at) in self._reservations.items()
+                if now - made_at < self.ttl
+            }
+            for reservation, _ in self._reservations.values():
+                zone = zones.get(reservation.zone_id)
+                if zone is not None:
+                    zone.free = zone.free - reservation.resources
+            self._zones = zones
+            self._taken_at = now
+
+    def _safe_details(self, zone_id: str) -> Dict | None:
+        try:
+            return self.zone_details(zone_id)
+        except Exception as e:
+            log.warning(f"Zone '{zone_id}' left out of the placement snapshot: {e}")
+            return None
+
+    def _stale(self) -> bool:
+        with self._lock:
+            return self._taken_at is None or self.clock() - self._taken_at >= self.ttl
+
+    def _ensure_fresh(self) -> None:
+        if not self._stale():
+            return
+        with self._refreshing:
+            # Another thread may have refreshed while this one waited
+            if self._stale():
+                self.refresh()
+
+    def snapshot(self) -> dict[str, Resources]:
+        """Free resources of every zone, refreshing the snapshot if stale."""
+        self._ensure_fresh()
+        with self._lock:
+            return {zone_id: zone.free for zone_id, zone in self._zones.items()}
+
+    def score(self, zone_id: str, need: Resources) -> float | None:
+        """
+        Score of placing need in a zone (lower is better), None if it does not fit.
+        The score is the largest fraction of the zone capacity left free after
+        placement, negated for worst_fit.
+        """
+        zone = self._zones.get(zone_id)
+        if zone is None or not zone.free.fits(need):
+            return None
+        left = zone.free - need
+        fractions = [
+            left.cpu / zone.total.cpu if zone.total.cpu else 0.0,
+            left.memory / zone.total.memory if zone.total.memory else 0.0,
+        ]
+        leftover = max(fractions)
+        return leftover if self.strategy == "best_fit" else -leftover
+
+    def place(
+        self, need: Resources | Dict, candidates: Optional[Iterable[str]] = None
+    ) -> Reservation:
+        """
+        Chooses a zone for an instance and reserves its resources.
+
+        :param need: Resources, or an app manifest / requiredResources dict.
+        :param candidates: restricts the choice to these zones.
+        :return: the Reservation made.
+        :raises EdgeCloudPlatformError: if no zone has enough free capacity.
+        """
+        if isinstance(need, dict):
+            need = required_resources(need)
+        self._ensure_fresh()
+        with self._lock:
+            zone_ids = list(candidates) if candidates is not None else list(self._zones)
+            scored = [
+                (score, zone_id)
+                for zone_id in zone_ids
+                if (score := self.score(zone_id, need)) is not None
+            ]
+            if not scored:
+                raise EdgeCloudPlatformError(
+                    f"No zone has {need.cpu:g} vCPU and {math.ceil(need.memory)} MB available"
+                )
+            _, zone_id = min(scored)
+            reservation = Reservation(str(uuid.uuid4()), zone_id, need)
+            self._zones[zone_id].free = self._zones[zone_id].free - need
+            self._reservations[reservation.reservation_id] = (reservation, self.clock())
+            log.debug(f"Reserved {need} in zone '{zone_id}'")
+            return reservation
+
+    def release(self, reservation: Reservation) -> None:
+        """Gives back the capacity of a reservation whose deployment failed."""
+        with self._lock:
+            if self._reservations.pop(reservation.reservation_id, None) is None:
+                return
+            zone = self._zones.get(reservation.zone_id)
+            if zone is not None:
+                zone.free = zone.free + reservation.resources
+
+    def resolve_zones(self, app: Dict, app_zones: List[Dict]) -> tuple[List[Dict], list]:
+        """
+        Replaces the "auto" entries of deploy_app zones with placed zones.
+
+        :return: (zones, reservations made).
+        """
+        resolved, reservations = [], []
+        explicit = {zone_id_of(zone) for zone in app_zones} - {AUTO_ZONE, None}
+        try:
+            for zone in app_zones:
+                if zone_id_of(zone) != AUTO_ZONE:
+                    resolved.append(zone)
+                    continue
+                candidates = [z for z in self.snapshot() if z not in explicit]
+                reservation = self.place(app, candidates)
+                reservations.append(reservation)
+                explicit.add(reservation.zone_id)
+                resolved.append({"EdgeCloudZone": {"edgeCloudZoneId": reservation.zone_id}})
+        except Exception:
+            for reservation in reservations:
+                self.release(reservation)
+            raise
+        return resolved, reservations
@@ -11,6 +11,7 @@ import json
 from requests import Response
 
 from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
 
 log = logger.get_logger(__name__)
 
@@ -35,3 +36,28 @@ def build_custom_http_response(
     if request:
         response.request = request
     return response
+
+
+def response_payload(result):
+    """
+    Content of an adapter result, whether a Response or plain data (some
+    adapters return dicts, lists or (message, status) tuples).
+
+    :raises EdgeCloudPlatformError: if the result carries an error status.
+    """
+    if isinstance(result, Response):
+        if result.status_code >= 400:
+            raise EdgeCloudPlatformError(f"HTTP {result.status_code}: {result.text}")
+        return result.json() if result.content else None
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], int):
+        if result[1] >= 400:
+            raise EdgeCloudPlatformError(f"HTTP {result[1]}: {result[0]}")
+        return result[0]
+    return result
+
+
+def zone_id_of(zone: dict) -> str | None:
+    """Zone identifier of a CAMARA zone, a deploy_app zone entry or a GSMA zone."""
+    if "EdgeCloudZone" in zone:
+        zone = zone["EdgeCloudZone"]
+    return zone.get("edgeCloudZoneId") or zone.get("zoneId")
@@ -7,7 +7,10 @@
 #   - Giulio Carota (giulio.carota@eurecom.fr)
 ##
 from sunrise6g_opensdk import logger
-from sunrise6g_opensdk.network.core.base_network_client import BaseNetworkClient
+from sunrise6g_opensdk.network.core.base_network_client import (
+    BaseNetworkClient,
+    build_host_flow_descriptor,
+)
 from sunrise6g_opensdk.network.core.schemas import (
     AsSessionWithQoSSubscription,
     CreateSession,
@@ -73,7 +76,7 @@ class NetworkManager(BaseNetworkClient):
         server_ip = _retrieve_app_ipv4(session_info)
 
         # build flow descriptor in oai format using device ip and server ip
-        flow_descriptor = f"permit out ip from {device_ip}/32 to {server_ip}/32"
+        flow_descriptor = build_host_flow_descriptor(device_ip, server_ip)
         _add_qod_flow_descriptor(subscription, flow_descriptor)
         _add_qod_snssai(subscription, 1, "FFFFFF")
         subscription.dnn = "oai"
@@ -111,11 +114,11 @@ class NetworkManager(BaseNetworkClient):
 
 
 def _retrieve_ue_ipv4(session_info: CreateSession):
-    return session_info.device.ipv4Address.root.privateAddress
+    return session_info.device.ipv4Address.root.privateAddress.root
 
 
 def _retrieve_app_ipv4(session_info: CreateSession):
-    return session_info.applicationServer.ipv4Address
+    return session_info.applicationServer.ipv4Address.root
 
 
 def _add_qod_flow_descriptor(qos_sub: AsSessionWithQoSSubscription, flow_desriptor: str):
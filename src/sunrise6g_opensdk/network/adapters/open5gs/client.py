@@ -16,6 +16,7 @@ from sunrise6g_opensdk.network.core.base_network_client import (
 )
 
 from ...core import schemas
+from ...core.notification_receiver import NotificationKind
 
 log = logger.get_logger(__name__)
 
@@ -75,7 +76,9 @@ class NetworkManager(BaseNetworkClient):
         """Add core specific location parameters to support location retrieval scenario in NEF."""
         return schemas.MonitoringEventSubscriptionRequest(
             msisdn=retrieve_location_request.device.phoneNumber.root.lstrip("+"),
-            notificationDestination="http://127.0.0.1:8001",
+            notificationDestination=self._notification_destination(
+                NotificationKind.monitoring, default="http://127.0.0.1:8001"
+            ),
             monitoringType=schemas.MonitoringType.LOCATION_REPORTING,
             locationType=schemas.LocationType.LAST_KNOWN,
         )
@@ -9,31 +9,108 @@
 #   - Giulio Carota (giulio.carota@eurecom.fr)
 #   - Panagiotis Pavlidis (p.pavlidis@iit.demokritos.gr)
 ##
+import sqlite3
 import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta, timezone
 from itertools import product
-from typing import Dict
+from typing import Dict, Iterable, Iterator
+
+import requests
+from pydantic import TypeAdapter, ValidationError
 
 from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.common import idempotency, rate_limit
 from sunrise6g_opensdk.network.adapters.errors import NetworkPlatformError
 from sunrise6g_opensdk.network.core import common, schemas
 from sunrise6g_opensdk.network.core.common import requires_capability
+from sunrise6g_opensdk.network.core.ip_filter_rule import (
+    FilterDirection,
+    FilterEndpoint,
+    IPFilterRule,
+    encode_flow_description,
+    parse_flow_description,
+    parse_flow_descriptions,
+)
+from sunrise6g_opensdk.network.core.location_cache import LocationCache
+from sunrise6g_opensdk.network.core.notification_receiver import (
+    Notification,
+    NotificationKind,
+    NotificationReceiver,
+)
+from sunrise6g_opensdk.network.core.session_store import SessionKind, SqliteSessionStore
 
 log = logger.get_logger(__name__)
 
+_LOCATION_LIST = TypeAdapter(list[schemas.Location])
+
+# QoS status of a QoD session after a NEF user plane event
+_QOS_EVENT_STATUS = {
+    schemas.UserPlaneEvent.SUCCESSFUL_RESOURCES_ALLOCATION: (schemas.QosStatus.AVAILABLE, None),
+    schemas.UserPlaneEvent.QOS_GUARANTEED: (schemas.QosStatus.AVAILABLE, None),
+    schemas.UserPlaneEvent.FAILED_RESOURCES_ALLOCATION: (
+        schemas.QosStatus.UNAVAILABLE,
+        schemas.StatusInfo.NETWORK_TERMINATED,
+    ),
+    schemas.UserPlaneEvent.RELEASE_OF_BEARER: (
+        schemas.QosStatus.UNAVAILABLE,
+        schemas.StatusInfo.NETWORK_TERMINATED,
+    ),
+    schemas.UserPlaneEvent.SESSION_TERMINATION: (
+        schemas.QosStatus.UNAVAILABLE,
+        schemas.StatusInfo.NETWORK_TERMINATED,
+    ),
+}
+
+
+def resource_id_from_link(link: str) -> str:
+    """
+    Returns the NEF resource ID of a subscription self link (its last path
+    segment); an ID is returned unchanged.
+    """
+    return str(link).rstrip("/").split("/")[-1]
 
-def flatten_port_spec(ports_spec: schemas.PortsSpec | None) -> list[str]:
-    has_ports = False
-    has_ranges = False
-    flat_ports = []
+
+def compact_port_spec(ports_spec: schemas.PortsSpec | None) -> list[tuple[int, int]]:
+    """
+    Reduces a CAMARA PortsSpec to the minimal sorted list of disjoint port ranges.
+
+    Single ports and ranges are merged together when they overlap or are adjacent
+    (e.g. 80, 81 and 82-90 become 80-90), and duplicates are dropped. An empty or
+    missing spec means "all ports".
+
+    args:
+        ports_spec: CAMARA ports specification (device or application server side).
+
+    returns:
+        list of inclusive (start, end) tuples, sorted by start port.
+    """
+    intervals = []
     if ports_spec and ports_spec.ports:
-        has_ports = True
-        flat_ports.extend([str(port) for port in ports_spec.ports])
+        intervals.extend((port.root, port.root) for port in ports_spec.ports)
     if ports_spec and ports_spec.ranges:
-        has_ranges = True
-        flat_ports.extend([f"{range.from_.root}-{range.to.root}" for range in ports_spec.ranges])
-    if not has_ports and not has_ranges:
-        flat_ports.append("0-65535")
+        for port_range in ports_spec.ranges:
+            start, end = port_range.from_.root, port_range.to.root
+            intervals.append((min(start, end), max(start, end)))
+    if not intervals:
+        return [(0, 65535)]
+
+    intervals.sort()
+    compacted = [intervals[0]]
+    for start, end in intervals[1:]:
+        last_start, last_end = compacted[-1]
+        if start <= last_end + 1:
+            if end > last_end:
+                compacted[-1] = (last_start, end)
+        else:
+            compacted.append((start, end))
+    return compacted
+
+
+def flatten_port_spec(ports_spec: schemas.PortsSpec | None) -> list[str]:
+    flat_ports = []
+    for start, end in compact_port_spec(ports_spec):
+        flat_ports.append(str(start) if start == end else f"{start}-{end}")
     return flat_ports
 
 
@@ -41,8 +118,8 @@ def build_flows(
     flow_id: int,
     session_info: schemas.CreateSession,
 ) -> list[schemas.FlowInfo]:
-    device_ports = flatten_port_spec(session_info.devicePorts)
-    server_ports = flatten_port_spec(session_info.applicationServerPorts)
+    device_ports = compact_port_spec(session_info.devicePorts)
+    server_ports = compact_port_spec(session_info.applicationServerPorts)
     ports_combis = list(product(device_ports, server_ports))
 
     device_ip = session_info.device.ipv4Address or session_info.device.ipv6Address
@@ -55,18 +132,47 @@ def build_flows(
         session_info.applicationServer.ipv4Address or session_info.applicationServer.ipv6Address
     )
     server_ip = server_ip.root
-    flow_descrs = []
+    rules = []
     for device_port, server_port in ports_combis:
-        flow_descrs.append(
-            f"permit in ip from {device_ip} {device_port} to {server_ip} {server_port}"
-        )
-        flow_descrs.append(
-            f"permit out ip from {server_ip} {server_port} to {device_ip} {device_port}"
-        )
-    flows = [schemas.FlowInfo(flowId=flow_id, flowDescriptions=[", ".join(flow_descrs)])]
+        device = FilterEndpoint.from_address(device_ip, [device_port])
+        server = FilterEndpoint.from_address(server_ip, [server_port])
+        rules.append(IPFilterRule(direction=FilterDirection.inbound, src=device, dst=server))
+        rules.append(IPFilterRule(direction=FilterDirection.outbound, src=server, dst=device))
+    flows = [schemas.FlowInfo(flowId=flow_id, flowDescriptions=[encode_flow_description(rules)])]
     return flows
 
 
+def build_host_flow_descriptor(src_ip, dst_ip) -> str:
+    """
+    Builds the single-rule "permit out ip from <src>/32 to <dst>/32" descriptor used by
+    cores that match whole hosts (e.g. OAI). IPv6 hosts get a /128 mask; an explicit
+    mask, /0 included, is kept.
+    """
+    src = _host_endpoint(FilterEndpoint.from_address(str(src_ip)))
+    dst = _host_endpoint(FilterEndpoint.from_address(str(dst_ip)))
+    return IPFilterRule(direction=FilterDirection.outbound, src=src, dst=dst).encode()
+
+
+def _host_endpoint(endpoint: FilterEndpoint) -> FilterEndpoint:
+    if endpoint.prefix_length is not None:
+        return endpoint
+    return endpoint.model_copy(update={"prefix_length": endpoint.network.max_prefixlen})
+
+
+def _flow_descriptions(flows: list[schemas.FlowInfo] | None) -> list[str]:
+    return [description for flow in flows or [] for description in flow.flowDescriptions or []]
+
+
+def _application_server_from(endpoint: FilterEndpoint) -> schemas.ApplicationServer:
+    if endpoint.version == 6:
+        return schemas.ApplicationServer(
+            ipv6Address=schemas.ApplicationServerIpv6Address(endpoint.address_spec)
+        )
+    return schemas.ApplicationServer(
+        ipv4Address=schemas.ApplicationServerIpv4Address(endpoint.address_spec)
+    )
+
+
 class BaseNetworkClient:
     """
     Class for Network Resource Management.
@@ -78,6 +184,108 @@ class BaseNetworkClient:
 
     base_url: str
     scs_as_id: str
+    notification_receiver: NotificationReceiver | None = None
+    location_cache: LocationCache | None = None
+    idempotency_store: idempotency.IdempotencyStore | None = None
+    session_store: SqliteSessionStore | None = None
+    serve_session_reads: bool = False
+
+    def attach_notification_receiver(self, receiver: NotificationReceiver | None) -> None:
+        """
+        Routes NEF notifications to a NotificationReceiver.
+
+        Once attached, subscriptions created without an explicit sink (and all
+        monitoring event subscriptions) announce the receiver URL as their
+        notificationDestination.
+        """
+        self._watch_qos_notifications(False)
+        self.notification_receiver = receiver
+        self._watch_qos_notifications(True)
+
+    def attach_location_cache(self, cache: LocationCache | None) -> None:
+        """
+        Serves location requests from a LocationCache when the cached location
+        is recent enough for the request maxAge.
+        """
+        self.location_cache = cache
+
+    def attach_idempotency_store(self, store: idempotency.IdempotencyStore | None) -> None:
+        """
+        Keeps the results of the create calls made with an idempotency_key in
+        store (e.g. a SqliteIdempotencyStore shared by several processes),
+        instead of the in-memory store used by default.
+        """
+        self.idempotency_store = store
+
+    def attach_session_store(
+        self, store: SqliteSessionStore | None, serve_reads: bool = False
+    ) -> None:
+        """
+        Records the QoD sessions and traffic influence resources created,
+        extended and deleted through this client in store, to recover them
+        after a restart without querying the NEF.
+
+        Entries are keyed by the base_url and scs_as_id of this client. The
+        QoS status of the stored QoD sessions follows the reads of this client
+        and the QoS notifications of its NotificationReceiver, if attached.
+        Failing to write to the store is logged and does not fail the NEF call.
+
+        args:
+            store: session store, or None to detach it.
+            serve_reads: answer get_qod_session from the store once the QoS
+                         status of the session is known, until it expires.
+        """
+        self._watch_qos_notifications(False)
+        self.session_store = store
+        self.serve_session_reads = serve_reads
+        self._watch_qos_notifications(True)
+
+    def _watch_qos_notifications(self, watch: bool) -> None:
+        receiver = self.notification_receiver
+        if receiver is None:
+            return
+        if not watch:
+            receiver.remove_observer(self._track_qos_notification)
+        elif self.session_store is not None:
+            receiver.add_observer(self._track_qos_notification, NotificationKind.qos)
+
+    def _track_qos_notification(self, notification: Notification) -> None:
+        status = None
+        for report in notification.payload.eventReports:
+            status = _QOS_EVENT_STATUS.get(report.event, status)
+        if status is not None and notification.subscription_id is not None:
+            self._session_store_call("set_status", notification.subscription_id, *status)
+
+    def _session_store_call(self, operation: str, *args, **kwargs):
+        """
+        Runs a SessionStore operation on the entries of this client.
+
+        The NEF stays the source of truth, so a store failure (e.g. a database
+        locked for too long) is logged and None returned instead of raising.
+        """
+        store = self.session_store
+        if store is None:
+            return None
+        try:
+            return getattr(store, operation)(
+                *args, base_url=self.base_url, scs_as_id=self.scs_as_id, **kwargs
+            )
+        except sqlite3.Error as e:
+            log.error(f"Session store {operation} failed, the local record may be stale: {e}")
+            return None
+
+    def _notification_destination(
+        self, kind: NotificationKind, requested: str | None = None, default: str | None = None
+    ) -> str | None:
+        """
+        Picks the notificationDestination of a subscription: the destination
+        requested by the caller, else the attached receiver, else default.
+        """
+        if requested:
+            return str(requested)
+        if self.notification_receiver is not None:
+            return self.notification_receiver.url_for(kind)
+        return default
 
     @requires_capability("qod")
     def add_core_specific_qod_parameters(
@@ -171,7 +379,9 @@ class BaseNetworkClient:
 
         self.core_specific_qod_validation(valid_session_info)
         subscription = schemas.AsSessionWithQoSSubscription(
-            notificationDestination=str(valid_session_info.sink),
+            notificationDestination=str(
+                self._notification_destination(NotificationKind.qos, valid_session_info.sink)
+            ),
             qosReference=valid_session_info.qosProfile.root,
             ueIpv4Addr=device_ipv4,
             ueIpv6Addr=valid_session_info.device.ipv6Address,
@@ -191,11 +401,13 @@ class BaseNetworkClient:
         server_ip = (
             traffic_influence_data.appInstanceId
         )  # assume that the instance id corresponds to its IPv4 address
-        sink_url = traffic_influence_data.notificationUri
+        sink_url = self._notification_destination(
+            NotificationKind.traffic_influence, traffic_influence_data.notificationUri
+        )
         edge_zone = traffic_influence_data.edgeCloudZoneId
 
         # build flow descriptor in oai format using device ip and server ip
-        flow_descriptor = f"permit out ip from {device_ip}/32 to {server_ip}/32"
+        flow_descriptor = build_host_flow_descriptor(device_ip, server_ip)
 
         subscription = schemas.TrafficInfluSub(
             afAppId=traffic_influence_data.appId,
@@ -209,14 +421,21 @@ class BaseNetworkClient:
         return subscription
 
     @requires_capability("traffic_influence")
-    def _build_camara_ti(self, trafficInflSub: Dict):
+    def _build_camara_ti(
+        self, trafficInflSub: Dict, flow_rules: tuple[IPFilterRule, ...] | None = None
+    ):
         traffic_influence_data = schemas.TrafficInfluSub.model_validate(trafficInflSub)
 
-        flowDesc = traffic_influence_data.trafficFilters[0].flowDescriptions[0]
-        serverIp = flowDesc.split("to ")[1].split("/32")[0]
+        if flow_rules is None:
+            flowDesc = traffic_influence_data.trafficFilters[0].flowDescriptions[0]
+            flow_rules = parse_flow_description(flowDesc)
+        serverIp = flow_rules[0].dst.address_spec
         edgeId = traffic_influence_data.trafficRoutes[0].dnai
 
         camara_ti = schemas.CreateTrafficInfluence(
+            trafficInfluenceID=(
+                traffic_influence_data.self_.root if traffic_influence_data.self_ else None
+            ),
             appId=traffic_influence_data.afAppId,
             appInstanceId=serverIp,
             edgeCloudZoneId=edgeId,
@@ -241,7 +460,10 @@ class BaseNetworkClient:
         subscription_3gpp.ipv4Addr = device.ipv4Address
         subscription_3gpp.ipv6Addr = device.ipv6Address
         # subscription.msisdn = device.phoneNumber.root.lstrip('+')
-        # subscription.notificationDestination = "http://127.0.0.1:8001"
+        if self.notification_receiver is not None:
+            subscription_3gpp.notificationDestination = self.notification_receiver.url_for(
+                NotificationKind.monitoring
+            )
 
         return subscription_3gpp
 
@@ -279,10 +501,34 @@ class BaseNetworkClient:
         returns:
             dictionary containing the created subscription details, including its ID.
         """
+        if self.location_cache is not None:
+            return self.location_cache.get_or_fetch(
+                retrieve_location_request, self._retrieve_location
+            )
+        return self._retrieve_location(retrieve_location_request)
+
+    def _retrieve_location(
+        self, retrieve_location_request: schemas.RetrievalLocationRequest
+    ) -> schemas.Location:
+        monitoring_event_report = self._post_monitoring_event(retrieve_location_request)
+        camara_location = self.build_camara_locations([monitoring_event_report])[0]
+        if isinstance(camara_location, Exception):
+            raise camara_location
+        return camara_location
+
+    @requires_capability("location_retrieval")
+    def _post_monitoring_event(
+        self,
+        retrieve_location_request: schemas.RetrievalLocationRequest,
+        session: requests.Session | None = None,
+    ) -> schemas.MonitoringEventReport:
         subscription = self._build_monitoring_event_subscription(retrieve_location_request)
-        response = common.monitoring_event_post(self.base_url, self.scs_as_id, subscription)
+        response = common.monitoring_event_post(
+            self.base_url, self.scs_as_id, subscription, session=session
+        )
+        return schemas.MonitoringEventReport(**response)
 
-        monitoring_event_report = schemas.MonitoringEventReport(**response)
+    def _camara_location_data(self, monitoring_event_report: schemas.MonitoringEventReport) -> dict:
         if monitoring_event_report.locationInfo is None:
             log.error("Failed to retrieve location information from monitoring event report")
             raise NetworkPlatformError("Location information not found in monitoring event report")
@@ -295,30 +541,139 @@ class BaseNetworkClient:
             report_event_time, age_of_location_info
         )
         log.debug(f"Last Location time is {last_location_time}")
-        camara_point_list: list[schemas.Point] = []
-        for point in geo_area.polygon.point_list.geographical_coords:
-            camara_point_list.append(schemas.Point(latitude=point.lat, longitude=point.lon))
-        camara_polygon = schemas.Polygon(
-            areaType=schemas.AreaType.polygon,
-            boundary=schemas.PointList(camara_point_list),
-        )
+        return {
+            "lastLocationTime": last_location_time,
+            "area": {
+                "areaType": schemas.AreaType.polygon,
+                "boundary": [
+                    {"latitude": point.lat, "longitude": point.lon}
+                    for point in geo_area.polygon.point_list.geographical_coords
+                ],
+            },
+        }
+
+    def build_camara_locations(
+        self, monitoring_event_reports: list[schemas.MonitoringEventReport]
+    ) -> list[schemas.Location | Exception]:
+        """
+        Converts NEF monitoring event reports into CAMARA Locations.
 
-        camara_location = schemas.Location(area=camara_polygon, lastLocationTime=last_location_time)
+        The whole batch is validated in a single pydantic call; when that fails
+        the reports are validated one by one so that each gets its own result.
 
-        return camara_location
+        returns:
+            list aligned with the input holding a Location or the error for each report.
+        """
+        results: list[schemas.Location | Exception | None] = [None] * len(monitoring_event_reports)
+        indexes, location_data = [], []
+        for index, report in enumerate(monitoring_event_reports):
+            try:
+                location_data.append(self._camara_location_data(report))
+                indexes.append(index)
+            except NetworkPlatformError as e:
+                results[index] = e
+        try:
+            locations = _LOCATION_LIST.validate_python(location_data)
+        except ValidationError:
+            locations = []
+            for data in location_data:
+                try:
+                    locations.append(schemas.Location.model_validate(data))
+                except ValidationError as e:
+                    locations.append(e)
+        for index, location in zip(indexes, locations):
+            results[index] = location
+        return results
+
+    @requires_capability("location_retrieval")
+    def retrieve_locations(
+        self,
+        retrieve_location_requests: Iterable[schemas.RetrievalLocationRequest],
+        max_concurrency: int = 16,
+    ) -> Iterator[tuple[schemas.Device | None, schemas.Location | Exception]]:
+        """
+        Retrieves the location of many devices concurrently.
+
+        The NEF monitoring event requests are sent from up to max_concurrency
+        threads sharing a pooled HTTP session, with bulk rate-limit priority so
+        that interactive calls to the same NEF are admitted first. Results are
+        yielded as they complete, so their order does not follow the input.
+        Locations present in the attached LocationCache that satisfy the
+        request maxAge are yielded first without contacting the NEF.
+
+        args:
+            retrieve_location_requests: CAMARA location retrieval requests.
+            max_concurrency: maximum number of NEF requests in flight.
+
+        returns:
+            iterator of (device, Location) pairs, or (device, exception) for the
+            requests that failed.
+        """
+        if max_concurrency < 1:
+            raise NetworkPlatformError("max_concurrency must be at least 1")
+        pending = []
+        for request in retrieve_location_requests:
+            if self.location_cache is not None:
+                cached = self.location_cache.get(request.device, request.maxAge)
+                if cached is not None:
+                    yield request.device, cached
+                    continue
+            pending.append(request)
+        if not pending:
+            return
+
+        http_session = common.pooled_session(max_concurrency)
+        executor = ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(pending)), thread_name_prefix="location"
+        )
+        try:
+            futures = {
+                executor.submit(
+                    rate_limit.call_with_priority,
+                    rate_limit.Priority.bulk,
+                    self._post_monitoring_event,
+                    request,
+                    http_session,
+                ): request
+                for request in pending
+            }
+            not_done = set(futures)
+            while not_done:
+                done, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+                completed, reports = [], []
+                for future in done:
+                    request = futures.pop(future)
+                    try:
+                        reports.append(future.result())
+                        completed.append(request)
+                    except Exception as e:
+                        yield request.device, e
+                for request, location in zip(completed, self.build_camara_locations(reports)):
+                    if self.location_cache is not None and not isinstance(location, Exception):
+                        self.location_cache.put(request.device, location)
+                    yield request.device, location
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            http_session.close()
 
     @requires_capability("qod")
-    def create_qod_session(self, session_info: Dict) -> Dict:
+    def create_qod_session(self, session_info: Dict, idempotency_key: str | None = None) -> Dict:
         """
         Creates a QoS session based on CAMARA QoD API input.
 
         args:
             session_info: Dictionary containing session details conforming to
                           the CAMARA QoD session creation parameters.
+            idempotency_key: calls repeating a successful call with the same
+                             key return its session instead of creating another.
 
         returns:
             dictionary containing the created session details, including its ID.
         """
+        if idempotency_key is not None:
+            return idempotency.call(
+                self, "create_qod_session", idempotency_key, self.create_qod_session, session_info
+            )
         subscription = self._build_qod_subscription(session_info)
         response = common.as_session_with_qos_post(self.base_url, self.scs_as_id, subscription)
         subscription_info: schemas.AsSessionWithQoSSubscription = (
@@ -330,6 +685,16 @@ class BaseNetworkClient:
             qosStatus=schemas.QosStatus.REQUESTED,
             **session_info,
         )
+        self._session_store_call(
+            "record",
+            SessionKind.qod,
+            subscription_info.subscription_id,
+            session_info.model_dump(mode="json"),
+            device=session_info.device,
+            profile=subscription.qosReference,
+            flows=_flow_descriptions(subscription.flowInfo),
+            duration=session_info.duration,
+        )
         return session_info.model_dump()
 
     @requires_capability("qod")
@@ -343,12 +708,20 @@ class BaseNetworkClient:
         returns:
             Dictionary containing the details of the requested QoS session.
         """
+        if self.serve_session_reads:
+            stored = self._session_store_call("get", SessionKind.qod, session_id)
+            if (
+                stored is not None
+                and not stored.expired(self.session_store.clock())
+                and stored.payload.get("qosStatus") != schemas.QosStatus.REQUESTED.value
+            ):
+                return schemas.SessionInfo.model_validate(stored.payload).model_dump()
         response = common.as_session_with_qos_get(
             self.base_url, self.scs_as_id, session_id=session_id
         )
         subscription_info = schemas.AsSessionWithQoSSubscription(**response)
         flowDesc = subscription_info.flowInfo[0].flowDescriptions[0]
-        serverIp = flowDesc.split("to ")[1].split("/")[0]
+        server = parse_flow_description(flowDesc)[0].dst
         session_info = schemas.SessionInfo(
             sessionId=schemas.SessionId(uuid.UUID(subscription_info.subscription_id)),
             duration=subscription_info.usageThreshold.duration.root,
@@ -360,13 +733,57 @@ class BaseNetworkClient:
                     privateAddress=subscription_info.ueIpv4Addr,
                 ),
             ),
-            applicationServer=schemas.ApplicationServer(
-                ipv4Address=schemas.ApplicationServerIpv4Address(serverIp)
-            ),
+            applicationServer=_application_server_from(server),
             qosStatus=schemas.QosStatus.AVAILABLE,
         )
+        self._session_store_call("set_status", session_id, session_info.qosStatus)
         return session_info.model_dump()
 
+    @requires_capability("qod")
+    def extend_qod_session(self, session_id: str, requested_additional_duration: int) -> Dict:
+        """
+        Extends the duration of an active Quality on Demand (QoS) session.
+
+        The NEF subscription is patched with the new overall duration, following
+        the CAMARA semantics of POST /sessions/{sessionId}/extend.
+
+        args:
+            session_id: The unique identifier of the QoS session.
+            requested_additional_duration: seconds to add to the current duration.
+
+        returns:
+            Dictionary containing the details of the extended QoS session.
+        """
+        if requested_additional_duration < 1:
+            raise NetworkPlatformError("requested_additional_duration must be at least 1 second")
+        response = common.as_session_with_qos_get(
+            self.base_url, self.scs_as_id, session_id=session_id
+        )
+        subscription_info = schemas.AsSessionWithQoSSubscription(**response)
+        current_duration = 0
+        if subscription_info.usageThreshold and subscription_info.usageThreshold.duration:
+            current_duration = subscription_info.usageThreshold.duration.root
+        patch = schemas.AsSessionWithQoSSubscriptionPatch(
+            usageThreshold=schemas.UsageThreshold(
+                duration=current_duration + requested_additional_duration
+            )
+        )
+        common.as_session_with_qos_patch(self.base_url, self.scs_as_id, session_id, patch)
+        stored = self._session_store_call("get", SessionKind.qod, session_id)
+        if stored is not None:
+            self._session_store_call(
+                "extend",
+                SessionKind.qod,
+                session_id,
+                requested_additional_duration,
+                dict(stored.payload, duration=current_duration + requested_additional_duration),
+            )
+        log.info(
+            f"QoD session extended [id={session_id}, "
+            f"duration={current_duration + requested_additional_duration}s]"
+        )
+        return self.get_qod_session(session_id)
+
     @requires_capability("qod")
     def delete_qod_session(self, session_id: str) -> None:
         """
@@ -379,20 +796,33 @@ class BaseNetworkClient:
             None
         """
         common.as_session_with_qos_delete(self.base_url, self.scs_as_id, session_id=session_id)
+        self._session_store_call("remove", SessionKind.qod, session_id)
         log.info(f"QoD session deleted successfully [id={session_id}]")
 
     @requires_capability("traffic_influence")
-    def create_traffic_influence_resource(self, traffic_influence_info: Dict) -> Dict:
+    def create_traffic_influence_resource(
+        self, traffic_influence_info: Dict, idempotency_key: str | None = None
+    ) -> Dict:
         """
         Creates a Traffic Influence resource based on CAMARA TI API input.
 
         args:
             traffic_influence_info: Dictionary containing traffic influence details conforming to
                                     the CAMARA TI resource creation parameters.
+            idempotency_key: calls repeating a successful call with the same
+                             key return its resource instead of creating another.
 
         returns:
             dictionary containing the created traffic influence resource details, including its ID.
         """
+        if idempotency_key is not None:
+            return idempotency.call(
+                self,
+                "create_traffic_influence_resource",
+                idempotency_key,
+                self.create_traffic_influence_resource,
+                idempotency.without(traffic_influence_info, "trafficInfluenceID"),
+            )
 
         subscription = self._build_ti_subscription(traffic_influence_info)
         response = common.traffic_influence_post(self.base_url, self.scs_as_id, subscription)
@@ -404,6 +834,8 @@ class BaseNetworkClient:
             subscription_id = None
 
         traffic_influence_info["trafficInfluenceID"] = subscription_id
+        if subscription_id is not None:
+            self._record_traffic_influence(subscription_id, traffic_influence_info, subscription)
         return traffic_influence_info
 
     @requires_capability("traffic_influence")
@@ -423,8 +855,25 @@ class BaseNetworkClient:
         common.traffic_influence_put(self.base_url, self.scs_as_id, resource_id, subscription)
 
         traffic_influence_info["trafficInfluenceID"] = resource_id
+        self._record_traffic_influence(resource_id, traffic_influence_info, subscription)
         return traffic_influence_info
 
+    def _record_traffic_influence(
+        self, resource_id: str, traffic_influence_info: Dict, subscription: schemas.TrafficInfluSub
+    ) -> None:
+        if self.session_store is None:
+            return
+        # Keyed by the NEF resource ID, as used by the delete calls
+        self._session_store_call(
+            "record",
+            SessionKind.traffic_influence,
+            resource_id_from_link(resource_id),
+            traffic_influence_info,
+            device=schemas.CreateTrafficInfluence.model_validate(traffic_influence_info).device,
+            profile=subscription.afAppId,
+            flows=_flow_descriptions(subscription.trafficFilters),
+        )
+
     @requires_capability("traffic_influence")
     def delete_traffic_influence_resource(self, resource_id: str) -> None:
         """
@@ -437,6 +886,9 @@ class BaseNetworkClient:
             None
         """
         common.traffic_influence_delete(self.base_url, self.scs_as_id, resource_id)
+        self._session_store_call(
+            "remove", SessionKind.traffic_influence, resource_id_from_link(resource_id)
+        )
         return
 
     @requires_capability("traffic_influence")
@@ -448,6 +900,10 @@ class BaseNetworkClient:
     @requires_capability("traffic_influence")
     def get_all_traffic_influence_resource(self) -> list[Dict]:
         r = common.traffic_influence_get(self.base_url, self.scs_as_id)
-        return [self._build_camara_ti(item) for item in r]
+        subscriptions = [schemas.TrafficInfluSub.model_validate(item) for item in r]
+        flow_rules = parse_flow_descriptions(
+            sub.trafficFilters[0].flowDescriptions[0] for sub in subscriptions
+        )
+        return [self._build_camara_ti(sub, rules) for sub, rules in zip(subscriptions, flow_rules)]
 
     # Placeholder for additional CAMARA APIs
@@ -4,11 +4,25 @@ import requests
 from pydantic import BaseModel
 
 from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.common import resilience
+from sunrise6g_opensdk.common.single_flight import single_flight
 
 log = logger.get_logger(__name__)
 
 
-def _make_request(method: str, url: str, data=None):
+def pooled_session(pool_size: int) -> requests.Session:
+    """
+    HTTP session keeping up to pool_size connections per host alive, to be
+    shared by threads issuing many requests to the same NEF.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _make_request(method: str, url: str, data=None, session: requests.Session | None = None):
     try:
         headers = None
         if method == "POST" or method == "PUT":
@@ -16,18 +30,28 @@ def _make_request(method: str, url: str, data=None):
                 "Content-Type": "application/json",
                 "accept": "application/json",
             }
+        elif method == "PATCH":
+            headers = {
+                "Content-Type": "application/merge-patch+json",
+                "accept": "application/json",
+            }
         elif method == "GET":
             headers = {
                 "accept": "application/json",
             }
-        response = requests.request(method, url, headers=headers, data=data)
+        # Retries idempotent verbs and fails fast while the NEF circuit is open
+        response = resilience.request(method, url, session=session, headers=headers, data=data)
         response.raise_for_status()
         if response.content:
             return response.json()
     except requests.exceptions.HTTPError as e:
         raise CoreHttpError(e) from e
+    except resilience.CircuitOpenError as e:
+        raise CoreHttpError(str(e)) from e
     except requests.exceptions.ConnectionError as e:
         raise CoreHttpError("connection error") from e
+    except requests.exceptions.Timeout as e:
+        raise CoreHttpError("timeout") from e
 
 
 class CapabilityNotSupported(Exception):
@@ -62,10 +86,15 @@ class CoreHttpError(Exception):
 
 
 # Monitoring Event Methods
-def monitoring_event_post(base_url: str, scs_as_id: str, model_payload: BaseModel) -> dict:
+def monitoring_event_post(
+    base_url: str,
+    scs_as_id: str,
+    model_payload: BaseModel,
+    session: requests.Session | None = None,
+) -> dict:
     data = model_payload.model_dump_json(exclude_none=True, by_alias=True)
     url = monitoring_event_build_url(base_url, scs_as_id)
-    return _make_request("POST", url, data=data)
+    return _make_request("POST", url, data=data, session=session)
 
 
 def monitoring_event_build_url(base_url: str, scs_as_id: str, session_id: str = None):
@@ -83,11 +112,26 @@ def as_session_with_qos_post(base_url: str, scs_as_id: str, model_payload: BaseM
     return _make_request("POST", url, data=data)
 
 
+@single_flight()
 def as_session_with_qos_get(base_url: str, scs_as_id: str, session_id: str) -> dict:
     url = as_session_with_qos_build_url(base_url, scs_as_id, session_id)
     return _make_request("GET", url)
 
 
+@single_flight()
+def as_session_with_qos_get_all(base_url: str, scs_as_id: str) -> list[dict]:
+    url = as_session_with_qos_build_url(base_url, scs_as_id)
+    return _make_request("GET", url)
+
+
+def as_session_with_qos_patch(
+    base_url: str, scs_as_id: str, session_id: str, model_payload: BaseModel
+) -> dict:
+    data = model_payload.model_dump_json(exclude_none=True, by_alias=True)
+    url = as_session_with_qos_build_url(base_url, scs_as_id, session_id)
+    return _make_request("PATCH", url, data=data)
+
+
 def as_session_with_qos_delete(base_url: str, scs_as_id: str, session_id: str):
     url = as_session_with_qos_build_url(base_url, scs_as_id, session_id)
     return _make_request("DELETE", url)
@@ -121,11 +165,13 @@ def traffic_influence_put(
     return _make_request("PUT", url, data=data)
 
 
+@single_flight()
 def traffic_influence_get(base_url: str, scs_as_id: str, sessionId: str = None) -> dict:
     url = traffic_influence_build_url(base_url, scs_as_id, sessionId)
     return _make_request("GET", url)
 
 
+@single_flight()
 def traffic_influence_get_all(base_url: str, scs_as_id: str, sessionId: str = None) -> list[dict]:
     url = traffic_influence_build_url(base_url, scs_as_id)
     return _make_request("GET", url)
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Geofencing on top of NEF location reports.
+
+GeofenceEngine keeps the registered fences (CAMARA circles or polygons) in a
+uniform latitude/longitude grid. Each location update only tests the fences
+registered in the grid cell of the device position, so the cost of an update
+does not grow with the number of fences. Fences covering more than
+``max_cells_per_fence`` cells are not put in the grid but kept in a short list
+tested on every update, and fences crossing the ±180° meridian are indexed on
+both sides of it. Comparing the fences that contain the
+device before and after the update produces ``enter`` and ``leave`` events::
+
+    engine = GeofenceEngine(network_client, on_event=print)
+    engine.add_fence("factory", {"areaType": "CIRCLE", "center": {...}, "radius": 300})
+    receiver.subscribe(subscription_id, engine.handle_notification)
+
+Reports are converted to CAMARA locations with
+``BaseNetworkClient.build_camara_locations``, as for monitoring event
+subscriptions. The device position is the centroid of the reported area.
+"""
+import math
+import threading
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Iterable, NamedTuple
+
+from pydantic import TypeAdapter
+
+from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.network.core import schemas
+from sunrise6g_opensdk.network.core.base_network_client import BaseNetworkClient
+from sunrise6g_opensdk.network.core.geometry import (
+    PolygonArray,
+    bounding_boxes_of,
+    centroid_of,
+    crosses_antimeridian,
+    haversine_distance,
+)
+from sunrise6g_opensdk.network.core.location_cache import device_keys
+from sunrise6g_opensdk.network.core.notification_receiver import Notification
+
+log = logger.get_logger(__name__)
+
+_AREA = TypeAdapter(schemas.Area)
+
+
+class GeofenceEventType(str, Enum):
+    enter = "enter"
+    leave = "leave"
+
+
+class GeofenceEvent(NamedTuple):
+    device: str
+    fence_id: str
+    event_type: GeofenceEventType
+    location_time: datetime | None
+
+
+def _matcher(area: schemas.Circle | schemas.Polygon) -> Callable[[float, float], bool]:
+    """Point-in-area test with the area data unpacked once."""
+    if isinstance(area, schemas.Circle):
+        lat0, lon0, radius = area.center.latitude, area.center.longitude, area.radius
+        return lambda lat, lon: haversine_distance(lat0, lon0, lat, lon) <= radius
+    points = [(point.latitude, point.longitude) for point in area.boundary.root]
+    if crosses_antimeridian([lon for _, lon in points]):
+        # Tested with the western longitudes moved past +180°
+        polygon = PolygonArray.from_points([[(lat, lon % 360) for lat, lon in points]])
+        return lambda lat, lon: polygon.contains(lat, lon % 360)[0]
+    polygon = PolygonArray.from_points([points])
+    return lambda lat, lon: polygon.contains(lat, lon)[0]
+
+
+def report_device_key(report: schemas.MonitoringEventReport) -> str | None:
+    """Device key of a NEF report, in the format of location_cache.device_keys."""
+    if report.msisdn:
+        return f"tel:+{report.msisdn.lstrip('+')}"
+    if report.externalId:
+        return f"nai:{report.externalId.lower()}"
+    return None
+
+
+class GeofenceEngine:
+    """
+    Grid-indexed set of geofences tracking which devices are inside them.
+
+    args:
+        client: network client whose location parsing is used for NEF reports.
+        on_event: called with every GeofenceEvent produced.
+        cell_size: grid cell size in degrees. Fences are registered in every
+                   cell their bounding box overlaps, so the cell should be of
+                   the order of the typical fence size.
+        max_cells_per_fence: fences overlapping more cells are tested on every
+                             update instead of being registered in the grid.
+    """
+
+    def __init__(
+        self,
+        client: BaseNetworkClient,
+        on_event: Callable[[GeofenceEvent], None] | None = None,
+        cell_size: float = 0.05,
+        max_cells_per_fence: int = 4096,
+    ):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be a positive number of degrees")
+        self.client = client
+        self.on_event = on_event
+        self.cell_size = cell_size
+        self.max_cells_per_fence = max_cells_per_fence
+        self._fences: dict[str, schemas.Circle | schemas.Polygon] = {}
+        # fence_id -> (bounding boxes, point-in-area test)
+        self._matchers: dict[str, tuple[list[tuple], Callable[[float, float], bool]]] = {}
+        self._fence_cells: dict[str, list[tuple[int, int]]] = {}
+        self._grid: dict[tuple[int, int], set[str]] = {}
+        # Fences too large for the grid
+        self._large: set[str] = set()
+        self._inside: dict[str, set[str]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._fences)
+
+    def add_fence(self, fence_id: str, area: schemas.Circle | schemas.Polygon | dict) -> None:
+        """Registers (or replaces) a fence given as a CAMARA Circle or Polygon."""
+        area = _AREA.validate_python(area)
+        boxes = bounding_boxes_of(area)
+        ranges = [
+            (
+                range(self._cell(min_lat), self._cell(max_lat) + 1),
+                range(self._cell(min_lon), self._cell(max_lon) + 1),
+            )
+            for min_lat, min_lon, max_lat, max_lon in boxes
+        ]
+        large = sum(len(xs) * len(ys) for xs, ys in ranges) > self.max_cells_per_fence
+        cells = [] if large else [(x, y) for xs, ys in ranges for x in xs for y in ys]
+        with self._lock:
+            self._unindex(fence_id)
+            self._fences[fence_id] = area
+            self._matchers[fence_id] = (boxes, _matcher(area))
+            if large:
+                self._large.add(fence_id)
+            self._fence_cells[fence_id] = cells
+            for cell in cells:
+                self._grid.setdefault(cell, set()).add(fence_id)
+
+    def remove_fence(self, fence_id: str) -> None:
+        """Unregisters a fence. Devices inside it do not get a leave event."""
+        with self._lock:
+            self._unindex(fence_id)
+            self._fences.pop(fence_id, None)
+            self._matchers.pop(fence_id, None)
+            for fences in self._inside.values():
+                fences.discard(fence_id)
+
+    def fences_containing(self, lat: float, lon: float) -> set[str]:
+        with self._lock:
+            inside = set()
+            candidates = self._grid.get((self._cell(lat), self._cell(lon)), set())
+            for fence_id in (candidates | self._large) if self._large else candidates:
+                boxes, contains = self._matchers[fence_id]
+                in_box = any(
+                    min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+                    for min_lat, min_lon, max_lat, max_lon in boxes
+                )
+                if in_box and contains(lat, lon):
+                    inside.add(fence_id)
+            return inside
+
+    def devices_in(self, fence_id: str) -> list[str]:
+        with self._lock:
+            return [device for device, fences in self._inside.items() if fence_id in fences]
+
+    def update(self, device: str, location: schemas.Location) -> list[GeofenceEvent]:
+        """
+        Processes a new location of a device.
+
+        args:
+            device: device key (e.g. "tel:+34600000000").
+            location: CAMARA location of the device.
+
+        returns:
+            enter and leave events caused by the update.
+        """
+        lat, lon = centroid_of(location.area)
+        with self._lock:
+            inside = self.fences_containing(lat, lon)
+            previous = self._inside.get(device, set())
+            if inside:
+                self._inside[device] = inside
+            else:
+                self._inside.pop(device, None)
+        location_time = location.lastLocationTime.root
+        events = [
+            GeofenceEvent(device, fence_id, GeofenceEventType.leave, location_time)
+            for fence_id in previous - inside
+        ] + [
+            GeofenceEvent(device, fence_id, GeofenceEventType.enter, location_time)
+            for fence_id in inside - previous
+        ]
+        if self.on_event is not None:
+            for event in events:
+                try:
+                    self.on_event(event)
+                except Exception as e:
+                    log.error(f"Geofence event callback failed for {event}: {e}")
+        return events
+
+    def update_device(
+        self, device: schemas.Device, location: schemas.Location
+    ) -> list[GeofenceEvent]:
+        """Processes a location for a CAMARA Device, keyed by its first identifier."""
+        keys = device_keys(device)
+        if not keys:
+            raise ValueError("Device has no identifier")
+        return self.update(keys[0], location)
+
+    def consume_locations(
+        self, results: Iterable[tuple[schemas.Device | None, schemas.Location | Exception]]
+    ) -> list[GeofenceEvent]:
+        """Processes the output of BaseNetworkClient.retrieve_locations."""
+        events = []
+        for device, location in results:
+            if device is not None and isinstance(location, schemas.Location):
+                events.extend(self.update_device(device, location))
+        return events
+
+    def consume_reports(
+        self, reports: Iterable[schemas.MonitoringEventReport]
+    ) -> list[GeofenceEvent]:
+        """Processes NEF monitoring event reports identifying the device by MSISDN or NAI."""
+        reports = [report for report in reports if report_device_key(report) is not None]
+        events = []
+        locations = self.client.build_camara_locations(reports)
+        for report, location in zip(reports, locations):
+            if isinstance(location, Exception):
+                log.warning(f"Skipped location report without usable location: {location}")
+                continue
+            events.extend(self.update(report_device_key(report), location))
+        return events
+
+    def consume_notification(
+        self, notification: schemas.MonitoringNotification
+    ) -> list[GeofenceEvent]:
+        return self.consume_reports(notification.monitoringEventReports or [])
+
+    def handle_notification(self, notification: Notification) -> None:
+        """Callback for NotificationReceiver.subscribe."""
+        if isinstance(notification.payload, schemas.MonitoringNotification):
+            self.consume_notification(notification.payload)
+
+    def _cell(self, degrees: float) -> int:
+        return math.floor(degrees / self.cell_size)
+
+    def _unindex(self, fence_id: str) -> None:
+        self._large.discard(fence_id)
+        for cell in self._fence_cells.pop(fence_id, ()):
+            fences = self._grid.get(cell)
+            if fences is not None:
+                fences.discard(fence_id)
+                if not fences:
+                    del self._grid[cell]
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Geometry helpers for NEF and CAMARA location areas.
+
+PolygonArray stores many polygons in flat ``array('d')`` coordinate buffers
+(one latitude and one longitude buffer plus vertex offsets), so that location
+answers for a whole fleet of devices are kept compactly and converted to CAMARA
+models with one pydantic validation call::
+
+    polygons = PolygonArray.from_nef([report.locationInfo.geographicArea.polygon ...])
+    areas = polygons.areas()
+    circles = polygons.to_circles()
+
+Distances and areas are computed on a local equirectangular projection around
+each polygon, which is accurate for the cell-sized areas reported by the NEF.
+Coordinates are expressed as (latitude, longitude) pairs in degrees; areas are
+in square meters and distances in meters.
+
+The measurements are plain Python loops over the vertices, not vectorised
+arithmetic: the SDK does not depend on NumPy, and cell-sized polygons only have
+a handful of vertices.
+"""
+import math
+from array import array
+from typing import Iterable, Sequence
+
+from pydantic import TypeAdapter
+
+from sunrise6g_opensdk.network.core import schemas
+
+EARTH_RADIUS_M = 6_371_008.8
+
+LatLon = tuple[float, float]
+BoundingBox = tuple[float, float, float, float]
+
+_POLYGON_LIST = TypeAdapter(list[schemas.Polygon])
+_CIRCLE_LIST = TypeAdapter(list[schemas.Circle])
+
+
+def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points, in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class PolygonArray:
+    """
+    Immutable batch of polygons backed by flat coordinate arrays.
+
+    args:
+        lats: latitude of every vertex, polygon after polygon.
+        lons: longitude of every vertex, aligned with lats.
+        offsets: index of the first vertex of each polygon, plus the total
+                 number of vertices as last element.
+    """
+
+    __slots__ = ("lats", "lons", "offsets")
+
+    def __init__(self, lats: array, lons: array, offsets: array):
+        if len(lats) != len(lons) or not offsets or offsets[-1] != len(lats):
+            raise ValueError("Inconsistent polygon coordinate buffers")
+        self.lats = lats
+        self.lons = lons
+        self.offsets = offsets
+
+    @classmethod
+    def from_points(cls, polygons: Iterable[Sequence[LatLon]]) -> "PolygonArray":
+        """Builds the array from sequences of (latitude, longitude) vertices."""
+        lats, lons, offsets = array("d"), array("d"), array("q", [0])
+        for vertices in polygons:
+            for lat, lon in vertices:
+                lats.append(lat)
+                lons.append(lon)
+            offsets.append(len(lats))
+        return cls(lats, lons, offsets)
+
+    @classmethod
+    def from_nef(cls, polygons: Iterable[schemas.NefPolygon]) -> "PolygonArray":
+        return cls.from_points(
+            [(point.lat, point.lon) for point in polygon.point_list.geographical_coords]
+            for polygon in polygons
+        )
+
+    @classmethod
+    def from_camara(cls, polygons: Iterable[schemas.Polygon]) -> "PolygonArray":
+        return cls.from_points(
+            [(point.latitude, point.longitude) for point in polygon.boundary.root]
+            for polygon in polygons
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> list[LatLon]:
+        start, end = self._bounds(index)
+        return list(zip(self.lats[start:end], self.lons[start:end]))
+
+    def to_camara(self) -> list[schemas.Polygon]:
+        """Converts every polygon into a CAMARA Polygon, validating the batch at once."""
+        return _POLYGON_LIST.validate_python(
+            [
+                {
+                    "areaType": schemas.AreaType.polygon,
+                    "boundary": [{"latitude": lat, "longitude": lon} for lat, lon in self[index]],
+                }
+                for index in range(len(self))
+            ]
+        )
+
+    def bounding_boxes(self) -> list[BoundingBox]:
+        """(min_lat, min_lon, max_lat, max_lon) of every polygon."""
+        boxes = []
+        for index in range(len(self)):
+            start, end = self._bounds(index)
+            lats, lons = self.lats[start:end], self.lons[start:end]
+            boxes.append((min(lats), min(lons), max(lats), max(lons)))
+        return boxes
+
+    def areas(self) -> list[float]:
+        """Surface of every polygon, in square meters."""
+        return [abs(self._area_and_centroid(index)[0]) for index in range(len(self))]
+
+    def centroids(self) -> list[LatLon]:
+        """Area-weighted centroid of every polygon."""
+        return [self._area_and_centroid(index)[1] for index in range(len(self))]
+
+    def contains(self, lat: float, lon: float) -> list[bool]:
+        """Whether the point lies inside each polygon (even-odd rule)."""
+        return [self._contains(index, lat, lon) for index in range(len(self))]
+
+    def contains_each(self, points: Sequence[LatLon]) -> list[bool]:
+        """Whether the i-th point lies inside the i-th polygon."""
+        if len(points) != len(self):
+            raise ValueError("Expected one point per polygon")
+        return [self._contains(index, lat, lon) for index, (lat, lon) in enumerate(points)]
+
+    def to_circles(self) -> list[schemas.Circle]:
+        """
+        Approximates every polygon with the CAMARA Circle centred on its
+        centroid that encloses all its vertices.
+        """
+        circles = []
+        for index in range(len(self)):
+            _, (center_lat, center_lon) = self._area_and_centroid(index)
+            start, end = self._bounds(index)
+            radius = max(
+                haversine_distance(center_lat, center_lon, self.lats[i], self.lons[i])
+                for i in range(start, end)
+            )
+            circles.append(
+                {
+                    "areaType": schemas.AreaType.circle,
+                    "center": {"latitude": center_lat, "longitude": center_lon},
+                    "radius": max(1.0, radius),
+                }
+            )
+        return _CIRCLE_LIST.validate_python(circles)
+
+    def _bounds(self, index: int) -> tuple[int, int]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("polygon index out of range")
+        return self.offsets[index], self.offsets[index + 1]
+
+    def _area_and_centroid(self, index: int) -> tuple[float, LatLon]:
+        start, end = self._bounds(index)
+        count = end - start
+        lat0, lon0 = self.lats[start], self.lons[start]
+        scale_x = EARTH_RADIUS_M * math.radians(1) * math.cos(math.radians(lat0))
+        scale_y = EARTH_RADIUS_M * math.radians(1)
+        xs = [(self.lons[i] - lon0) * scale_x for i in range(start, end)]
+        ys = [(self.lats[i] - lat0) * scale_y for i in range(start, end)]
+        twice_area = cx = cy = 0.0
+        for i in range(count):
+            j = (i + 1) % count
+            cross = xs[i] * ys[j] - xs[j] * ys[i]
+            twice_area += cross
+            cx += (xs[i] + xs[j]) * cross
+            cy += (ys[i] + ys[j]) * cross
+        if twice_area == 0 or scale_x == 0:
+            # Degenerate polygon: fall back to the vertex mean
+            mean_lat = sum(self.lats[start:end]) / count
+            return 0.0, (mean_lat, sum(self.lons[start:end]) / count)
+        cx /= 3 * twice_area
+        cy /= 3 * twice_area
+        return twice_area / 2, (lat0 + cy / scale_y, lon0 + cx / scale_x)
+
+    def _contains(self, index: int, lat: float, lon: float) -> bool:
+        start, end = self._bounds(index)
+        inside = False
+        j = end - 1
+        for i in range(start, end):
+            lat_i, lon_i = self.lats[i], self.lons[i]
+            lat_j, lon_j = self.lats[j], self.lons[j]
+            if (lat_i > lat) != (lat_j > lat):
+                crossing = lon_i + (lat - lat_i) * (lon_j - lon_i) / (lat_j - lat_i)
+                if lon < crossing:
+                    inside = not inside
+            j = i
+        return inside
+
+
+def area_of(area: schemas.Circle | schemas.Polygon) -> float:
+    """Surface of a CAMARA area, in square meters."""
+    if isinstance(area, schemas.Circle):
+        return math.pi * area.radius**2
+    return PolygonArray.from_camara([area]).areas()[0]
+
+
+def centroid_of(area: schemas.Circle | schemas.Polygon) -> LatLon:
+    if isinstance(area, schemas.Circle):
+        return area.center.latitude, area.center.longitude
+    return PolygonArray.from_camara([area]).centroids()[0]
+
+
+def bounding_box_of(area: schemas.Circle | schemas.Polygon) -> BoundingBox:
+    if isinstance(area, schemas.Circle):
+        lat, lon = area.center.latitude, area.center.longitude
+        d_lat = math.degrees(area.radius / EARTH_RADIUS_M)
+        cos_lat = math.cos(math.radians(lat))
+        d_lon = 180.0 if cos_lat < 1e-12 else min(180.0, d_lat / cos_lat)
+        return lat - d_lat, lon - d_lon, lat + d_lat, lon + d_lon
+    return PolygonArray.from_camara([area]).bounding_boxes()[0]
+
+
+def crosses_antimeridian(lons: Sequence[float]) -> bool:
+    """
+    Whether a polygon with these vertex longitudes crosses the ±180° meridian,
+    i.e. one of its edges (including the closing one) spans over 180 degrees.
+    """
+    return any(abs(lons[i] - lons[i - 1]) > 180 for i in range(len(lons)))
+
+
+def bounding_boxes_of(area: schemas.Circle | schemas.Polygon) -> list[BoundingBox]:
+    """
+    Bounding boxes of a CAMARA area, split in two where it crosses the ±180°
+    meridian, so that every box has min_lon <= max_lon within [-180, 180].
+    """
+    if isinstance(area, schemas.Circle):
+        min_lat, min_lon, max_lat, max_lon = bounding_box_of(area)
+        min_lat, max_lat = max(-90.0, min_lat), min(90.0, max_lat)
+        if max_lon - min_lon >= 360:
+            return [(min_lat, -180.0, max_lat, 180.0)]
+    else:
+        lats = [point.latitude for point in area.boundary.root]
+        lons = [point.longitude for point in area.boundary.root]
+        if crosses_antimeridian(lons):
+            lons = [lon + 360 if lon < 0 else lon for lon in lons]
+        min_lat, min_lon, max_lat, max_lon = min(lats), min(lons), max(lats), max(lons)
+    if min_lon < -180:
+        return [(min_lat, min_lon + 360, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+    if max_lon > 180:
+        return [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon - 360)]
+    return [(min_lat, min_lon, max_lat, max_lon)]
+
+
+def area_contains(area: schemas.Circle | schemas.Polygon, lat: float, lon: float) -> bool:
+    """Whether a CAMARA area contains the point."""
+    if isinstance(area, schemas.Circle):
+        center = area.center
+        return haversine_distance(center.latitude, center.longitude, lat, lon) <= area.radius
+    return PolygonArray.from_camara([area]).contains(lat, lon)[0]
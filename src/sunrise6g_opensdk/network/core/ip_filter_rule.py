@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Parser and encoder for IPFilterRule flow descriptions (RFC 6733, section 4.3).
+
+NEF flow descriptions (``flowInfo.flowDescriptions`` in AsSessionWithQoS and
+``trafficFilters`` in TrafficInfluence) are IPFilterRule strings such as::
+
+    permit out ip from 10.45.0.10/32 to 10.45.0.1/32
+    permit in 17 from 10.45.0.10 1000-1002 to 2001:db8::/64 80,443
+
+The functions below turn those strings into typed, immutable rule objects and
+back. Parsing is cached, so re-reading the same subscription (or listing many
+subscriptions sharing the same filters) only pays the parsing cost once.
+"""
+import ipaddress
+import re
+from enum import Enum
+from functools import lru_cache
+from typing import Iterable, Literal
+
+from pydantic import BaseModel, ConfigDict
+
+PortRange = tuple[int, int]
+
+_PORTS_RE = re.compile(r"^\d{1,5}(?:-\d{1,5})?(?:,\d{1,5}(?:-\d{1,5})?)*$")
+# Several rules may be joined in a single flow description, e.g. the output of
+# build_flows: "permit in ip from ... to ..., permit out ip from ... to ...".
+# Port lists use commas without spaces, so only split before a new action keyword.
+_RULE_SEPARATOR_RE = re.compile(r"\s*,\s*(?=(?:permit|deny)\s)")
+_KEYWORD_ADDRESSES = ("any", "assigned")
+
+
+class IPFilterRuleError(ValueError):
+    """Raised when a flow description is not a valid IPFilterRule."""
+
+    pass
+
+
+class FilterAction(str, Enum):
+    permit = "permit"
+    deny = "deny"
+
+
+class FilterDirection(str, Enum):
+    inbound = "in"
+    outbound = "out"
+
+
+class FilterEndpoint(BaseModel):
+    """Source or destination of an IPFilterRule: address, optional mask and ports."""
+
+    model_config = ConfigDict(frozen=True)
+
+    address: str
+    prefix_length: int | None = None
+    negated: bool = False
+    ports: tuple[PortRange, ...] = ()
+
+    @classmethod
+    def from_address(cls, address: str, ports: Iterable[PortRange] = ()) -> "FilterEndpoint":
+        """
+        Builds an endpoint from an address that may carry a mask ("10.0.0.0/24"),
+        or from the "any"/"assigned" keywords.
+        """
+        address = str(address).strip()
+        prefix_length = None
+        if address not in _KEYWORD_ADDRESSES:
+            try:
+                if "/" in address:
+                    address, mask = address.split("/", 1)
+                    prefix_length = int(mask)
+                ip = ipaddress.ip_address(address)
+            except ValueError as e:
+                raise IPFilterRuleError(f"Invalid IPFilterRule address '{address}'") from e
+            if prefix_length is not None and not 0 <= prefix_length <= ip.max_prefixlen:
+                raise IPFilterRuleError(f"Invalid mask /{prefix_length} for address {address}")
+            address = str(ip)
+        return cls(address=address, prefix_length=prefix_length, ports=tuple(ports))
+
+    @property
+    def is_keyword(self) -> bool:
+        return self.address in _KEYWORD_ADDRESSES
+
+    @property
+    def network(self) -> ipaddress.IPv4Network | ipaddress.IPv6Network | None:
+        """Network matched by this endpoint, or None for the "any"/"assigned" keywords."""
+        if self.is_keyword:
+            return None
+        if self.prefix_length is None:
+            return ipaddress.ip_network(self.address)
+        return ipaddress.ip_network(f"{self.address}/{self.prefix_length}", strict=False)
+
+    @property
+    def version(self) -> int | None:
+        network = self.network
+        return network.version if network is not None else None
+
+    @property
+    def address_spec(self) -> str:
+        """
+        Address in CAMARA form: a bare IP for single hosts (/32 or /128 masks are
+        dropped) and "address/mask" for wider networks.
+        """
+        network = self.network
+        if network is None or network.num_addresses == 1:
+            return self.address
+        return network.with_prefixlen
+
+    def encode(self) -> str:
+        text = self.address
+        if self.prefix_length is not None:
+            text = f"{text}/{self.prefix_length}"
+        if self.negated:
+            text = f"!{text}"
+        if self.ports:
+            text = f"{text} {encode_ports(self.ports)}"
+        return text
+
+
+class IPFilterRule(BaseModel):
+    """Typed representation of a single IPFilterRule."""
+
+    model_config = ConfigDict(frozen=True)
+
+    action: FilterAction = FilterAction.permit
+    direction: FilterDirection
+    proto: Literal["ip"] | int = "ip"
+    src: FilterEndpoint
+    dst: FilterEndpoint
+    options: str | None = None
+
+    def encode(self) -> str:
+        text = (
+            f"{self.action.value} {self.direction.value} {self.proto} "
+            f"from {self.src.encode()} to {self.dst.encode()}"
+        )
+        if self.options:
+            text = f"{text} {self.options}"
+        return text
+
+
+def encode_ports(ports: Iterable[PortRange]) -> str:
+    return ",".join(str(start) if start == end else f"{start}-{end}" for start, end in ports)
+
+
+def _parse_ports(text: str) -> tuple[PortRange, ...]:
+    ports = []
+    for item in text.split(","):
+        start, _, end = item.partition("-")
+        start = int(start)
+        end = int(end) if end else start
+        if not 0 <= start <= end <= 65535:
+            raise IPFilterRuleError(f"Invalid port specification '{item}'")
+        ports.append((start, end))
+    return tuple(ports)
+
+
+def _parse_endpoint(tokens: list[str], pos: int, rule: str) -> tuple[FilterEndpoint, int]:
+    if pos >= len(tokens):
+        raise IPFilterRuleError(f"Missing address in IPFilterRule '{rule}'")
+    address = tokens[pos]
+    negated = address.startswith("!")
+    if negated:
+        address = address[1:]
+    pos += 1
+    ports = ()
+    if pos < len(tokens) and _PORTS_RE.match(tokens[pos]):
+        ports = _parse_ports(tokens[pos])
+        pos += 1
+    endpoint = FilterEndpoint.from_address(address, ports)
+    if negated:
+        endpoint = endpoint.model_copy(update={"negated": True})
+    return endpoint, pos
+
+
+@lru_cache(maxsize=4096)
+def parse_ip_filter_rule(rule: str) -> IPFilterRule:
+    """
+    Parses a single IPFilterRule string.
+
+    args:
+        rule: text such as "permit out ip from 10.45.0.10/32 to 10.45.0.1/32".
+
+    returns:
+        the parsed (immutable, cached) IPFilterRule.
+
+    raises:
+        IPFilterRuleError: if the text is not a valid IPFilterRule.
+    """
+    tokens = rule.split()
+    if len(tokens) < 7:
+        raise IPFilterRuleError(f"Incomplete IPFilterRule '{rule}'")
+    try:
+        action = FilterAction(tokens[0])
+        direction = FilterDirection(tokens[1])
+    except ValueError as e:
+        raise IPFilterRuleError(f"Invalid action or direction in IPFilterRule '{rule}'") from e
+    proto = tokens[2]
+    if proto != "ip":
+        if not proto.isdigit() or int(proto) > 255:
+            raise IPFilterRuleError(f"Invalid protocol '{proto}' in IPFilterRule '{rule}'")
+        proto = int(proto)
+    if tokens[3] != "from":
+        raise IPFilterRuleError(f"Expected 'from' in IPFilterRule '{rule}'")
+    src, pos = _parse_endpoint(tokens, 4, rule)
+    if pos >= len(tokens) or tokens[pos] != "to":
+        raise IPFilterRuleError(f"Expected 'to' in IPFilterRule '{rule}'")
+    dst, pos = _parse_endpoint(tokens, pos + 1, rule)
+    options = " ".join(tokens[pos:]) or None
+    return IPFilterRule(
+        action=action, direction=direction, proto=proto, src=src, dst=dst, options=options
+    )
+
+
+@lru_cache(maxsize=1024)
+def parse_flow_description(flow_description: str) -> tuple[IPFilterRule, ...]:
+    """
+    Parses a flow description that may hold several comma-joined IPFilterRules.
+
+    returns:
+        tuple with the parsed rules, in the order they appear.
+    """
+    rules = [part for part in _RULE_SEPARATOR_RE.split(flow_description.strip()) if part]
+    if not rules:
+        raise IPFilterRuleError("Empty flow description")
+    return tuple(parse_ip_filter_rule(rule) for rule in rules)
+
+
+def parse_flow_descriptions(
+    flow_descriptions: Iterable[str],
+) -> list[tuple[IPFilterRule, ...]]:
+    """
+    Batch variant of parse_flow_description for listing paths.
+
+    Identical descriptions are parsed once and the result is shared.
+
+    returns:
+        list aligned with the input, one tuple of rules per description.
+    """
+    parsed: dict[str, tuple[IPFilterRule, ...]] = {}
+    result = []
+    for flow_description in flow_descriptions:
+        rules = parsed.get(flow_description)
+        if rules is None:
+            rules = parse_flow_description(flow_description)
+            parsed[flow_description] = rules
+        result.append(rules)
+    return result
+
+
+def encode_flow_description(rules: Iterable[IPFilterRule]) -> str:
+    """Joins several rules into a single flow description, as expected by the NEFs."""
+    return ", ".join(rule.encode() for rule in rules)
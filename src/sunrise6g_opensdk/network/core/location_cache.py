@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Per-device cache of CAMARA locations.
+
+CAMARA RetrievalLocationRequest carries ``maxAge``, the oldest location the
+caller accepts. LocationCache keeps the last Location obtained for each device
+so that requests whose ``maxAge`` is satisfied by that Location's
+``lastLocationTime`` are answered without a new NEF monitoring event. Following
+the CAMARA Location Retrieval API, a missing ``maxAge`` accepts any age and
+``maxAge=0`` always asks the network for a fresh location.
+
+Concurrent requests for the same device share a single NEF call, and the number
+of cached device identifiers is bounded with LRU eviction.
+"""
+import ipaddress
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable
+
+from sunrise6g_opensdk.network.core import schemas
+
+
+def device_keys(device: schemas.Device | None) -> list[str]:
+    """
+    Cache keys identifying a device: one per identifier present (phone number,
+    network access identifier, IPv4 public/private address and port, IPv6 /64).
+    """
+    if device is None:
+        return []
+    keys = []
+    if device.phoneNumber is not None:
+        keys.append(f"tel:{device.phoneNumber.root}")
+    if device.networkAccessIdentifier is not None:
+        keys.append(f"nai:{device.networkAccessIdentifier.root.lower()}")
+    if device.ipv4Address is not None:
+        ipv4 = device.ipv4Address.root
+        private = ipv4.privateAddress.root if ipv4.privateAddress else ""
+        port = ipv4.publicPort.root if ipv4.publicPort else ""
+        keys.append(f"ipv4:{ipv4.publicAddress.root}/{private}:{port}")
+    if device.ipv6Address is not None:
+        # Any address of the subnet allocated to the device identifies it
+        network = ipaddress.ip_network(f"{device.ipv6Address.root}/64", strict=False)
+        keys.append(f"ipv6:{network}")
+    return keys
+
+
+def _location_time(location: schemas.Location) -> datetime:
+    last_location_time = location.lastLocationTime.root
+    if last_location_time.tzinfo is None:
+        return last_location_time.replace(tzinfo=timezone.utc)
+    return last_location_time
+
+
+class _Flight:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: schemas.Location | None = None
+        self.error: BaseException | None = None
+
+
+class LocationCache:
+    """
+    Thread-safe LRU cache of device locations.
+
+    args:
+        max_entries: maximum number of device identifiers kept in the cache.
+        clock: returns the current time as an aware datetime (UTC by default).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: OrderedDict[str, schemas.Location] = OrderedDict()
+        self._inflight: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, device: schemas.Device | None, max_age: int | None = None
+    ) -> schemas.Location | None:
+        """
+        Cached location of a device, if it is not older than max_age seconds.
+        """
+        with self._lock:
+            return self._lookup(device_keys(device), max_age)
+
+    def put(self, device: schemas.Device | None, location: schemas.Location) -> None:
+        with self._lock:
+            self._store(device_keys(device), location)
+
+    def invalidate(self, device: schemas.Device | None) -> None:
+        with self._lock:
+            for key in device_keys(device):
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_fetch(
+        self,
+        retrieve_location_request: schemas.RetrievalLocationRequest,
+        fetch: Callable[[schemas.RetrievalLocationRequest], schemas.Location],
+    ) -> schemas.Location:
+        """
+        Returns a cached location satisfying the request maxAge or fetches one.
+
+        If a fetch for the same device is already running, the caller waits
+        for it instead of issuing another one.
+
+        args:
+            retrieve_location_request: CAMARA location retrieval request.
+            fetch: callable performing the actual retrieval (NEF call).
+
+        returns:
+            the CAMARA Location of the device.
+        """
+        keys = device_keys(retrieve_location_request.device)
+        if not keys:
+            return fetch(retrieve_location_request)
+
+        with self._lock:
+            location = self._lookup(keys, retrieve_location_request.maxAge)
+            if location is not None:
+                self.hits += 1
+                return location
+            flight = next((self._inflight[k] for k in keys if k in self._inflight), None)
+            owner = flight is None
+            if owner:
+                self.misses += 1
+                flight = _Flight()
+                for key in keys:
+                    self._inflight[key] = flight
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fetch(retrieve_location_request)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if flight.result is not None:
+                    self._store(keys, flight.result)
+                for key in keys:
+                    if self._inflight.get(key) is flight:
+                        del self._inflight[key]
+            flight.event.set()
+
+    def _lookup(self, keys: list[str], max_age: int | None) -> schemas.Location | None:
+        for key in keys:
+            location = self._entries.get(key)
+            if location is None:
+                continue
+            self._entries.move_to_end(key)
+            if max_age is None:
+                return location
+            age = (self.clock() - _location_time(location)).total_seconds()
+            if age <= max_age:
+                return location
+        return None
+
+    def _store(self, keys: list[str], location: schemas.Location) -> None:
+        for key in keys:
+            current = self._entries.get(key)
+            if current is None or _location_time(current) <= _location_time(location):
+                self._entries[key] = location
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
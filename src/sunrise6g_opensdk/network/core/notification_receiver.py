@@ -0,0 +1,526 @@
+# -*- coding: utf-8 -*-
+"""
+Embeddable receiver for NEF notifications.
+
+The NEF reports QoS events, traffic influence UP path changes and monitoring
+events (e.g. location reports) by POSTing to the ``notificationDestination`` of
+each subscription. NotificationReceiver is a small asyncio HTTP/1.1 server that
+accepts those callbacks, validates them into the models of
+``network/core/schemas.py`` and hands them over to the consumer, keyed by
+subscription ID::
+
+    receiver = NotificationReceiver(port=8001, public_url="http://10.0.0.5:8001")
+    receiver.start_in_thread()
+    network_client.attach_notification_receiver(receiver)
+
+    async def on_location(notification: Notification):
+        ...
+
+    receiver.subscribe(subscription_id, on_location)
+
+Each subscriber owns a bounded queue. When a queue is full the request is held
+for up to ``put_timeout`` seconds and then rejected with 503 and Retry-After, so
+a slow consumer pushes back on the NEF instead of growing memory unboundedly.
+
+The subscriptions are owned by the event loop of the receiver: subscribing or
+unsubscribing from another thread runs the change on that loop and waits for
+it. Request bodies are read with Content-Length or chunked Transfer-Encoding.
+"""
+import asyncio
+import concurrent.futures
+import inspect
+import json
+import threading
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from pydantic import BaseModel, ValidationError
+
+from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.network.core import schemas
+
+log = logger.get_logger(__name__)
+
+_BASE_PATH = "/notifications"
+_REASONS = {
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+
+class NotificationKind(str, Enum):
+    qos = "qos"
+    traffic_influence = "traffic-influence"
+    monitoring = "monitoring"
+
+
+_MODELS: dict[NotificationKind, type[BaseModel]] = {
+    NotificationKind.qos: schemas.UserPlaneNotificationData,
+    NotificationKind.traffic_influence: schemas.TrafficInfluenceNotification,
+    NotificationKind.monitoring: schemas.MonitoringNotification,
+}
+
+
+class Notification(NamedTuple):
+    kind: NotificationKind
+    subscription_id: str | None
+    payload: BaseModel
+
+
+NotificationCallback = Callable[[Notification], Awaitable[None] | None]
+NotificationObserver = Callable[[Notification], None]
+
+
+def _notification_key(kind: NotificationKind, payload: BaseModel, path_key: str | None):
+    """
+    Subscription ID a notification belongs to: the last segment of the
+    subscription link for QoS and monitoring events, the AF transaction ID for
+    traffic influence, or a key appended to the notification URL.
+    """
+    if path_key:
+        return path_key
+    link = None
+    if kind is NotificationKind.qos:
+        link = payload.transaction.root
+    elif kind is NotificationKind.monitoring:
+        link = str(payload.subscription)
+    elif kind is NotificationKind.traffic_influence:
+        return payload.afTransId
+    return link.rstrip("/").rsplit("/", 1)[-1] if link else None
+
+
+class _Subscriber:
+    __slots__ = ("queue", "callback", "worker")
+
+    def __init__(self, queue_size: int, callback: NotificationCallback | None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.callback = callback
+        self.worker: asyncio.Task | None = None
+
+
+class NotificationReceiver:
+    """
+    asyncio HTTP server receiving NEF notifications.
+
+    args:
+        host: interface to listen on.
+        port: TCP port to listen on (0 picks a free port).
+        public_url: base URL announced to the NEF, if it differs from
+                    http://host:port (e.g. behind NAT or a reverse proxy).
+        queue_size: default capacity of each subscriber queue.
+        put_timeout: seconds a request waits for room in a full queue before
+                     being rejected with 503.
+        max_body_size: largest accepted request body, in bytes.
+        max_pending: number of unknown subscription IDs whose notifications are
+                     kept until someone subscribes to them. This covers
+                     notifications arriving before the creation call returns.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8001,
+        public_url: str | None = None,
+        queue_size: int = 100,
+        put_timeout: float = 5.0,
+        max_body_size: int = 1 << 20,
+        max_pending: int = 1024,
+    ):
+        self.host = host
+        self.port = port
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.queue_size = queue_size
+        self.put_timeout = put_timeout
+        self.max_body_size = max_body_size
+        self.max_pending = max_pending
+        self._subscribers: dict[str, _Subscriber] = {}
+        self._default: _Subscriber | None = None
+        self._pending: OrderedDict[str, list[Notification]] = OrderedDict()
+        # Replaced, never mutated, so the loop thread can iterate it safely
+        self._observers: tuple[tuple[NotificationKind | None, NotificationObserver], ...] = ()
+        self._observers_lock = threading.Lock()
+        self._server: asyncio.AbstractServer | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        if self.public_url:
+            return self.public_url
+        return f"http://{self.host}:{self.port}"
+
+    def url_for(self, kind: NotificationKind | str, key: str | None = None) -> str:
+        """
+        Notification URL to announce to the NEF for a kind of subscription.
+
+        args:
+            kind: NotificationKind (or its value).
+            key: optional dispatch key appended to the URL; notifications
+                 received on it are delivered to the subscriber of that key.
+        """
+        url = f"{self.base_url}{_BASE_PATH}/{NotificationKind(kind).value}"
+        return f"{url}/{key}" if key else url
+
+    def subscribe(
+        self,
+        subscription_id: str,
+        callback: NotificationCallback | None = None,
+        queue_size: int | None = None,
+    ) -> asyncio.Queue:
+        """
+        Registers interest in the notifications of a subscription.
+
+        args:
+            subscription_id: NEF subscription ID (or key passed to url_for).
+            callback: sync or async callable awaited for each notification, in
+                      order. Without callback, consume the returned queue.
+            queue_size: capacity of the subscriber queue.
+
+        returns:
+            the asyncio.Queue notifications are delivered to.
+        """
+        return self._on_loop(self._subscribe, str(subscription_id), callback, queue_size)
+
+    def _subscribe(
+        self, subscription_id: str, callback: NotificationCallback | None, queue_size: int | None
+    ) -> asyncio.Queue:
+        subscriber = _Subscriber(queue_size or self.queue_size, callback)
+        previous = self._subscribers.pop(subscription_id, None)
+        if previous is not None:
+            self._stop_worker(previous)
+        self._subscribers[subscription_id] = subscriber
+        for notification in self._pending.pop(subscription_id, []):
+            if subscriber.queue.full():
+                break
+            subscriber.queue.put_nowait(notification)
+        self._start_worker(subscriber)
+        return subscriber.queue
+
+    def set_default_handler(
+        self, callback: NotificationCallback | None = None, queue_size: int | None = None
+    ) -> asyncio.Queue:
+        """Registers a subscriber for notifications nobody subscribed to."""
+        return self._on_loop(self._set_default_handler, callback, queue_size)
+
+    def _set_default_handler(
+        self, callback: NotificationCallback | None, queue_size: int | None
+    ) -> asyncio.Queue:
+        if self._default is not None:
+            self._stop_worker(self._default)
+        self._default = _Subscriber(queue_size or self.queue_size, callback)
+        self._start_worker(self._default)
+        return self._default.queue
+
+    def add_observer(
+        self, observer: NotificationObserver, kind: NotificationKind | str | None = None
+    ) -> None:
+        """
+        Registers a synchronous callable seeing every valid notification (of a
+        kind, or of all kinds) besides its subscriber, e.g. to keep a local
+        record of the subscriptions up to date. Observers run on the default
+        executor of the loop, so they may block.
+        """
+        kind = None if kind is None else NotificationKind(kind)
+        with self._observers_lock:
+            self._observers = self._observers + ((kind, observer),)
+
+    def remove_observer(self, observer: NotificationObserver) -> None:
+        with self._observers_lock:
+            self._observers = tuple(
+                (kind, registered) for kind, registered in self._observers if registered != observer
+            )
+
+    def unsubscribe(self, subscription_id: str) -> None:
+        self._on_loop(self._unsubscribe, str(subscription_id))
+
+    def _unsubscribe(self, subscription_id: str) -> None:
+        subscriber = self._subscribers.pop(subscription_id, None)
+        if subscriber is not None:
+            self._stop_worker(subscriber)
+        self._pending.pop(subscription_id, None)
+
+    def _on_loop(self, function: Callable, *args):
+        """
+        Runs function on the event loop of the receiver and returns its result,
+        or runs it directly when called from that loop or no loop runs yet.
+        """
+        loop = self._loop
+        if loop is None or not loop.is_running() or _running_loop() is loop:
+            return function(*args)
+        future = concurrent.futures.Future()
+
+        def run():
+            try:
+                future.set_result(function(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        loop.call_soon_threadsafe(run)
+        return future.result()
+
+    async def start(self) -> None:
+        """Starts listening on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+        for subscriber in self._all_subscribers():
+            self._start_worker(subscriber)
+        log.info(f"Notification receiver listening on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for subscriber in self._all_subscribers():
+            self._stop_worker(subscriber)
+
+    async def __aenter__(self) -> "NotificationReceiver":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def start_in_thread(self, timeout: float = 5.0) -> None:
+        """Runs the receiver in its own event loop on a background daemon thread."""
+        started = threading.Event()
+        errors = []
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="nef-notification-receiver", daemon=True)
+        self._thread.start()
+        started.wait(timeout)
+        if errors:
+            raise errors[0]
+
+    def stop_thread(self, timeout: float | None = None) -> None:
+        if self._thread is None or self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _all_subscribers(self) -> list[_Subscriber]:
+        subscribers = list(self._subscribers.values())
+        if self._default is not None:
+            subscribers.append(self._default)
+        return subscribers
+
+    def _start_worker(self, subscriber: _Subscriber) -> None:
+        if subscriber.callback is None or self._loop is None or self._loop.is_closed():
+            return
+        if _running_loop() is self._loop:
+            subscriber.worker = self._loop.create_task(self._run_callback(subscriber))
+        else:
+            self._loop.call_soon_threadsafe(self._start_worker, subscriber)
+
+    def _stop_worker(self, subscriber: _Subscriber) -> None:
+        if subscriber.worker is None or self._loop is None or self._loop.is_closed():
+            return
+        if _running_loop() is self._loop:
+            subscriber.worker.cancel()
+        else:
+            self._loop.call_soon_threadsafe(subscriber.worker.cancel)
+
+    async def _run_callback(self, subscriber: _Subscriber) -> None:
+        while True:
+            notification = await subscriber.queue.get()
+            try:
+                result = subscriber.callback(notification)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                log.error(
+                    f"Notification callback failed [subscription={notification.subscription_id}]"
+                    f": {e}"
+                )
+            finally:
+                subscriber.queue.task_done()
+
+    async def dispatch(
+        self, kind: NotificationKind | str, body: bytes | str | dict, key: str | None = None
+    ) -> int:
+        """
+        Validates a notification body and delivers it to its subscriber.
+
+        returns:
+            HTTP status for the NEF: 204 when delivered (or buffered), 400 on an
+            invalid payload and 503 when the subscriber queue stayed full.
+        """
+        kind = NotificationKind(kind)
+        try:
+            if isinstance(body, (bytes, str)):
+                body = json.loads(body)
+            payload = _MODELS[kind].model_validate(body)
+        except (ValueError, ValidationError) as e:
+            log.warning(f"Rejected invalid {kind.value} notification: {e}")
+            return 400
+        notification = Notification(kind, _notification_key(kind, payload, key), payload)
+        self._notify_observers(notification)
+
+        subscriber = self._subscribers.get(notification.subscription_id)
+        if subscriber is None:
+            subscriber = self._default
+        if subscriber is None:
+            self._buffer(notification)
+            return 204
+        try:
+            await asyncio.wait_for(subscriber.queue.put(notification), self.put_timeout)
+        except asyncio.TimeoutError:
+            log.warning(
+                f"Notification queue full [subscription={notification.subscription_id}], "
+                "asking the NEF to retry"
+            )
+            return 503
+        return 204
+
+    def _notify_observers(self, notification: Notification) -> None:
+        loop = asyncio.get_running_loop()
+        for kind, observer in self._observers:
+            if kind is None or kind is notification.kind:
+                loop.run_in_executor(None, observer, notification).add_done_callback(
+                    _log_observer_failure
+                )
+
+    def _buffer(self, notification: Notification) -> None:
+        if notification.subscription_id is None:
+            log.warning(f"Dropped {notification.kind.value} notification without subscription")
+            return
+        pending = self._pending.get(notification.subscription_id)
+        if pending is None:
+            pending = self._pending[notification.subscription_id] = []
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+        if len(pending) < self.queue_size:
+            pending.append(notification)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            keep_alive = True
+            while keep_alive:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = _parse_request_line(request_line)
+                headers = await _read_headers(reader)
+                keep_alive = _keep_alive(version, headers)
+                status = await self._handle_request(reader, method, path, headers)
+                retry_after = {"Retry-After": "1"} if status == 503 else {}
+                await _write_response(writer, status, keep_alive, retry_after)
+                if status in (411, 413):
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(
+        self, reader: asyncio.StreamReader, method: str, path: str, headers: dict[str, str]
+    ) -> int:
+        length = headers.get("content-length")
+        chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+        body = b""
+        if chunked:
+            body = await _read_chunked(reader, self.max_body_size)
+            if body is None:
+                return 413
+        elif length is not None:
+            length = int(length)
+            if length > self.max_body_size:
+                return 413
+            body = await reader.readexactly(length)
+        segments = path.split("?", 1)[0].strip("/").split("/")
+        if len(segments) not in (2, 3) or f"/{segments[0]}" != _BASE_PATH:
+            return 404
+        try:
+            kind = NotificationKind(segments[1])
+        except ValueError:
+            return 404
+        if method != "POST":
+            return 405
+        if length is None and not chunked:
+            return 411
+        key = segments[2] if len(segments) == 3 else None
+        return await self.dispatch(kind, body, key)
+
+
+def _log_observer_failure(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        log.error(f"Notification observer failed: {future.exception()}")
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _parse_request_line(line: bytes) -> tuple[str, str, str]:
+    method, path, version = line.decode("latin-1").split()
+    return method.upper(), path, version.upper()
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line or line in (b"\r\n", b"\n"):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_chunked(reader: asyncio.StreamReader, limit: int) -> bytes | None:
+    """Body sent with chunked Transfer-Encoding, or None once it exceeds limit."""
+    body = bytearray()
+    while True:
+        size = int((await reader.readline()).split(b";", 1)[0].strip(), 16)
+        if size == 0:
+            # Trailer fields, up to the blank line
+            await _read_headers(reader)
+            return bytes(body)
+        if len(body) + size > limit:
+            return None
+        body += await reader.readexactly(size)
+        await reader.readexactly(2)
+
+
+def _keep_alive(version: str, headers: dict[str, Any]) -> bool:
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+async def _write_response(
+    writer: asyncio.StreamWriter, status: int, keep_alive: bool, extra_headers: dict[str, str]
+) -> None:
+    lines = [f"HTTP/1.1 {status} {_REASONS[status]}", "Content-Length: 0"]
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    lines.extend(f"{name}: {value}" for name, value in extra_headers.items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    await writer.drain()
@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+"""
+Desired-state reconciliation of the QoD and traffic influence subscriptions of
+a network adapter.
+
+After a crash the NEF may keep subscriptions nobody tracks anymore (orphans),
+and sessions the application believes exist may be gone. Reconciler compares
+the desired sessions with the subscriptions actually held by the NEF and
+applies the minimal set of operations to converge::
+
+    network_client.attach_session_store(SqliteSessionStore("/var/lib/sdk/sessions.db"))
+    reconciler = Reconciler(network_client, lambda: DesiredState(qod_sessions, ti_infos))
+    report = reconciler.reconcile()
+    reconciler.start(interval=300)
+
+Each cycle lists every QoD and traffic influence subscription of the AF once
+(one GET per API, none for an API with nothing desired unless pruning). The
+desired CAMARA requests are translated with the adapter's own builders, so both
+sides are compared as NEF subscriptions, keyed by their normalised content:
+
+- QoD: UE address, QoS reference and flow rules. A session whose key is
+  missing is created.
+- traffic influence: AF application, UE address and flow rules identify the
+  subscription; the traffic routes (DNAIs) and notification destination are
+  its content. A subscription whose content differs is replaced with a PUT.
+
+Flow descriptions are split into their IPFilterRules and compared as sorted
+canonical rules, so a comma-joined description and a NEF echoing the same rules
+one per description match.
+
+Other processes and SDK instances may share the scs_as_id, so only the
+subscriptions this client owns are ever deleted: the ones recorded in its
+session store (see ``attach_session_store``) before the cycle started, and the
+ones created by the reconciler itself. Among those, duplicates of a desired
+session (left by retries) are reduced to one, and with ``prune`` the ones
+matching no desired session are deleted. Operations run with bounded
+concurrency; failures are reported, not raised, and retried on the next cycle.
+"""
+import functools
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, NamedTuple, Sequence
+
+from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.network.core import common, schemas
+from sunrise6g_opensdk.network.core.base_network_client import (
+    BaseNetworkClient,
+    resource_id_from_link,
+)
+from sunrise6g_opensdk.network.core.ip_filter_rule import (
+    IPFilterRuleError,
+    parse_flow_description,
+)
+from sunrise6g_opensdk.network.core.session_store import SessionKind
+
+log = logger.get_logger(__name__)
+
+
+class DesiredState(NamedTuple):
+    """CAMARA requests of the sessions that should exist."""
+
+    qod_sessions: Sequence[Dict] = ()
+    traffic_influences: Sequence[Dict] = ()
+
+
+class ReconcilePlan(NamedTuple):
+    create_qod: list[Dict]
+    delete_qod: list[str]
+    create_ti: list[Dict]
+    # (resource ID, CAMARA traffic influence info)
+    put_ti: list[tuple[str, Dict]]
+    delete_ti: list[str]
+
+    def __len__(self) -> int:
+        return sum(
+            len(operations)
+            for operations in (
+                self.create_qod,
+                self.delete_qod,
+                self.create_ti,
+                self.put_ti,
+                self.delete_ti,
+            )
+        )
+
+
+class ReconcileReport(NamedTuple):
+    plan: ReconcilePlan
+    applied: int
+    # (operation, target, error message)
+    errors: list[tuple[str, str, str]]
+    duration: float
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def normalise_flow(flow_description: str) -> tuple[str, ...]:
+    """Canonical form of the rules of a flow description, as encoded by IPFilterRule."""
+    try:
+        return tuple(rule.encode() for rule in parse_flow_description(flow_description))
+    except IPFilterRuleError:
+        return (" ".join(flow_description.split()),)
+
+
+def _flows(flow_info: list[schemas.FlowInfo] | None) -> tuple[str, ...]:
+    return tuple(
+        sorted(
+            {
+                rule
+                for flow in flow_info or []
+                for description in flow.flowDescriptions or []
+                for rule in normalise_flow(description)
+            }
+        )
+    )
+
+
+def qod_key(subscription: schemas.AsSessionWithQoSSubscription) -> tuple:
+    """Normalised content of a QoD subscription."""
+    return (
+        str(subscription.ueIpv4Addr or ""),
+        str(subscription.ueIpv6Addr or ""),
+        subscription.qosReference or "",
+        _flows(subscription.flowInfo),
+    )
+
+
+def ti_key(subscription: schemas.TrafficInfluSub) -> tuple:
+    """Normalised identity of a traffic influence subscription."""
+    return (
+        subscription.afAppId,
+        subscription.ipv4Addr or "",
+        subscription.ipv6Addr or "",
+        _flows(subscription.trafficFilters),
+    )
+
+
+def ti_content(subscription: schemas.TrafficInfluSub) -> tuple:
+    """Normalised part of a traffic influence subscription updated with a PUT."""
+    return (
+        tuple(sorted(route.dnai for route in subscription.trafficRoutes or [])),
+        str(subscription.notificationDestination or ""),
+    )
+
+
+def _resource_id(item: Dict) -> str | None:
+    link = item.get("self") if isinstance(item, dict) else None
+    return resource_id_from_link(link) if link else None
+
+
+class Reconciler:
+    """
+    Converges the QoD and traffic influence subscriptions of a network adapter
+    to a desired state.
+
+    args:
+        client: network adapter owning the subscriptions.
+        desired: DesiredState, or a callable returning it on every cycle (e.g.
+                 read from the application database).
+        prune: delete the subscriptions owned by client matching no desired
+               session.
+        max_workers: operations applied at the same time.
+    """
+
+    def __init__(
+        self,
+        client: BaseNetworkClient,
+        desired: DesiredState | Callable[[], DesiredState],
+        prune: bool = False,
+        max_workers: int = 8,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.client = client
+        self.desired = desired
+        self.prune = prune
+        self.max_workers = max_workers
+        self.clock = clock
+        self.last_report: ReconcileReport | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        # IDs of the subscriptions created by this reconciler, by kind
+        self._created: dict[SessionKind, set[str]] = {kind: set() for kind in SessionKind}
+        self._created_lock = threading.Lock()
+
+    def _desired_state(self) -> DesiredState:
+        return self.desired() if callable(self.desired) else self.desired
+
+    def _handles(self, capability: str, desired: Sequence) -> bool:
+        return capability in self.client.capabilities and (bool(desired) or self.prune)
+
+    def _owned(self, kind: SessionKind, cutoff: float | None) -> set[str]:
+        """
+        IDs of the subscriptions of a kind this client owns: created by the
+        reconciler, or recorded in the session store of the client before
+        cutoff (store clock), so the sessions created while a cycle runs are
+        never pruned.
+        """
+        with self._created_lock:
+            owned = set(self._created[kind])
+        store = self.client.session_store
+        if store is None or cutoff is None:
+            return owned
+        try:
+            stored = store.sessions(
+                kind,
+                include_expired=True,
+                base_url=self.client.base_url,
+                scs_as_id=self.client.scs_as_id,
+            )
+        except sqlite3.Error as e:
+            log.error(f"Reading the session store failed, only pruning own sessions: {e}")
+            return owned
+        owned.update(
+            resource_id_from_link(session.session_id)
+            for session in stored
+            if session.created_at < cutoff
+        )
+        return owned
+
+    def plan(self, desired: DesiredState | None = None) -> ReconcilePlan:
+        """
+        Lists the NEF subscriptions and computes the operations needed.
+
+        returns:
+            ReconcilePlan, empty when the NEF already matches the desired state.
+        """
+        store = self.client.session_store
+        cutoff = store.clock() if store is not None else None
+        if desired is None:
+            desired = self._desired_state()
+        create_qod, delete_qod = [], []
+        if self._handles("qod", desired.qod_sessions):
+            create_qod, delete_qod = self._plan_qod(
+                desired.qod_sessions, self._owned(SessionKind.qod, cutoff)
+            )
+        create_ti, put_ti, delete_ti = [], [], []
+        if self._handles("traffic_influence", desired.traffic_influences):
+            create_ti, put_ti, delete_ti = self._plan_ti(
+                desired.traffic_influences, self._owned(SessionKind.traffic_influence, cutoff)
+            )
+        return ReconcilePlan(create_qod, delete_qod, create_ti, put_ti, delete_ti)
+
+    def _plan_qod(self, sessions: Sequence[Dict], owned: set[str]) -> tuple[list[Dict], list[str]]:
+        wanted: Dict[tuple, Dict] = {}
+        for session_info in sessions:
+            wanted.setdefault(
+                qod_key(self.client._build_qod_subscription(session_info)), session_info
+            )
+        listed = common.as_session_with_qos_get_all(self.client.base_url, self.client.scs_as_id)
+        found = set()
+        delete = []
+        for item in listed or []:
+            resource_id = _resource_id(item)
+            if resource_id is None:
+                continue
+            try:
+                key = qod_key(schemas.AsSessionWithQoSSubscription.model_validate(item))
+            except ValueError as e:
+                log.warning(f"Skipping unreadable QoD subscription '{resource_id}': {e}")
+                continue
+            if key in wanted and key not in found:
+                found.add(key)
+            elif resource_id in owned and (key in wanted or self.prune):
+                delete.append(resource_id)
+        return [info for key, info in wanted.items() if key not in found], delete
+
+    def _plan_ti(
+        self, infos: Sequence[Dict], owned: set[str]
+    ) -> tuple[list[Dict], list[tuple[str, Dict]], list[str]]:
+        wanted: Dict[tuple, tuple[tuple, Dict]] = {}
+        for info in infos:
+            subscription = self.client._build_ti_subscription(info)
+            wanted.setdefault(ti_key(subscription), (ti_content(subscription), info))
+        listed = common.traffic_influence_get_all(self.client.base_url, self.client.scs_as_id)
+        found = set()
+        put, delete = [], []
+        for item in listed or []:
+            resource_id = _resource_id(item)
+            if resource_id is None:
+                continue
+            try:
+                subscription = schemas.TrafficInfluSub.model_validate(item)
+                key = ti_key(subscription)
+            except ValueError as e:
+                log.warning(
+                    f"Skipping unreadable traffic influence subscription '{resource_id}': {e}"
+                )
+                continue
+            if key in wanted and key not in found:
+                found.add(key)
+                content, info = wanted[key]
+                if ti_content(subscription) != content:
+                    put.append((resource_id, info))
+            elif resource_id in owned and (key in wanted or self.prune):
+                delete.append(resource_id)
+        create = [info for key, (_, info) in wanted.items() if key not in found]
+        return create, put, delete
+
+    def reconcile(self, dry_run: bool = False) -> ReconcileReport:
+        """
+        Runs one reconciliation cycle.
+
+        args:
+            dry_run: only compute the plan.
+
+        returns:
+            ReconcileReport with the plan, the operations applied and the errors.
+        """
+        started = self.clock()
+        plan = self.plan()
+        client = self.client
+        # (operation, target, call)
+        operations = (
+            [
+                (
+                    "create_qod_session",
+                    "",
+                    functools.partial(self._create_qod, dict(info)),
+                )
+                for info in plan.create_qod
+            ]
+            + [
+                (
+                    "delete_qod_session",
+                    sid,
+                    functools.partial(
+                        self._delete, SessionKind.qod, client.delete_qod_session, sid
+                    ),
+                )
+                for sid in plan.delete_qod
+            ]
+            + [
+                (
+                    "create_traffic_influence_resource",
+                    "",
+                    functools.partial(self._create_ti, dict(info)),
+                )
+                for info in plan.create_ti
+            ]
+            + [
+                (
+                    "put_traffic_influence_resource",
+                    rid,
+                    functools.partial(client.put_traffic_influence_resource, rid, dict(info)),
+                )
+                for rid, info in plan.put_ti
+            ]
+            + [
+                (
+                    "delete_traffic_influence_resource",
+                    rid,
+                    functools.partial(
+                        self._delete,
+                        SessionKind.traffic_influence,
+                        client.delete_traffic_influence_resource,
+                        rid,
+                    ),
+                )
+                for rid in plan.delete_ti
+            ]
+        )
+        errors = []
+        if operations and not dry_run:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(operations))) as pool:
+                outcomes = list(pool.map(self._apply, operations))
+            errors = [outcome for outcome in outcomes if outcome is not None]
+        applied = 0 if dry_run else len(operations) - len(errors)
+        report = ReconcileReport(plan, applied, errors, self.clock() - started)
+        self.last_report = report
+        if operations:
+            log.info(
+                f"Reconciliation: {applied}/{len(operations)} operations applied "
+                f"in {report.duration:.3f}s, {len(errors)} failed"
+            )
+        return report
+
+    def _create_qod(self, session_info: Dict) -> None:
+        created = self.client.create_qod_session(session_info)
+        with self._created_lock:
+            self._created[SessionKind.qod].add(str(created["sessionId"]))
+
+    def _create_ti(self, traffic_influence_info: Dict) -> None:
+        created = self.client.create_traffic_influence_resource(traffic_influence_info)
+        if created.get("trafficInfluenceID"):
+            with self._created_lock:
+                self._created[SessionKind.traffic_influence].add(
+                    resource_id_from_link(created["trafficInfluenceID"])
+                )
+
+    def _delete(self, kind: SessionKind, delete: Callable[[str], None], resource_id: str) -> None:
+        delete(resource_id)
+        with self._created_lock:
+            self._created[kind].discard(resource_id)
+
+    @staticmethod
+    def _apply(operation: tuple) -> tuple[str, str, str] | None:
+        name, target, call = operation
+        try:
+            call()
+            return None
+        except Exception as e:
+            log.error(f"Reconciliation {name} {target} failed: {e}")
+            return name, target, str(e)
+
+    def start(self, interval: float = 300.0) -> None:
+        """Reconciles every interval seconds from a background daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+
+        def run():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.reconcile()
+                except Exception as e:
+                    log.error(f"Reconciliation failed: {e}")
+
+        self._thread = threading.Thread(target=run, name="nef-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
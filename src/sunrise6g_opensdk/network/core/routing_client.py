@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+Routing network client spreading CAMARA calls over several NEFs.
+
+A shard is one NEF, reachable through one or more replica adapters (Open5GS,
+OAI, Open5GCore clients) that share its state. New sessions are placed by
+consistent hashing of the device identifier, restricted to the shards of the
+device region when a region resolver is given::
+
+    client = RoutingNetworkClient(
+        {
+            "madrid": [Open5GSClient(url_a, "af"), Open5GSClient(url_b, "af")],
+            "athens": OaiNefClient(url_c, "af"),
+        },
+        shard_regions={"madrid": "es", "athens": "gr"},
+        region_of=lambda info: info.get("region"),
+    )
+    session = client.create_qod_session(session_info)
+    client.delete_qod_session(session["sessionId"])   # goes to the owning shard
+
+Calls fail over to another replica of the shard when a replica cannot be
+reached; such replicas are skipped until a health probe sees them back. When no
+replica of the selected shard is available, new sessions go to the next shard
+of the hash ring.
+
+Creations are not idempotent, so they only fail over when the request surely
+never reached the NEF: the connection could not be established (refused,
+connect timeout) or the circuit breaker of the NEF is open. Other failures,
+e.g. a read timeout after the NEF accepted the POST, are raised to the caller,
+which may retry with an idempotency_key.
+"""
+import bisect
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Mapping, Sequence
+
+import requests
+
+from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.common import idempotency, resilience
+from sunrise6g_opensdk.network.adapters.errors import NetworkPlatformError
+from sunrise6g_opensdk.network.core import schemas
+from sunrise6g_opensdk.network.core.base_network_client import (
+    BaseNetworkClient,
+    resource_id_from_link,
+)
+from sunrise6g_opensdk.network.core.location_cache import device_keys
+from sunrise6g_opensdk.network.core.session_store import SqliteSessionStore
+
+log = logger.get_logger(__name__)
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class ShardUnavailableError(NetworkPlatformError):
+    """No replica of a shard could be reached."""
+
+
+def _request_error(error: BaseException) -> BaseException | None:
+    """The requests exception a call failed with, following the exception causes."""
+    while error is not None:
+        if isinstance(error, requests.exceptions.RequestException):
+            return error
+        error = error.__cause__
+    return None
+
+
+def _is_unavailable(error: Exception) -> bool:
+    """Whether a call failed because the NEF replica could not be reached."""
+    return isinstance(
+        _request_error(error),
+        (requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+    )
+
+
+def _was_not_sent(error: Exception) -> bool:
+    """
+    Whether a call failed before its request reached the NEF, so that running
+    it on another replica cannot duplicate a resource.
+    """
+    cause = _request_error(error)
+    if isinstance(cause, resilience.CircuitOpenError):
+        return True
+    return cause is not None and resilience.request_not_sent(cause)
+
+
+def _is_not_found(error: Exception) -> bool:
+    cause = _request_error(error)
+    response = getattr(cause, "response", None)
+    return response is not None and response.status_code == 404
+
+
+def http_probe(client: BaseNetworkClient, timeout: float = 2.0) -> bool:
+    """Default health probe: the NEF answers HTTP on its base URL without a 5xx."""
+    try:
+        return requests.get(client.base_url, timeout=timeout).status_code < 500
+    except requests.exceptions.RequestException:
+        return False
+
+
+class _Replica:
+    __slots__ = ("client", "healthy")
+
+    def __init__(self, client: BaseNetworkClient):
+        self.client = client
+        self.healthy = True
+
+
+class RoutingNetworkClient:
+    """
+    Network client routing CAMARA calls to sharded and replicated NEFs.
+
+    args:
+        shards: shard name -> adapter, or list of replica adapters of that NEF.
+        shard_regions: shard name -> region served by the shard.
+        region_of: returns the region of a CAMARA request body (or None).
+        virtual_nodes: points per shard on the consistent hash ring.
+        probe: health probe of a replica adapter.
+        max_owners: resource owners remembered; the least recently used are
+                    forgotten and looked up again on their next call.
+    """
+
+    idempotency_store: idempotency.IdempotencyStore | None = None
+
+    def __init__(
+        self,
+        shards: Mapping[str, BaseNetworkClient | Sequence[BaseNetworkClient]],
+        shard_regions: Mapping[str, str] | None = None,
+        region_of: Callable[[Dict], str | None] | None = None,
+        virtual_nodes: int = 64,
+        probe: Callable[[BaseNetworkClient], bool] = http_probe,
+        max_owners: int = 100_000,
+    ):
+        if not shards:
+            raise NetworkPlatformError("At least one shard is required")
+        self._shards: dict[str, list[_Replica]] = {}
+        for name, clients in shards.items():
+            if isinstance(clients, BaseNetworkClient):
+                clients = [clients]
+            if not clients:
+                raise NetworkPlatformError(f"Shard '{name}' has no replica")
+            self._shards[name] = [_Replica(client) for client in clients]
+        self.shard_regions = dict(shard_regions or {})
+        self.region_of = region_of
+        self.probe = probe
+        self._ring = sorted(
+            (_hash(f"{name}#{i}"), name) for name in self._shards for i in range(virtual_nodes)
+        )
+        self._ring_keys = [point for point, _ in self._ring]
+        self.max_owners = max_owners
+        self._owners: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def attach_idempotency_store(self, store: idempotency.IdempotencyStore | None) -> None:
+        """Keeps the results of the create calls made with an idempotency_key in store."""
+        self.idempotency_store = store
+
+    def attach_session_store(
+        self, store: SqliteSessionStore | None, serve_reads: bool = False
+    ) -> None:
+        """
+        Records the sessions of every replica in store, each under the
+        base_url and scs_as_id of its NEF (see BaseNetworkClient).
+        """
+        for replicas in self._shards.values():
+            for replica in replicas:
+                replica.client.attach_session_store(store, serve_reads)
+
+    # Routing
+
+    def shards_for(self, body: Dict, device: schemas.Device | None = None) -> list[str]:
+        """
+        Shards able to serve a new resource, in preference order: the ring
+        walk from the device hash, limited to the shards of its region.
+        """
+        region = self.region_of(body) if self.region_of is not None else None
+        allowed = {name for name, r in self.shard_regions.items() if r == region}
+        if not allowed:
+            if region is not None:
+                log.warning(f"No shard serves region '{region}', using all shards")
+            allowed = set(self._shards)
+        keys = device_keys(device)
+        start = bisect.bisect(self._ring_keys, _hash(keys[0])) if keys else 0
+        ordered = []
+        for i in range(len(self._ring)):
+            name = self._ring[(start + i) % len(self._ring)][1]
+            if name in allowed and name not in ordered:
+                ordered.append(name)
+        return ordered
+
+    def owner_of(self, resource_id: str) -> str | None:
+        key = resource_id_from_link(resource_id)
+        with self._lock:
+            shard = self._owners.get(key)
+            if shard is not None:
+                self._owners.move_to_end(key)
+            return shard
+
+    def _remember(self, resource_id, shard: str) -> None:
+        if resource_id is None:
+            return
+        key = resource_id_from_link(resource_id)
+        with self._lock:
+            self._owners[key] = shard
+            self._owners.move_to_end(key)
+            while len(self._owners) > self.max_owners:
+                self._owners.popitem(last=False)
+
+    def _forget(self, resource_id) -> None:
+        with self._lock:
+            self._owners.pop(resource_id_from_link(resource_id), None)
+
+    def _call_shard(
+        self,
+        shard: str,
+        operation: Callable[[BaseNetworkClient], object],
+        can_fail_over: Callable[[Exception], bool] = _is_unavailable,
+    ):
+        """
+        Runs operation on a replica of the shard, failing over to the next
+        replica on the errors accepted by can_fail_over.
+
+        raises:
+            ShardUnavailableError: if every replica failed that way.
+        """
+        replicas = self._shards[shard]
+        # Replicas believed down are still tried last rather than not at all
+        ordered = [r for r in replicas if r.healthy] + [r for r in replicas if not r.healthy]
+        last_error = None
+        for replica in ordered:
+            try:
+                result = operation(replica.client)
+            except Exception as e:
+                if not can_fail_over(e):
+                    raise
+                if replica.healthy:
+                    log.warning(f"NEF replica {replica.client.base_url} unavailable: {e}")
+                replica.healthy = False
+                last_error = e
+                continue
+            replica.healthy = True
+            return result
+        raise ShardUnavailableError(f"No replica of shard '{shard}' is available") from last_error
+
+    def _create(self, body: Dict, device, operation, id_of: Callable[[object], object]):
+        last_error = None
+        for shard in self.shards_for(body, device):
+            try:
+                result = self._call_shard(shard, operation, _was_not_sent)
+            except ShardUnavailableError as e:
+                last_error = e
+                continue
+            self._remember(id_of(result), shard)
+            return result
+        raise ShardUnavailableError("No shard available for the request") from last_error
+
+    def _on_owner(self, resource_id: str, operation):
+        """Runs operation on the shard owning resource_id, looking it up if unknown."""
+        shard = self.owner_of(resource_id)
+        if shard is not None:
+            return self._call_shard(shard, operation)
+        for shard in self._shards:
+            try:
+                result = self._call_shard(shard, operation)
+            except Exception as e:
+                if _is_not_found(e) or isinstance(e, ShardUnavailableError):
+                    continue
+                raise
+            self._remember(resource_id, shard)
+            return result
+        raise NetworkPlatformError(f"Resource '{resource_id}' not found on any shard")
+
+    @staticmethod
+    def _device_of(body: Dict) -> schemas.Device | None:
+        device = body.get("device") if isinstance(body, dict) else None
+        return schemas.Device.model_validate(device) if device else None
+
+    # Health
+
+    def check_health(self) -> dict[str, list[bool]]:
+        """Probes every replica and returns the health of each shard's replicas."""
+        for replicas in self._shards.values():
+            for replica in replicas:
+                healthy = self.probe(replica.client)
+                if healthy != replica.healthy:
+                    state = "back" if healthy else "down"
+                    log.info(f"NEF replica {replica.client.base_url} is {state}")
+                replica.healthy = healthy
+        return {name: [r.healthy for r in replicas] for name, replicas in self._shards.items()}
+
+    def start_health_checks(self, interval: float = 10.0) -> None:
+        """Probes the replicas every interval seconds from a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.check_health()
+                except Exception as e:
+                    log.error(f"NEF health check failed: {e}")
+
+        self._thread = threading.Thread(target=run, name="nef-health", daemon=True)
+        self._thread.start()
+
+    def stop_health_checks(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # CAMARA QoD
+
+    def create_qod_session(self, session_info: Dict, idempotency_key: str | None = None) -> Dict:
+        if idempotency_key is not None:
+            return idempotency.call(
+                self, "create_qod_session", idempotency_key, self.create_qod_session, session_info
+            )
+        return self._create(
+            session_info,
+            self._device_of(session_info),
+            lambda client: client.create_qod_session(session_info),
+            lambda result: result.get("sessionId"),
+        )
+
+    def get_qod_session(self, session_id: str) -> Dict:
+        return self._on_owner(session_id, lambda client: client.get_qod_session(session_id))
+
+    def extend_qod_session(self, session_id: str, requested_additional_duration: int) -> Dict:
+        return self._on_owner(
+            session_id,
+            lambda client: client.extend_qod_session(session_id, requested_additional_duration),
+        )
+
+    def delete_qod_session(self, session_id: str) -> None:
+        self._on_owner(session_id, lambda client: client.delete_qod_session(session_id))
+        self._forget(session_id)
+
+    # CAMARA Traffic Influence
+
+    def create_traffic_influence_resource(
+        self, traffic_influence_info: Dict, idempotency_key: str | None = None
+    ) -> Dict:
+        if idempotency_key is not None:
+            return idempotency.call(
+                self,
+                "create_traffic_influence_resource",
+                idempotency_key,
+                self.create_traffic_influence_resource,
+                idempotency.without(traffic_influence_info, "trafficInfluenceID"),
+            )
+        return self._create(
+            traffic_influence_info,
+            self._device_of(traffic_influence_info),
+            lambda client: client.create_traffic_influence_resource(traffic_influence_info),
+            lambda result: result.get("trafficInfluenceID"),
+        )
+
+    def put_traffic_influence_resource(
+        self, resource_id: str, traffic_influence_info: Dict
+    ) -> Dict:
+        return self._on_owner(
+            resource_id,
+            lambda client: client.put_traffic_influence_resource(
+                resource_id, traffic_influence_info
+            ),
+        )
+
+    def delete_traffic_influence_resource(self, resource_id: str) -> None:
+        self._on_owner(
+            resource_id, lambda client: client.delete_traffic_influence_resource(resource_id)
+        )
+        self._forget(resource_id)
+
+    def get_individual_traffic_influence_resource(self, resource_id: str) -> Dict:
+        return self._on_owner(
+            resource_id,
+            lambda client: client.get_individual_traffic_influence_resource(resource_id),
+        )
+
+    def get_all_traffic_influence_resource(self) -> list[schemas.CreateTrafficInfluence]:
+        resources = []
+        for shard in self._shards:
+            for resource in self._call_shard(
+                shard, lambda client: client.get_all_traffic_influence_resource()
+            ):
+                self._remember(resource.trafficInfluenceID, shard)
+                resources.append(resource)
+        return resources
+
+    # CAMARA Location Retrieval
+
+    def create_monitoring_event_subscription(
+        self, retrieve_location_request: schemas.RetrievalLocationRequest
+    ) -> schemas.Location:
+        return self._create(
+            {},
+            retrieve_location_request.device,
+            lambda client: client.create_monitoring_event_subscription(retrieve_location_request),
+            lambda result: None,
+        )
+
+    def retrieve_locations(
+        self,
+        retrieve_location_requests: Iterable[schemas.RetrievalLocationRequest],
+        max_concurrency: int = 16,
+    ):
+        """
+        Batch location retrieval: requests are grouped by the shard owning the
+        device and each group is served by BaseNetworkClient.retrieve_locations.
+        """
+        groups: dict[str, list[schemas.RetrievalLocationRequest]] = {}
+        for request in retrieve_location_requests:
+            groups.setdefault(self.shards_for({}, request.device)[0], []).append(request)
+        for shard, requests_ in groups.items():
+            replicas = self._shards[shard]
+            replica = next((r for r in replicas if r.healthy), replicas[0])
+            yield from replica.client.retrieve_locations(requests_, max_concurrency)
@@ -140,6 +140,43 @@ class FlowInfo(BaseModel):
     )
 
 
+class AsSessionWithQoSSubscriptionPatch(BaseModel):
+    flowInfo: list[FlowInfo] | None = Field(None, min_length=1)
+    qosReference: str | None = None
+    usageThreshold: UsageThreshold | None = None
+
+
+class UserPlaneEvent(str, Enum):
+    SESSION_TERMINATION = "SESSION_TERMINATION"
+    LOSS_OF_BEARER = "LOSS_OF_BEARER"
+    RECOVERY_OF_BEARER = "RECOVERY_OF_BEARER"
+    RELEASE_OF_BEARER = "RELEASE_OF_BEARER"
+    USAGE_REPORT = "USAGE_REPORT"
+    FAILED_RESOURCES_ALLOCATION = "FAILED_RESOURCES_ALLOCATION"
+    SUCCESSFUL_RESOURCES_ALLOCATION = "SUCCESSFUL_RESOURCES_ALLOCATION"
+    QOS_GUARANTEED = "QOS_GUARANTEED"
+    QOS_NOT_GUARANTEED = "QOS_NOT_GUARANTEED"
+    QOS_MONITORING = "QOS_MONITORING"
+    ACCESS_TYPE_CHANGE = "ACCESS_TYPE_CHANGE"
+    PLMN_CHG = "PLMN_CHG"
+
+
+class UserPlaneEventReport(BaseModel):
+    event: UserPlaneEvent
+    accumulatedUsage: UsageThreshold | None = None
+    flowIds: list[int] | None = Field(None, min_length=1)
+    appliedQosRef: str | None = None
+
+
+# This data type represents the notification sent by the NEF to the AF for an
+# AsSessionWithQoS subscription (UserPlaneNotificationData, TS 29.122).
+class UserPlaneNotificationData(BaseModel):
+    transaction: Link = Field(
+        ..., description="Link to the AsSessionWithQoS subscription the notification refers to."
+    )
+    eventReports: list[UserPlaneEventReport] = Field(..., min_length=1)
+
+
 class Snssai(BaseModel):
     sst: int = Field(default=1)
     sd: str = Field(default="FFFFFF")
@@ -198,6 +235,7 @@ class TrafficRoute(BaseModel):
 
 
 class TrafficInfluSub(BaseModel):  # Replace with a meaningful name
+    self_: Link | None = Field(None, alias="self")
     afServiceId: str | None = None
     afAppId: str
     dnn: str | None = None
@@ -232,6 +270,27 @@ class TrafficInfluSub(BaseModel):  # Replace with a meaningful name
         self.snssai = Snssai(sst=sst, sd=sd)
 
 
+class DnaiChangeType(str, Enum):
+    EARLY = "EARLY"
+    EARLY_LATE = "EARLY_LATE"
+    LATE = "LATE"
+
+
+# This data type represents the UP path change notification sent by the NEF to the
+# AF for a TrafficInfluence subscription (EventNotification, TS 29.522).
+class TrafficInfluenceNotification(BaseModel):
+    afTransId: str | None = None
+    dnaiChgType: DnaiChangeType
+    subscribedEvent: Literal["UP_PATH_CHANGE"] = "UP_PATH_CHANGE"
+    sourceTrafRoute: TrafficRoute | None = None
+    targetTrafRoute: TrafficRoute | None = None
+    sourceDnai: str | None = None
+    targetDnai: str | None = None
+    gpsi: str | None = None
+    srcUeIpv4Addr: IPv4Address | None = None
+    tgtUeIpv4Addr: IPv4Address | None = None
+
+
 # Monitoring Event API
 
 
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+Lifecycle tracking for QoD sessions.
+
+CAMARA QoD sessions are granted for a limited ``duration``. The manager below
+records the sessions created through a network adapter together with their
+deadlines in a hierarchical timer wheel, so expiry (and the moments shortly
+before it) can be acted upon without polling ``get_qod_session``::
+
+    manager = QoDSessionManager(
+        network_client,
+        on_expiry=lambda session: print(f"{session.session_id} expired"),
+        pre_expiry_margin=30,
+        auto_extend_by=600,
+    )
+    manager.start()
+    session = manager.create_qod_session(session_info)
+
+The timer wheel thread only does the bookkeeping: the hooks and the NEF calls
+they cause (automatic extension and deletion) run on a bounded pool of worker
+threads, so a slow NEF does not delay the other sessions' timers. A session
+whose deadline passes while it is being extended only expires if the extension
+fails.
+"""
+import threading
+import time
+from concurrent import futures
+from typing import Callable, Dict
+
+from sunrise6g_opensdk import logger
+from sunrise6g_opensdk.common.timer_wheel import TimerHandle, TimerWheel
+from sunrise6g_opensdk.network.core.base_network_client import BaseNetworkClient
+from sunrise6g_opensdk.network.core.common import CoreHttpError
+
+log = logger.get_logger(__name__)
+
+
+class TrackedSession:
+    """Bookkeeping for a QoD session followed by QoDSessionManager."""
+
+    __slots__ = (
+        "session_id",
+        "started_at",
+        "duration",
+        "extensions",
+        "session_info",
+        "_extending",
+        "_expiry_timer",
+        "_pre_expiry_timer",
+    )
+
+    def __init__(
+        self, session_id: str, started_at: float, duration: int, session_info: Dict | None
+    ):
+        self.session_id = session_id
+        self.started_at = started_at
+        self.duration = duration
+        self.extensions = 0
+        self.session_info = session_info
+        self._extending = False
+        self._expiry_timer: TimerHandle | None = None
+        self._pre_expiry_timer: TimerHandle | None = None
+
+    @property
+    def deadline(self) -> float:
+        return self.started_at + self.duration
+
+    def __repr__(self) -> str:
+        return (
+            f"TrackedSession(session_id={self.session_id!r}, "
+            f"duration={self.duration}, deadline={self.deadline})"
+        )
+
+
+class QoDSessionManager:
+    """
+    Tracks QoD sessions and reacts to their expiry.
+
+    args:
+        client: network adapter used to create, extend and delete sessions.
+        on_expiry: called with the TrackedSession once its deadline is reached.
+        on_pre_expiry: called with the TrackedSession pre_expiry_margin seconds
+                       before its deadline.
+        pre_expiry_margin: seconds before the deadline at which the pre-expiry
+                           hook (and auto-extension) runs.
+        auto_extend_by: if set, sessions are extended by this many seconds
+                        through the adapter when the pre-expiry hook runs.
+        max_extensions: upper bound on automatic extensions per session.
+        auto_delete: if True, expired sessions are deleted through the adapter.
+        max_workers: threads running the hooks, extensions and deletions.
+        tick: resolution of the timer wheel in seconds.
+        clock: time source, in seconds (defaults to time.time).
+    """
+
+    def __init__(
+        self,
+        client: BaseNetworkClient,
+        on_expiry: Callable[[TrackedSession], None] | None = None,
+        on_pre_expiry: Callable[[TrackedSession], None] | None = None,
+        pre_expiry_margin: float = 60.0,
+        auto_extend_by: int | None = None,
+        max_extensions: int | None = None,
+        auto_delete: bool = False,
+        max_workers: int = 4,
+        tick: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.client = client
+        self.on_expiry = on_expiry
+        self.on_pre_expiry = on_pre_expiry
+        self.pre_expiry_margin = pre_expiry_margin
+        self.auto_extend_by = auto_extend_by
+        self.max_extensions = max_extensions
+        self.auto_delete = auto_delete
+        self.clock = clock
+        self._wheel = TimerWheel(tick=tick, clock=clock)
+        self._sessions: dict[str, TrackedSession] = {}
+        self._lock = threading.RLock()
+        self._max_workers = max_workers
+        self._executor = self._new_executor()
+        self._pending: set[futures.Future] = set()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return str(session_id) in self._sessions
+
+    def get(self, session_id: str) -> TrackedSession | None:
+        return self._sessions.get(str(session_id))
+
+    def create_qod_session(self, session_info: Dict) -> Dict:
+        """
+        Creates a QoD session through the adapter and starts tracking it.
+
+        returns:
+            dictionary with the created session, as returned by the adapter.
+        """
+        session = self.client.create_qod_session(session_info)
+        self.track(session["sessionId"], session["duration"], session_info=session)
+        return session
+
+    def extend_qod_session(self, session_id: str, requested_additional_duration: int) -> Dict:
+        """
+        Extends a session through the adapter and moves its deadline accordingly.
+
+        returns:
+            dictionary with the extended session, as returned by the adapter.
+        """
+        session = self.client.extend_qod_session(str(session_id), requested_additional_duration)
+        with self._lock:
+            tracked = self._sessions.get(str(session_id))
+            if tracked is not None:
+                tracked.duration = session["duration"]
+                tracked.session_info = session
+                self._schedule(tracked)
+        return session
+
+    def delete_qod_session(self, session_id: str) -> None:
+        """Deletes a session through the adapter and stops tracking it."""
+        self.client.delete_qod_session(str(session_id))
+        self.untrack(session_id)
+
+    def track(
+        self,
+        session_id: str,
+        duration: int,
+        started_at: float | None = None,
+        session_info: Dict | None = None,
+    ) -> TrackedSession:
+        """
+        Starts tracking a session, e.g. one created before the manager existed.
+        Tracking an already tracked session replaces its deadline.
+
+        args:
+            session_id: identifier of the QoD session.
+            duration: session duration in seconds, counted from started_at.
+            started_at: start time of the session, defaults to now.
+            session_info: optional session details kept alongside the deadline.
+        """
+        session_id = str(session_id)
+        started_at = self.clock() if started_at is None else started_at
+        tracked = TrackedSession(session_id, started_at, duration, session_info)
+        with self._lock:
+            previous = self._sessions.get(session_id)
+            if previous is not None:
+                self._cancel_timers(previous)
+            self._sessions[session_id] = tracked
+            self._schedule(tracked)
+        return tracked
+
+    def untrack(self, session_id: str) -> TrackedSession | None:
+        """Stops tracking a session without touching it in the network."""
+        with self._lock:
+            tracked = self._sessions.pop(str(session_id), None)
+            if tracked is not None:
+                self._cancel_timers(tracked)
+        return tracked
+
+    def poll(self, now: float | None = None) -> int:
+        """
+        Fires the timers of the sessions whose (pre-)expiry time has passed.
+        Their hooks, extensions and deletions run in the background; see join.
+
+        returns:
+            number of timers fired.
+        """
+        return self._wheel.advance(now)
+
+    def join(self, timeout: float | None = None) -> bool:
+        """
+        Waits for the hooks, extensions and deletions in progress.
+
+        returns:
+            False if some were still running after timeout seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = set(self._pending)
+            if not pending:
+                return True
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            _, not_done = futures.wait(pending, remaining)
+            if not_done:
+                return False
+
+    def start(self) -> None:
+        """Polls the timer wheel from a background daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="qod-session-lifecycle", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stops the polling thread and lets the worker threads exit once the
+        actions in progress are done (see join).
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        # The new pool only starts threads when used, e.g. by a later start()
+        executor, self._executor = self._executor, self._new_executor()
+        executor.shutdown(wait=False)
+
+    def _new_executor(self) -> futures.ThreadPoolExecutor:
+        return futures.ThreadPoolExecutor(
+            max_workers=self._max_workers, thread_name_prefix="qod-session-worker"
+        )
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._wheel.tick):
+            self.poll()
+
+    def _schedule(self, tracked: TrackedSession) -> None:
+        self._cancel_timers(tracked)
+        tracked._expiry_timer = self._wheel.schedule(tracked.deadline, self._expire, tracked)
+        if self.on_pre_expiry is not None or self.auto_extend_by:
+            pre_deadline = tracked.deadline - self.pre_expiry_margin
+            if pre_deadline > tracked.started_at:
+                tracked._pre_expiry_timer = self._wheel.schedule(
+                    pre_deadline, self._pre_expire, tracked
+                )
+
+    def _cancel_timers(self, tracked: TrackedSession) -> None:
+        for timer in (tracked._expiry_timer, tracked._pre_expiry_timer):
+            if timer is not None:
+                self._wheel.cancel(timer)
+        tracked._expiry_timer = tracked._pre_expiry_timer = None
+
+    def _submit(self, function: Callable, *args) -> None:
+        future = self._executor.submit(self._run_action, function, args)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._action_done)
+
+    def _action_done(self, future: futures.Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    @staticmethod
+    def _run_action(function: Callable, args: tuple) -> None:
+        try:
+            function(*args)
+        except Exception as e:
+            log.error(f"QoD session task {function.__name__} failed: {e}")
+
+    def _pre_expire(self, tracked: TrackedSession) -> None:
+        # Timer thread: decides what to do, the workers do it
+        with self._lock:
+            tracked._pre_expiry_timer = None
+            extend = bool(self.auto_extend_by) and self._sessions.get(tracked.session_id) is tracked
+            if self.max_extensions is not None and tracked.extensions >= self.max_extensions:
+                extend = False
+            tracked._extending = tracked._extending or extend
+        if self.on_pre_expiry is not None or extend:
+            self._submit(self._run_pre_expiry, tracked, extend)
+
+    def _run_pre_expiry(self, tracked: TrackedSession, extend: bool) -> None:
+        if self.on_pre_expiry is not None:
+            try:
+                self.on_pre_expiry(tracked)
+            except Exception as e:
+                log.error(f"Pre-expiry hook failed for QoD session {tracked.session_id}: {e}")
+        if not extend:
+            return
+        try:
+            self.extend_qod_session(tracked.session_id, self.auto_extend_by)
+            tracked.extensions += 1
+        except CoreHttpError as e:
+            log.error(f"Failed to extend QoD session {tracked.session_id}: {e}")
+        finally:
+            with self._lock:
+                tracked._extending = False
+                if (
+                    self._sessions.get(tracked.session_id) is tracked
+                    and tracked._expiry_timer is None
+                ):
+                    # The deadline passed during a failed extension
+                    tracked._expiry_timer = self._wheel.schedule(
+                        tracked.deadline, self._expire, tracked
+                    )
+
+    def _expire(self, tracked: TrackedSession) -> None:
+        # Timer thread
+        with self._lock:
+            if self._sessions.get(tracked.session_id) is not tracked:
+                return
+            tracked._expiry_timer = None
+            if tracked._extending:
+                # Re-armed by the extension if it fails
+                return
+            del self._sessions[tracked.session_id]
+            self._cancel_timers(tracked)
+        log.info(f"QoD session expired [id={tracked.session_id}]")
+        if self.on_expiry is not None or self.auto_delete:
+            self._submit(self._run_expiry, tracked)
+
+    def _run_expiry(self, tracked: TrackedSession) -> None:
+        try:
+            if self.on_expiry is not None:
+                self.on_expiry(tracked)
+        finally:
+            if self.auto_delete:
+                try:
+                    self.client.delete_qod_session(tracked.session_id)
+                except CoreHttpError as e:
+                    log.warning(f"Failed to delete expired QoD session {tracked.session_id}: {e}")
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""
+Durable local record of the QoD sessions and traffic influence resources
+created by a network adapter.
+
+The NEF is the only source of truth of BaseNetworkClient, so after a restart
+rebuilding the view of the sessions takes one GET per known ID. A
+SqliteSessionStore attached to the adapter records every session it creates,
+extends or deletes in an embedded SQLite database (WAL journal), so a restarted
+process recovers them with one local query::
+
+    store = SqliteSessionStore("/var/lib/sdk/sessions.db")
+    network_client.attach_session_store(store, serve_reads=True)
+    active = store.sessions(kind=SessionKind.qod, base_url=network_client.base_url)
+
+Each entry keeps the subscription ID, the device identifiers, the QoS profile
+(QoD) or application (traffic influence), the flow descriptions of the NEF
+subscription, the expiry time and the CAMARA body returned by the adapter.
+Entries are keyed by NEF (base URL and SCS/AS ID), kind and subscription ID, so
+the adapters of several NEFs can share one store, and indexed by device
+IPv4/IPv6 address, phone number and expiry time.
+
+The QoS status of a QoD entry starts as REQUESTED and is updated by the NEF
+reads of the adapter and by the QoS notifications of an attached
+NotificationReceiver. With serve_reads, get_qod_session answers from the store
+once the status is known, until the session expires; changes made to the NEF
+by other clients are then not seen until the entry expires or is removed.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from enum import Enum
+from typing import Callable, Dict, NamedTuple, Sequence
+
+from sunrise6g_opensdk.network.core import schemas
+
+
+class SessionKind(str, Enum):
+    qod = "qod"
+    traffic_influence = "traffic_influence"
+
+
+class StoredSession(NamedTuple):
+    base_url: str
+    scs_as_id: str
+    session_id: str
+    kind: SessionKind
+    ipv4: str | None
+    ipv6: str | None
+    phone: str | None
+    # QoS profile of a QoD session, application ID of a traffic influence resource
+    profile: str | None
+    flows: tuple[str, ...]
+    created_at: float
+    expires_at: float | None
+    payload: Dict
+
+    def expired(self, now: float) -> bool:
+        return self.expires_at is not None and self.expires_at <= now
+
+
+def device_fields(device: schemas.Device | None) -> tuple[str | None, str | None, str | None]:
+    """
+    Indexed identifiers of a device.
+
+    returns:
+        (public IPv4 address, IPv6 address, phone number), None when absent.
+    """
+    if device is None:
+        return None, None, None
+    ipv4 = str(device.ipv4Address.root.publicAddress.root) if device.ipv4Address else None
+    ipv6 = str(device.ipv6Address.root) if device.ipv6Address else None
+    phone = device.phoneNumber.root if device.phoneNumber else None
+    return ipv4, ipv6, phone
+
+
+_COLUMNS = (
+    "base_url, scs_as_id, session_id, kind, ipv4, ipv6, phone, profile, flows, "
+    "created_at, expires_at, payload"
+)
+_KEY = "base_url = ? AND scs_as_id = ? AND kind = ? AND session_id = ?"
+
+
+def _scope(base_url: str | None, scs_as_id: str | None) -> tuple[str, list]:
+    """SQL conditions (starting with AND) restricting a query to a NEF."""
+    conditions, params = "", []
+    if base_url is not None:
+        conditions += " AND base_url = ?"
+        params.append(base_url)
+    if scs_as_id is not None:
+        conditions += " AND scs_as_id = ?"
+        params.append(scs_as_id)
+    return conditions, params
+
+
+class SqliteSessionStore:
+    """
+    Sessions kept in a SQLite database shared by several processes.
+
+    The methods reading or changing one entry take the base_url and scs_as_id
+    of the adapter owning it; the listing methods are restricted to one NEF
+    when they are given, and cover every NEF otherwise.
+
+    args:
+        path: database file, created if missing.
+        clock: wall clock time source, in seconds (shared between processes).
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.clock = clock
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "base_url TEXT NOT NULL, scs_as_id TEXT NOT NULL, "
+                "session_id TEXT NOT NULL, kind TEXT NOT NULL, "
+                "ipv4 TEXT, ipv6 TEXT, phone TEXT, profile TEXT, flows TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL, payload TEXT NOT NULL, "
+                "PRIMARY KEY (base_url, scs_as_id, kind, session_id))"
+            )
+            for column in ("ipv4", "ipv6", "phone", "expires_at"):
+                connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS sessions_{column} ON sessions ({column})"
+                )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    @staticmethod
+    def _session(row: tuple) -> StoredSession:
+        return StoredSession(
+            base_url=row[0],
+            scs_as_id=row[1],
+            session_id=row[2],
+            kind=SessionKind(row[3]),
+            ipv4=row[4],
+            ipv6=row[5],
+            phone=row[6],
+            profile=row[7],
+            flows=tuple(json.loads(row[8])),
+            created_at=row[9],
+            expires_at=row[10],
+            payload=json.loads(row[11]),
+        )
+
+    @staticmethod
+    def _key(base_url: str, scs_as_id: str, kind: SessionKind, session_id: str) -> tuple:
+        return base_url, scs_as_id, SessionKind(kind).value, str(session_id)
+
+    def _select(self, conditions: str, params: Sequence, order: str) -> list[StoredSession]:
+        rows = (
+            self._connection()
+            .execute(f"SELECT {_COLUMNS} FROM sessions WHERE {conditions} ORDER BY {order}", params)
+            .fetchall()
+        )
+        return [self._session(row) for row in rows]
+
+    def record(
+        self,
+        kind: SessionKind,
+        session_id: str,
+        payload: Dict,
+        device: schemas.Device | None = None,
+        profile: str | None = None,
+        flows: Sequence[str] = (),
+        duration: float | None = None,
+        base_url: str = "",
+        scs_as_id: str = "",
+    ) -> StoredSession:
+        """
+        Adds or replaces a session.
+
+        args:
+            kind: QoD session or traffic influence resource.
+            session_id: NEF subscription ID.
+            payload: CAMARA body returned by the adapter, JSON serialisable.
+            device: device of the session, indexed by IP address and phone number.
+            profile: QoS profile or application ID.
+            flows: flow descriptions of the NEF subscription.
+            duration: seconds until the session expires; None if it does not.
+            base_url: NEF the session belongs to.
+            scs_as_id: AF identifier of the session on that NEF.
+
+        returns:
+            the stored entry.
+        """
+        now = self.clock()
+        session = StoredSession(
+            base_url,
+            scs_as_id,
+            str(session_id),
+            SessionKind(kind),
+            *device_fields(device),
+            profile,
+            tuple(flows),
+            now,
+            None if duration is None else now + duration,
+            payload,
+        )
+        with self._connection() as connection:
+            connection.execute(
+                f"INSERT OR REPLACE INTO sessions ({_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session.base_url,
+                    session.scs_as_id,
+                    session.session_id,
+                    session.kind.value,
+                    session.ipv4,
+                    session.ipv6,
+                    session.phone,
+                    session.profile,
+                    json.dumps(session.flows),
+                    session.created_at,
+                    session.expires_at,
+                    json.dumps(session.payload, default=str),
+                ),
+            )
+        return session
+
+    def get(
+        self, kind: SessionKind, session_id: str, base_url: str = "", scs_as_id: str = ""
+    ) -> StoredSession | None:
+        sessions = self._select(_KEY, self._key(base_url, scs_as_id, kind, session_id), "rowid")
+        return sessions[0] if sessions else None
+
+    def extend(
+        self,
+        kind: SessionKind,
+        session_id: str,
+        additional: float,
+        payload: Dict | None = None,
+        base_url: str = "",
+        scs_as_id: str = "",
+    ) -> StoredSession | None:
+        """
+        Pushes back the expiry of a session by additional seconds, replacing
+        its payload if given.
+
+        returns:
+            the updated entry, None if the session is not stored.
+        """
+        with self._connection() as connection:
+            connection.execute(
+                "UPDATE sessions SET expires_at = expires_at + ?, "
+                f"payload = COALESCE(?, payload) WHERE {_KEY}",
+                (
+                    additional,
+                    None if payload is None else json.dumps(payload, default=str),
+                    *self._key(base_url, scs_as_id, kind, session_id),
+                ),
+            )
+        return self.get(kind, session_id, base_url, scs_as_id)
+
+    def set_status(
+        self,
+        session_id: str,
+        status: schemas.QosStatus,
+        status_info: schemas.StatusInfo | None = None,
+        base_url: str = "",
+        scs_as_id: str = "",
+    ) -> bool:
+        """
+        Updates the qosStatus and statusInfo of a stored QoD session.
+
+        returns:
+            whether the session is stored.
+        """
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "UPDATE sessions SET payload = json_set(payload, '$.qosStatus', ?, "
+                f"'$.statusInfo', ?) WHERE {_KEY}",
+                (
+                    schemas.QosStatus(status).value,
+                    None if status_info is None else schemas.StatusInfo(status_info).value,
+                    *self._key(base_url, scs_as_id, SessionKind.qod, session_id),
+                ),
+            )
+        return cursor.rowcount > 0
+
+    def remove(
+        self, kind: SessionKind, session_id: str, base_url: str = "", scs_as_id: str = ""
+    ) -> bool:
+        """Forgets a session; returns whether it was stored."""
+        with self._connection() as connection:
+            cursor = connection.execute(
+                f"DELETE FROM sessions WHERE {_KEY}",
+                self._key(base_url, scs_as_id, kind, session_id),
+            )
+        return cursor.rowcount > 0
+
+    def sessions(
+        self,
+        kind: SessionKind | None = None,
+        include_expired: bool = False,
+        base_url: str | None = None,
+        scs_as_id: str | None = None,
+    ) -> list[StoredSession]:
+        """
+        Stored sessions, by creation time, e.g. to recover them on restart.
+
+        args:
+            kind: only the sessions of this kind.
+            include_expired: also return the sessions past their expiry.
+            base_url: only the sessions of this NEF.
+            scs_as_id: only the sessions of this AF.
+        """
+        conditions, params = _scope(base_url, scs_as_id)
+        conditions = "1 = 1" + conditions
+        if kind is not None:
+            conditions += " AND kind = ?"
+            params.append(SessionKind(kind).value)
+        if not include_expired:
+            conditions += " AND (expires_at IS NULL OR expires_at > ?)"
+            params.append(self.clock())
+        return self._select(conditions, params, "created_at, rowid")
+
+    def by_device(
+        self,
+        ipv4: str | None = None,
+        ipv6: str | None = None,
+        phone: str | None = None,
+        include_expired: bool = False,
+        base_url: str | None = None,
+        scs_as_id: str | None = None,
+    ) -> list[StoredSession]:
+        """Stored sessions of the device with any of the given identifiers."""
+        matches, params = [], []
+        for column, value in (("ipv4", ipv4), ("ipv6", ipv6), ("phone", phone)):
+            if value is not None:
+                matches.append(f"{column} = ?")
+                params.append(str(value))
+        if not matches:
+            return []
+        scope, scope_params = _scope(base_url, scs_as_id)
+        conditions = f"({' OR '.join(matches)})" + scope
+        params.extend(scope_params)
+        if not include_expired:
+            conditions += " AND (expires_at IS NULL OR expires_at > ?)"
+            params.append(self.clock())
+        return self._select(conditions, params, "created_at, rowid")
+
+    def expiring_before(
+        self, deadline: float, base_url: str | None = None, scs_as_id: str | None = None
+    ) -> list[StoredSession]:
+        """Sessions whose expiry is before deadline (wall clock), soonest first."""
+        scope, params = _scope(base_url, scs_as_id)
+        return self._select("expires_at < ?" + scope, [deadline, *params], "expires_at")
+
+    def purge_expired(self) -> int:
+        """Removes the expired sessions; returns how many were removed."""
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "DELETE FROM sessions WHERE expires_at <= ?", (self.clock(),)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+import pytest
+
+from sunrise6g_opensdk.common.idempotency import (
+    IdempotencyKeyConflict,
+    MemoryIdempotencyStore,
+    SqliteIdempotencyStore,
+    fingerprint,
+)
+from sunrise6g_opensdk.edgecloud.core.utils import build_custom_http_response
+from sunrise6g_opensdk.network.adapters.oai.client import NetworkManager as OaiClient
+from sunrise6g_opensdk.network.core import common
+
+TI_INFO = {
+    "device": {"ipv4Address": {"publicAddress": "12.1.2.31", "privateAddress": "12.1.2.31"}},
+    "edgeCloudZoneId": "edge",
+    "appId": "testSdk-ffff-aaaa-c0ffe",
+    "appInstanceId": "172.21.18.3",
+    "notificationUri": "https://endpoint.example.com/sink",
+}
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, body):
+        self.calls += 1
+        return {"id": self.calls, **body}
+
+
+def test_memory_store_replays_results():
+    store, create = MemoryIdempotencyStore(), Counter()
+    first = store.call("key", create, {"name": "a"})
+    first["id"] = "modified by the caller"
+    assert store.call("key", create, {"name": "a"}) == {"id": 1, "name": "a"}
+    assert create.calls == 1
+    with pytest.raises(IdempotencyKeyConflict):
+        store.call("key", create, {"name": "b"})
+
+
+def test_failures_are_not_stored():
+    store = MemoryIdempotencyStore()
+    failed = build_custom_http_response(503, {"error": "busy"})
+    assert store.call("key", lambda: failed) is failed
+    assert store.call("key", lambda: "created") == "created"
+
+    def fail():
+        raise RuntimeError("timeout")
+
+    with pytest.raises(RuntimeError):
+        store.call("other", fail)
+    assert len(store) == 1
+
+
+def test_memory_store_bounds_and_ttl():
+    now = [0.0]
+    store = MemoryIdempotencyStore(max_entries=2, ttl=10, clock=lambda: now[0])
+    create = Counter()
+    for key in ("a", "b", "c"):
+        store.call(key, create, {})
+    assert len(store) == 2
+    store.call("a", create, {})
+    assert create.calls == 4
+    now[0] = 20
+    store.call("c", create, {})
+    assert create.calls == 5
+
+
+def test_sqlite_store_is_shared(tmp_path):
+    path = str(tmp_path / "keys.db")
+    create = Counter()
+    first = SqliteIdempotencyStore(path).call("key", create, {"name": "a"})
+    # Another process opening the same file
+    assert SqliteIdempotencyStore(path).call("key", create, {"name": "a"}) == first
+    assert create.calls == 1
+
+    store = SqliteIdempotencyStore(path, max_entries=2)
+    for key in ("b", "c", "d"):
+        store.call(key, create, {})
+    assert len(store) == 2
+
+
+def test_traffic_influence_retry_does_not_create_a_duplicate(monkeypatch):
+    posts = []
+
+    def traffic_influence_post(*args, **kwargs):
+        posts.append(args)
+        return {"self": f"ti-{len(posts)}"}
+
+    monkeypatch.setattr(common, "traffic_influence_post", traffic_influence_post)
+    client = OaiClient(base_url="http://test-oai.url", scs_as_id="scs")
+    info = dict(TI_INFO)
+    first = client.create_traffic_influence_resource(info, idempotency_key="req-1")
+    retry = client.create_traffic_influence_resource(info, idempotency_key="req-1")
+    other = client.create_traffic_influence_resource(dict(TI_INFO), idempotency_key="req-2")
+
+    assert first["trafficInfluenceID"] == retry["trafficInfluenceID"] == "ti-1"
+    assert other["trafficInfluenceID"] == "ti-2"
+    assert len(posts) == 2
+
+
+def test_sqlite_store_reserves_keys_across_processes(tmp_path):
+    path = str(tmp_path / "keys.db")
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_create(body):
+        calls.append(body)
+        started.set()
+        release.wait(5)
+        return {"id": len(calls)}
+
+    results = []
+    # Two stores on the same file do not share a SingleFlight, as two processes
+    first = threading.Thread(
+        target=lambda: results.append(SqliteIdempotencyStore(path).call("key", slow_create, "a"))
+    )
+    first.start()
+    started.wait(5)
+    second = threading.Thread(
+        target=lambda: results.append(
+            SqliteIdempotencyStore(path, poll_interval=0.01).call("key", slow_create, "a")
+        )
+    )
+    second.start()
+    time.sleep(0.1)
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert results == [{"id": 1}, {"id": 1}] and len(calls) == 1
+
+
+def test_sqlite_store_takes_over_abandoned_reservations_and_forgets(tmp_path):
+    path = str(tmp_path / "keys.db")
+    now = [1000.0]
+    store = SqliteIdempotencyStore(path, lease=60, clock=lambda: now[0], sleep=lambda d: None)
+    # Reservation of a process that crashed during its call
+    assert store._reserve("key", fingerprint({"name": "a"})) is None
+    now[0] += 61
+    create = Counter()
+    assert store.call("key", create, {"name": "a"})["id"] == 1
+
+    store.forget("key")
+    assert store.call("key", create, {"name": "a"})["id"] == 2
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from sunrise6g_opensdk.common import rate_limit
+from sunrise6g_opensdk.common.rate_limit import AdmissionTimeout, Priority, RateLimiter
+
+NEF = "http://nef:8080"
+QOS_URL = f"{NEF}/3gpp-as-session-with-qos/v1/myNetApp/subscriptions"
+
+
+def test_unconfigured_backends_are_not_limited():
+    limiter = RateLimiter()
+    assert limiter.acquire("http://i2edge/zones") == 0
+    assert limiter.metrics() == {}
+
+
+def test_burst_then_sustained_rate():
+    limiter = RateLimiter()
+    limiter.configure(NEF, rate=50, burst=3)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire(QOS_URL)
+    elapsed = time.monotonic() - start
+    # 3 immediate tokens, then one every 20 ms
+    assert 0.05 <= elapsed < 0.5
+    metrics = limiter.metrics()[(NEF, None)]
+    assert metrics.admitted == 6 and metrics.queue_depth == 0 and metrics.max_wait > 0
+
+
+def test_scs_as_id_limit_only_applies_to_its_urls():
+    limiter = RateLimiter()
+    limiter.configure(NEF, rate=0.1, burst=1, scs_as_id="myNetApp", max_wait=0.05)
+    limiter.acquire(QOS_URL)
+    limiter.acquire(f"{NEF}/3gpp-as-session-with-qos/v1/otherApp/subscriptions")
+    with pytest.raises(AdmissionTimeout):
+        limiter.acquire(QOS_URL)
+    assert limiter.metrics()[(NEF, "myNetApp")].timed_out == 1
+
+
+def test_limits_match_on_origin_and_whole_path_segments():
+    limiter = RateLimiter()
+    limiter.configure(f"{NEF}/api", rate=0.1, burst=1, max_wait=0)
+    limiter.acquire(f"{NEF}/api/sessions")
+    for url in (f"{NEF}/api2/sessions", "http://nef:8080.evil/api/x", "https://nef:8080/api/x"):
+        assert limiter.acquire(url) == 0
+    with pytest.raises(AdmissionTimeout):
+        limiter.acquire(f"{NEF}/api")
+    # Default ports are equivalent
+    limiter.configure("http://nef", rate=0.1, burst=1, max_wait=0)
+    limiter.acquire("http://NEF:80/x")
+    with pytest.raises(AdmissionTimeout):
+        limiter.acquire("http://nef/x")
+
+
+def test_tokens_are_refunded_when_a_narrower_limit_times_out():
+    limiter = RateLimiter()
+    limiter.configure(NEF, rate=0.1, burst=2)
+    limiter.configure(NEF, rate=0.1, burst=1, scs_as_id="myNetApp", max_wait=0.01)
+    limiter.acquire(QOS_URL)
+    with pytest.raises(AdmissionTimeout):
+        limiter.acquire(QOS_URL)
+    # The broad token taken by the rejected call was given back
+    limiter.acquire(f"{NEF}/3gpp-as-session-with-qos/v1/otherApp/subscriptions", timeout=0)
+    assert limiter.metrics()[(NEF, None)].admitted == 2
+
+
+def test_interactive_calls_overtake_queued_bulk_calls():
+    limiter = RateLimiter()
+    limiter.configure(NEF, rate=20, burst=1)
+    limiter.acquire(QOS_URL)
+    order = []
+
+    def call(level, name):
+        limiter.acquire(QOS_URL, level)
+        order.append(name)
+
+    bulk = [threading.Thread(target=call, args=(Priority.bulk, f"bulk{i}")) for i in range(3)]
+    for thread in bulk:
+        thread.start()
+    time.sleep(0.01)
+    with rate_limit.priority(Priority.interactive):
+        interactive = threading.Thread(target=call, args=(None, "interactive"))
+        interactive.start()
+    for thread in bulk + [interactive]:
+        thread.join(5)
+    assert order[0] == "interactive"
+    assert sorted(order[1:]) == ["bulk0", "bulk1", "bulk2"]
+
+
+def test_async_and_threaded_callers_share_the_bucket():
+    limiter = RateLimiter()
+    limiter.configure(NEF, rate=40, burst=2)
+
+    async def main():
+        with rate_limit.priority(Priority.bulk):
+            return await asyncio.gather(*(limiter.acquire_async(QOS_URL) for _ in range(4)))
+
+    thread = threading.Thread(target=limiter.acquire, args=(QOS_URL,))
+    thread.start()
+    waits = asyncio.run(main())
+    thread.join(5)
+    assert len(waits) == 4
+    assert limiter.metrics()[(NEF, None)].admitted == 5
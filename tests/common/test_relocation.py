@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+import threading
+from datetime import datetime, timezone
+
+from sunrise6g_opensdk.common.relocation import (
+    RelocationOrchestrator,
+    ZoneGeoIndex,
+    parse_geolocation,
+)
+from sunrise6g_opensdk.edgecloud.core.instance_events import InstanceTracker
+from sunrise6g_opensdk.network.core import schemas
+
+NOW = datetime(2025, 6, 18, 12, 30, tzinfo=timezone.utc)
+ZONES = [
+    {"zoneId": "barcelona", "geolocation": "41.39,2.17"},
+    {"zoneId": "madrid", "geolocation": "40.42,-3.70"},
+    {"zoneId": "unplaced"},
+]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeEdge:
+    def __init__(self, failing_zones=(), gate=None):
+        self.failing_zones = set(failing_zones)
+        self.gate = gate
+        self.instances = {"app-1": {"appId": "app", "appInstanceId": "app-1", "zone": "barcelona"}}
+        self.log = []
+
+    def get_edge_cloud_zones(self):
+        return ZONES
+
+    def deploy_app(self, app_id, app_zones):
+        if self.gate is not None:
+            assert self.gate.wait(5)
+        zone = app_zones[0]["EdgeCloudZone"]["edgeCloudZoneId"]
+        instance_id = f"app-{len(self.log) + 2}"
+        self.instances[instance_id] = {"appId": app_id, "appInstanceId": instance_id, "zone": zone}
+        self.log.append(("deploy", zone))
+        return {"appInstanceId": instance_id}
+
+    def undeploy_app(self, app_instance_id):
+        self.log.append(("undeploy", self.instances.pop(app_instance_id)["zone"]))
+
+    def watch_app_instances(self, app_id=None, timeout=None):
+        tracker = InstanceTracker(app_id)
+        for instance in list(self.instances.values()):
+            status = "failed" if instance["zone"] in self.failing_zones else "ready"
+            event = tracker.update(dict(instance, status=status))
+            if event:
+                yield event
+
+
+class FakeNetwork:
+    def __init__(self):
+        self.puts = []
+
+    def put_traffic_influence_resource(self, resource_id, info):
+        self.puts.append((resource_id, info["edgeCloudZoneId"]))
+        return dict(info, trafficInfluenceID=resource_id)
+
+
+def _location(lat, lon):
+    area = {"areaType": "CIRCLE", "center": {"latitude": lat, "longitude": lon}, "radius": 50}
+    return schemas.Location(lastLocationTime=NOW, area=area)
+
+
+def _orchestrator(edge, **kwargs):
+    clock = Clock()
+    zones = ZoneGeoIndex.for_adapter(edge, positions={"valencia": (39.47, -0.38)}, clock=clock)
+    orchestrator = RelocationOrchestrator(edge, FakeNetwork(), zones, clock=clock, **kwargs)
+    ti = {"appId": "app", "appInstanceId": "10.0.0.1", "edgeCloudZoneId": "barcelona"}
+    orchestrator.add_group("fleet", "app", "app-1", "barcelona", ["tel:+1", "tel:+2"], {"ti-1": ti})
+    return orchestrator, clock
+
+
+def test_zone_geo_index():
+    assert parse_geolocation("41.39, 2.17") == (41.39, 2.17)
+    assert parse_geolocation("NOT_USED") is None and parse_geolocation("91,0") is None
+    zones = ZoneGeoIndex.for_adapter(FakeEdge(), positions={"valencia": (39.47, -0.38)})
+    assert len(zones) == 3
+    assert zones.nearest(40.0, -3.0)[0] == "madrid"
+    assert zones.nearest(39.5, -0.3)[0] == "valencia"
+
+
+def test_group_is_relocated_after_debounce():
+    edge = FakeEdge()
+    decisions = []
+    orchestrator, clock = _orchestrator(edge, debounce=30, on_decision=decisions.append)
+
+    assert orchestrator.update("tel:+1", _location(40.41, -3.71)) == "madrid"
+    # One device of two: the current zone wins the tie
+    assert orchestrator.group("fleet").candidate is None
+    orchestrator.update("tel:+2", _location(40.43, -3.69))
+    assert orchestrator.group("fleet").candidate == "madrid"
+
+    clock.now += 10
+    assert orchestrator.poll() == 0 and edge.log == []
+    clock.now += 25
+    assert orchestrator.poll() == 1
+    assert orchestrator.join(5)
+
+    assert edge.log == [("deploy", "madrid"), ("undeploy", "barcelona")]
+    assert orchestrator.network.puts == [("ti-1", "madrid")]
+    group = orchestrator.group("fleet")
+    assert (group.zone_id, group.app_instance_id) == ("madrid", "app-2")
+    (decision,) = decisions
+    assert decision.ok and decision.decision_latency == 35
+    assert orchestrator.latency_summary()["count"] == 1
+
+
+def test_moving_back_cancels_relocation_and_predeployment():
+    edge = FakeEdge()
+    orchestrator, clock = _orchestrator(edge, debounce=30, predeploy=True)
+    for device in ("tel:+1", "tel:+2"):
+        orchestrator.update(device, _location(40.42, -3.70))
+    orchestrator.join(5)
+    assert edge.log == [("deploy", "madrid")]
+
+    clock.now += 10
+    orchestrator.update("tel:+1", _location(41.39, 2.17))
+    clock.now += 60
+    assert orchestrator.poll() == 0
+    orchestrator.join(5)
+    assert edge.log == [("deploy", "madrid"), ("undeploy", "madrid")]
+    assert orchestrator.group("fleet").zone_id == "barcelona"
+
+
+def test_failed_relocation_keeps_the_group():
+    edge = FakeEdge(failing_zones=["valencia"])
+    decisions = []
+    orchestrator, clock = _orchestrator(
+        edge, debounce=0, retry_backoff=60, on_decision=decisions.append
+    )
+    for device in ("tel:+1", "tel:+2"):
+        orchestrator.update(device, _location(39.47, -0.38))
+    orchestrator.join(5)
+
+    assert edge.log == [("deploy", "valencia"), ("undeploy", "valencia")]
+    assert orchestrator.network.puts == []
+    assert orchestrator.group("fleet").app_instance_id == "app-1"
+    assert not decisions[0].ok and "failed" in decisions[0].error
+
+    # The failed zone is not retried before its backoff is over
+    orchestrator.update("tel:+1", _location(39.48, -0.37))
+    clock.now += 30
+    assert orchestrator.poll() == 0
+    orchestrator.join(5)
+    assert len(edge.log) == 2
+
+    clock.now += 31
+    assert orchestrator.poll() == 1
+    orchestrator.join(5)
+    assert edge.log[2:] == [("deploy", "valencia"), ("undeploy", "valencia")]
+    # Doubled after a second consecutive failure
+    assert orchestrator.group("fleet").backoff[1] == clock.now + 120
+
+
+def test_updates_do_not_wait_for_relocations():
+    gate = threading.Event()
+    edge = FakeEdge(gate=gate)
+    orchestrator, _ = _orchestrator(edge, debounce=0)
+    for device in ("tel:+1", "tel:+2"):
+        orchestrator.update(device, _location(40.42, -3.70))
+    assert orchestrator.group("fleet").relocating
+
+    # The deployment is blocked, but locations are still processed
+    assert orchestrator.update("tel:+1", _location(41.39, 2.17)) == "barcelona"
+    assert not orchestrator.join(0.05)
+    gate.set()
+    assert orchestrator.join(5)
+    assert edge.log == [("deploy", "madrid"), ("undeploy", "barcelona")]
+
+
+def test_stop_releases_the_worker_threads():
+    def workers():
+        return {t for t in threading.enumerate() if t.name.startswith("edge-relocation-worker")}
+
+    before = workers()
+    edge = FakeEdge()
+    orchestrator, _ = _orchestrator(edge, debounce=0)
+    for device in ("tel:+1", "tel:+2"):
+        orchestrator.update(device, _location(40.42, -3.70))
+    assert orchestrator.join(5)
+
+    started = workers() - before
+    assert started
+    orchestrator.stop()
+    for thread in started:
+        thread.join(5)
+    assert not any(thread.is_alive() for thread in started)
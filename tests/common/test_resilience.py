@@ -0,0 +1,110 @@
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from sunrise6g_opensdk.common.resilience import CircuitOpenError, ResiliencePolicy
+
+
+def _response(status: int, headers: dict | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = b"{}"
+    return response
+
+
+class _Session:
+    """Returns (or raises) the scripted outcomes in order."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _policy(**kwargs) -> tuple[ResiliencePolicy, list]:
+    sleeps = []
+    return ResiliencePolicy(sleep=sleeps.append, **kwargs), sleeps
+
+
+def test_idempotent_requests_are_retried_with_bounded_backoff():
+    policy, sleeps = _policy(max_attempts=3, backoff_base=0.5)
+    session = _Session(requests.exceptions.ConnectionError(), _response(503), _response(200))
+
+    response = policy.request("GET", "http://nef:8080/qos", session=session)
+
+    assert response.status_code == 200
+    assert len(session.calls) == 3
+    assert 0 <= sleeps[0] <= 0.5 and 0 <= sleeps[1] <= 1.0
+
+
+def test_post_is_only_retried_when_not_processed():
+    policy, _ = _policy(max_attempts=3)
+    session = _Session(_response(503))
+    assert policy.request("POST", "http://nef/qos", session=session).status_code == 503
+
+    session = _Session(_response(429, {"Retry-After": "2"}), _response(201))
+    policy, sleeps = _policy(max_attempts=3)
+    assert policy.request("POST", "http://nef/qos", session=session).status_code == 201
+    assert sleeps == [2.0]
+
+    session = _Session(requests.exceptions.ReadTimeout())
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        policy.request("POST", "http://nef/qos", session=session)
+
+
+def test_post_is_retried_when_the_connection_is_refused():
+    refused = MaxRetryError(None, "http://nef/qos", NewConnectionError(None, "refused"))
+    session = _Session(requests.exceptions.ConnectionError(refused), _response(201))
+    policy, _ = _policy(max_attempts=3)
+    assert policy.request("POST", "http://nef/qos", session=session).status_code == 201
+
+    # A connection dropped after sending may have been processed
+    aborted = requests.exceptions.ConnectionError(ProtocolError("Connection aborted"))
+    session = _Session(aborted, _response(201))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        policy.request("POST", "http://nef/qos", session=session)
+
+
+def test_long_retry_after_is_not_waited_for():
+    policy, sleeps = _policy(max_retry_after=10)
+    session = _Session(_response(503, {"Retry-After": "120"}))
+    assert policy.request("GET", "http://nef/qos", session=session).status_code == 503
+    assert sleeps == []
+
+
+def test_circuit_opens_fails_fast_and_recovers_after_probe():
+    clock = _Clock()
+    policy, _ = _policy(max_attempts=1, failure_threshold=2, reset_timeout=30, clock=clock)
+    session = _Session(_response(500), _response(500), _response(500), _response(200))
+
+    for _ in range(2):
+        policy.request("GET", "http://nef/a", session=session)
+    with pytest.raises(CircuitOpenError):
+        policy.request("GET", "http://nef/b", session=session)
+    assert len(session.calls) == 2
+    # Other endpoints are not affected
+    other = _Session(_response(200))
+    assert policy.request("GET", "http://i2edge/zones", session=other).status_code == 200
+
+    clock.now = 31
+    policy.request("GET", "http://nef/a", session=session)  # failed probe reopens
+    with pytest.raises(CircuitOpenError):
+        policy.request("GET", "http://nef/a", session=session)
+    clock.now = 62
+    assert policy.request("GET", "http://nef/a", session=session).status_code == 200
+    assert policy.breaker("http://nef/a").state == "closed"
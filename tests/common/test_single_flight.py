@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+
+import pytest
+
+from sunrise6g_opensdk.common.single_flight import single_flight
+
+
+def test_concurrent_threads_share_one_call():
+    release = threading.Event()
+    calls = []
+
+    @single_flight()
+    def fetch(url, params=None):
+        calls.append(url)
+        release.wait(5)
+        return {"url": url}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(fetch("http://zones", {"a": [1]})))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    while fetch.flights.shared < 9:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["http://zones"]
+    assert all(result is results[0] for result in results)
+    # Nothing is cached once the call completed
+    fetch("http://zones", {"a": [1]})
+    assert len(calls) == 2
+
+
+def test_errors_are_shared_and_different_keys_are_not_coalesced():
+    barrier = threading.Barrier(2, timeout=5)
+
+    @single_flight()
+    def fetch(key):
+        barrier.wait()
+        raise RuntimeError(key)
+
+    errors = []
+
+    def run(key):
+        try:
+            fetch(key)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=run, args=(key,)) for key in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(errors) == ["a", "b"]
+
+
+def test_asyncio_callers_share_one_call():
+    calls = []
+
+    @single_flight()
+    async def fetch(session_id):
+        calls.append(session_id)
+        await asyncio.sleep(0.01)
+        return {"id": session_id}
+
+    @single_flight()
+    def fetch_sync(session_id):
+        calls.append(session_id)
+        threading.Event().wait(0.05)
+        return {"id": session_id}
+
+    async def scenario():
+        first = await asyncio.gather(*(fetch("s1") for _ in range(5)))
+        second = await asyncio.gather(*(fetch_sync.aio("s2") for _ in range(5)))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert calls == ["s1", "s2"]
+    assert all(result is first[0] for result in first)
+    assert all(result is second[0] for result in second)
+
+
+def test_async_errors_propagate_to_all_waiters():
+    @single_flight()
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(*(fetch() for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    with pytest.raises(ValueError):
+        asyncio.run(fetch())
+
+
+def test_cancelling_the_first_caller_does_not_cancel_the_others():
+    calls = []
+
+    @single_flight()
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "zones"
+
+    async def scenario():
+        first = asyncio.ensure_future(fetch())
+        await asyncio.sleep(0)
+        others = [asyncio.ensure_future(fetch()) for _ in range(2)]
+        await asyncio.sleep(0)
+        first.cancel()
+        return await asyncio.gather(first, *others, return_exceptions=True)
+
+    first, *others = asyncio.run(scenario())
+    assert isinstance(first, asyncio.CancelledError)
+    assert others == ["zones", "zones"] and calls == [1]
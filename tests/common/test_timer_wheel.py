@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import random
+
+from sunrise6g_opensdk.common.timer_wheel import TimerWheel
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_timers_fire_in_deadline_order_across_levels():
+    clock = FakeClock()
+    wheel = TimerWheel(tick=1.0, clock=clock)
+    fired = []
+    delays = [1, 5, 63, 64, 65, 4095, 4096, 4097, 300000, 20_000_000]
+    for delay in reversed(delays):
+        wheel.schedule(clock.now + delay, fired.append, delay)
+
+    for delay in delays:
+        clock.now = 1000.0 + delay - 1
+        wheel.advance()
+        assert delay not in fired
+        clock.now = 1000.0 + delay
+        wheel.advance()
+        assert fired[-1] == delay
+    assert fired == delays
+    assert len(wheel) == 0
+
+
+def test_cancel_is_idempotent():
+    clock = FakeClock()
+    wheel = TimerWheel(clock=clock)
+    fired = []
+    handle = wheel.schedule_in(10, fired.append, "a")
+    wheel.schedule_in(10, fired.append, "b")
+    assert wheel.cancel(handle)
+    assert not wheel.cancel(handle)
+    assert len(wheel) == 1
+    assert wheel.advance(clock.now + 10) == 1
+    assert fired == ["b"]
+
+
+def test_past_deadlines_fire_on_next_advance():
+    clock = FakeClock()
+    wheel = TimerWheel(clock=clock)
+    fired = []
+    wheel.schedule(clock.now - 100, fired.append, "late")
+    assert wheel.advance(clock.now + 1) == 1
+    assert fired == ["late"]
+
+
+def test_randomised_deadlines_fire_exactly_once():
+    clock = FakeClock(0.0)
+    wheel = TimerWheel(tick=0.5, levels=3, clock=clock)
+    rng = random.Random(7)
+    fired = []
+    deadlines = [rng.uniform(0, 200_000) for _ in range(5000)]
+    for deadline in deadlines:
+        wheel.schedule(deadline, fired.append, deadline)
+    for now in range(0, 200_001, 997):
+        wheel.advance(now)
+        assert all(d <= now + 0.5 for d in fired)
+    wheel.advance(200_001)
+    assert sorted(fired) == sorted(deadlines)
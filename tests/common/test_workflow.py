@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+
+from sunrise6g_opensdk.common import idempotency
+from sunrise6g_opensdk.common.workflow import (
+    COMPENSATED,
+    SKIPPED,
+    SUCCEEDED,
+    FileWorkflowStore,
+    Step,
+    Workflow,
+    WorkflowError,
+    WorkflowExecutor,
+    onboarding_workflow,
+)
+
+
+class FakeEdge:
+    idempotency_store = None
+
+    def __init__(self):
+        self.calls = []
+
+    def onboard_app(self, app_manifest, idempotency_key=None):
+        if idempotency_key is not None:
+            return idempotency.call(
+                self, "onboard_app", idempotency_key, self.onboard_app, app_manifest
+            )
+        self.calls.append("onboard")
+        return {"appId": app_manifest["appId"]}
+
+    def delete_onboarded_app(self, app_id):
+        self.calls.append("delete")
+
+    def deploy_app(self, app_id, app_zones, idempotency_key=None):
+        if idempotency_key is not None:
+            return idempotency.call(
+                self, "deploy_app", idempotency_key, self.deploy_app, app_id, app_zones
+            )
+        self.calls.append("deploy")
+        return {"appInstanceId": "instance-1"}
+
+    def undeploy_app(self, app_instance_id):
+        self.calls.append("undeploy")
+
+
+class FakeNetwork:
+    idempotency_store = None
+
+    def __init__(self, failing_ti=0, failing_qod=False):
+        self.failing_ti = failing_ti
+        self.failing_qod = failing_qod
+        self.calls = []
+
+    def create_traffic_influence_resource(self, info, idempotency_key=None):
+        if idempotency_key is not None:
+            return idempotency.call(
+                self,
+                "create_traffic_influence_resource",
+                idempotency_key,
+                self.create_traffic_influence_resource,
+                info,
+            )
+        if self.failing_ti:
+            self.failing_ti -= 1
+            raise RuntimeError("NEF unavailable")
+        self.calls.append(("ti", info["appId"], info["appInstanceId"]))
+        return dict(info, trafficInfluenceID="http://nef:8000/af/subscriptions/ti-1")
+
+    def delete_traffic_influence_resource(self, resource_id):
+        self.calls.append(("delete-ti", resource_id))
+
+    def create_qod_session(self, info, idempotency_key=None):
+        if idempotency_key is not None:
+            return idempotency.call(
+                self, "create_qod_session", idempotency_key, self.create_qod_session, info
+            )
+        if self.failing_qod:
+            raise RuntimeError("QoD profile unavailable")
+        self.calls.append(("qod",))
+        return dict(info, sessionId="session-1")
+
+    def delete_qod_session(self, session_id):
+        self.calls.append(("delete-qod", session_id))
+
+
+def _workflow(edge, network, **kwargs):
+    return onboarding_workflow(
+        edge,
+        network,
+        {"appId": "app"},
+        [{"EdgeCloudZone": {"edgeCloudZoneId": "zone"}}],
+        traffic_influences=[{"edgeCloudZoneId": "zone"}],
+        qod_sessions=[{"duration": 60}],
+        **kwargs,
+    )
+
+
+def test_invalid_workflows_are_rejected():
+    with pytest.raises(WorkflowError):
+        Workflow([Step("a", print, depends_on=["b"])])
+    with pytest.raises(WorkflowError):
+        Workflow([Step("a", print, depends_on=["b"]), Step("b", print, depends_on=["a"])])
+
+
+def test_independent_steps_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    workflow = Workflow(
+        [
+            Step("a", lambda results: barrier.wait()),
+            Step("b", lambda results: barrier.wait()),
+            Step("c", lambda results: sorted(results), depends_on=["a", "b"]),
+        ]
+    )
+    run = WorkflowExecutor(max_workers=2).run(workflow)
+    assert run.ok and run.results["c"] == ["a", "b"]
+    assert all(duration is not None for duration in run.timings().values())
+
+
+def test_onboarding_with_retries():
+    edge, network = FakeEdge(), FakeNetwork(failing_ti=1)
+    run = WorkflowExecutor(sleep=lambda delay: None).run(_workflow(edge, network))
+
+    assert run.ok
+    assert edge.calls == ["onboard", "deploy"]
+    assert ("ti", "app", "instance-1") in network.calls
+    assert run.records["traffic-influence-0"].attempts == 2
+
+
+def test_failure_compensates_and_resume_skips_done_steps(tmp_path):
+    store = FileWorkflowStore(str(tmp_path))
+    edge, network = FakeEdge(), FakeNetwork(failing_ti=2)
+    executor = WorkflowExecutor(store=store, sleep=lambda delay: None)
+
+    run = executor.run(_workflow(edge, network, retries=1), "run-1")
+    assert run.state == COMPENSATED
+    assert edge.calls == ["onboard", "deploy", "undeploy", "delete"]
+    assert ("delete-qod", "session-1") in network.calls
+    assert store.load("run-1").state == COMPENSATED
+
+    # Without compensation, a resumed run only redoes what did not succeed
+    edge, network = FakeEdge(), FakeNetwork(failing_ti=2)
+    workflow = _workflow(edge, network, retries=1)
+    for step in workflow.steps.values():
+        step.compensate = None
+    run = executor.run(workflow, "run-2")
+    assert run.records["traffic-influence-0"].state == "failed"
+    assert store.load("run-2").records["deploy"].state == SUCCEEDED
+
+    run = executor.run(workflow, "run-2")
+    assert run.ok
+    assert edge.calls == ["onboard", "deploy"]
+    assert [call[0] for call in network.calls] == ["qod", "ti"]
+
+
+def test_traffic_influence_is_deleted_by_its_nef_resource_id():
+    edge, network = FakeEdge(), FakeNetwork(failing_qod=True)
+    run = WorkflowExecutor(sleep=lambda delay: None).run(_workflow(edge, network, retries=0))
+    assert run.state == COMPENSATED
+    assert ("delete-ti", "ti-1") in network.calls
+
+
+def test_dependants_of_failed_step_are_skipped():
+    def fail(results):
+        raise RuntimeError("boom")
+
+    workflow = Workflow([Step("a", fail), Step("b", lambda results: 1, depends_on=["a"])])
+    run = WorkflowExecutor().run(workflow)
+    assert not run.ok and run.records["b"].state == SKIPPED
+    assert "boom" in run.error
+
+
+def test_compensation_forgets_idempotency_keys(tmp_path):
+    executor = WorkflowExecutor(store=FileWorkflowStore(str(tmp_path)), sleep=lambda delay: None)
+    edge, network = FakeEdge(), FakeNetwork(failing_ti=2)
+    workflow = _workflow(edge, network, retries=1, idempotency_prefix="run-1")
+    assert executor.run(workflow, "run-1").state == COMPENSATED
+
+    # Resuming the compensated run recreates what was undone
+    network.failing_ti = 0
+    assert executor.run(workflow, "run-1").ok
+    assert edge.calls == ["onboard", "deploy", "undeploy", "delete", "onboard", "deploy"]
+    assert network.calls.count(("qod",)) == 2
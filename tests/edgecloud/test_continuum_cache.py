@@ -0,0 +1,130 @@
+import threading
+
+from sunrise6g_opensdk.edgecloud.adapters.aeros import client as aeros_client
+from sunrise6g_opensdk.edgecloud.adapters.aeros import config, continuum_client
+from sunrise6g_opensdk.edgecloud.adapters.aeros.continuum_cache import (
+    DOMAIN,
+    INFRASTRUCTURE_ELEMENT,
+    ContinuumCache,
+)
+
+
+class FakeBroker:
+    def __init__(self, domains, ies):
+        self.entities = {DOMAIN: domains, INFRASTRUCTURE_ELEMENT: ies}
+        self.subscriptions = {}
+        self.queries = 0
+
+    def create_subscription(self, entity_type, notification_uri, **kwargs):
+        subscription_id = f"sub-{entity_type}"
+        self.subscriptions[subscription_id] = notification_uri
+        return subscription_id
+
+    def delete_subscription(self, subscription_id):
+        del self.subscriptions[subscription_id]
+
+    def query_entities(self, ngsild_params):
+        self.queries += 1
+        entity_type = ngsild_params.split("&")[0].split("=")[1]
+        return [dict(entity) for entity in self.entities[entity_type]]
+
+
+class FakeReceiver:
+    def __init__(self):
+        self.handlers = {}
+
+    def register(self, key, handler):
+        self.handlers[key] = handler
+
+    def unregister(self, key):
+        del self.handlers[key]
+
+    def url_for(self, key):
+        return key
+
+    def notify(self, broker, entity_type, entities):
+        self.handlers[broker.subscriptions[f"sub-{entity_type}"]](entities)
+
+
+def _ie(ie_id, domain, ram=1024):
+    return {"id": ie_id, "domain": domain, "cpuCores": 4, "availableRam": ram}
+
+
+def test_cache_follows_notifications_without_querying_again():
+    broker = FakeBroker(
+        [{"id": "d1", "domainStatus": "urn:ngsi-ld:DomainStatus:Functional"}],
+        [_ie("ie1", "d1"), _ie("ie2", "d1")],
+    )
+    receiver, changes = FakeReceiver(), []
+    cache = ContinuumCache(
+        broker, receiver, resync_interval=None, on_change=lambda *c: changes.append(c)
+    ).start()
+    assert broker.queries == 2 and len(cache.infrastructure_elements("d1")) == 2
+
+    # Partial update merged into the stored entity, then an IE moving domains
+    receiver.notify(broker, INFRASTRUCTURE_ELEMENT, [{"id": "ie1", "availableRam": 512}])
+    assert cache.infrastructure_elements("d1")[0] == _ie("ie1", "d1", ram=512)
+    receiver.notify(broker, INFRASTRUCTURE_ELEMENT, [{"id": "ie2", "domain": "d2"}])
+    assert [ie["id"] for ie in cache.infrastructure_elements("d2")] == ["ie2"]
+    assert len(changes) == 3 + 2 and broker.queries == 2
+
+    cache.stop()
+    assert broker.subscriptions == {} and receiver.handlers == {}
+
+
+def test_resync_drops_entities_deleted_from_the_broker():
+    now = [0.0]
+    broker = FakeBroker([{"id": "d1"}], [_ie("ie1", "d1"), _ie("ie2", "d1")])
+    cache = ContinuumCache(broker, FakeReceiver(), resync_interval=60, clock=lambda: now[0])
+    cache.start()
+
+    broker.entities[INFRASTRUCTURE_ELEMENT] = [_ie("ie2", "d1")]
+    assert len(cache.infrastructure_elements("d1")) == 2
+    now[0] = 61
+    assert [ie["id"] for ie in cache.infrastructure_elements("d1")] == ["ie2"]
+
+
+def test_zone_details_readers_trigger_the_resync(monkeypatch):
+    broker = FakeBroker([{"id": "d1"}], [_ie("ie1", "d1"), _ie("ie2", "d1")])
+    monkeypatch.setattr(aeros_client, "ContinuumClient", lambda base_url: broker)
+    client = aeros_client.EdgeApplicationManager("http://aeros")
+    monkeypatch.setattr(client, "_get_notification_receiver", FakeReceiver)
+    client.start_continuum_cache(resync_interval=0)
+
+    before = client.get_edge_cloud_zones_details("d1")
+    broker.entities[INFRASTRUCTURE_ELEMENT] = [_ie("ie2", "d1")]
+    queries = broker.queries
+    assert client.get_edge_cloud_zones_details("d1") != before
+    assert broker.queries == queries + 2
+    client.stop_continuum_cache()
+
+
+def test_queries_with_different_tokens_are_not_coalesced(monkeypatch):
+    both_sent = threading.Barrier(2, timeout=5)
+    tokens = []
+
+    class Reply:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return []
+
+    def request(method, url, headers=None, timeout=None):
+        tokens.append(headers["Authorization"])
+        both_sent.wait()
+        return Reply()
+
+    monkeypatch.setattr(continuum_client.resilience, "request", request)
+    clients = []
+    for token in ("token-a", "token-b"):
+        monkeypatch.setattr(config, "aerOS_ACCESS_TOKEN", token)
+        clients.append(continuum_client.ContinuumClient("http://aeros"))
+    threads = [
+        threading.Thread(target=client.query_entities, args=("type=Domain",)) for client in clients
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert sorted(tokens) == ["Bearer token-a", "Bearer token-b"]
@@ -0,0 +1,114 @@
+import pytest
+
+from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
+from sunrise6g_opensdk.edgecloud.core.edgecloud_interface import (
+    EdgeCloudManagementInterface,
+)
+from sunrise6g_opensdk.edgecloud.core.federation import (
+    UNAVAILABLE_HEADER,
+    FederatedEdgeCloudClient,
+)
+from sunrise6g_opensdk.edgecloud.core.utils import build_custom_http_response
+
+
+class FakeProvider(EdgeCloudManagementInterface):
+    def __init__(self, zones, fail=False):
+        self.zones = zones
+        self.fail = fail
+        self.instances = {}
+
+    def get_edge_cloud_zones(self, region=None, status=None):
+        if self.fail:
+            raise EdgeCloudPlatformError("down")
+        return build_custom_http_response(200, [{"edgeCloudZoneId": z} for z in self.zones])
+
+    def deploy_app(self, app_id, app_zones):
+        zone = app_zones[0]["EdgeCloudZone"]["edgeCloudZoneId"]
+        instance_id = f"{app_id}@{zone}"
+        self.instances[instance_id] = zone
+        return {"appId": app_id, "appInstanceId": instance_id}
+
+    def get_all_deployed_apps(self, app_id=None, app_instance_id=None, region=None):
+        return [{"appId": i.split("@")[0], "appInstanceId": i} for i in self.instances]
+
+    def undeploy_app(self, app_instance_id):
+        del self.instances[app_instance_id]
+
+
+FakeProvider.__abstractmethods__ = frozenset()
+
+
+def _zone(zone_id, provider=None):
+    zone = {"edgeCloudZoneId": zone_id}
+    if provider is not None:
+        zone["edgeCloudProvider"] = provider
+    return {"EdgeCloudZone": zone}
+
+
+def test_zones_are_merged_and_tagged_by_provider():
+    federation = FederatedEdgeCloudClient(
+        {"i2edge": FakeProvider(["z1"]), "aeros": FakeProvider(["z2", "z3"])}
+    )
+    zones = federation.get_edge_cloud_zones().json()
+    assert sorted((z["edgeCloudZoneId"], z["edgeCloudProvider"]) for z in zones) == [
+        ("z1", "i2edge"),
+        ("z2", "aeros"),
+        ("z3", "aeros"),
+    ]
+
+
+def test_partial_failures_are_reported_and_total_failure_raises():
+    federation = FederatedEdgeCloudClient(
+        {"i2edge": FakeProvider(["z1"]), "k8s": FakeProvider(["z9"], fail=True)}
+    )
+    response = federation.get_edge_cloud_zones()
+    assert len(response.json()) == 1
+    assert response.headers[UNAVAILABLE_HEADER] == "k8s"
+
+    federation.providers["i2edge"].fail = True
+    with pytest.raises(EdgeCloudPlatformError):
+        federation.get_edge_cloud_zones()
+
+
+def test_writes_are_routed_to_the_owning_provider():
+    i2edge, aeros = FakeProvider(["z1"]), FakeProvider(["z2"])
+    federation = FederatedEdgeCloudClient({"i2edge": i2edge, "aeros": aeros})
+
+    instances = federation.deploy_app("app", [_zone("z1"), _zone("z2")]).json()
+    assert {i["edgeCloudProvider"] for i in instances} == {"i2edge", "aeros"}
+    assert list(i2edge.instances) == ["app@z1"] and list(aeros.instances) == ["app@z2"]
+
+    federation.undeploy_app("app@z2")
+    assert aeros.instances == {} and list(i2edge.instances) == ["app@z1"]
+
+    # A fresh federation rebuilds the index from the providers
+    other = FederatedEdgeCloudClient({"i2edge": i2edge, "aeros": aeros})
+    other.undeploy_app("app@z1")
+    assert i2edge.instances == {}
+    with pytest.raises(EdgeCloudPlatformError):
+        other.undeploy_app("app@z1")
+
+
+def test_zone_ids_listed_by_several_providers_need_the_provider():
+    i2edge, aeros = FakeProvider(["edge", "z1"]), FakeProvider(["edge"])
+    federation = FederatedEdgeCloudClient({"i2edge": i2edge, "aeros": aeros})
+
+    with pytest.raises(EdgeCloudPlatformError, match="several providers"):
+        federation.deploy_app("app", [_zone("edge")])
+    assert i2edge.instances == {} and aeros.instances == {}
+
+    (zone,) = [
+        z for z in federation.get_edge_cloud_zones().json() if z["edgeCloudProvider"] == "aeros"
+    ]
+    federation.deploy_app("app", [{"EdgeCloudZone": zone}])
+    assert list(aeros.instances) == ["app@edge"] and i2edge.instances == {}
+    with pytest.raises(EdgeCloudPlatformError):
+        federation.deploy_app("app", [{"EdgeCloudZone": dict(zone, edgeCloudProvider="k8s")}])
+
+
+def test_deployments_are_routed_by_provider_name():
+    # The same adapter object may serve two providers (e.g. two tenants)
+    shared = FakeProvider(["z1", "z2"])
+    federation = FederatedEdgeCloudClient({"a": shared, "b": shared})
+    federation.deploy_app("app", [_zone("z1", "a"), _zone("z2", "b")])
+    assert sorted(shared.instances) == ["app@z1", "app@z2"]
@@ -0,0 +1,85 @@
+import random
+
+from sunrise6g_opensdk.edgecloud.adapters.aeros import ie_table
+from sunrise6g_opensdk.edgecloud.adapters.aeros.ie_table import (
+    COLUMNS,
+    InfrastructureTable,
+    ie_flavour,
+    zone_details,
+)
+
+
+def _ie(i, domain, ram=4096):
+    return {
+        "id": f"urn:ngsi-ld:InfrastructureElement:{i}",
+        "domain": domain,
+        "hostname": f"host{i}",
+        "containerTechnology": "K8s",
+        "cpuArchitecture": "x64",
+        "operatingSystem": "Ubuntu",
+        "cpuCores": 4,
+        "ramCapacity": 8192,
+        "availableRam": ram,
+        "diskCapacity": 100,
+        "availableDisk": 60,
+    }
+
+
+def _recomputed(domain, elements):
+    totals = [sum(e[name] for e in elements) for name in COLUMNS]
+    return zone_details(domain, totals, [ie_flavour(e) for e in elements])
+
+
+def test_running_aggregates_match_a_full_recomputation():
+    rng = random.Random(7)
+    table, live = InfrastructureTable(), {}
+    for step in range(300):
+        i = rng.randrange(40)
+        element = _ie(i, rng.choice(["d1", "d2"]), ram=rng.randrange(0, 8192, 512))
+        if rng.random() < 0.3:
+            table.remove(element["id"])
+            live.pop(element["id"], None)
+        else:
+            table.upsert(element)
+            live[element["id"]] = element
+    assert len(table) == len(live)
+    for domain in ("d1", "d2"):
+        elements = [e for e in live.values() if e["domain"] == domain]
+        expected = _recomputed(domain, elements)
+        details = table.zone_details(domain)
+        assert details["reservedComputeResources"] == expected["reservedComputeResources"]
+        assert sorted(f["flavourId"] for f in details["flavoursSupported"]) == sorted(
+            f["flavourId"] for f in expected["flavoursSupported"]
+        )
+        assert table.totals(domain)["availableRam"] == sum(e["availableRam"] for e in elements)
+
+
+def test_details_are_cached_until_the_domain_changes_and_hosts_can_be_filtered(monkeypatch):
+    builds = []
+
+    def counted(domain, *args):
+        builds.append(domain)
+        return zone_details(domain, *args)
+
+    monkeypatch.setattr(ie_table, "zone_details", counted)
+    table = InfrastructureTable()
+    table.upsert(_ie(1, "d1", ram=1024))
+    table.upsert(_ie(2, "d1", ram=6144))
+    table.upsert(_ie(3, "d2", ram=8192))
+
+    details = table.zone_details("d1")
+    assert table.zone_details("d1") == details and builds == ["d1"]
+    table.upsert(_ie(3, "d2", ram=512))
+    table.zone_details("d1")
+    assert builds == ["d1"]
+    table.apply_change("InfrastructureElement", _ie(1, "d1"), None)
+    assert table.zone_details("d1") != details and builds == ["d1", "d1"]
+    assert table.zone_details("d1")["reservedComputeResources"][0]["numCPU"] == "4"
+
+    # Callers get copies: modifying one does not change the table
+    details = table.zone_details("d1")
+    details["reservedComputeResources"][0]["numCPU"] = "0"
+    assert table.zone_details("d1")["reservedComputeResources"][0]["numCPU"] == "4"
+
+    assert table.hosts_with(min_available_ram=4096) == ["urn:ngsi-ld:InfrastructureElement:2"]
+    assert table.hosts_with(domain="d2") == ["urn:ngsi-ld:InfrastructureElement:3"]
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+import requests
+
+from sunrise6g_opensdk.edgecloud.adapters.aeros.client import service_status
+from sunrise6g_opensdk.edgecloud.adapters.aeros.notifications import (
+    NotificationReceiver,
+)
+from sunrise6g_opensdk.edgecloud.core.instance_events import (
+    ADDED,
+    DELETED,
+    MODIFIED,
+    iterate_async,
+    poll_app_instances,
+)
+
+
+def _instance(instance_id, status, app_id="app"):
+    return {"appId": app_id, "appInstanceId": instance_id, "status": status}
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_polling_emits_only_changes_and_adapts_its_interval():
+    listings = iter(
+        [
+            [_instance("i1", "instantiating"), _instance("x", "ready", app_id="other")],
+            [_instance("i1", "instantiating")],
+            [_instance("i1", "ready")],
+            [_instance("i1", "ready")],
+            [_instance("i1", "ready")],
+            [],
+        ]
+    )
+    fake = FakeTime()
+    events = list(
+        poll_app_instances(
+            lambda: next(listings, []),
+            app_id="app",
+            timeout=20,
+            min_interval=1,
+            max_interval=8,
+            sleep=fake.sleep,
+            clock=fake.clock,
+        )
+    )
+    assert [(e.type, e.instance["status"]) for e in events] == [
+        (ADDED, "instantiating"),
+        (MODIFIED, "ready"),
+        (DELETED, "ready"),
+    ]
+    # Fast while instantiating or changing, backing off while stable
+    assert fake.sleeps[:6] == [1, 1, 1, 2, 4, 1]
+
+
+def test_async_iteration_runs_the_watch_in_a_thread():
+    async def collect():
+        return [event async for event in iterate_async(iter(["a", "b"]))]
+
+    assert asyncio.run(collect()) == ["a", "b"]
+
+
+def test_notifications_reach_the_handler_of_their_endpoint():
+    received = []
+    with NotificationReceiver("127.0.0.1", 0) as receiver:
+        receiver.register("k1", received.extend)
+        notification = {"type": "Notification", "data": [{"id": "c1", "status": "Running"}]}
+        assert requests.post(receiver.url_for("k1"), json=notification).status_code == 204
+        assert requests.post(receiver.url_for("k2"), json=notification).status_code == 404
+    assert received == [{"id": "c1", "status": "Running"}]
+
+
+def test_notification_receiver_needs_a_reachable_url():
+    with pytest.raises(ValueError):
+        NotificationReceiver("0.0.0.0", 8002)
+    with pytest.raises(ValueError):
+        NotificationReceiver("0.0.0.0", 0, public_url="http://203.0.113.5:8002")
+
+
+def test_service_status_aggregates_components():
+    assert service_status([]) == "instantiating"
+    assert service_status(["ready", "ready"]) == "ready"
+    assert service_status(["ready", "instantiating"]) == "instantiating"
+    assert service_status(["ready", "failed", "terminating"]) == "failed"
@@ -0,0 +1,152 @@
+import threading
+
+from kubernetes.client import ApiClient, V1ObjectMeta
+from kubernetes.client.rest import ApiException
+
+from sunrise6g_opensdk.edgecloud.adapters.kubernetes.lib.utils.kubernetes_connector import (
+    KubernetesConnector,
+)
+
+
+class FakeCluster:
+    """Namespaced objects by (kind, name), behind the methods the connector calls."""
+
+    def __init__(self, fail=None, existing=(), fail_delete=()):
+        self.objects = {key: {} for key in existing}
+        self.fail = fail or {}
+        self.fail_delete = set(fail_delete)
+        self.lock = threading.Lock()
+        self.api_client = ApiClient()
+        kinds = {
+            "persistent_volume_claim": "PersistentVolumeClaim",
+            "deployment": "Deployment",
+            "service": "Service",
+            "horizontal_pod_autoscaler": "HorizontalPodAutoscaler",
+        }
+        for suffix, kind in kinds.items():
+            setattr(self, f"create_namespaced_{suffix}", self._creator(kind))
+            setattr(self, f"delete_namespaced_{suffix}", self._deleter(kind))
+
+    def _creator(self, kind):
+        def create(namespace, body):
+            name = body["metadata"]["name"] if isinstance(body, dict) else body.metadata.name
+            with self.lock:
+                if isinstance(self.fail.get(kind), Exception):
+                    raise self.fail[kind]
+                if kind in self.fail:
+                    raise ApiException(status=self.fail[kind], reason="Forbidden")
+                if (kind, name) in self.objects:
+                    raise ApiException(status=409, reason="Conflict")
+                self.objects[(kind, name)] = body
+            if isinstance(body, dict):
+                return body
+            body.metadata = V1ObjectMeta(name=name, uid=f"uid-{name}")
+            return body
+
+        return create
+
+    def _deleter(self, kind):
+        def delete(name, namespace):
+            if kind in self.fail_delete:
+                raise ConnectionResetError("connection reset by peer")
+            with self.lock:
+                del self.objects[(kind, name)]
+
+        return delete
+
+
+def _connector(cluster):
+    connector = KubernetesConnector.__new__(KubernetesConnector)
+    connector.namespace = "sunrise6g"
+    connector.v1 = connector.api_instance_appsv1 = cluster
+    connector.api_instance_v1autoscale = cluster
+    return connector
+
+
+def _descriptor():
+    return {
+        "name": "app",
+        "count-min": 1,
+        "count-max": 3,
+        "containers": [{"image": "nginx", "application_ports": [80]}],
+        "volumes": [{"name": "data", "storage": "1Gi", "path": "/data"}],
+        "autoscaling_policies": [
+            {"metric": "cpu", "util_percent": 80, "limit": "1", "request": "500m"}
+        ],
+    }
+
+
+def test_all_objects_are_created():
+    cluster = FakeCluster()
+    result = _connector(cluster).deploy_service_function(_descriptor())
+
+    assert result.ok and result.status == 201
+    assert result.deployment.metadata.uid == "uid-app"
+    assert sorted(cluster.objects) == [
+        ("Deployment", "app"),
+        ("HorizontalPodAutoscaler", "app"),
+        ("PersistentVolumeClaim", "app-data"),
+        ("Service", "app"),
+    ]
+
+
+def test_failure_rolls_back_created_objects_only():
+    cluster = FakeCluster(fail={"Service": 403})
+    result = _connector(cluster).deploy_service_function(_descriptor())
+
+    assert not result.ok and result.status == 403
+    assert [(f.kind, f.status) for f in result.failures] == [("Service", 403)]
+    assert cluster.objects == {}
+    assert ("Deployment", "app") in result.rolled_back
+
+    # An instance that already exists is reported as a conflict and left untouched
+    cluster = FakeCluster(existing=[("Deployment", "app")])
+    result = _connector(cluster).deploy_service_function(_descriptor())
+    assert result.status == 409 and result.deployment is None
+    assert list(cluster.objects) == [("Deployment", "app")]
+
+
+def test_any_failure_rolls_back_and_reports_what_is_left():
+    cluster = FakeCluster(fail={"Service": ValueError("invalid port")}, fail_delete={"Deployment"})
+    result = _connector(cluster).deploy_service_function(_descriptor())
+
+    assert not result.ok and result.status == 500
+    assert result.failures[0].reason == "invalid port"
+    assert result.left_behind == [("Deployment", "app")]
+    assert result.message.endswith("remove by hand: Deployment 'app'")
+    assert list(cluster.objects) == [("Deployment", "app")]
+    assert ("PersistentVolumeClaim", "app-data") in result.rolled_back
+
+
+class FakeApplyClient(ApiClient):
+    """Server-side apply endpoint that rejects one path."""
+
+    def __init__(self, reject):
+        super().__init__()
+        self.reject = reject
+        self.persisted = []
+
+    def call_api(self, path, method, query_params=None, body=None, **kwargs):
+        dry_run = ("dryRun", "All") in query_params
+        if self.reject in path:
+            raise ApiException(status=422, reason="Invalid")
+        if not dry_run:
+            self.persisted.append(body["kind"])
+        return body, 201, {}
+
+
+def test_server_side_apply_persists_nothing_unless_all_manifests_pass():
+    cluster = FakeCluster()
+    cluster.api_client = FakeApplyClient(reject="/services/")
+    result = _connector(cluster).deploy_service_function(_descriptor(), server_side_apply=True)
+    assert result.status == 422 and cluster.api_client.persisted == []
+
+    cluster.api_client.reject = "/nothing/"
+    result = _connector(cluster).deploy_service_function(_descriptor(), server_side_apply=True)
+    assert result.ok and len(result.created) == 4
+    assert sorted(cluster.api_client.persisted) == [
+        "Deployment",
+        "HorizontalPodAutoscaler",
+        "PersistentVolumeClaim",
+        "Service",
+    ]
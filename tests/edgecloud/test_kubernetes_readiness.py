@@ -0,0 +1,101 @@
+from kubernetes.client import (
+    V1ContainerState,
+    V1ContainerStateWaiting,
+    V1ContainerStatus,
+    V1ListMeta,
+    V1ObjectMeta,
+    V1Pod,
+    V1PodCondition,
+    V1PodList,
+    V1PodStatus,
+)
+
+from sunrise6g_opensdk.edgecloud.adapters.kubernetes.lib.utils.readiness import (
+    InstanceStatus,
+    pod_status,
+    watch_status,
+)
+
+
+def _pod(name, version, ready=False, waiting=None, unschedulable=False):
+    conditions = [V1PodCondition(type="Ready", status="True" if ready else "False")]
+    if unschedulable:
+        conditions.append(
+            V1PodCondition(
+                type="PodScheduled",
+                status="False",
+                reason="Unschedulable",
+                message="0/3 nodes are available: insufficient cpu",
+            )
+        )
+    statuses = None
+    if waiting:
+        state = V1ContainerState(waiting=V1ContainerStateWaiting(reason=waiting, message="boom"))
+        statuses = [
+            V1ContainerStatus(
+                name="app", image="app", image_id="", ready=False, restart_count=0, state=state
+            )
+        ]
+    return V1Pod(
+        metadata=V1ObjectMeta(name=name, resource_version=str(version)),
+        status=V1PodStatus(phase="Pending", conditions=conditions, container_statuses=statuses),
+    )
+
+
+class FakeCoreV1:
+    def __init__(self, pods, events):
+        self.pods = pods
+        self.events = events
+        self.lists = 0
+
+    def list_namespaced_pod(self, namespace, **kwargs):
+        self.lists += 1
+        return V1PodList(items=self.pods, metadata=V1ListMeta(resource_version="1"))
+
+
+class FakeWatch:
+    streams = 0
+
+    def __init__(self):
+        FakeWatch.streams += 1
+
+    def stream(self, func, namespace, **kwargs):
+        assert kwargs["label_selector"] == "sunrise6g=app"
+        yield from func.__self__.events
+
+    def stop(self):
+        pass
+
+
+def test_pod_failures_are_detected_early():
+    assert pod_status(_pod("a", 1, waiting="ImagePullBackOff")).status == "failed"
+    assert pod_status(_pod("a", 1, waiting="CrashLoopBackOff")).reason == "CrashLoopBackOff"
+    assert pod_status(_pod("a", 1, unschedulable=True)).reason == "Unschedulable"
+    assert pod_status(_pod("a", 1, waiting="ContainerCreating")).status == "instantiating"
+    assert pod_status(_pod("a", 1, ready=True)).status == "ready"
+
+
+def test_transitions_come_from_a_single_watch():
+    events = [
+        {"type": "ADDED", "object": _pod("app-2", 2)},
+        {"type": "MODIFIED", "object": _pod("app-2", 3)},
+        {"type": "MODIFIED", "object": _pod("app-2", 4, ready=True)},
+        {"type": "MODIFIED", "object": _pod("app-2", 5, waiting="CrashLoopBackOff")},
+    ]
+    core_v1 = FakeCoreV1([], events)
+    FakeWatch.streams = 0
+    transitions = list(watch_status(core_v1, "sunrise6g", "app", watch_factory=FakeWatch))
+
+    assert [t.status for t in transitions] == ["instantiating", "ready"]
+    assert transitions[-1] == InstanceStatus("ready", pod="app-2")
+    assert core_v1.lists == 1 and FakeWatch.streams == 1
+
+
+def test_watch_stops_at_the_first_failure():
+    core_v1 = FakeCoreV1(
+        [_pod("app-1", 1)],
+        [{"type": "MODIFIED", "object": _pod("app-1", 2, waiting="ImagePullBackOff")}],
+    )
+    transitions = list(watch_status(core_v1, "sunrise6g", "app", watch_factory=FakeWatch))
+    assert [t.status for t in transitions] == ["instantiating", "failed"]
+    assert transitions[-1].reason == "ImagePullBackOff"
@@ -0,0 +1,88 @@
+import pytest
+
+from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
+from sunrise6g_opensdk.edgecloud.core import migration
+from sunrise6g_opensdk.edgecloud.core.edgecloud_interface import (
+    EdgeCloudManagementInterface,
+)
+from sunrise6g_opensdk.edgecloud.core.instance_events import InstanceTracker
+
+
+class FakePlatform(EdgeCloudManagementInterface):
+    """Instances become ready (or fail) as soon as they are watched."""
+
+    def __init__(self, failing_zones=()):
+        self.failing_zones = set(failing_zones)
+        self.instances = {"app-1": {"appId": "app", "appInstanceId": "app-1", "zone": "z1"}}
+        self.log = []
+
+    def deploy_app(self, app_id, app_zones):
+        zone = app_zones[0]["EdgeCloudZone"]["edgeCloudZoneId"]
+        instance_id = f"app-{len(self.instances) + 1}"
+        self.instances[instance_id] = {"appId": app_id, "appInstanceId": instance_id, "zone": zone}
+        self.log.append(("deploy", instance_id))
+        return {"appInstanceId": instance_id}
+
+    def undeploy_app(self, app_instance_id):
+        self.log.append(("undeploy", app_instance_id))
+        del self.instances[app_instance_id]
+
+    def get_all_deployed_apps(self, app_id=None, app_instance_id=None, region=None):
+        return list(self.instances.values())
+
+    def watch_app_instances(self, app_id=None, timeout=None):
+        tracker = InstanceTracker(app_id)
+        for instance in list(self.instances.values()):
+            status = "failed" if instance["zone"] in self.failing_zones else "ready"
+            event = tracker.update(dict(instance, status=status))
+            if event:
+                yield event
+
+
+FakePlatform.__abstractmethods__ = frozenset()
+
+
+def test_new_instance_is_ready_before_the_source_is_removed():
+    platform = FakePlatform()
+    result = migration.migrate(platform, "app-1", "z2")
+
+    assert result.state == migration.COMPLETED and result.target_instance_id == "app-2"
+    assert platform.log == [("deploy", "app-2"), ("undeploy", "app-1")]
+    assert [state for state, _ in result.history] == [
+        "pending",
+        "deploying",
+        "switching",
+        "completed",
+    ]
+    assert platform.get_migration(result.migration_id) is result
+
+
+def test_failed_target_is_rolled_back_and_source_kept():
+    platform = FakePlatform(failing_zones=["z3"])
+    with pytest.raises(EdgeCloudPlatformError):
+        migration.migrate(platform, "app-1", "z3")
+
+    assert platform.log == [("deploy", "app-2"), ("undeploy", "app-2")]
+    assert list(platform.instances) == ["app-1"]
+    (record,) = platform._migrations.values()
+    assert record.state == migration.ROLLED_BACK and "failed" in record.error
+
+
+def test_background_migration_is_tracked():
+    platform = FakePlatform()
+    result = migration.migrate(platform, "app-1", "z2", wait=False)
+    assert result.done.wait(5)
+    assert platform.get_migration(result.migration_id).state == migration.COMPLETED
+
+
+def test_only_recent_finished_migrations_are_kept(monkeypatch):
+    monkeypatch.setattr(migration, "FINISHED_RETAINED", 2)
+    platform = FakePlatform(failing_zones=["z3"])
+    first = None
+    for _ in range(3):
+        with pytest.raises(EdgeCloudPlatformError):
+            migration.migrate(platform, "app-1", "z3")
+        first = first or next(iter(platform._migrations))
+    assert len(platform._migrations) == 2
+    with pytest.raises(EdgeCloudPlatformError):
+        platform.get_migration(first)
@@ -0,0 +1,181 @@
+import threading
+
+import pytest
+
+from sunrise6g_opensdk.edgecloud.adapters.errors import EdgeCloudPlatformError
+from sunrise6g_opensdk.edgecloud.core.edgecloud_interface import (
+    EdgeCloudManagementInterface,
+)
+from sunrise6g_opensdk.edgecloud.core.placement import (
+    PlacementEngine,
+    Resources,
+    parse_memory,
+    required_resources,
+    zone_capacity,
+)
+from sunrise6g_opensdk.edgecloud.core.utils import build_custom_http_response
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+ZONES = {
+    # zone -> (quota vCPU, quota memory, used vCPU, used memory)
+    "small": (4, "8Gi", 1, "2Gi"),
+    "large": (32, "64Gi", 4, "8Gi"),
+}
+
+
+def _details(zone_id):
+    cpu, memory, used_cpu, used_memory = ZONES[zone_id]
+    return {
+        "zoneId": zone_id,
+        "computeResourceQuotaLimits": [{"numCPU": str(cpu), "memory": memory}],
+        "reservedComputeResources": [{"numCPU": str(used_cpu), "memory": used_memory}],
+    }
+
+
+def _engine(strategy="best_fit", clock=None):
+    calls = []
+
+    def zone_details(zone_id):
+        calls.append(zone_id)
+        return _details(zone_id)
+
+    engine = PlacementEngine(
+        lambda: list(ZONES), zone_details, ttl=30, strategy=strategy, clock=clock or Clock()
+    )
+    return engine, calls
+
+
+def _app(cpu, memory):
+    return {
+        "appManifest": {
+            "requiredResources": {
+                "infraKind": "kubernetes",
+                "applicationResources": {"cpuPool": {"numCPU": cpu, "memory": memory}},
+            }
+        }
+    }
+
+
+def test_capacity_parsing():
+    assert parse_memory("16Gi") == 16384 and parse_memory(512) == 512
+    assert zone_capacity(_details("small")) == (Resources(4, 8192), Resources(3, 6144))
+    assert required_resources({"infraKind": "container", "numCPU": "500m", "memory": 256}) == (
+        Resources(0.5, 256)
+    )
+
+
+def test_best_fit_packs_and_reservations_prevent_overcommit():
+    engine, calls = _engine()
+    placed = [engine.place(_app(1, 1024)).zone_id for _ in range(3)]
+    # The small zone is filled first, then the large one takes over
+    assert placed == ["small", "small", "small"]
+    assert engine.place(_app(1, 1024)).zone_id == "large"
+    # A single snapshot served every decision
+    assert sorted(calls) == ["large", "small"]
+
+
+def test_worst_fit_spreads_and_release_gives_capacity_back():
+    engine, _ = _engine("worst_fit")
+    assert engine.place(_app(2, 2048)).zone_id == "large"
+
+    engine, _ = _engine()
+    with pytest.raises(EdgeCloudPlatformError):
+        engine.place(_app(64, 1024))
+    reservation = engine.place(_app(3, 1024))
+    assert reservation.zone_id == "small"
+    engine.release(reservation)
+    assert engine.snapshot()["small"] == Resources(3, 6144)
+
+
+def test_reservations_survive_refresh_until_expired():
+    clock = Clock()
+    engine, calls = _engine(clock=clock)
+    engine.snapshot()
+    clock.now = 10
+    engine.place(_app(2, 1024))
+    clock.now = 31
+    assert engine.snapshot()["small"] == Resources(1, 5120)
+    assert len(calls) == 4
+    clock.now = 62
+    assert engine.snapshot()["small"] == Resources(3, 6144)
+
+
+def test_auto_zones_are_resolved():
+    engine, _ = _engine()
+    zones, reservations = engine.resolve_zones(
+        _app(1, 512),
+        [
+            {"EdgeCloudZone": {"edgeCloudZoneId": "auto"}},
+            {"EdgeCloudZone": {"edgeCloudZoneId": "auto"}},
+        ],
+    )
+    # Two instances of the same app are placed in different zones
+    assert sorted(z["EdgeCloudZone"]["edgeCloudZoneId"] for z in zones) == ["large", "small"]
+    assert len(reservations) == 2
+
+
+class RejectingAdapter(EdgeCloudManagementInterface):
+    def __init__(self, failure):
+        self.failure = failure
+
+    def get_onboarded_app(self, app_id):
+        return _app(3, 1024)
+
+    def deploy_app(self, app_id, app_zones, idempotency_key=None):
+        return self._deploy_placed(app_id, app_zones, self._deploy)
+
+    def _deploy(self, app_id, app_zones):
+        if isinstance(self.failure, Exception):
+            raise self.failure
+        return self.failure
+
+
+RejectingAdapter.__abstractmethods__ = frozenset()
+
+
+@pytest.mark.parametrize(
+    "failure", [EdgeCloudPlatformError("quota"), build_custom_http_response(500, {})]
+)
+def test_failed_deployments_release_their_reservations(failure):
+    engine, _ = _engine()
+    adapter = RejectingAdapter(failure)
+    adapter.attach_placement_engine(engine)
+    free = engine.snapshot()
+    if isinstance(failure, Exception):
+        with pytest.raises(EdgeCloudPlatformError):
+            adapter.deploy_app("app", "auto")
+    else:
+        assert adapter.deploy_app("app", "auto").status_code == 500
+    assert engine.snapshot() == free
+
+
+def test_refresh_does_not_block_reservations():
+    clock = Clock()
+    engine, _ = _engine(clock=clock)
+    reservation = engine.place(_app(1, 1024))
+    fetching, resume = threading.Event(), threading.Event()
+
+    def slow_details(zone_id):
+        fetching.set()
+        assert resume.wait(5)
+        return _details(zone_id)
+
+    engine.zone_details = slow_details
+    clock.now = 31
+    refresher = threading.Thread(target=engine.snapshot)
+    refresher.start()
+    assert fetching.wait(5)
+    # The zones are being fetched, yet the engine is not locked
+    engine.release(reservation)
+    assert engine.score("small", Resources(3, 1024)) is not None
+    resume.set()
+    refresher.join(5)
+    assert not refresher.is_alive()
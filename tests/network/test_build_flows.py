@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests and benchmark for the flow descriptor compaction in build_flows.
+
+Run the benchmark with output enabled to see the numbers:
+
+    pytest -s tests/network/test_build_flows.py -k benchmark
+"""
+import time
+from itertools import product
+
+from sunrise6g_opensdk.network.core import schemas
+from sunrise6g_opensdk.network.core.base_network_client import (
+    build_flows,
+    compact_port_spec,
+    flatten_port_spec,
+)
+
+
+def _session(device_ports: dict | None = None, server_ports: dict | None = None):
+    session = {
+        "duration": 3600,
+        "device": {
+            "ipv4Address": {
+                "publicAddress": "10.45.0.10",
+                "privateAddress": "10.45.0.10",
+            }
+        },
+        "applicationServer": {"ipv4Address": "10.45.0.1"},
+        "qosProfile": "qos-e",
+    }
+    if device_ports is not None:
+        session["devicePorts"] = device_ports
+    if server_ports is not None:
+        session["applicationServerPorts"] = server_ports
+    return schemas.CreateSession.model_validate(session)
+
+
+def _legacy_flow_descriptions(session_info: schemas.CreateSession) -> str:
+    """Reproduces the pre-compaction output: one rule pair per raw port combination."""
+
+    def flatten(ports_spec):
+        flat = []
+        if ports_spec and ports_spec.ports:
+            flat.extend(str(port.root) for port in ports_spec.ports)
+        if ports_spec and ports_spec.ranges:
+            flat.extend(f"{r.from_.root}-{r.to.root}" for r in ports_spec.ranges)
+        return flat or ["0-65535"]
+
+    descrs = []
+    for device_port, server_port in product(
+        flatten(session_info.devicePorts), flatten(session_info.applicationServerPorts)
+    ):
+        descrs.append(f"permit in ip from 10.45.0.10 {device_port} to 10.45.0.1 {server_port}")
+        descrs.append(f"permit out ip from 10.45.0.1 {server_port} to 10.45.0.10 {device_port}")
+    return ", ".join(descrs)
+
+
+def test_compact_port_spec_defaults_to_all_ports():
+    assert compact_port_spec(None) == [(0, 65535)]
+    assert compact_port_spec(schemas.PortsSpec()) == [(0, 65535)]
+
+
+def test_compact_port_spec_merges_adjacent_and_overlapping():
+    spec = schemas.PortsSpec.model_validate(
+        {
+            "ports": [5000, 80, 81, 81, 443, 4999],
+            "ranges": [{"from": 82, "to": 90}, {"from": 85, "to": 100}, {"from": 8000, "to": 8000}],
+        }
+    )
+    assert compact_port_spec(spec) == [(80, 100), (443, 443), (4999, 5000), (8000, 8000)]
+    assert flatten_port_spec(spec) == ["80-100", "443", "4999-5000", "8000"]
+
+
+def test_compact_port_spec_normalises_reversed_ranges():
+    spec = schemas.PortsSpec.model_validate({"ranges": [{"from": 200, "to": 100}]})
+    assert compact_port_spec(spec) == [(100, 200)]
+
+
+def test_build_flows_emits_compacted_rules():
+    session = _session(
+        device_ports={"ports": [1000, 1001, 1002]},
+        server_ports={"ports": [80, 80], "ranges": [{"from": 81, "to": 90}]},
+    )
+    flows = build_flows(3, session)
+    assert len(flows) == 1
+    assert flows[0].flowId == 3
+    assert flows[0].flowDescriptions == [
+        "permit in ip from 10.45.0.10 1000-1002 to 10.45.0.1 80-90, "
+        "permit out ip from 10.45.0.1 80-90 to 10.45.0.10 1000-1002"
+    ]
+
+
+def test_build_flows_benchmark_large_ports_spec():
+    # 600 contiguous device ports and 200 server ports split in two blocks
+    device_ports = {"ports": list(range(20000, 20600))}
+    server_ports = {"ports": list(range(8000, 8100)) + list(range(9000, 9100))}
+    session = _session(device_ports=device_ports, server_ports=server_ports)
+
+    start = time.perf_counter()
+    legacy_payload = _legacy_flow_descriptions(session)
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compacted_payload = build_flows(1, session)[0].flowDescriptions[0]
+    compacted_elapsed = time.perf_counter() - start
+
+    legacy_rules = legacy_payload.count("permit")
+    compacted_rules = compacted_payload.count("permit")
+    print(
+        f"\nbuild_flows: rules {legacy_rules} -> {compacted_rules}, "
+        f"payload {len(legacy_payload)} B -> {len(compacted_payload)} B, "
+        f"time {legacy_elapsed * 1000:.1f} ms -> {compacted_elapsed * 1000:.1f} ms"
+    )
+    assert legacy_rules == 2 * 600 * 200
+    assert compacted_rules == 2 * 1 * 2
+    assert len(compacted_payload) * 100 < len(legacy_payload)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import random
+import time
+from datetime import datetime, timezone
+
+from sunrise6g_opensdk.network.adapters.open5gs.client import (
+    NetworkManager as Open5GSClient,
+)
+from sunrise6g_opensdk.network.core import schemas
+from sunrise6g_opensdk.network.core.geofencing import GeofenceEngine, GeofenceEventType
+
+NOW = datetime(2025, 6, 18, 12, 30, tzinfo=timezone.utc)
+
+
+def _circle(lat: float, lon: float, radius: float = 500) -> dict:
+    return {
+        "areaType": "CIRCLE",
+        "center": {"latitude": lat, "longitude": lon},
+        "radius": radius,
+    }
+
+
+def _location(lat: float, lon: float) -> schemas.Location:
+    return schemas.Location(lastLocationTime=NOW, area=_circle(lat, lon, radius=10))
+
+
+def _engine(**kwargs) -> GeofenceEngine:
+    client = Open5GSClient(base_url="http://test-open5gs.url", scs_as_id="scs")
+    return GeofenceEngine(client, **kwargs)
+
+
+def test_enter_and_leave_events():
+    received = []
+    engine = _engine(on_event=received.append)
+    engine.add_fence("office", _circle(41.0, 2.0))
+    engine.add_fence(
+        "campus",
+        {
+            "areaType": "POLYGON",
+            "boundary": [
+                {"latitude": 40.99, "longitude": 1.99},
+                {"latitude": 40.99, "longitude": 2.01},
+                {"latitude": 41.01, "longitude": 2.01},
+                {"latitude": 41.01, "longitude": 1.99},
+            ],
+        },
+    )
+
+    events = engine.update("tel:+34600000001", _location(41.0, 2.0))
+    assert {(e.fence_id, e.event_type) for e in events} == {
+        ("office", GeofenceEventType.enter),
+        ("campus", GeofenceEventType.enter),
+    }
+    events = engine.update("tel:+34600000001", _location(41.008, 2.0))
+    assert [(e.fence_id, e.event_type) for e in events] == [("office", GeofenceEventType.leave)]
+    assert engine.update("tel:+34600000001", _location(41.008, 2.0)) == []
+    assert engine.devices_in("campus") == ["tel:+34600000001"]
+    assert len(received) == 3
+
+
+def test_consumes_nef_notifications():
+    engine = _engine()
+    engine.add_fence("cell", _circle(41.05, 2.05, radius=20000))
+    notification = schemas.MonitoringNotification(
+        subscription="http://nef/3gpp-monitoring-event/v1/scs/subscriptions/1",
+        monitoringEventReports=[
+            {
+                "msisdn": "34600000001",
+                "monitoringType": "LOCATION_REPORTING",
+                "eventTime": "2025-06-18T12:29:50Z",
+                "locationInfo": {
+                    "geographicArea": {
+                        "polygon": {
+                            "point_list": {
+                                "geographical_coords": [
+                                    {"lon": 2.0, "lat": 41.0},
+                                    {"lon": 2.1, "lat": 41.0},
+                                    {"lon": 2.1, "lat": 41.1},
+                                ]
+                            }
+                        }
+                    }
+                },
+            },
+            {"msisdn": "34600000002", "monitoringType": "LOCATION_REPORTING"},
+        ],
+    )
+    events = engine.consume_notification(notification)
+    assert [(e.device, e.event_type) for e in events] == [
+        ("tel:+34600000001", GeofenceEventType.enter)
+    ]
+
+
+def test_update_cost_does_not_scan_all_fences():
+    engine = _engine(cell_size=0.01)
+    rng = random.Random(3)
+    for i in range(20000):
+        engine.add_fence(f"f{i}", _circle(rng.uniform(40, 42), rng.uniform(1, 3), radius=300))
+    locations = [_location(rng.uniform(40, 42), rng.uniform(1, 3)) for _ in range(2000)]
+    start = time.perf_counter()
+    for i, location in enumerate(locations):
+        engine.update(f"tel:+3460{i:07d}", location)
+    elapsed = time.perf_counter() - start
+    print(f"\ngeofencing: 20000 fences, 2000 updates in {elapsed * 1000:.1f} ms")
+    assert elapsed < 2.0
+
+
+def test_fences_across_the_antimeridian():
+    engine = _engine()
+    engine.add_fence("dateline", _circle(0.0, 179.999, radius=1000))
+    engine.add_fence(
+        "fiji",
+        {
+            "areaType": "POLYGON",
+            "boundary": [
+                {"latitude": -17.0, "longitude": 179.9},
+                {"latitude": -17.0, "longitude": -179.9},
+                {"latitude": -16.8, "longitude": -179.9},
+                {"latitude": -16.8, "longitude": 179.9},
+            ],
+        },
+    )
+    assert engine.fences_containing(0.0, -179.999) == {"dateline"}
+    assert engine.fences_containing(-16.9, -179.95) == {"fiji"}
+    assert engine.fences_containing(-16.9, 179.95) == {"fiji"}
+    assert engine.fences_containing(-16.9, 0.0) == set()
+
+
+def test_large_fences_are_kept_out_of_the_grid():
+    engine = _engine(cell_size=0.01, max_cells_per_fence=100)
+    engine.add_fence("region", _circle(41.0, 2.0, radius=50_000))
+    engine.add_fence("office", _circle(41.0, 2.0))
+    assert sum(len(fences) for fences in engine._grid.values()) <= 100
+    assert engine.fences_containing(41.3, 2.2) == {"region"}
+    assert engine.fences_containing(41.0, 2.0) == {"region", "office"}
+    engine.remove_fence("region")
+    assert engine.fences_containing(41.3, 2.2) == set()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import math
+
+import pytest
+
+from sunrise6g_opensdk.network.core import schemas
+from sunrise6g_opensdk.network.core.geometry import (
+    PolygonArray,
+    area_contains,
+    area_of,
+    bounding_box_of,
+    bounding_boxes_of,
+    haversine_distance,
+)
+
+# Square of roughly 1.11 km x 1.11 km around (41.0, 2.0)
+SQUARE = [
+    (41.0, 2.0),
+    (41.0, 2.0 + 0.01 / math.cos(math.radians(41))),
+    (41.01, 2.0132),
+    (41.01, 2.0),
+]
+
+
+def _nef_polygon(vertices) -> schemas.NefPolygon:
+    return schemas.NefPolygon(
+        point_list={"geographical_coords": [{"lat": lat, "lon": lon} for lat, lon in vertices]}
+    )
+
+
+def test_bulk_conversion_from_nef_to_camara():
+    triangle = [(41.0, 2.0), (41.0, 2.1), (41.1, 2.1)]
+    polygons = PolygonArray.from_nef([_nef_polygon(triangle), _nef_polygon(SQUARE)])
+    assert len(polygons) == 2
+    camara = polygons.to_camara()
+    assert camara[0].boundary.root[2] == schemas.Point(latitude=41.1, longitude=2.1)
+    assert PolygonArray.from_camara(camara)[1] == SQUARE
+
+
+def test_area_centroid_and_bounding_box():
+    side = math.radians(0.01) * 6_371_008.8
+    square = [(0.0, 0.0), (0.0, 0.01), (0.01, 0.01), (0.01, 0.0)]
+    polygons = PolygonArray.from_points([square, list(reversed(square))])
+    assert polygons.areas() == pytest.approx([side * side] * 2, rel=1e-3)
+    assert polygons.centroids()[0] == pytest.approx((0.005, 0.005))
+    assert polygons.bounding_boxes()[1] == (0.0, 0.0, 0.01, 0.01)
+
+
+def test_point_in_polygon():
+    polygons = PolygonArray.from_points([SQUARE, [(0, 0), (0, 1), (1, 1)]])
+    assert polygons.contains(41.005, 2.005) == [True, False]
+    assert polygons.contains_each([(41.02, 2.005), (0.2, 0.8)]) == [False, True]
+
+
+def test_polygon_to_circle_encloses_vertices():
+    polygons = PolygonArray.from_points([SQUARE])
+    [circle] = polygons.to_circles()
+    for lat, lon in SQUARE:
+        distance = haversine_distance(circle.center.latitude, circle.center.longitude, lat, lon)
+        assert distance <= circle.radius + 1e-6
+    assert area_contains(circle, 41.005, 2.006)
+    assert area_of(circle) >= polygons.areas()[0]
+
+
+def test_circle_helpers():
+    circle = schemas.Circle(
+        areaType=schemas.AreaType.circle, center={"latitude": 0, "longitude": 0}, radius=1000
+    )
+    min_lat, min_lon, max_lat, max_lon = bounding_box_of(circle)
+    assert haversine_distance(0, 0, max_lat, 0) == pytest.approx(1000)
+    assert min_lon == pytest.approx(-max_lon)
+
+
+def test_bounding_boxes_are_split_at_the_antimeridian():
+    circle = schemas.Circle(
+        areaType=schemas.AreaType.circle, center={"latitude": 0, "longitude": 180}, radius=1000
+    )
+    (_, east_min, _, east_max), (_, west_min, _, west_max) = bounding_boxes_of(circle)
+    assert east_max == 180 and west_min == -180
+    assert 180 - east_min == pytest.approx(west_max + 180)
+
+    polygon = schemas.Polygon(
+        areaType=schemas.AreaType.polygon,
+        boundary=[
+            {"latitude": 0, "longitude": 179.5},
+            {"latitude": 0, "longitude": -179.5},
+            {"latitude": 1, "longitude": -179.5},
+        ],
+    )
+    assert bounding_boxes_of(polygon) == [(0, 179.5, 1, 180.0), (0, -180.0, 1, -179.5)]
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from sunrise6g_opensdk.network.adapters.oai.client import NetworkManager as OaiClient
+from sunrise6g_opensdk.network.adapters.open5gs.client import (
+    NetworkManager as Open5GSClient,
+)
+from sunrise6g_opensdk.network.core import common
+from sunrise6g_opensdk.network.core.base_network_client import (
+    build_host_flow_descriptor,
+)
+from sunrise6g_opensdk.network.core.ip_filter_rule import (
+    FilterDirection,
+    IPFilterRuleError,
+    encode_flow_description,
+    parse_flow_description,
+    parse_flow_descriptions,
+    parse_ip_filter_rule,
+)
+
+SESSION_ID = "8a5d3c67-4c8b-4f1e-a0a4-6f3a9c1d2b11"
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        "permit out ip from 10.45.0.10/32 to 10.45.0.1/32",
+        "permit in ip from 10.45.0.10 1000-1002 to 10.45.0.1 80,443",
+        "deny in 17 from !192.168.0.0/16 to any 53",
+        "permit out 6 from 2001:db8::1 to 2001:db8:85a3::/64 8080-8090 established",
+        "permit out ip from assigned to any",
+    ],
+)
+def test_encode_round_trip(rule):
+    assert parse_ip_filter_rule(rule).encode() == rule
+
+
+def test_parse_typed_fields():
+    rule = parse_ip_filter_rule("deny in 17 from !192.168.0.0/16 1-10,20 to 2001:db8::/64 53")
+    assert rule.action.value == "deny"
+    assert rule.direction is FilterDirection.inbound
+    assert rule.proto == 17
+    assert rule.src.negated
+    assert rule.src.ports == ((1, 10), (20, 20))
+    assert str(rule.src.network) == "192.168.0.0/16"
+    assert rule.dst.version == 6
+    assert rule.dst.address_spec == "2001:db8::/64"
+
+
+def test_address_spec_drops_host_masks():
+    rule = parse_ip_filter_rule("permit out ip from 10.45.0.10/32 to 2001:db8::1/128")
+    assert rule.src.address_spec == "10.45.0.10"
+    assert rule.dst.address_spec == "2001:db8::1"
+
+
+def test_parse_multi_rule_description():
+    description = (
+        "permit in ip from 10.45.0.10 1000-1002,2000 to 10.45.0.1 80-90, "
+        "permit out ip from 10.45.0.1 80-90 to 10.45.0.10 1000-1002,2000"
+    )
+    rules = parse_flow_description(description)
+    assert len(rules) == 2
+    assert rules[0].src.ports == ((1000, 1002), (2000, 2000))
+    assert rules[1].direction is FilterDirection.outbound
+    assert encode_flow_description(rules) == description
+
+
+def test_batch_parse_shares_results():
+    description = "permit out ip from 10.45.0.10/32 to 10.45.0.1/32"
+    parsed = parse_flow_descriptions([description, description])
+    assert parsed[0] is parsed[1]
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        "",
+        "permit out ip from 10.45.0.10/32",
+        "allow out ip from 10.0.0.1 to 10.0.0.2",
+        "permit out tcp from 10.0.0.1 to 10.0.0.2",
+        "permit out ip from 10.0.0.300 to 10.0.0.2",
+        "permit out ip from 10.0.0.1/40 to 10.0.0.2",
+        "permit out ip from 10.0.0.1 70000 to 10.0.0.2",
+    ],
+)
+def test_invalid_rules(rule):
+    with pytest.raises(IPFilterRuleError):
+        parse_flow_description(rule)
+
+
+def _camara_session(server: str) -> dict:
+    return {
+        "duration": 3600,
+        "device": {
+            "ipv4Address": {
+                "publicAddress": "10.45.0.10",
+                "privateAddress": "10.45.0.10",
+            }
+        },
+        "applicationServer": {"ipv4Address": server},
+        "qosProfile": "qos-e",
+        "sink": "https://endpoint.example.com/sink",
+    }
+
+
+def test_host_flow_descriptor_keeps_explicit_masks():
+    assert build_host_flow_descriptor("10.45.0.10", "2001:db8::1") == (
+        "permit out ip from 10.45.0.10/32 to 2001:db8::1/128"
+    )
+    assert build_host_flow_descriptor("10.45.0.10", "0.0.0.0/0") == (
+        "permit out ip from 10.45.0.10/32 to 0.0.0.0/0"
+    )
+
+
+def test_oai_flow_descriptor_uses_plain_addresses():
+    client = OaiClient(base_url="http://test-oai.url", scs_as_id="scs")
+    subscription = client._build_qod_subscription(_camara_session("10.45.0.1"))
+    assert subscription.flowInfo[0].flowDescriptions == [
+        "permit out ip from 10.45.0.10/32 to 10.45.0.1/32"
+    ]
+
+
+@pytest.mark.parametrize("server", ["10.45.0.1", "198.51.100.0/24"])
+def test_get_qod_session_recovers_server_address(monkeypatch, server):
+    client = Open5GSClient(base_url="http://test-open5gs.url", scs_as_id="scs")
+    subscription = client._build_qod_subscription(_camara_session(server))
+    nef_response = subscription.model_dump(mode="json", exclude_none=True)
+    nef_response["self"] = f"http://nef/subscriptions/{SESSION_ID}"
+    monkeypatch.setattr(common, "as_session_with_qos_get", lambda *args, **kwargs: nef_response)
+
+    session = client.get_qod_session(SESSION_ID)
+    assert session["applicationServer"]["ipv4Address"] == server
+
+
+def test_get_all_traffic_influence_batch_parses(monkeypatch):
+    client = OaiClient(base_url="http://test-oai.url", scs_as_id="scs")
+    ti_info = {
+        "appId": "app",
+        "appInstanceId": "10.45.0.1",
+        "edgeCloudZoneId": "zone-1",
+        "notificationUri": "http://sink",
+        "device": {"ipv4Address": {"publicAddress": "10.45.0.10", "privateAddress": "10.45.0.10"}},
+    }
+    nef_item = client._build_ti_subscription(ti_info).model_dump(exclude_none=True)
+    monkeypatch.setattr(common, "traffic_influence_get", lambda *args: [nef_item, nef_item])
+
+    resources = client.get_all_traffic_influence_resource()
+    assert [r.appInstanceId for r in resources] == ["10.45.0.1", "10.45.0.1"]
+    assert resources[0].edgeCloudZoneId == "zone-1"
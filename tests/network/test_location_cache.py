@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sunrise6g_opensdk.network.adapters.open5gs.client import (
+    NetworkManager as Open5GSClient,
+)
+from sunrise6g_opensdk.network.core import common, schemas
+from sunrise6g_opensdk.network.core.location_cache import LocationCache
+
+NOW = datetime(2025, 6, 18, 12, 30, tzinfo=timezone.utc)
+
+
+def _request(phone: str = "+34600000001", max_age: int | None = None):
+    return schemas.RetrievalLocationRequest(device={"phoneNumber": phone}, maxAge=max_age)
+
+
+def _location(age_seconds: int) -> schemas.Location:
+    return schemas.Location(
+        lastLocationTime=NOW - timedelta(seconds=age_seconds),
+        area={"areaType": "CIRCLE", "center": {"latitude": 41.0, "longitude": 2.0}, "radius": 50},
+    )
+
+
+def test_max_age_controls_cache_hits():
+    cache = LocationCache(clock=lambda: NOW)
+    calls = []
+
+    def fetch(request):
+        calls.append(request)
+        return _location(age_seconds=30)
+
+    cache.get_or_fetch(_request(max_age=60), fetch)
+    cache.get_or_fetch(_request(max_age=60), fetch)
+    cache.get_or_fetch(_request(), fetch)
+    assert len(calls) == 1
+    cache.get_or_fetch(_request(max_age=10), fetch)
+    cache.get_or_fetch(_request(max_age=0), fetch)
+    assert len(calls) == 3
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_concurrent_requests_share_one_fetch():
+    cache = LocationCache(clock=lambda: NOW)
+    release = threading.Event()
+    calls = []
+
+    def fetch(request):
+        calls.append(request)
+        release.wait(5)
+        return _location(age_seconds=0)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch(_request(), fetch)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    while cache.coalesced < 7:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len(results) == 8
+    assert all(result is results[0] for result in results)
+
+
+def test_lru_eviction_bounds_memory():
+    cache = LocationCache(max_entries=2, clock=lambda: NOW)
+    for phone in ("+34600000001", "+34600000002"):
+        cache.put(_request(phone).device, _location(0))
+    cache.get(_request("+34600000001").device)
+    cache.put(_request("+34600000003").device, _location(0))
+    assert len(cache) == 2
+    assert cache.get(_request("+34600000002").device) is None
+    assert cache.get(_request("+34600000001").device) is not None
+
+
+def test_client_uses_attached_cache(monkeypatch):
+    calls = []
+    report = {
+        "monitoringType": "LOCATION_REPORTING",
+        "eventTime": "2025-06-18T12:29:50Z",
+        "locationInfo": {
+            "geographicArea": {
+                "polygon": {
+                    "point_list": {
+                        "geographical_coords": [
+                            {"lon": 2.0, "lat": 41.0},
+                            {"lon": 2.1, "lat": 41.0},
+                            {"lon": 2.1, "lat": 41.1},
+                        ]
+                    }
+                }
+            }
+        },
+    }
+
+    def monitoring_event_post(*args, **kwargs):
+        calls.append(args)
+        return report
+
+    monkeypatch.setattr(common, "monitoring_event_post", monitoring_event_post)
+    client = Open5GSClient(base_url="http://test-open5gs.url", scs_as_id="scs")
+    client.attach_location_cache(LocationCache(clock=lambda: NOW))
+    first = client.create_monitoring_event_subscription(_request(max_age=60))
+    second = client.create_monitoring_event_subscription(_request(max_age=60))
+    assert first is second
+    assert len(calls) == 1
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import threading
+
+from sunrise6g_opensdk.network.adapters.open5gs.client import (
+    NetworkManager as Open5GSClient,
+)
+from sunrise6g_opensdk.network.core import schemas
+from sunrise6g_opensdk.network.core.notification_receiver import (
+    NotificationKind,
+    NotificationReceiver,
+)
+
+SUBSCRIPTION_ID = "6c9d1b5e-2f6a-4f8e-9a37-0c1d2e3f4a5b"
+
+QOS_NOTIFICATION = {
+    "transaction": f"http://nef/3gpp-as-session-with-qos/v1/scs/subscriptions/{SUBSCRIPTION_ID}",
+    "eventReports": [{"event": "QOS_GUARANTEED"}],
+}
+MONITORING_NOTIFICATION = {
+    "subscription": f"http://nef/3gpp-monitoring-event/v1/scs/subscriptions/{SUBSCRIPTION_ID}",
+    "monitoringEventReports": [{"monitoringType": "LOCATION_REPORTING"}],
+}
+
+
+async def _post(port: int, path: str, payload) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    writer.close()
+    return int(status_line.split()[1])
+
+
+def test_dispatches_validated_notifications_to_subscribers():
+    async def scenario():
+        received = []
+
+        async def on_notification(notification):
+            received.append(notification)
+
+        async with NotificationReceiver(port=0) as receiver:
+            receiver.subscribe(SUBSCRIPTION_ID, on_notification)
+            assert await _post(receiver.port, "/notifications/qos", QOS_NOTIFICATION) == 204
+            assert (
+                await _post(receiver.port, "/notifications/monitoring", MONITORING_NOTIFICATION)
+                == 204
+            )
+            assert await _post(receiver.port, "/notifications/qos", {"bad": 1}) == 400
+            assert await _post(receiver.port, "/notifications/qos", b"{not json") == 400
+            assert await _post(receiver.port, "/other", QOS_NOTIFICATION) == 404
+            await asyncio.sleep(0.05)
+        return received
+
+    received = asyncio.run(scenario())
+    assert [n.kind for n in received] == [NotificationKind.qos, NotificationKind.monitoring]
+    assert all(n.subscription_id == SUBSCRIPTION_ID for n in received)
+    assert isinstance(received[0].payload, schemas.UserPlaneNotificationData)
+    assert isinstance(received[1].payload, schemas.MonitoringNotification)
+
+
+def test_full_queue_pushes_back_with_503():
+    async def scenario():
+        receiver = NotificationReceiver(port=0, queue_size=1, put_timeout=0.05)
+        async with receiver:
+            queue = receiver.subscribe(SUBSCRIPTION_ID)
+            first = await _post(receiver.port, "/notifications/qos", QOS_NOTIFICATION)
+            second = await _post(receiver.port, "/notifications/qos", QOS_NOTIFICATION)
+            return first, second, queue.qsize()
+
+    assert asyncio.run(scenario()) == (204, 503, 1)
+
+
+def test_early_notifications_are_kept_until_subscribed():
+    async def scenario():
+        receiver = NotificationReceiver(port=0)
+        assert await receiver.dispatch("monitoring", MONITORING_NOTIFICATION) == 204
+        queue = receiver.subscribe(SUBSCRIPTION_ID)
+        return queue.get_nowait()
+
+    notification = asyncio.run(scenario())
+    assert notification.kind is NotificationKind.monitoring
+
+
+def test_chunked_bodies_are_accepted():
+    async def post_chunked(port, chunks):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(
+            b"POST /notifications/qos HTTP/1.1\r\nHost: localhost\r\n"
+            b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n"
+        )
+        for chunk in chunks:
+            writer.write(b"%x;ext=1\r\n%s\r\n" % (len(chunk), chunk))
+        writer.write(b"0\r\nX-Trailer: 1\r\n\r\n")
+        await writer.drain()
+        status_line = await reader.readline()
+        writer.close()
+        return int(status_line.split()[1])
+
+    async def scenario():
+        async with NotificationReceiver(port=0, max_body_size=200) as receiver:
+            queue = receiver.subscribe(SUBSCRIPTION_ID)
+            body = json.dumps(QOS_NOTIFICATION).encode()
+            accepted = await post_chunked(receiver.port, [body[:10], body[10:]])
+            too_large = await post_chunked(receiver.port, [body, body])
+            return accepted, too_large, queue.qsize()
+
+    assert asyncio.run(scenario()) == (204, 413, 1)
+
+
+def test_subscriptions_from_other_threads_run_on_the_receiver_loop():
+    receiver = NotificationReceiver(port=0)
+    receiver.start_in_thread()
+    try:
+        received = threading.Event()
+        loops = []
+
+        def on_notification(notification):
+            loops.append(asyncio.get_running_loop())
+            received.set()
+
+        receiver.subscribe(SUBSCRIPTION_ID, on_notification)
+        assert asyncio.run(_post(receiver.port, "/notifications/qos", QOS_NOTIFICATION)) == 204
+        assert received.wait(5)
+        assert loops == [receiver._loop]
+        receiver.unsubscribe(SUBSCRIPTION_ID)
+        assert receiver._subscribers == {}
+    finally:
+        receiver.stop_thread(5)
+
+
+def test_adapters_announce_receiver_url():
+    client = Open5GSClient(base_url="http://test-open5gs.url", scs_as_id="scs")
+    request = schemas.RetrievalLocationRequest(device={"phoneNumber": "+34600000000"})
+    assert str(client._build_monitoring_event_subscription(request).notificationDestination) == (
+        "http://127.0.0.1:8001/"
+    )
+
+    receiver = NotificationReceiver(public_url="http://10.0.0.5:9000/")
+    client.attach_notification_receiver(receiver)
+    subscription = client._build_monitoring_event_subscription(request)
+    assert str(subscription.notificationDestination) == (
+        "http://10.0.0.5:9000/notifications/monitoring"
+    )
+
+    session_info = {
+        "duration": 60,
+        "device": {"ipv4Address": {"publicAddress": "10.45.0.10", "privateAddress": "10.45.0.10"}},
+        "applicationServer": {"ipv4Address": "10.45.0.1"},
+        "qosProfile": "qos-e",
+    }
+    qos_subscription = client._build_qod_subscription(session_info)
+    assert qos_subscription.notificationDestination.root == (
+        "http://10.0.0.5:9000/notifications/qos"
+    )
+    session_info["sink"] = "https://endpoint.example.com/sink"
+    qos_subscription = client._build_qod_subscription(session_info)
+    assert qos_subscription.notificationDestination.root == "https://endpoint.example.com/sink"
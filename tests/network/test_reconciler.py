@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+import uuid
+
+from sunrise6g_opensdk.network.adapters.oai.client import NetworkManager as OaiClient
+from sunrise6g_opensdk.network.core import common
+from sunrise6g_opensdk.network.core.reconciler import DesiredState, Reconciler
+from sunrise6g_opensdk.network.core.session_store import SessionKind, SqliteSessionStore
+
+
+def _session(device_ip: str, profile: str = "qos-e") -> dict:
+    return {
+        "duration": 3600,
+        "device": {"ipv4Address": {"publicAddress": device_ip, "privateAddress": device_ip}},
+        "applicationServer": {"ipv4Address": "10.45.0.1"},
+        "devicePorts": {"ranges": [{"from": 0, "to": 65535}]},
+        "applicationServerPorts": {"ranges": [{"from": 0, "to": 65535}]},
+        "qosProfile": profile,
+        "sink": "https://endpoint.example.com/sink",
+    }
+
+
+def _ti(device_ip: str, zone: str = "edge") -> dict:
+    return {
+        "device": {"ipv4Address": {"publicAddress": device_ip, "privateAddress": device_ip}},
+        "edgeCloudZoneId": zone,
+        "appId": "testSdk-ffff-aaaa-c0ffe",
+        "appInstanceId": "172.21.18.3",
+        "notificationUri": "https://endpoint.example.com/sink",
+    }
+
+
+class FakeNef:
+    """NEF subscription collections, seeded with subscriptions built by the client."""
+
+    def __init__(self, monkeypatch, client):
+        self.client = client
+        self.qod = {}
+        self.ti = {}
+        self.calls = []
+        monkeypatch.setattr(common, "as_session_with_qos_get_all", self._list(self.qod))
+        monkeypatch.setattr(common, "traffic_influence_get_all", self._list(self.ti))
+        monkeypatch.setattr(common, "as_session_with_qos_post", self._post("qod", self.qod))
+        monkeypatch.setattr(common, "traffic_influence_post", self._post("ti", self.ti))
+        monkeypatch.setattr(common, "as_session_with_qos_delete", self._delete("qod", self.qod))
+        monkeypatch.setattr(common, "traffic_influence_delete", self._delete("ti", self.ti))
+        monkeypatch.setattr(common, "traffic_influence_put", self._put)
+
+    def add_qod(self, session_info, owned=False, split_flows=False):
+        subscription = self.client._build_qod_subscription(session_info)
+        if split_flows:
+            # A NEF echoing every rule of the flow as its own description
+            for flow in subscription.flowInfo:
+                flow.flowDescriptions = [
+                    rule.strip()
+                    for description in flow.flowDescriptions
+                    for rule in description.split(", ")
+                ]
+        item = self._store(self.qod, subscription)
+        if owned:
+            self._own(SessionKind.qod, item)
+
+    def add_ti(self, info, owned=False):
+        item = self._store(self.ti, self.client._build_ti_subscription(info))
+        if owned:
+            self._own(SessionKind.traffic_influence, item)
+
+    def _own(self, kind, item):
+        self.client.session_store.record(
+            kind,
+            item["self"],
+            {},
+            base_url=self.client.base_url,
+            scs_as_id=self.client.scs_as_id,
+        )
+
+    @staticmethod
+    def _store(collection, subscription):
+        resource_id = str(uuid.uuid4())
+        item = subscription.model_dump(mode="json", exclude_none=True, by_alias=True)
+        collection[resource_id] = dict(item, self=f"http://nef/subscriptions/{resource_id}")
+        return collection[resource_id]
+
+    def _list(self, collection):
+        def get_all(base_url, scs_as_id):
+            self.calls.append("list")
+            return list(collection.values())
+
+        return get_all
+
+    def _post(self, kind, collection):
+        def post(base_url, scs_as_id, subscription):
+            self.calls.append(f"create-{kind}")
+            return self._store(collection, subscription)
+
+        return post
+
+    def _delete(self, kind, collection):
+        def delete(base_url, scs_as_id, session_id):
+            self.calls.append(f"delete-{kind}")
+            del collection[session_id]
+
+        return delete
+
+    def _put(self, base_url, scs_as_id, resource_id, subscription):
+        self.calls.append("put-ti")
+        self.ti[resource_id] = self._store({}, subscription)
+
+
+def _client(tmp_path):
+    client = OaiClient(base_url="http://test-oai.url", scs_as_id="scs")
+    client.attach_session_store(SqliteSessionStore(str(tmp_path / "sessions.db")))
+    return client
+
+
+def test_reconcile_applies_the_minimal_diff(monkeypatch, tmp_path):
+    client = _client(tmp_path)
+    nef = FakeNef(monkeypatch, client)
+    nef.add_qod(_session("10.45.0.10"), owned=True)
+    nef.add_qod(_session("10.45.0.10"), owned=True)  # duplicate left by a retry
+    nef.add_qod(_session("10.45.0.99"), owned=True)  # orphan
+    nef.add_qod(_session("10.45.0.98"))  # owned by another SDK instance
+    nef.add_ti(_ti("12.1.2.31", zone="old-edge"), owned=True)
+
+    desired = DesiredState(
+        qod_sessions=[_session("10.45.0.10"), _session("10.45.0.11", "qos-l")],
+        traffic_influences=[_ti("12.1.2.31", zone="edge"), _ti("12.1.2.32")],
+    )
+    reconciler = Reconciler(client, desired, prune=True, max_workers=4)
+    plan = reconciler.plan()
+    assert len(plan.create_qod) == 1 and len(plan.delete_qod) == 2
+    assert len(plan.create_ti) == 1 and len(plan.put_ti) == 1 and plan.delete_ti == []
+
+    nef.calls.clear()
+    report = reconciler.reconcile()
+    assert report.ok and report.applied == 5
+    assert sorted(nef.calls) == sorted(
+        ["list", "list", "create-qod", "delete-qod", "delete-qod", "create-ti", "put-ti"]
+    )
+    assert len(nef.qod) == 3 and len(nef.ti) == 2
+
+    # Converged: the next cycle only lists
+    nef.calls.clear()
+    assert len(reconciler.reconcile().plan) == 0
+    assert nef.calls == ["list", "list"]
+
+
+def test_without_prune_unknown_subscriptions_are_kept(monkeypatch, tmp_path):
+    client = _client(tmp_path)
+    nef = FakeNef(monkeypatch, client)
+    nef.add_qod(_session("10.45.0.99"), owned=True)
+
+    report = Reconciler(client, lambda: DesiredState()).reconcile()
+    assert len(report.plan) == 0 and nef.calls == []
+
+
+def test_sessions_created_during_the_cycle_are_not_pruned(monkeypatch, tmp_path):
+    client = _client(tmp_path)
+    nef = FakeNef(monkeypatch, client)
+
+    def desired():
+        # Created after the desired snapshot, before the NEF listing
+        client.create_qod_session(_session("10.45.0.12"))
+        return DesiredState()
+
+    plan = Reconciler(client, desired, prune=True).plan()
+    assert plan.delete_qod == [] and len(nef.qod) == 1
+    assert len(Reconciler(client, DesiredState(), prune=True).plan().delete_qod) == 1
+
+
+def test_split_flow_descriptions_match(monkeypatch, tmp_path):
+    client = _client(tmp_path)
+    nef = FakeNef(monkeypatch, client)
+    session = dict(_session("10.45.0.10"), devicePorts={"ports": [5000, 6000]})
+    nef.add_qod(session, owned=True, split_flows=True)
+
+    assert len(Reconciler(client, DesiredState([session]), prune=True).plan()) == 0
+
+
+def test_failures_are_reported(monkeypatch):
+    client = OaiClient(base_url="http://test-oai.url", scs_as_id="scs")
+    nef = FakeNef(monkeypatch, client)
+
+    def fail(*args):
+        raise common.CoreHttpError("NEF unavailable")
+
+    monkeypatch.setattr(common, "as_session_with_qos_post", fail)
+    report = Reconciler(client, DesiredState([_session("10.45.0.10")])).reconcile()
+    assert not report.ok and report.errors[0][0] == "create_qod_session"
+    assert nef.qod == {}
+
+
+def test_pruned_traffic_influences_leave_the_store(monkeypatch, tmp_path):
+    client = _client(tmp_path)
+    nef = FakeNef(monkeypatch, client)
+    created = client.create_traffic_influence_resource(_ti("12.1.2.31"))
+    assert created["trafficInfluenceID"].startswith("http://nef/subscriptions/")
+    (stored,) = client.session_store.sessions(SessionKind.traffic_influence)
+    assert stored.session_id == created["trafficInfluenceID"].split("/")[-1]
+
+    report = Reconciler(client, DesiredState(), prune=True).reconcile()
+    assert report.ok and len(report.plan.delete_ti) == 1
+    assert nef.ti == {} and client.session_store.sessions(SessionKind.traffic_influence) == []
+
+
+def test_unreadable_subscriptions_are_skipped(monkeypatch, tmp_path):
+    client = _client(tmp_path)
+    nef = FakeNef(monkeypatch, client)
+    nef.add_ti(_ti("12.1.2.31"), owned=True)
+    nef.ti["broken"] = {"self": "http://nef/subscriptions/broken", "afAppId": "app"}
+
+    plan = Reconciler(client, DesiredState(traffic_influences=[_ti("12.1.2.31")])).plan()
+    assert len(plan) == 0
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from sunrise6g_opensdk.network.adapters.errors import NetworkPlatformError
+from sunrise6g_opensdk.network.adapters.open5gs.client import (
+    NetworkManager as Open5GSClient,
+)
+from sunrise6g_opensdk.network.core import common, schemas
+from sunrise6g_opensdk.network.core.common import CoreHttpError
+
+
+def _report(lon: float) -> dict:
+    return {
+        "monitoringType": "LOCATION_REPORTING",
+        "eventTime": "2025-06-18T12:29:50Z",
+        "locationInfo": {
+            "ageOfLocationInfo": {"duration": 1},
+            "geographicArea": {
+                "polygon": {
+                    "point_list": {
+                        "geographical_coords": [
+                            {"lon": lon, "lat": 41.0},
+                            {"lon": lon + 0.1, "lat": 41.0},
+                            {"lon": lon + 0.1, "lat": 41.1},
+                        ]
+                    }
+                }
+            },
+        },
+    }
+
+
+def _requests(count: int) -> list[schemas.RetrievalLocationRequest]:
+    return [
+        schemas.RetrievalLocationRequest(device={"phoneNumber": f"+3460000{i:04d}"})
+        for i in range(count)
+    ]
+
+
+def test_retrieve_locations_runs_concurrently_and_reports_errors(monkeypatch):
+    in_flight, peak = 0, 0
+    lock = threading.Lock()
+    barrier = threading.Barrier(4, timeout=5)
+
+    def monitoring_event_post(base_url, scs_as_id, subscription, session=None):
+        nonlocal in_flight, peak
+        assert session is not None
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        try:
+            barrier.wait()
+            phone_suffix = int(subscription.msisdn[-4:])
+            if phone_suffix == 3:
+                raise CoreHttpError("404 Not Found")
+            if phone_suffix == 5:
+                return {"monitoringType": "LOCATION_REPORTING"}
+            return _report(lon=phone_suffix)
+        finally:
+            with lock:
+                in_flight -= 1
+
+    monkeypatch.setattr(common, "monitoring_event_post", monitoring_event_post)
+    client = Open5GSClient(base_url="http://test-open5gs.url", scs_as_id="scs")
+    results = dict(
+        (device.phoneNumber.root, result)
+        for device, result in client.retrieve_locations(_requests(8), max_concurrency=4)
+    )
+
+    assert peak == 4
+    assert len(results) == 8
+    assert isinstance(results["+34600000003"], CoreHttpError)
+    assert isinstance(results["+34600000005"], NetworkPlatformError)
+    location = results["+34600000007"]
+    assert isinstance(location, schemas.Location)
+    assert location.area.boundary.root[0].longitude == 7
+    assert location.lastLocationTime.root.minute == 28
+
+
+def test_batch_conversion_matches_single_retrieval(monkeypatch):
+    monkeypatch.setattr(common, "monitoring_event_post", lambda *args, **kwargs: _report(2.0))
+    client = Open5GSClient(base_url="http://test-open5gs.url", scs_as_id="scs")
+    single = client.create_monitoring_event_subscription(_requests(1)[0])
+    [(_, batched)] = list(client.retrieve_locations(_requests(1)))
+    assert single == batched
@@ -0,0 +1,205 @@
+import uuid
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from sunrise6g_opensdk.network.adapters.errors import NetworkPlatformError
+from sunrise6g_opensdk.network.adapters.oai.client import NetworkManager as OaiClient
+from sunrise6g_opensdk.network.core import common
+from sunrise6g_opensdk.network.core.base_network_client import BaseNetworkClient
+from sunrise6g_opensdk.network.core.common import CoreHttpError
+from sunrise6g_opensdk.network.core.routing_client import RoutingNetworkClient
+
+
+class FakeNef(BaseNetworkClient):
+    """In-memory NEF; replicas of a shard share the same sessions dict."""
+
+    def __init__(self, base_url: str, sessions: dict):
+        self.base_url = base_url
+        self.scs_as_id = "af"
+        self.sessions = sessions
+        self.down = False
+        self.slow = False
+        self.calls = 0
+
+    def _check(self):
+        self.calls += 1
+        if self.down:
+            refused = NewConnectionError(None, "Connection refused")
+            try:
+                raise requests.exceptions.ConnectionError(
+                    MaxRetryError(None, self.base_url, refused)
+                )
+            except requests.exceptions.ConnectionError as e:
+                raise CoreHttpError("connection error") from e
+
+    def create_qod_session(self, session_info):
+        self._check()
+        if "qosProfile" not in session_info:
+            raise NetworkPlatformError("qosProfile is required")
+        session_id = str(uuid.uuid4())
+        self.sessions[session_id] = dict(session_info, sessionId=session_id)
+        if self.slow:
+            # The NEF created the session but the answer did not arrive in time
+            try:
+                raise requests.exceptions.ReadTimeout("read timed out")
+            except requests.exceptions.ReadTimeout as e:
+                raise CoreHttpError("timeout") from e
+        return self.sessions[session_id]
+
+    def get_qod_session(self, session_id):
+        self._check()
+        if session_id not in self.sessions:
+            response = requests.Response()
+            response.status_code = 404
+            try:
+                raise requests.exceptions.HTTPError("404", response=response)
+            except requests.exceptions.HTTPError as e:
+                raise CoreHttpError(e) from e
+        return self.sessions[session_id]
+
+    def delete_qod_session(self, session_id):
+        self._check()
+        del self.sessions[session_id]
+
+
+def _session_info(phone: str, region: str | None = None) -> dict:
+    info = {"device": {"phoneNumber": phone}, "qosProfile": "qos-e", "duration": 60}
+    if region:
+        info["region"] = region
+    return info
+
+
+def _shards(count: int, replicas: int = 1):
+    shards = {}
+    for i in range(count):
+        sessions = {}
+        shards[f"nef{i}"] = [FakeNef(f"http://nef{i}-{r}", sessions) for r in range(replicas)]
+    return shards
+
+
+def test_devices_are_spread_consistently_and_sessions_routed_to_owner():
+    shards = _shards(3)
+    client = RoutingNetworkClient(shards, probe=lambda c: True)
+
+    created = [client.create_qod_session(_session_info(f"+3460000{i:04d}")) for i in range(60)]
+    used = {client.owner_of(s["sessionId"]) for s in created}
+    assert used == {"nef0", "nef1", "nef2"}
+    # Same device, same shard
+    again = client.create_qod_session(_session_info("+34600000007"))
+    assert client.owner_of(again["sessionId"]) == client.owner_of(created[7]["sessionId"])
+
+    target = created[0]["sessionId"]
+    owner = shards[client.owner_of(target)][0]
+    before = owner.calls
+    client.delete_qod_session(target)
+    assert owner.calls == before + 1 and target not in owner.sessions
+
+
+def test_region_restricts_placement():
+    client = RoutingNetworkClient(
+        _shards(3),
+        shard_regions={"nef0": "es", "nef1": "es", "nef2": "gr"},
+        region_of=lambda info: info.get("region"),
+        probe=lambda c: True,
+    )
+    for i in range(20):
+        session = client.create_qod_session(_session_info(f"+3069000{i:04d}", "gr"))
+        assert client.owner_of(session["sessionId"]) == "nef2"
+
+
+def test_failover_between_replicas_and_recovery_after_probe():
+    shards = _shards(1, replicas=2)
+    primary, secondary = shards["nef0"]
+    client = RoutingNetworkClient(shards, probe=lambda c: not c.down)
+
+    primary.down = True
+    session = client.create_qod_session(_session_info("+34600000001"))
+    assert client.get_qod_session(session["sessionId"]) == session
+    assert client.check_health() == {"nef0": [False, True]}
+
+    primary.down = False
+    assert client.check_health() == {"nef0": [True, True]}
+
+
+def test_unknown_session_is_looked_up_and_full_outage_reported():
+    shards = _shards(2)
+    writer = RoutingNetworkClient(shards, probe=lambda c: True)
+    session = writer.create_qod_session(_session_info("+34600000002"))
+
+    reader = RoutingNetworkClient(shards, probe=lambda c: True)
+    assert reader.get_qod_session(session["sessionId"]) == session
+    assert reader.owner_of(session["sessionId"]) == writer.owner_of(session["sessionId"])
+
+    for replicas in shards.values():
+        replicas[0].down = True
+    with pytest.raises(NetworkPlatformError):
+        reader.create_qod_session(_session_info("+34600000003"))
+
+
+def test_creations_only_fail_over_when_the_request_was_not_sent():
+    shards = _shards(2, replicas=2)
+    client = RoutingNetworkClient(shards, probe=lambda c: True)
+    for replicas in shards.values():
+        for replica in replicas:
+            replica.slow = True
+
+    with pytest.raises(CoreHttpError):
+        client.create_qod_session(_session_info("+34600000004"))
+    assert sum(len(replicas[0].sessions) for replicas in shards.values()) == 1
+
+    # Invalid requests are not retried on the other shards either
+    calls = sum(replica.calls for replicas in shards.values() for replica in replicas)
+    with pytest.raises(NetworkPlatformError, match="qosProfile"):
+        client.create_qod_session({"device": {"phoneNumber": "+34600000005"}})
+    assert sum(replica.calls for replicas in shards.values() for replica in replicas) == calls + 1
+
+
+def test_listed_traffic_influence_resources_are_routed_to_their_nef(monkeypatch):
+    ti_info = {
+        "appId": "app",
+        "appInstanceId": "10.45.0.1",
+        "edgeCloudZoneId": "zone-1",
+        "notificationUri": "http://sink",
+        "device": {"ipv4Address": {"publicAddress": "10.45.0.10", "privateAddress": "10.45.0.10"}},
+    }
+    shards = {name: OaiClient(base_url=f"http://{name}", scs_as_id="af") for name in ("a", "b")}
+    nef_item = shards["a"]._build_ti_subscription(ti_info).model_dump(exclude_none=True)
+    subscriptions = {
+        base_url: [dict(nef_item, self=f"{base_url}/subscriptions/ti-{name}")]
+        for name, base_url in (("a", "http://a"), ("b", "http://b"))
+    }
+    deleted = []
+    monkeypatch.setattr(common, "traffic_influence_get", lambda url, scs: subscriptions[url])
+    monkeypatch.setattr(
+        common, "traffic_influence_delete", lambda url, scs, rid: deleted.append((url, rid))
+    )
+
+    client = RoutingNetworkClient(shards, probe=lambda c: True)
+    resources = client.get_all_traffic_influence_resource()
+    assert sorted(r.trafficInfluenceID for r in resources) == [
+        "http://a/subscriptions/ti-a",
+        "http://b/subscriptions/ti-b",
+    ]
+    assert client.owner_of("ti-b") == "b"
+    assert client.owner_of("http://b/subscriptions/ti-b") == "b"
+
+    client.delete_traffic_influence_resource("ti-b")
+    assert deleted == [("http://b", "ti-b")]
+    assert client.owner_of("ti-b") is None
+
+
+def test_owner_map_is_bounded():
+    shards = _shards(2)
+    client = RoutingNetworkClient(shards, probe=lambda c: True, max_owners=3)
+    created = [client.create_qod_session(_session_info(f"+3460000{i:04d}")) for i in range(5)]
+    assert [client.owner_of(s["sessionId"]) is not None for s in created] == [
+        False,
+        False,
+        True,
+        True,
+        True,
+    ]
+    # Forgotten owners are looked up again
+    assert client.get_qod_session(created[0]["sessionId"]) == created[0]
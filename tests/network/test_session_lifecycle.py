@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+import threading
+import uuid
+
+from sunrise6g_opensdk.network.core.common import CoreHttpError
+from sunrise6g_opensdk.network.core.session_lifecycle import QoDSessionManager
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeNetworkClient:
+    def __init__(self, gate=None, failing=False):
+        self.sessions = {}
+        self.deleted = []
+        self.gate = gate
+        self.failing = failing
+
+    def create_qod_session(self, session_info):
+        session_id = uuid.uuid4()
+        session = dict(session_info, sessionId=session_id)
+        self.sessions[str(session_id)] = session
+        return session
+
+    def extend_qod_session(self, session_id, requested_additional_duration):
+        if self.gate is not None:
+            assert self.gate.wait(5)
+        if self.failing:
+            raise CoreHttpError("503 Service Unavailable")
+        session = self.sessions[session_id]
+        session["duration"] += requested_additional_duration
+        return dict(session)
+
+    def delete_qod_session(self, session_id):
+        self.deleted.append(session_id)
+        self.sessions.pop(session_id, None)
+
+
+def test_expiry_and_pre_expiry_hooks():
+    clock = FakeClock()
+    events = []
+    manager = QoDSessionManager(
+        FakeNetworkClient(),
+        on_expiry=lambda s: events.append(("expired", s.session_id)),
+        on_pre_expiry=lambda s: events.append(("pre", s.session_id)),
+        pre_expiry_margin=30,
+        clock=clock,
+    )
+    session = manager.create_qod_session({"duration": 100, "qosProfile": "qos-e"})
+    session_id = str(session["sessionId"])
+    assert session_id in manager
+
+    manager.poll(clock.now + 69)
+    assert events == []
+    manager.poll(clock.now + 70)
+    manager.join(5)
+    assert events == [("pre", session_id)]
+    manager.poll(clock.now + 100)
+    manager.join(5)
+    assert events[-1] == ("expired", session_id)
+    assert session_id not in manager
+
+
+def test_auto_extend_moves_deadline_and_respects_limit():
+    clock = FakeClock()
+    client = FakeNetworkClient()
+    expired = []
+    manager = QoDSessionManager(
+        client,
+        on_expiry=expired.append,
+        pre_expiry_margin=10,
+        auto_extend_by=50,
+        max_extensions=1,
+        clock=clock,
+    )
+    session_id = str(manager.create_qod_session({"duration": 100})["sessionId"])
+
+    # The expiry due while the extension is in flight waits for it
+    manager.poll(clock.now + 100)
+    manager.join(5)
+    assert expired == []
+    assert manager.get(session_id).duration == 150
+    assert manager.get(session_id).extensions == 1
+
+    manager.poll(clock.now + 150)
+    manager.join(5)
+    assert [s.session_id for s in expired] == [session_id]
+
+
+def test_auto_delete_and_untrack():
+    clock = FakeClock()
+    client = FakeNetworkClient()
+    manager = QoDSessionManager(client, auto_delete=True, clock=clock)
+    kept = str(manager.create_qod_session({"duration": 10})["sessionId"])
+    dropped = str(manager.create_qod_session({"duration": 10})["sessionId"])
+    manager.untrack(dropped)
+
+    assert manager.poll(clock.now + 10) == 1
+    manager.join(5)
+    assert client.deleted == [kept]
+    assert len(manager) == 0
+
+
+def test_nef_calls_do_not_block_the_timers():
+    clock = FakeClock()
+    gate, expired = threading.Event(), threading.Event()
+    client = FakeNetworkClient(gate=gate)
+    manager = QoDSessionManager(
+        client,
+        on_expiry=lambda s: expired.set(),
+        pre_expiry_margin=10,
+        auto_extend_by=50,
+        clock=clock,
+    )
+    slow = str(manager.create_qod_session({"duration": 100})["sessionId"])
+    manager.track("other", duration=5)
+
+    # The extension of the first session hangs; the other one still expires
+    assert manager.poll(clock.now + 96) == 2
+    assert expired.wait(5) and "other" not in manager
+    assert not manager.join(0.05)
+    gate.set()
+    assert manager.join(5)
+    assert manager.get(slow).duration == 150
+
+
+def test_failed_extension_lets_the_session_expire():
+    clock = FakeClock()
+    gate = threading.Event()
+    expired = []
+    manager = QoDSessionManager(
+        FakeNetworkClient(gate=gate, failing=True),
+        on_expiry=expired.append,
+        pre_expiry_margin=10,
+        auto_extend_by=50,
+        clock=clock,
+    )
+    manager.track("s1", duration=100)
+    # The deadline passes while the extension is in flight
+    manager.poll(clock.now + 100)
+    assert "s1" in manager
+    gate.set()
+    manager.join(5)
+    assert expired == []
+    manager.poll(clock.now + 101)
+    manager.join(5)
+    assert [s.session_id for s in expired] == ["s1"]
+
+
+def test_tracks_many_sessions():
+    clock = FakeClock()
+    manager = QoDSessionManager(FakeNetworkClient(), clock=clock)
+    for i in range(100_000):
+        manager.track(f"session-{i}", duration=1 + i % 3600)
+    for i in range(0, 100_000, 2):
+        manager.untrack(f"session-{i}")
+    assert len(manager) == 50_000
+    assert manager.poll(clock.now + 3600) == 50_000
+    assert len(manager) == 0
+
+
+def test_stop_releases_the_worker_threads():
+    def workers():
+        return {t for t in threading.enumerate() if t.name.startswith("qod-session-worker")}
+
+    clock = FakeClock()
+    expired = threading.Event()
+    before = workers()
+    manager = QoDSessionManager(FakeNetworkClient(), on_expiry=lambda s: expired.set(), clock=clock)
+    manager.create_qod_session({"duration": 10, "qosProfile": "qos-e"})
+    manager.poll(clock.now + 10)
+    assert expired.wait(5) and manager.join(5)
+
+    started = workers() - before
+    assert started
+    manager.stop()
+    for thread in started:
+        thread.join(5)
+    assert not any(thread.is_alive() for thread in started)
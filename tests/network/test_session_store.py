@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import sqlite3
+import uuid
+
+import pytest
+
+from sunrise6g_opensdk.network.adapters.oai.client import NetworkManager as OaiClient
+from sunrise6g_opensdk.network.core import common
+from sunrise6g_opensdk.network.core.notification_receiver import NotificationReceiver
+from sunrise6g_opensdk.network.core.session_store import SessionKind, SqliteSessionStore
+
+SESSION = {
+    "duration": 600,
+    "device": {
+        "ipv4Address": {"publicAddress": "10.45.0.10", "privateAddress": "10.45.0.10"},
+        "phoneNumber": "+34600000001",
+    },
+    "applicationServer": {"ipv4Address": "10.45.0.1"},
+    "qosProfile": "qos-e",
+    "sink": "https://endpoint.example.com/sink",
+}
+
+TI = {
+    "device": {"ipv4Address": {"publicAddress": "12.1.2.31", "privateAddress": "12.1.2.31"}},
+    "edgeCloudZoneId": "edge",
+    "appId": "testSdk-ffff-aaaa-c0ffe",
+    "appInstanceId": "172.21.18.3",
+    "notificationUri": "https://endpoint.example.com/sink",
+}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def nef(monkeypatch):
+    subscriptions = {}
+    calls = []
+
+    def post(base_url, scs_as_id, subscription):
+        calls.append("post")
+        resource_id = str(uuid.uuid4())
+        item = subscription.model_dump(mode="json", exclude_none=True, by_alias=True)
+        subscriptions[resource_id] = dict(item, self=f"http://nef/subscriptions/{resource_id}")
+        return subscriptions[resource_id]
+
+    def get(base_url, scs_as_id, session_id):
+        calls.append("get")
+        return subscriptions[session_id]
+
+    def patch(base_url, scs_as_id, session_id, model_payload):
+        calls.append("patch")
+        subscriptions[session_id]["usageThreshold"] = model_payload.usageThreshold.model_dump()
+
+    def delete(base_url, scs_as_id, session_id):
+        calls.append("delete")
+        subscriptions.pop(session_id.rstrip("/").split("/")[-1])
+
+    monkeypatch.setattr(common, "as_session_with_qos_post", post)
+    monkeypatch.setattr(common, "as_session_with_qos_get", get)
+    monkeypatch.setattr(common, "as_session_with_qos_patch", patch)
+    monkeypatch.setattr(common, "as_session_with_qos_delete", delete)
+    monkeypatch.setattr(common, "traffic_influence_post", post)
+    monkeypatch.setattr(common, "traffic_influence_delete", delete)
+    return calls
+
+
+def test_qod_lifecycle_is_recorded_and_served_locally(tmp_path, nef):
+    clock = Clock()
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"), clock=clock)
+    client = OaiClient(base_url="http://test-oai.url", scs_as_id="scs")
+    client.attach_session_store(store, serve_reads=True)
+
+    scope = {"base_url": client.base_url, "scs_as_id": "scs"}
+
+    created = client.create_qod_session(dict(SESSION))
+    session_id = str(created["sessionId"])
+    stored = store.get(SessionKind.qod, session_id, **scope)
+    assert stored.ipv4 == "10.45.0.10" and stored.phone == "+34600000001"
+    assert stored.profile == "qos-e" and stored.flows
+    assert stored.expires_at == clock.now + 600
+
+    # The status is unknown until the NEF is read once
+    assert client.get_qod_session(session_id)["qosStatus"].value == "AVAILABLE"
+    nef.clear()
+    assert client.get_qod_session(session_id)["sessionId"] == created["sessionId"]
+    assert nef == []
+
+    extended = client.extend_qod_session(session_id, 300)
+    assert extended["duration"] == 900
+    assert store.get(SessionKind.qod, session_id, **scope).expires_at == clock.now + 900
+
+    # Expired entries are not served
+    clock.now += 901
+    client.get_qod_session(session_id)
+    assert nef[-1] == "get"
+
+    client.delete_qod_session(session_id)
+    assert store.get(SessionKind.qod, session_id, **scope) is None
+
+
+def test_nefs_sharing_a_store_are_kept_apart(tmp_path, nef):
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+    first = OaiClient(base_url="http://nef-1.url", scs_as_id="scs")
+    second = OaiClient(base_url="http://nef-2.url", scs_as_id="scs")
+    first.attach_session_store(store, serve_reads=True)
+    second.attach_session_store(store, serve_reads=True)
+
+    store.record(
+        SessionKind.qod, "same-id", {"qosStatus": "AVAILABLE"}, base_url="http://nef-1.url"
+    )
+    store.record(
+        SessionKind.qod, "same-id", {"qosStatus": "AVAILABLE"}, base_url="http://nef-2.url"
+    )
+    assert len(store) == 2
+    assert store.remove(SessionKind.qod, "same-id", base_url="http://nef-1.url")
+    assert [s.base_url for s in store.sessions()] == ["http://nef-2.url"]
+    assert store.sessions(base_url="http://nef-1.url") == []
+
+
+def test_qos_notifications_update_the_stored_status(tmp_path, nef):
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+    receiver = NotificationReceiver()
+    client = OaiClient(base_url="http://test-oai.url", scs_as_id="scs")
+    client.attach_notification_receiver(receiver)
+    client.attach_session_store(store, serve_reads=True)
+    session_id = str(client.create_qod_session(dict(SESSION))["sessionId"])
+    client.get_qod_session(session_id)
+
+    notification = {
+        "transaction": f"http://nef/subscriptions/{session_id}",
+        "eventReports": [{"event": "SESSION_TERMINATION"}],
+    }
+    assert asyncio.run(receiver.dispatch("qos", notification)) == 204
+    nef.clear()
+    session = client.get_qod_session(session_id)
+    assert nef == []
+    assert session["qosStatus"].value == "UNAVAILABLE"
+    assert session["statusInfo"].value == "NETWORK_TERMINATED"
+
+
+def test_store_failures_do_not_fail_the_nef_call(tmp_path, nef, monkeypatch):
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+    client = OaiClient(base_url="http://test-oai.url", scs_as_id="scs")
+    client.attach_session_store(store, serve_reads=True)
+
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "record", locked)
+    monkeypatch.setattr(store, "get", locked)
+    session_id = str(client.create_qod_session(dict(SESSION))["sessionId"])
+    assert client.get_qod_session(session_id)["qosStatus"].value == "AVAILABLE"
+    assert nef == ["post", "get"]
+
+
+def test_sessions_survive_a_restart(tmp_path, nef):
+    path = str(tmp_path / "sessions.db")
+    clock = Clock()
+    client = OaiClient(base_url="http://test-oai.url", scs_as_id="scs")
+    client.attach_session_store(SqliteSessionStore(path, clock=clock))
+    qod = client.create_qod_session(dict(SESSION))
+    ti = client.create_traffic_influence_resource(dict(TI))
+
+    restarted = SqliteSessionStore(path, clock=clock)
+    assert len(restarted) == 2
+    assert [s.session_id for s in restarted.sessions(SessionKind.qod)] == [str(qod["sessionId"])]
+    (stored_ti,) = restarted.by_device(ipv4="12.1.2.31")
+    assert stored_ti.kind is SessionKind.traffic_influence
+    assert stored_ti.expires_at is None and stored_ti.profile == TI["appId"]
+    assert stored_ti.payload["trafficInfluenceID"] == ti["trafficInfluenceID"]
+    assert [s.kind for s in restarted.by_device(phone="+34600000001")] == [SessionKind.qod]
+
+    client.delete_traffic_influence_resource(ti["trafficInfluenceID"])
+    assert restarted.sessions(SessionKind.traffic_influence) == []
+
+
+def test_expiry_index(tmp_path):
+    clock = Clock()
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"), clock=clock)
+    store.record(SessionKind.qod, "a", {}, duration=60)
+    store.record(SessionKind.qod, "b", {}, duration=10)
+    store.record(SessionKind.traffic_influence, "c", {})
+
+    assert [s.session_id for s in store.expiring_before(clock.now + 120)] == ["b", "a"]
+    clock.now += 30
+    assert [s.session_id for s in store.sessions()] == ["a", "c"]
+    assert len(store.sessions(include_expired=True)) == 3
+    assert store.purge_expired() == 1
+    assert len(store) == 2